@@ -1,18 +1,21 @@
 from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
-from ..db.session import get_db
-from ..models.meeting import Meeting
-from ..schemas.meeting import MeetingCreate
+from ...db.repository import JobRepository, MeetingRepository
+from ...db.session import get_db
+from ...models.meeting import Meeting
+from ...schemas.meeting import MeetingCreate
 
-async def get_meeting(meeting_id: int, db: Session = Depends(get_db)) -> Meeting:
-    meeting = db.query(Meeting).filter(Meeting.id == meeting_id).first()
+def get_repo(db: Session = Depends(get_db)) -> MeetingRepository:
+    return MeetingRepository(db)
+
+def get_job_repo(db: Session = Depends(get_db)) -> JobRepository:
+    return JobRepository(db)
+
+def get_meeting(meeting_id: str, repo: MeetingRepository = Depends(get_repo)) -> Meeting:
+    meeting = repo.get_meeting(meeting_id)
     if meeting is None:
         raise HTTPException(status_code=404, detail="Meeting not found")
     return meeting
 
-async def create_meeting(meeting: MeetingCreate, db: Session = Depends(get_db)) -> Meeting:
-    db_meeting = Meeting(**meeting.dict())
-    db.add(db_meeting)
-    db.commit()
-    db.refresh(db_meeting)
-    return db_meeting
\ No newline at end of file
+def create_meeting(meeting: MeetingCreate, repo: MeetingRepository = Depends(get_repo)) -> Meeting:
+    return repo.create_meeting(meeting.title, meeting.meeting_type)
@@ -1,11 +1,45 @@
 # app/api/v1/routes.py
-from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from uuid import uuid4
 from app.config import get_settings
-from app.services.groq_service import GroqClient, transcribe_audio
-import tempfile, shutil, os
-from app.services.groq_service import translate_text
-from app.services.groq_service import summarize_text_en, summarize_text_native
+from app.services.groq_service import GroqClient
+from app.services.groq_clients import get_client_manager
+import os, asyncio, json, time
+from typing import List
+from app.services.async_groq_service import transcribe_audio, translate_text
+from app.services.async_groq_service import summarize_text_en, summarize_text_native
+from app.utils.uploads import remove_quietly, spool_upload, spooled_upload
+from app.services.live_session import analyze_pending, get_session, restore_session, session_from_state
+from app.services.live_hub import get_live_hub
+from app.services.live_audio import (
+    ENCODINGS,
+    OpusDecoder,
+    OrderedTranscriber,
+    Utterance,
+    UtteranceSegmenter,
+    ffmpeg_available,
+    pcm_from_bytes,
+)
+from app.services.audio import SAMPLE_RATE, encode_wav
+from app.services.langid import detect_language, normalize_language
+from app.core.logger import logger
+from app.db.session import SessionLocal
+from app.services.pipeline import analyze_pipeline, analyze_response, stage_events
+from app.utils.helpers import format_sse
+from app.services.cache import get_cache
+from app.api.v1.deps import get_job_repo, get_repo
+from app.db.repository import JobRepository, MeetingRepository
+from app.models.job import JOB_STATUSES
+from app.schemas.meeting import Meeting, MeetingPage, MeetingResponse
+from app.services.jobs import backfill_candidates, discard_audio, in_repo, job_view, notify_workers
+from app.services.persistence import persist_analysis
+from app.services.search import KINDS, get_search_index, index_analysis
+from app.services.model_router import get_model_router
+from app.services.scheduler import BATCH, LIVE, SchedulerBusy, get_scheduler, priority
+from app.services.singleflight import acoalesce, get_singleflight
 
 router = APIRouter()
 
@@ -13,63 +47,481 @@ router = APIRouter()
 def v1_health():
     return {"status": "ok", "version": "v1"}
 
-# In-memory store for MVP
-_MEETINGS = {}
-_LAST_AUDIO: bytes | None = None
-_LAST_AUDIO_NAME: str = "audio.wav"
+@router.get("/cache/stats")
+def cache_stats():
+    cache = get_cache()
+    return {"enabled": cache is not None, **(cache.stats() if cache else {})}
 
-@router.get("/meetings")
-def list_meetings():
-    return list(_MEETINGS.values())
+@router.get("/clients/stats")
+def client_stats():
+    """
+    Groq connection pool usage: requests in flight, connections opened and
+    request counters for the sync and async clients.
+    """
+    return get_client_manager().stats()
+
+@router.get("/scheduler/stats")
+def scheduler_stats():
+    """
+    Model-call queues: waiting calls per priority class, admitted / rejected
+    counts and average queueing delay per model.
+    """
+    return get_scheduler().stats()
 
-@router.post("/meetings")
-def create_meeting(title: str = "Untitled", meeting_type: str = "upload"):
-    mid = str(uuid4())
-    item = {"id": mid, "title": title, "meeting_type": meeting_type}
-    _MEETINGS[mid] = item
-    return item
+@router.get("/singleflight/stats")
+def singleflight_stats():
+    """
+    Request coalescing: analyses in flight, callers waiting on them, and per
+    kind how many were executed vs. served by joining one already running.
+    """
+    return get_singleflight().stats()
+
+@router.get("/models/stats")
+def model_stats():
+    """
+    Model routing: the tier of each task, the models of each tier in
+    fallback order, and per model calls by outcome, latency percentiles
+    and estimated cost.
+    """
+    return get_model_router().stats()
+
+@router.get("/meetings", response_model=MeetingPage)
+def list_meetings(
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = None,
+    meeting_type: str | None = None,
+    repo: MeetingRepository = Depends(get_repo),
+):
+    """
+    Newest first, keyset-paginated: pass `next_cursor` back as `cursor`
+    to get the following page.
+    """
+    try:
+        items, next_cursor = repo.list_meetings(limit=limit, cursor=cursor, meeting_type=meeting_type)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.post("/meetings", response_model=Meeting)
+def create_meeting(title: str = "Untitled", meeting_type: str = "upload", repo: MeetingRepository = Depends(get_repo)):
+    return repo.create_meeting(title, meeting_type)
+
+@router.get("/meetings/{meeting_id}", response_model=MeetingResponse)
+def get_meeting_detail(meeting_id: str, repo: MeetingRepository = Depends(get_repo)):
+    meeting = repo.get_meeting(meeting_id)
+    if meeting is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    transcript = repo.latest_transcript(meeting_id)
+    return MeetingResponse(
+        **Meeting.model_validate(meeting).model_dump(),
+        summary=meeting.summary,
+        transcript=transcript.text_en or transcript.text_native if transcript else None,
+        actions=repo.list_actions(meeting_id),
+        moderation=[f.note for f in repo.list_flags(meeting_id)],
+    )
 
 @router.post("/meetings/upload")
-async def upload_audio(file: UploadFile = File(...)):
-    global _LAST_AUDIO, _LAST_AUDIO_NAME
+async def upload_audio(
+    file: UploadFile = File(...),
+    meeting_id: str | None = None,
+    repo: MeetingRepository = Depends(get_repo),
+):
+    """
+    Stores the audio under UPLOAD_DIR and returns its `upload_id`
+    (pass it to /meetings/transcribe, which deletes it once transcribed).
+    """
     if file.content_type not in {"audio/mpeg","audio/wav","audio/x-m4a","audio/mp4","audio/aac"}:
         raise HTTPException(status_code=400, detail="Unsupported audio type")
-    _LAST_AUDIO = await file.read()
-    _LAST_AUDIO_NAME = file.filename or "audio.wav"
-    return {"status": "received", "filename": _LAST_AUDIO_NAME, "size": len(_LAST_AUDIO)}
+    if meeting_id and await run_in_threadpool(repo.get_meeting, meeting_id) is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
+    filename = file.filename or "audio.wav"
+    spooled = await spool_upload(file, suffix=os.path.splitext(filename)[1] or ".wav", directory=get_settings().UPLOAD_DIR)
+    upload = await run_in_threadpool(repo.create_upload, filename, spooled.path, spooled.size, meeting_id)
+    return {"status": "received", "upload_id": upload.id, "filename": filename, "size": spooled.size,
+            "sha256": spooled.sha256}
 
 @router.post("/meetings/transcribe")
-def transcribe_stub():
-    if _LAST_AUDIO is None:
-        raise HTTPException(status_code=400, detail="No audio uploaded yet")
+def transcribe_stub(upload_id: str, repo: MeetingRepository = Depends(get_repo)):
+    upload = repo.get_upload(upload_id)
+    if upload is None or not os.path.exists(upload.path):
+        raise HTTPException(status_code=404, detail="Upload not found")
     settings = get_settings()
     if not settings.GROQ_API_KEY:
         raise HTTPException(status_code=500, detail="GROQ_API_KEY not set")
-    groq = GroqClient(api_key=settings.GROQ_API_KEY)
-    text = groq.transcribe_bytes(_LAST_AUDIO, filename=_LAST_AUDIO_NAME)
-    return {"text": text}
+    groq = GroqClient()
+    with priority(BATCH):
+        text = groq.transcribe_file(upload.path, filename=upload.filename)
+    if upload.meeting_id:
+        repo.save_transcript(upload.meeting_id, text)
+    # consumed: the transcript is what's kept, not the audio
+    remove_quietly(upload.path)
+    repo.delete_upload(upload.id)
+    return {"text": text, "upload_id": upload.id}
 
 @router.post("/meetings/process")
-def process_stub(payload: dict):
+def process_stub(payload: dict, repo: MeetingRepository = Depends(get_repo)):
     transcript = payload.get("transcript", "")
     if not transcript:
         raise HTTPException(status_code=400, detail="transcript is required")
+    meeting_id = payload.get("meeting_id")
+    meeting = repo.get_meeting(meeting_id) if meeting_id else None
+    if meeting_id and meeting is None:
+        raise HTTPException(status_code=404, detail="Meeting not found")
     settings = get_settings()
     if not settings.GROQ_API_KEY:
         raise HTTPException(status_code=500, detail="GROQ_API_KEY not set")
-    groq = GroqClient(api_key=settings.GROQ_API_KEY)
-    analysis = groq.analyze_transcript(transcript)
-    return analysis
+    groq = GroqClient()
+    with priority(BATCH):
+        analysis = groq.analyze_transcript(transcript)
+
+    if meeting is None:
+        meeting = repo.create_meeting(payload.get("title") or "Untitled", "upload")
+    repo.save_transcript(meeting.id, transcript)
+    repo.save_analysis(meeting.id, analysis)
+    index_analysis(meeting.id, title=meeting.title, transcript=transcript,
+                   summary=analysis.get("summary", ""), actions=analysis.get("actions") or [])
+    return {**analysis, "meeting_id": meeting.id}
+
+def _live_session(meeting_id: str, repo: MeetingRepository, register: bool = True):
+    """
+    The meeting's session, in step with the store (other workers add to it
+    too). A session this worker holds only fetches what was stored since its
+    version; otherwise the meeting is loaded in full, and kept for the next
+    call if `register` is set.
+    """
+    session = get_session(meeting_id, create=False)
+    if session is None:
+        state = repo.load_live_state(meeting_id) or {}
+        return restore_session(meeting_id, state) if register else session_from_state(meeting_id, state)
+    with session.store_lock:
+        stored = repo.live_version(meeting_id)
+        if stored is None or stored == session.version:
+            return session
+        if session.version is None or stored[0] < session.version[0]:
+            session.load(session_from_state(meeting_id, repo.load_live_state(meeting_id) or {}))
+        else:
+            session.catch_up(repo.load_live_state(meeting_id, segments_after=session.version[0]))
+    return session
+
+def _append_live_segment(repo: MeetingRepository, meeting_id: str, text: str, title: str | None = None,
+                         participants: List[str] | None = None):
+    """
+    Stores one transcript line of a live meeting and runs the rule-based
+    action engine on it. Returns (session, rule_actions).
+    """
+    repo.get_or_create_meeting(meeting_id, title=title, meeting_type="live")
+    session = get_session(meeting_id, create=False) or _live_session(meeting_id, repo)
+    with session.store_lock:
+        session = _live_session(meeting_id, repo)
+        # viewers have everything stored so far: publish only this segment's changes
+        since = session.changes()[1]
+        if participants:
+            session.add_participants(participants)
+            repo.add_participants(meeting_id, session.participants())
+        rule_actions = session.add_segment(text)
+        if text:
+            session.note_stored(segment_count=repo.add_segments(meeting_id, [text]))
+            rule_actions = repo.add_new_actions(meeting_id, rule_actions, source="rule")
+            hub = get_live_hub()
+            hub.publish(session, since)
+            hub.touch(meeting_id)
+    return session, rule_actions
+
+def _analyze_live(repo: MeetingRepository, meeting_id: str, session, rule_actions: List[dict] | None = None) -> dict:
+    """
+    Analyzes the transcript added since the previous tick, stores and
+    indexes the result and publishes the changes to the meeting's viewers.
+    If another worker stored the same tick first, its result is returned
+    instead.
+    """
+    groq = GroqClient()
+    since = session.changes()[1]
+    with priority(LIVE):
+        result = analyze_pending(session, groq)
+    start = result.pop("analyzed_from")
+    if result["analyzed_segments"] > start:
+        if not repo.save_live_analysis(meeting_id, start, result, participants=session.participants()):
+            logger.info(f"Live analysis of {meeting_id} from segment {start} was stored by another worker")
+            session.invalidate()
+            session = _live_session(meeting_id, repo)
+            return {**session.snapshot(), "new_actions": [], "new_notes": []}
+        session.note_stored(analyzed_upto=result["analyzed_segments"])
+        meeting = repo.get_meeting(meeting_id)
+        index_analysis(
+            meeting_id,
+            title=meeting.title if meeting else meeting_id,
+            transcript=" ".join(repo.segment_texts(meeting_id, after_seq=start, upto_seq=result["analyzed_segments"])),
+            summary=result["summary"],
+            actions=(rule_actions or []) + result["new_actions"],
+        )
+    # the tick's own changes: segments are published by the worker that stored them
+    get_live_hub().publish(session, {**since, "segments": result["segments"]})
+    return result
+
+def run_live_analysis(meeting_id: str) -> bool:
+    """
+    One round of a meeting's server-side analysis loop (see live_hub.py):
+    catches up with the store and analyzes once LIVE_ANALYZE_MIN_CHARS of
+    new transcript are waiting. Returns whether it did.
+    """
+    settings = get_settings()
+    if not settings.GROQ_API_KEY:
+        return False
+    db = SessionLocal()
+    try:
+        repo = MeetingRepository(db)
+        if repo.live_version(meeting_id) is None:
+            return False
+        session = _live_session(meeting_id, repo)
+        if session.pending_chars() < settings.LIVE_ANALYZE_MIN_CHARS:
+            return False
+        _analyze_live(repo, meeting_id, session)
+    finally:
+        db.close()
+    return True
+
+@router.post("/meetings/{meeting_id}/segments")
+def add_live_segment(meeting_id: str, payload: dict, repo: MeetingRepository = Depends(get_repo)):
+    """
+    Appends a transcript segment to a live meeting and (by default)
+    analyzes everything added since the previous analysis tick.
+    Action items the rule engine finds in the segment are returned right
+    away as `rule_actions`, also when `analyze` is false.
+    Returns the merged summary, actions and moderation notes.
+    The meeting is also analyzed on the server every few seconds while
+    transcript comes in (see live_hub.py), so analyze=true is only needed
+    to get a result right now, e.g. for the final report.
+    """
+    text = " ".join((payload.get("text", "") or "").split())
+    analyze = bool(payload.get("analyze", True))
+
+    session, rule_actions = _append_live_segment(repo, meeting_id, text, payload.get("title"),
+                                                 payload.get("participants"))
+
+    if not analyze:
+        return {**session.snapshot(), "rule_actions": rule_actions}
+
+    settings = get_settings()
+    if not settings.GROQ_API_KEY:
+        raise HTTPException(status_code=500, detail="GROQ_API_KEY not set")
+    result = _analyze_live(repo, meeting_id, session, rule_actions)
+    return {**result, "rule_actions": rule_actions}
+
+@router.get("/meetings/{meeting_id}/live")
+def get_live_session(meeting_id: str, repo: MeetingRepository = Depends(get_repo)):
+    if repo.get_meeting(meeting_id) is None:
+        raise HTTPException(status_code=404, detail="Live session not found")
+    return _live_session(meeting_id, repo, register=False).snapshot(include_transcript=True)
+
+def _live_changes(meeting_id: str) -> dict:
+    # the whole state as one diff, as stored (any worker may have added to it)
+    db = SessionLocal()
+    try:
+        session = _live_session(meeting_id, MeetingRepository(db), register=False)
+    finally:
+        db.close()
+    return session.changes()[0]
+
+@router.get("/meetings/{meeting_id}/live/events")
+async def live_events(meeting_id: str):
+    """
+    Live insights as Server-Sent Events, for any number of viewers: first
+    an `update` with the whole state, then one `update` per change with
+    only what changed. New segments / actions / notes come as lists with
+    the index they start at (`segments_from`, `actions_from`,
+    `notes_from`): skip what you already have, reconnect if there is a
+    gap. `summary`, `interruptions` and `analyzed_segments` are sent when
+    they change. `resync` means this client fell behind: reconnect.
+    Viewing never triggers an analysis; the meeting's own loop does.
+    """
+    hub = get_live_hub()
+
+    async def events():
+        async with hub.subscribe(meeting_id) as queue:
+            # subscribed before the snapshot is taken, so nothing falls in between
+            yield format_sse("update", {"type": "update", **await run_in_threadpool(_live_changes, meeting_id)})
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event["type"], event)
+                if event["type"] == "resync":
+                    return
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/live/stats")
+def live_hub_stats():
+    """
+    Live fan-out: broker, viewers per meeting, running analysis loops and
+    published / delivered event counts.
+    """
+    return get_live_hub().stats()
+
+def _store_live_segment(meeting_id: str, text: str, title: str | None, participants: List[str]):
+    db = SessionLocal()
+    try:
+        return _append_live_segment(MeetingRepository(db), meeting_id, text, title, participants)[1]
+    finally:
+        db.close()
+
+@router.websocket("/ws/meetings/{meeting_id}/audio")
+async def live_audio_socket(
+    websocket: WebSocket,
+    meeting_id: str,
+    sample_rate: int = 16000,
+    encoding: str = "pcm_s16le",
+    language: str | None = None,
+    title: str | None = None,
+):
+    """
+    Live meeting audio in, transcript segments out.
+
+    Binary messages are audio: 16-bit little-endian mono PCM at
+    `sample_rate`, or with encoding=opus a WebM/Ogg Opus stream. Text
+    messages are JSON: {"participants": [...]} adds names for action
+    assignment, {"type": "stop"} transcribes what is left and ends the
+    stream. `language` (e.g. "hi") pins Whisper's language; default auto.
+
+    Sent back: {"type": "ready"}; per utterance {"type": "segment", seq,
+    start, end, text, language, rule_actions, latency_ms}, stored on the
+    meeting like POST /segments with analyze=false (analysis ticks still go
+    through that endpoint); {"type": "error", seq, message} for an
+    utterance that could not be transcribed; {"type": "end"} after a stop.
+    """
+    await websocket.accept()
+    settings = get_settings()
+    problem = None
+    if not settings.GROQ_API_KEY:
+        problem = "GROQ_API_KEY not set"
+    elif encoding not in ENCODINGS:
+        problem = f"encoding must be one of: {', '.join(ENCODINGS)}"
+    elif encoding == "opus" and not ffmpeg_available():
+        problem = "opus needs ffmpeg on the server; send pcm_s16le"
+    elif not 8000 <= sample_rate <= 192000:
+        problem = "sample_rate must be between 8000 and 192000"
+    if problem:
+        await websocket.send_json({"type": "error", "message": problem})
+        await websocket.close(code=1008)
+        return
+
+    language = normalize_language(language)  # "auto" / unknown -> let Whisper detect it
+    participants: List[str] = []
+    groq = GroqClient()
+    segmenter = UtteranceSegmenter(
+        sample_rate=SAMPLE_RATE if encoding == "opus" else sample_rate,
+        buffer_seconds=settings.LIVE_AUDIO_BUFFER_SECONDS,
+        silence_ms=settings.LIVE_VAD_SILENCE_MS,
+        min_speech_ms=settings.LIVE_VAD_MIN_SPEECH_MS,
+        max_seconds=settings.LIVE_MAX_UTTERANCE_SECONDS,
+    )
+
+    async def transcribe(utterance: Utterance) -> str:
+        wav = encode_wav(utterance.samples)
+
+        def call():
+            with priority(LIVE):
+                return groq.transcribe_bytes(wav, f"utterance-{utterance.seq}.wav", language=language)
+        return await run_in_threadpool(call)
+
+    transcriber = OrderedTranscriber(transcribe, settings.LIVE_AUDIO_MAX_PARALLEL)
+    cut_at: dict = {}  # seq -> when the utterance was cut, for latency_ms
+
+    def submit(utterances: List[Utterance]) -> None:
+        for utterance in utterances:
+            cut_at[utterance.seq] = time.perf_counter()
+            transcriber.submit(utterance)
+
+    async def send_segments():
+        async for utterance, text, error in transcriber.results():
+            latency_ms = round((time.perf_counter() - cut_at.pop(utterance.seq)) * 1000, 1)
+            if error is not None:
+                logger.warning(f"Live transcription of {meeting_id}#{utterance.seq} failed: {error}")
+                message = {"type": "error", "seq": utterance.seq, "message": str(error)}
+                if isinstance(error, SchedulerBusy):
+                    message["retry_after"] = error.retry_after
+                await websocket.send_json(message)
+                continue
+            text = " ".join((text or "").split())
+            if not text:
+                continue
+            rule_actions = await run_in_threadpool(_store_live_segment, meeting_id, text, title, list(participants))
+            await websocket.send_json({
+                "type": "segment",
+                "seq": utterance.seq,
+                "start": utterance.start,
+                "end": utterance.end,
+                "text": text,
+                "language": language or detect_language(text),
+                "rule_actions": rule_actions,
+                "latency_ms": latency_ms,
+            })
+
+    decoder = OpusDecoder() if encoding == "opus" else None
+    tasks = [asyncio.ensure_future(send_segments())]
+    if decoder is not None:
+        await decoder.start()
+
+        async def pump_decoded():
+            carry = b""
+            async for chunk in decoder.chunks():
+                samples, carry = pcm_from_bytes(chunk, carry)
+                submit(segmenter.feed(samples))
+        tasks.append(asyncio.ensure_future(pump_decoded()))
+
+    await websocket.send_json({"type": "ready", "encoding": encoding, "sample_rate": segmenter.sample_rate,
+                               "language": language})
+    carry = b""
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                if decoder is not None:
+                    await decoder.write(message["bytes"])
+                else:
+                    samples, carry = pcm_from_bytes(message["bytes"], carry)
+                    submit(segmenter.feed(samples))
+                continue
+            try:
+                data = json.loads(message.get("text") or "{}")
+            except ValueError:
+                continue
+            if isinstance(data, dict) and data.get("participants"):
+                participants[:] = [str(p) for p in data["participants"]]
+            if isinstance(data, dict) and data.get("type") == "stop":
+                break
+
+        if decoder is not None:
+            await decoder.end()
+            await tasks[1]  # the rest of the decoded audio
+        submit(segmenter.flush())
+        transcriber.close()
+        await tasks[0]
+        await websocket.send_json({"type": "end", "utterances": segmenter.seq})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        transcriber.cancel()
+        for task in tasks:
+            task.cancel()
+        if decoder is not None:
+            await decoder.close()
 
 @router.post("/transcribe")
 async def transcribe_audio_endpoint(file: UploadFile = File(...)):
-    # Save file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio:
-        shutil.copyfileobj(file.file, temp_audio)
-        temp_path = temp_audio.name
-
-    # Process audio
-    result = transcribe_audio(temp_path)
+    # Save file temporarily (removed when the block exits)
+    async with spooled_upload(file) as audio:
+        # Process audio
+        result = await transcribe_audio(audio.path, digest=audio.sha256)
 
     return {
         "status": "success",
@@ -81,15 +533,11 @@ async def translate_endpoint(file: UploadFile = File(...)):
     Uploads an audio file → Transcribes (auto language detect + native script)
     → Translates to English → Returns both versions.
     """
-    temp_path = None  # ✅ ensures variable exists even if try fails
     try:
-        # 1️⃣ Save uploaded audio temporarily
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio:
-            shutil.copyfileobj(file.file, temp_audio)
-            temp_path = temp_audio.name
-
-        # 2️⃣ Transcribe the audio
-        result = transcribe_audio(temp_path)
+        # 1️⃣ Save uploaded audio temporarily (removed as soon as it is transcribed)
+        async with spooled_upload(file) as audio:
+            # 2️⃣ Transcribe the audio
+            result = await transcribe_audio(audio.path, digest=audio.sha256)
         if "error" in result:
             return {"status": "error", "message": result["error"]}
 
@@ -98,7 +546,7 @@ async def translate_endpoint(file: UploadFile = File(...)):
         lang_name = result["language_name"]
 
         # 3️⃣ Translate to English
-        english = translate_text(native, lang)
+        english = await translate_text(native, lang)
 
         # 4️⃣ Return combined result
         return {
@@ -111,26 +559,23 @@ async def translate_endpoint(file: UploadFile = File(...)):
             }
         }
 
+    except HTTPException:
+        raise  # e.g. 413 from the upload size limit
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
-    finally:
-        # 5️⃣ Clean up temp file
-        if temp_path and os.path.exists(temp_path):
-            os.remove(temp_path)
-
 @router.post("/summarize")
 async def summarize_endpoint(payload: dict):
     text = payload.get("text", "")
     src_lang = payload.get("src_lang", "unknown")
 
     # Step 1: Summarize in English
-    summary_en = summarize_text_en(text)
+    summary_en = await summarize_text_en(text)
     if "error" in summary_en:
         return summary_en
 
     # Step 2: Translate summary to native language
-    summary_native = summarize_text_native(summary_en["summary_en"], src_lang)
+    summary_native = await summarize_text_native(summary_en["summary_en"], src_lang)
 
     return {
         "status": "success",
@@ -139,62 +584,223 @@ async def summarize_endpoint(payload: dict):
             "summary_native": summary_native.get("summary_native", "")
         }
     }
-from app.services.groq_service import moderate_text
+from app.services.async_groq_service import moderate_text
 
 @router.post("/moderate")
 async def moderate_endpoint(payload: dict):
     text = payload.get("text", "")
-    result = moderate_text(text)
+    result = await moderate_text(text)
     return {"status": "success", "data": result}
 
-from app.services.groq_service import detect_actions
+from app.services.async_groq_service import detect_actions
 
 @router.post("/actions")
 async def detect_actions_endpoint(payload: dict):
     text = payload.get("text", "")
-    result = detect_actions(text)
+    result = await detect_actions(text)
     return {"status": "success", "data": result}
 
 @router.post("/analyze")
 async def analyze_audio(file: UploadFile = File(...)):
-    import tempfile, shutil
-
-    # 1️⃣ Save the uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_audio:
-        shutil.copyfileobj(file.file, temp_audio)
-        temp_path = temp_audio.name
-
-    # 2️⃣ Transcribe audio (auto language detection)
-    transcription = transcribe_audio(temp_path)
-    transcript_native = transcription.get("transcript_native", "")
-    language_name = transcription.get("language_name", "Unknown")
-
-    # 3️⃣ Translate to English (translate_text returns a string)
-    transcript_en = translate_text(transcript_native, language_name)
-
-    # 4️⃣ Summarize (returns dicts)
-    summary_en_data = summarize_text_en(transcript_en)
-    summary_en = summary_en_data.get("summary_en", "")
-
-    summary_native_data = summarize_text_native(summary_en, language_name)
-    summary_native = summary_native_data.get("summary_native", "")
-
-    # 5️⃣ Moderation
-    moderation = moderate_text(transcript_en)
-
-    # 6️⃣ Action detection
-    actions = detect_actions(transcript_en)
+    # 1️⃣ Save the uploaded file temporarily (removed when the block exits)
+    async with spooled_upload(file) as audio:
+        # 2️⃣ Run the stage graph: transcribe → translate → summary / moderation / actions
+        #    in parallel → native summary (see app/services/pipeline.py)
+        #    (uploads of the same file while one is being analyzed share that run)
+        with priority(BATCH):
+            results, timings = await acoalesce("analyze", audio.sha256, lambda: analyze_pipeline().run(
+                {"audio_path": audio.path, "audio_digest": audio.sha256}
+            ))
+    data = analyze_response(results)
+    meeting_id = await run_in_threadpool(persist_analysis, file.filename or "Untitled", data)
 
     return {
         "status": "success",
-        "data": {
-            "language_code": transcription.get("language_code", ""),
-            "language_name": language_name,
-            "transcript_native": transcript_native,
-            "transcript_en": transcript_en,
-            "summary_native": summary_native,
-            "summary_en": summary_en,
-            "moderation": moderation,
-            "actions": actions,
-        },
+        "meeting_id": meeting_id,
+        "data": data,
+        "timings": timings,
     }
+
+@router.post("/analyze/stream")
+async def analyze_audio_stream(file: UploadFile = File(...)):
+    """
+    Same pipeline as /analyze, but as Server-Sent Events: every stage result
+    is pushed as soon as it is ready (language, transcript_native,
+    transcript_en, summary_en, moderation, actions, summary_native), the
+    summaries also token by token (*.delta), then a final `done` event
+    carrying the full /analyze payload.
+    """
+    audio = await spool_upload(file)
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def emit(event: str, data: dict):
+        await queue.put(format_sse(event, data))
+
+    async def on_stage(name, result):
+        for event, data in stage_events(name, result):
+            await emit(event, data)
+
+    async def run():
+        try:
+            with priority(BATCH):
+                results, timings = await analyze_pipeline(emit=emit).run(
+                    {"audio_path": audio.path, "audio_digest": audio.sha256}, on_stage=on_stage
+                )
+            data = analyze_response(results)
+            meeting_id = await run_in_threadpool(persist_analysis, file.filename or "Untitled", data)
+            await emit("done", {"status": "success", "meeting_id": meeting_id, "data": data, "timings": timings})
+        except SchedulerBusy as e:
+            await emit("error", {"message": str(e), "retry_after": e.retry_after})
+        except Exception as e:
+            await emit("error", {"message": str(e)})
+        finally:
+            await queue.put(None)
+
+    async def events():
+        task = asyncio.create_task(run())
+        # the temp file goes once the pipeline is done with it, finished or cancelled
+        task.add_done_callback(lambda _: remove_quietly(audio.path))
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+        finally:
+            # client went away: stop paying for the remaining stages
+            task.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(remove_quietly, audio.path),  # also covers a stream that never started
+    )
+
+@router.get("/search")
+def search_meetings(
+    q: str = Query(..., min_length=1),
+    meeting_id: List[str] | None = Query(None),
+    kind: List[str] | None = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+):
+    """
+    Full-text search over transcripts, summaries and action items,
+    BM25-ranked with highlighted snippets. Repeat `meeting_id` / `kind`
+    (transcript, summary, action) to filter.
+    """
+    index = get_search_index()
+    if index is None:
+        raise HTTPException(status_code=503, detail="Search is disabled")
+    if kind and any(k not in KINDS for k in kind):
+        raise HTTPException(status_code=400, detail=f"kind must be one of {', '.join(KINDS)}")
+    started = time.perf_counter()
+    hits = index.search(q, meeting_ids=meeting_id, kinds=kind, limit=limit)
+    return {"query": q, "took_ms": round((time.perf_counter() - started) * 1000, 2), "hits": hits}
+
+# ---------------- background jobs ----------------
+
+@router.post("/jobs/analyze", status_code=202)
+async def submit_analyze_job(
+    file: UploadFile = File(...),
+    title: str | None = None,
+    jobs: JobRepository = Depends(get_job_repo),
+):
+    """
+    Queues an /analyze run and returns its job id at once. Poll
+    GET /jobs/{id} or subscribe to GET /jobs/{id}/events for progress.
+    """
+    audio = await spool_upload(file, directory=os.path.join(get_settings().UPLOAD_DIR, "jobs"))
+    job = await run_in_threadpool(
+        jobs.create_job, audio.path, title or file.filename or "Untitled", audio.sha256, True
+    )
+    notify_workers()
+    return {"job_id": job.id, "status": job.status}
+
+@router.post("/jobs/backfill", status_code=202)
+def backfill_jobs(payload: dict, jobs: JobRepository = Depends(get_job_repo)):
+    """
+    Queues one analysis job per recording in a server-side folder (under
+    BACKFILL_ROOT). Files are read in place; those that already have a
+    queued, running or finished job are skipped.
+    """
+    root = get_settings().BACKFILL_ROOT
+    if not root:
+        raise HTTPException(status_code=403, detail="Backfill is disabled (BACKFILL_ROOT not set)")
+    root = os.path.realpath(root)
+    directory = os.path.realpath(os.path.join(root, payload.get("directory") or ""))
+    if os.path.commonpath([root, directory]) != root or not os.path.isdir(directory):
+        raise HTTPException(status_code=400, detail="directory must be an existing folder under BACKFILL_ROOT")
+
+    paths = [p for p in backfill_candidates(directory, payload.get("pattern") or "*", bool(payload.get("recursive")))
+             if os.path.commonpath([root, p]) == root]
+    existing = jobs.queued_paths(paths)
+    created = jobs.create_jobs([
+        {"audio_path": p, "title": os.path.basename(p)} for p in paths if p not in existing
+    ])
+    notify_workers()
+    return {"queued": [job.id for job in created], "skipped": len(existing)}
+
+@router.get("/jobs")
+def list_jobs(
+    status: str | None = None,
+    limit: int = Query(50, ge=1, le=200),
+    jobs: JobRepository = Depends(get_job_repo),
+):
+    if status and status not in JOB_STATUSES:
+        raise HTTPException(status_code=400, detail=f"status must be one of {', '.join(JOB_STATUSES)}")
+    return {"items": [job_view(job) for job in jobs.list_jobs(status=status, limit=limit)]}
+
+@router.get("/jobs/{job_id}")
+def get_job(job_id: str, jobs: JobRepository = Depends(get_job_repo)):
+    """
+    Status plus everything finished so far: `result` fills in stage by
+    stage, `meeting_id` is set once the job is done.
+    """
+    job = jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_job(job_id: str, jobs: JobRepository = Depends(get_job_repo)):
+    if jobs.get_job(job_id) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if not jobs.cancel_job(job_id):
+        raise HTTPException(status_code=409, detail="Job already finished")
+    job = jobs.get_job(job_id)
+    discard_audio(job)  # a running job notices at its next heartbeat and stops
+    return job_view(job)
+
+@router.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-Sent Events for a job: `status` on every status change, the
+    /analyze/stream stage events as stages are checkpointed, then `done`
+    (with the job) or `error`. Works whichever process runs the job.
+    """
+    if await in_repo(lambda repo: repo.get_job(job_id)) is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    async def events():
+        sent, last_status = set(), None
+        while True:
+            job = await in_repo(lambda repo: repo.get_job(job_id))
+            checkpoint = json.loads(job.checkpoint or "{}")
+            for name in [n for n in checkpoint if n not in sent]:
+                sent.add(name)
+                for event, data in stage_events(name, checkpoint[name]):
+                    yield format_sse(event, data)
+            if job.status != last_status:
+                last_status = job.status
+                yield format_sse("status", {"status": job.status, "attempts": job.attempts, "error": job.error})
+            if job.status in ("done", "partial"):
+                yield format_sse("done", job_view(job))
+                return
+            if job.status in ("failed", "cancelled"):
+                yield format_sse("error", {"message": job.error or job.status, "status": job.status})
+                return
+            await asyncio.sleep(0.5)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,10 +1,176 @@
 # app/config.py
 from pydantic_settings import BaseSettings
 from functools import lru_cache
+from typing import Dict, List
 
 class Settings(BaseSettings):
     GROQ_API_KEY: str | None = None
 
+    # Shared Groq HTTP pool (app/services/groq_clients.py); HTTP/2 needs the h2 package
+    GROQ_HTTP2: bool = True
+    GROQ_MAX_CONNECTIONS: int = 20
+    GROQ_MAX_KEEPALIVE_CONNECTIONS: int = 10
+    GROQ_KEEPALIVE_SECONDS: float = 60.0
+    GROQ_TIMEOUT_SECONDS: float = 120.0
+    GROQ_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    GROQ_POOL_TIMEOUT_SECONDS: float = 10.0
+    GROQ_MAX_RETRIES: int = 0  # retries are done by the scheduler below
+
+    # Outbound model-call scheduler (app/services/scheduler.py): per-model
+    # requests / tokens per minute (0 = unlimited), bounded wait queues and
+    # retry backoff. Calls that would wait longer than their class allows get 503.
+    # SCHEDULER_LIMITS are the account's limits; each process enforces its own
+    # buckets, so it gets SCHEDULER_LIMIT_SHARE of them (e.g. 0.25 for each of
+    # 4 workers); the shares of all processes on one API key should add up to 1
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_LIMIT_SHARE: float = 1.0
+    SCHEDULER_LIMITS: Dict[str, Dict[str, float]] = {
+        "llama-3.3-70b-versatile": {"rpm": 30, "tpm": 12000},
+        "llama-3.1-8b-instant": {"rpm": 30, "tpm": 6000},
+        "whisper-large-v3": {"rpm": 20, "tpm": 0},
+    }
+    SCHEDULER_MAX_QUEUE: int = 64
+    SCHEDULER_MAX_WAIT_SECONDS: Dict[str, float] = {"live": 10.0, "interactive": 30.0, "batch": 120.0}
+    SCHEDULER_RETRIES: int = 4
+    SCHEDULER_BACKOFF_BASE_SECONDS: float = 0.5
+    SCHEDULER_BACKOFF_MAX_SECONDS: float = 20.0
+
+    # Model routing (app/services/model_router.py): each task uses a tier,
+    # each tier a list of chat models tried in order. A model that is rate
+    # limited, failing or slower than its tier's timeout hands over to the
+    # next one. Prices (USD per million tokens) only feed the cost counters
+    MODEL_ROUTES: Dict[str, str] = {
+        "live": "fast", "moderation": "fast", "final": "large", "translation": "large", "actions": "large",
+    }
+    MODEL_TIERS: Dict[str, List[str]] = {
+        "fast": ["llama-3.1-8b-instant", "llama-3.3-70b-versatile"],
+        "large": ["llama-3.3-70b-versatile", "llama-3.1-8b-instant"],
+    }
+    MODEL_TIER_TIMEOUT_SECONDS: Dict[str, float] = {"fast": 3.0, "large": 45.0}
+    MODEL_PRICES: Dict[str, Dict[str, float]] = {
+        "llama-3.1-8b-instant": {"input": 0.05, "output": 0.08},
+        "llama-3.3-70b-versatile": {"input": 0.59, "output": 0.79},
+    }
+
+    # /analyze pipeline: max threads for blocking stages. ANALYZE_MODE
+    # "combined" gets summary, actions/decisions and moderation from one
+    # JSON-mode call (fields failing validation are re-asked on their own);
+    # "separate" makes one call each
+    PIPELINE_MAX_WORKERS: int = 8
+    ANALYZE_MODE: str = "combined"
+    ANALYZE_REASK_ATTEMPTS: int = 1
+
+    # Long recordings are split on silences into overlapping windows
+    # that are transcribed concurrently
+    TRANSCRIBE_CHUNK_SECONDS: float = 300.0
+    TRANSCRIBE_CHUNK_OVERLAP_SECONDS: float = 2.0
+    TRANSCRIBE_MAX_PARALLEL: int = 4
+    TRANSCRIBE_CHUNK_RETRIES: int = 2
+
+    # Recordings are decoded to 16 kHz mono and silences longer than
+    # AUDIO_MAX_SILENCE_MS cut down to AUDIO_KEEP_SILENCE_MS before Whisper
+    # (app/services/preprocess.py); the original is sent if that saves nothing
+    AUDIO_PREPROCESS: bool = True
+    AUDIO_MAX_SILENCE_MS: int = 1000
+    AUDIO_KEEP_SILENCE_MS: int = 400
+
+    # Language ID looks at this many characters of a transcript; translation
+    # is done in sentence-aligned chunks of about this many tokens
+    LANGID_SAMPLE_CHARS: int = 2000
+    TRANSLATE_CHUNK_TOKENS: int = 1500
+
+    # Content-addressed cache for transcription / LLM results
+    CACHE_ENABLED: bool = True
+    CACHE_MAX_ENTRIES: int = 2048
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    CACHE_TTL_SECONDS: float = 7 * 24 * 3600
+    CACHE_DISK_PATH: str | None = None  # e.g. "./cache/results.sqlite3"
+    CACHE_DISK_MAX_BYTES: int = 512 * 1024 * 1024
+
+    # Transcripts above the threshold are summarized / moderated / mined for
+    # actions chunk-by-chunk in parallel and then reduced
+    MAP_REDUCE_THRESHOLD_TOKENS: int = 6000
+    MAP_REDUCE_CHUNK_TOKENS: int = 3000
+    MAP_REDUCE_MAX_PARALLEL: int = 4
+
+    # Meeting store (SQLAlchemy URL); pool settings apply to server databases
+    DATABASE_URL: str = "sqlite:///./meetings.db"
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_ECHO: bool = False
+    # Uploaded audio is kept here, one file per upload id; larger uploads get 413
+    UPLOAD_DIR: str = "./uploads"
+    MAX_UPLOAD_BYTES: int = 500 * 1024 * 1024
+
+    # Background analysis jobs: in-process workers (0 = only `python -m app.worker`),
+    # lease after which a crashed worker's job is taken over, and the folder
+    # /jobs/backfill may read recordings from (unset = backfill disabled)
+    JOB_WORKERS: int = 2
+    JOB_POLL_SECONDS: float = 1.0
+    JOB_LEASE_SECONDS: float = 120.0
+    JOB_MAX_ATTEMPTS: int = 3
+    BACKFILL_ROOT: str | None = None
+
+    # Live audio over WebSocket (/ws/meetings/{id}/audio): the stream is cut
+    # into utterances at pauses of LIVE_VAD_SILENCE_MS, or after
+    # LIVE_MAX_UTTERANCE_SECONDS of continuous speech, and each socket has
+    # at most LIVE_AUDIO_MAX_PARALLEL transcriptions in flight
+    LIVE_AUDIO_BUFFER_SECONDS: float = 30.0
+    LIVE_VAD_SILENCE_MS: int = 500
+    LIVE_VAD_MIN_SPEECH_MS: int = 250
+    LIVE_MAX_UTTERANCE_SECONDS: float = 6.0
+    LIVE_AUDIO_MAX_PARALLEL: int = 2
+
+    # Live insights fan-out (app/services/live_hub.py): one server-side
+    # analysis loop per meeting runs every LIVE_ANALYZE_INTERVAL_SECONDS once
+    # LIVE_ANALYZE_MIN_CHARS of new transcript are waiting, and viewers get the
+    # changes as diffs from GET /meetings/{id}/live/events. LIVE_HUB_BROKER
+    # "memory" reaches this process only; "sqlite" shares events between the
+    # workers on one host through LIVE_HUB_SQLITE_PATH
+    LIVE_ANALYZE_INTERVAL_SECONDS: float = 10.0
+    LIVE_ANALYZE_MIN_CHARS: int = 80
+    LIVE_ANALYZE_IDLE_SECONDS: float = 120.0
+    # one worker at a time analyzes a meeting: it holds the meeting's lease
+    # in the database, renewed every tick; if it stops renewing, another
+    # worker receiving the meeting's transcript takes over after this long
+    LIVE_ANALYZE_LEASE_SECONDS: float = 60.0
+    LIVE_HUB_BROKER: str = "memory"
+    LIVE_HUB_SQLITE_PATH: str = "./live_events.db"
+    LIVE_HUB_POLL_SECONDS: float = 0.25
+
+    # Concurrent /meetings/process calls for the same transcript, and /analyze
+    # uploads of the same file, share one in-flight analysis (singleflight.py)
+    COALESCE_REQUESTS: bool = True
+
+    # Full-text search index (SQLite FTS5 file)
+    SEARCH_ENABLED: bool = True
+    SEARCH_INDEX_PATH: str = "./search.db"
+
+    # Lexicon/PII prefilter decides clear moderation cases locally and
+    # escalates only ambiguous sentences to the LLM
+    MODERATION_PREFILTER: bool = True
+
+    # Logging and instrumentation: LOG_JSON writes one JSON object per line;
+    # LOG_REQUESTS logs every request with its stage timings and model usage
+    LOG_LEVEL: str = "INFO"
+    LOG_JSON: bool = False
+    LOG_FILE: str | None = None  # e.g. "app.log" (errors only)
+    LOG_REQUESTS: bool = True
+    METRICS_ENABLED: bool = True
+    # Metrics are kept per process. Under gunicorn, point METRICS_MULTIPROC_DIR
+    # at a directory the workers share (emptied by the master on startup): each
+    # writes its metrics there every METRICS_FLUSH_SECONDS and GET /metrics on
+    # any worker returns the sum over all of them, so one scrape target is enough
+    METRICS_MULTIPROC_DIR: str | None = None  # e.g. "/tmp/metrics"
+    METRICS_FLUSH_SECONDS: float = 5.0
+
+    # Startup: WARMUP does each worker's one-time initialisation (database,
+    # search index, cache, language ID) in the lifespan instead of on the
+    # first request; WARMUP_GROQ also opens a pooled connection to the API
+    WARMUP: bool = False
+    WARMUP_GROQ: bool = False
+
     class Config:
         env_file = ".env"
         extra = "ignore"
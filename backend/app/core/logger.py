@@ -1,20 +1,67 @@
-from logging import getLogger, StreamHandler, Formatter, INFO, DEBUG, ERROR, FileHandler
-
-logger = getLogger("AI Meeting Monitor")
-logger.setLevel(DEBUG)
-
-# Console handler
-console_handler = StreamHandler()
-console_handler.setLevel(INFO)
-console_formatter = Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-console_handler.setFormatter(console_formatter)
-
-# File handler
-file_handler = FileHandler("app.log")
-file_handler.setLevel(ERROR)
-file_formatter = Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler.setFormatter(file_formatter)
-
-# Add handlers to the logger
-logger.addHandler(console_handler)
-logger.addHandler(file_handler)
\ No newline at end of file
+# app/core/logger.py
+"""
+Application logger. Every record carries the id of the request it belongs
+to (set by RequestContextMiddleware, "-" outside requests). LOG_JSON
+switches the output to one JSON object per line; structured fields go in
+`extra={"fields": {...}}`.
+"""
+import contextvars
+import json
+from logging import DEBUG, ERROR, FileHandler, Filter, Formatter, Logger, LogRecord, StreamHandler, getLogger
+from typing import Optional
+
+from app.config import get_settings
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+
+class RequestIdFilter(Filter):
+    def filter(self, record: LogRecord) -> bool:
+        record.request_id = request_id_var.get() or "-"
+        return True
+
+
+class JsonFormatter(Formatter):
+    def format(self, record: LogRecord) -> str:
+        data = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+            **getattr(record, "fields", {}),
+        }
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+def _text_formatter() -> Formatter:
+    return Formatter('%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s')
+
+
+def _build_logger() -> Logger:
+    settings = get_settings()
+    log = getLogger("AI Meeting Monitor")
+    log.setLevel(DEBUG)
+    log.propagate = False
+    formatter = JsonFormatter() if settings.LOG_JSON else _text_formatter()
+
+    # Console handler
+    console_handler = StreamHandler()
+    console_handler.setLevel(settings.LOG_LEVEL.upper())
+    console_handler.setFormatter(formatter)
+    console_handler.addFilter(RequestIdFilter())
+    log.addHandler(console_handler)
+
+    # File handler (errors only)
+    if settings.LOG_FILE:
+        file_handler = FileHandler(settings.LOG_FILE)
+        file_handler.setLevel(ERROR)
+        file_handler.setFormatter(formatter)
+        file_handler.addFilter(RequestIdFilter())
+        log.addHandler(file_handler)
+    return log
+
+
+logger = _build_logger()
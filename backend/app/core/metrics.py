@@ -0,0 +1,481 @@
+# app/core/metrics.py
+"""
+In-process metrics with Prometheus text exposition (GET /metrics).
+
+- http_request_duration_seconds: every HTTP request, by route template
+- stage_duration_seconds: every service function wrapped in @timed
+- pipeline_stage_seconds: every /analyze pipeline stage
+- model_call_seconds / model_queue_wait_seconds / model_tokens_total /
+  model_audio_seconds_total: every model call, recorded by the scheduler
+- model_route_calls_total / model_route_seconds / model_cost_usd_total:
+  chat calls by task, tier and model, recorded by the model router
+- coalesced_requests_total: analyses run vs. joined while in flight
+
+Each process counts for itself; with several workers set
+METRICS_MULTIPROC_DIR so a scrape of any of them sums all of them (see
+"multiprocess" below).
+
+Spans are also added to the current request's trace (see trace()), which
+RequestContextMiddleware logs when the request finishes, so a slow request
+can be broken down without a metrics backend.
+"""
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import anyio
+
+from app.core.logger import logger
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(values: Dict[str, Any]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in values.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Sequence[Tuple[str, str]] = ()) -> str:
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, help: str):
+        self.name, self.help = name, help
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(_labels(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(k)} {_format_value(v)}" for k, v in items]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name, self.help = name, help
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Labels, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += 1
+            series[-1] += value
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(_labels(labels))
+        return int(series[-2]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{_format_labels(key, [('le', repr(bound))])} {_format_value(count)}")
+            lines.append(f"{self.name}_bucket{_format_labels(key, [('le', '+Inf')])} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_sum{_format_labels(key)} {repr(round(series[-1], 6))}")
+            lines.append(f"{self.name}_count{_format_labels(key)} {_format_value(series[-2])}")
+        return lines
+
+
+HTTP_REQUESTS = Histogram("http_request_duration_seconds", "HTTP request latency, until the last body byte is sent.")
+STAGES = Histogram("stage_duration_seconds", "Wall time of service functions (transcription, translation, ...).")
+PIPELINE_STAGES = Histogram("pipeline_stage_seconds", "Wall time of /analyze pipeline stages.")
+MODEL_CALLS = Histogram("model_call_seconds", "Groq API call latency, excluding scheduler queueing.")
+MODEL_WAIT = Histogram("model_queue_wait_seconds", "Time model calls waited for the scheduler to admit them.")
+MODEL_TOKENS = Counter("model_tokens_total", "Tokens reported by the API, by model and type (prompt/completion).")
+MODEL_AUDIO = Counter("model_audio_seconds_total", "Seconds of audio transcribed, by model.")
+MODEL_ERRORS = Counter("model_call_errors_total", "Failed model call attempts, by model.")
+ROUTED_CALLS = Counter("model_route_calls_total", "Routed chat calls by task, tier, model and outcome (ok/fallback/failed).")
+ROUTED_SECONDS = Histogram("model_route_seconds", "Routed chat call latency, queueing included, by tier and model.")
+MODEL_COST = Counter("model_cost_usd_total", "Estimated spend from reported tokens and MODEL_PRICES, by tier and model.")
+
+METRICS = [HTTP_REQUESTS, STAGES, PIPELINE_STAGES, MODEL_CALLS, MODEL_WAIT, MODEL_TOKENS, MODEL_AUDIO, MODEL_ERRORS,
+           ROUTED_CALLS, ROUTED_SECONDS, MODEL_COST]
+
+
+# ---------------- per-request trace ----------------
+
+_TRACE: contextvars.ContextVar[Optional[Dict[str, Any]]] = contextvars.ContextVar("metrics_trace", default=None)
+_USAGE: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("metrics_model_usage", default=None)
+_TRACE_LOCK = threading.Lock()
+
+
+def new_trace() -> Dict[str, Any]:
+    return {"spans": {}, "model": {"calls": 0, "wait_ms": 0.0, "prompt_tokens": 0, "completion_tokens": 0,
+                                   "audio_seconds": 0.0}}
+
+
+@contextmanager
+def trace() -> Iterator[Dict[str, Any]]:
+    """
+    Collects spans and model usage of everything run in this context (and
+    in worker threads started with a copy of it) into one dict.
+    """
+    data = new_trace()
+    token = _TRACE.set(data)
+    try:
+        yield data
+    finally:
+        _TRACE.reset(token)
+
+
+@contextmanager
+def model_usage() -> Iterator[Dict[str, int]]:
+    """
+    Tokens reported by the model calls made inside the block, on top of
+    whatever trace is active (the model router prices calls with it).
+    """
+    data = {"prompt_tokens": 0, "completion_tokens": 0}
+    token = _USAGE.set(data)
+    try:
+        yield data
+    finally:
+        _USAGE.reset(token)
+
+
+def _add_span(name: str, seconds: float) -> None:
+    data = _TRACE.get()
+    if data is not None:
+        with _TRACE_LOCK:
+            span = data["spans"].setdefault(name, {"count": 0, "ms": 0.0})
+            span["count"] += 1
+            span["ms"] = round(span["ms"] + seconds * 1000, 1)
+
+
+def observe_stage(name: str, seconds: float) -> None:
+    STAGES.observe(seconds, stage=name)
+    _add_span(name, seconds)
+
+
+def timed(name: str) -> Callable:
+    """
+    Decorator: records the wall time of each call of a (sync or async)
+    function in stage_duration_seconds{stage=name} and the request trace.
+    """
+    def wrap(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_timed(*args: Any, **kwargs: Any) -> Any:
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    observe_stage(name, time.perf_counter() - started)
+            return async_timed
+
+        @functools.wraps(fn)
+        def sync_timed(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe_stage(name, time.perf_counter() - started)
+        return sync_timed
+    return wrap
+
+
+def _field(obj: Any, name: str) -> Any:
+    return obj.get(name) if isinstance(obj, dict) else getattr(obj, name, None)
+
+
+def observe_model_call(model: str, wait: float, seconds: float, response: Any = None,
+                       failed: bool = False) -> None:
+    """
+    Called by the scheduler for every attempt. Token counts come from the
+    response's `usage`, audio length from a verbose_json `duration`;
+    a streamed response reports its usage at the end instead (see
+    observe_stream_usage()).
+    """
+    MODEL_WAIT.observe(wait, model=model)
+    MODEL_CALLS.observe(seconds, model=model)
+    if failed:
+        MODEL_ERRORS.inc(model=model)
+    usage = _field(response, "usage") if response is not None else None
+    prompt = int(_field(usage, "prompt_tokens") or 0) if usage is not None else 0
+    completion = int(_field(usage, "completion_tokens") or 0) if usage is not None else 0
+    audio = _field(response, "duration") if response is not None else None
+    audio = float(audio) if isinstance(audio, (int, float)) else 0.0
+    _count_tokens(model, prompt, completion)
+    if audio:
+        MODEL_AUDIO.inc(audio, model=model)
+
+    data = _TRACE.get()
+    if data is not None:
+        with _TRACE_LOCK:
+            stats = data["model"]
+            stats["calls"] += 1
+            stats["wait_ms"] = round(stats["wait_ms"] + wait * 1000, 1)
+            stats["prompt_tokens"] += prompt
+            stats["completion_tokens"] += completion
+            stats["audio_seconds"] = round(stats["audio_seconds"] + audio, 2)
+
+
+def observe_stream_usage(model: str, usage: Any) -> None:
+    """
+    Token counts of a streamed response, which arrive with its last chunk
+    rather than with the response the scheduler sees when the stream opens.
+    """
+    prompt = int(_field(usage, "prompt_tokens") or 0)
+    completion = int(_field(usage, "completion_tokens") or 0)
+    _count_tokens(model, prompt, completion)
+    data = _TRACE.get()
+    if data is not None:
+        with _TRACE_LOCK:
+            data["model"]["prompt_tokens"] += prompt
+            data["model"]["completion_tokens"] += completion
+
+
+def _count_tokens(model: str, prompt: int, completion: int) -> None:
+    if prompt:
+        MODEL_TOKENS.inc(prompt, model=model, type="prompt")
+    if completion:
+        MODEL_TOKENS.inc(completion, model=model, type="completion")
+    used = _USAGE.get()
+    if used is not None:
+        with _TRACE_LOCK:
+            used["prompt_tokens"] += prompt
+            used["completion_tokens"] += completion
+
+
+# ---------------- exposition ----------------
+
+Series = Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]  # name, type, help, samples
+
+
+def _samples(name: str, kind: str, help: str, samples: List[Tuple[Dict[str, Any], float]]) -> List[str]:
+    lines = [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+    return lines + [f"{name}{_format_labels(_labels(labels))} {_format_value(value)}" for labels, value in samples]
+
+
+def _runtime_series() -> List[Series]:
+    # point-in-time state of the scheduler, request coalescing and the result cache
+    from app.services.cache import get_cache
+    from app.services.scheduler import get_scheduler
+    from app.services.singleflight import get_singleflight
+
+    waiting, admitted, rejected = [], [], []
+    for model, stats in get_scheduler().stats()["models"].items():
+        for priority, count in stats["waiting"].items():
+            waiting.append(({"model": model, "priority": priority}, count))
+        admitted.append(({"model": model}, stats["admitted"]))
+        rejected.append(({"model": model}, stats["rejected"]))
+    series: List[Series] = [
+        ("scheduler_waiting_calls", "gauge", "Model calls queued in the scheduler.", waiting),
+        ("scheduler_admitted_calls_total", "counter", "Model calls admitted.", admitted),
+        ("scheduler_rejected_calls_total", "counter", "Model calls rejected with 503.", rejected),
+    ]
+
+    calls = get_singleflight().stats()["calls"]
+    series.append(("coalesced_requests_total", "counter",
+                   "Analyses by outcome: executed, or coalesced onto one already in flight.",
+                   [({"kind": kind, "outcome": outcome}, n) for kind, counts in calls.items()
+                    for outcome, n in counts.items()]))
+
+    cache = get_cache()
+    if cache is not None:
+        stats = cache.stats()
+        series.append(("cache_lookups_total", "counter", "Result cache lookups, by outcome.",
+                       [({"outcome": k}, stats[k]) for k in ("memory_hits", "disk_hits", "misses") if k in stats]))
+    return series
+
+
+def _render_local() -> List[str]:
+    lines: List[str] = []
+    for metric in METRICS:
+        lines += metric.render()
+    try:
+        for series in _runtime_series():
+            lines += _samples(*series)
+    except Exception as e:  # never fail the scrape over a gauge
+        lines.append(f"# runtime gauges unavailable: {e}")
+    return lines
+
+
+# ---------------- multiprocess ----------------
+#
+# Under gunicorn every worker has its own registry and a scrape reaches
+# whichever worker accepts it. With METRICS_MULTIPROC_DIR set, each worker
+# writes a snapshot of its metrics to <dir>/<pid>.json every
+# METRICS_FLUSH_SECONDS (and when it answers a scrape or shuts down), and
+# /metrics on any worker serves the sum over all snapshots. Snapshots of
+# exited workers are kept, so counters never go backwards when a worker is
+# recycled; their gauges are dropped. The gunicorn master empties the
+# directory on startup.
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True
+    except (OSError, OverflowError):
+        return False
+    return True
+
+
+def _snapshot() -> Dict[str, Any]:
+    metrics: Dict[str, List[Any]] = {}
+    for metric in METRICS:
+        with metric._lock:
+            values = metric._values if isinstance(metric, Counter) else metric._series
+            metrics[metric.name] = [[list(map(list, k)), v if isinstance(v, float) else list(v)]
+                                    for k, v in values.items()]
+    try:
+        runtime = [list(series) for series in _runtime_series()]
+    except Exception as e:
+        logger.warning(f"Runtime gauges left out of the metrics snapshot: {e}")
+        runtime = []
+    return {"pid": os.getpid(), "metrics": metrics, "runtime": runtime}
+
+
+def write_snapshot(directory: str) -> None:
+    """Writes this process's metrics to <directory>/<pid>.json, atomically."""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{os.getpid()}.json")
+    tmp = f"{path}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(_snapshot(), f)
+    os.replace(tmp, path)
+
+
+def clear_snapshots(directory: str) -> None:
+    """Removes every worker's snapshot (run before the workers start)."""
+    os.makedirs(directory, exist_ok=True)
+    for name in os.listdir(directory):
+        if name.endswith((".json", ".tmp")):
+            os.remove(os.path.join(directory, name))
+
+
+def _read_snapshots(directory: str) -> List[Dict[str, Any]]:
+    snapshots = []
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name)) as f:
+                snapshots.append(json.load(f))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Skipping metrics snapshot {name}: {e}")
+    return snapshots
+
+
+def _render_merged(directory: str) -> List[str]:
+    snapshots = _read_snapshots(directory)
+    lines: List[str] = []
+    for metric in METRICS:
+        merged = type(metric)(metric.name, metric.help)
+        if isinstance(metric, Histogram):
+            merged.buckets = metric.buckets
+        values = merged._values if isinstance(merged, Counter) else merged._series
+        for snapshot in snapshots:
+            for labels, value in snapshot["metrics"].get(metric.name, []):
+                key = tuple(tuple(pair) for pair in labels)
+                if isinstance(value, list):
+                    series = values.setdefault(key, [0.0] * len(value))
+                    values[key] = [a + b for a, b in zip(series, value)]
+                else:
+                    values[key] = values.get(key, 0.0) + value
+        lines += merged.render()
+
+    runtime: Dict[str, Tuple[str, str, Dict[Labels, float]]] = {}
+    for snapshot in snapshots:
+        alive = _pid_alive(snapshot["pid"])
+        for name, kind, help, samples in snapshot["runtime"]:
+            if kind == "gauge" and not alive:
+                continue
+            totals = runtime.setdefault(name, (kind, help, {}))[2]
+            for labels, value in samples:
+                key = _labels(labels)
+                totals[key] = totals.get(key, 0.0) + value
+    for name, (kind, help, totals) in runtime.items():
+        lines += _samples(name, kind, help, [(dict(k), v) for k, v in sorted(totals.items())])
+    return lines
+
+
+def render(multiproc_dir: Optional[str] = None) -> str:
+    """
+    This process's metrics, or with `multiproc_dir` the sum over every
+    worker's snapshot in it (this worker's is refreshed first).
+    """
+    if multiproc_dir:
+        write_snapshot(multiproc_dir)
+        lines = _render_merged(multiproc_dir)
+    else:
+        lines = _render_local()
+    return "\n".join(lines) + "\n"
+
+
+_WRITER: Optional[asyncio.Task] = None
+
+
+async def _write_snapshots(directory: str, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await anyio.to_thread.run_sync(write_snapshot, directory)
+        except Exception as e:
+            logger.error(f"Could not write the metrics snapshot: {e}")
+
+
+async def start_metrics_writer(directory: Optional[str], interval: float) -> None:
+    """Lifespan hook: keeps this worker's snapshot in `directory` fresh."""
+    global _WRITER
+    if not directory or _WRITER is not None:
+        return
+    await anyio.to_thread.run_sync(write_snapshot, directory)
+    _WRITER = asyncio.create_task(_write_snapshots(directory, interval))
+
+
+async def stop_metrics_writer(directory: Optional[str]) -> None:
+    global _WRITER
+    if _WRITER is None:
+        return
+    _WRITER.cancel()
+    try:
+        await _WRITER
+    except asyncio.CancelledError:
+        pass
+    _WRITER = None
+    try:
+        await anyio.to_thread.run_sync(write_snapshot, directory)  # the final counts outlive the worker
+    except Exception as e:
+        logger.error(f"Could not write the metrics snapshot: {e}")
@@ -0,0 +1,91 @@
+# app/core/middleware.py
+"""
+Per-request context: a request id (the client's X-Request-ID if it sent a
+sane one), a metrics trace, the latency histogram and a closing log line.
+
+Plain ASGI rather than BaseHTTPMiddleware so streamed responses (SSE) are
+timed until their last byte, not until their headers.
+"""
+import re
+import time
+from uuid import uuid4
+
+from app.config import get_settings
+from app.core import metrics
+from app.core.logger import logger, request_id_var
+
+_REQUEST_ID = re.compile(r"^[A-Za-z0-9._-]{1,64}$")
+
+
+def _route_template(scope) -> str:
+    """
+    e.g. "/api/v1/jobs/{job_id}" for "/api/v1/jobs/3f2a...": a bounded label
+    set. The matched route's path is relative to the router it was included
+    in, so the prefix is recovered from the concrete path.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if not template:
+        return "unmatched"
+    try:
+        concrete = template.format(**{k: str(v) for k, v in (scope.get("path_params") or {}).items()})
+    except (KeyError, IndexError, ValueError):
+        return template
+    path = scope["path"]
+    return path[: len(path) - len(concrete)] + template if path.endswith(concrete) else template
+
+
+def _request_id(scope) -> str:
+    for name, value in scope.get("headers") or []:
+        if name == b"x-request-id":
+            candidate = value.decode("latin-1")
+            if _REQUEST_ID.match(candidate):
+                return candidate
+    return uuid4().hex
+
+
+class RequestContextMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        request_id = _request_id(scope)
+        token = request_id_var.set(request_id)
+        started = time.perf_counter()
+        status = 500
+        finished = False
+
+        def finish() -> None:
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            seconds = time.perf_counter() - started
+            path = _route_template(scope)
+            metrics.HTTP_REQUESTS.observe(seconds, method=scope["method"], route=path, status=status)
+            if get_settings().LOG_REQUESTS:
+                spans = " ".join(f"{name}={span['ms']:.0f}ms" for name, span in trace["spans"].items())
+                logger.info(
+                    f"{scope['method']} {scope['path']} {status} {seconds * 1000:.1f}ms {spans}".rstrip(),
+                    extra={"fields": {"method": scope["method"], "route": path, "status": status,
+                                      "duration_ms": round(seconds * 1000, 1), **trace}},
+                )
+
+        async def send_with_context(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [(b"x-request-id", request_id.encode())]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        try:
+            with metrics.trace() as trace:
+                await self.app(scope, receive, send_with_context)
+        finally:
+            finish()  # e.g. the client went away mid-stream
+            request_id_var.reset(token)
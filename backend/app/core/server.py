@@ -0,0 +1,50 @@
+# app/core/server.py
+"""
+Gunicorn glue for the production profile (see gunicorn.conf.py).
+
+The master imports the app once (preload_app) and forks the workers, which
+share its imported modules copy-on-write. Nothing that owns a socket, a
+thread or a database connection may exist before the fork, which is why
+every such singleton in app/ is created on first use or in the lifespan.
+"""
+from uvicorn.workers import UvicornWorker as _UvicornWorker
+
+from app.config import get_settings
+from app.core.logger import logger
+
+
+class UvicornWorker(_UvicornWorker):
+    """
+    Uvicorn's worker, but on SIGTERM it stops waiting for open requests
+    (SSE streams never end on their own) a few seconds before gunicorn's
+    graceful_timeout would SIGKILL it, so the lifespan shutdown still runs
+    and in-flight jobs are handed back to the queue.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.config.timeout_graceful_shutdown = max(1, self.cfg.graceful_timeout - 5)
+
+
+def prepare_master() -> None:
+    """
+    Runs once in the master before the workers are forked: creates the
+    schema (so the workers don't race each other at it) and builds the
+    shared TLS context the workers' Groq clients inherit. The engine is
+    disposed so no database connection crosses the fork. Metrics snapshots
+    left by a previous run are removed.
+    """
+    from app.core.metrics import clear_snapshots
+    from app.db.session import init_db, make_engine
+    from app.services.groq_clients import ssl_context
+
+    settings = get_settings()
+    engine = make_engine(settings.DATABASE_URL)
+    try:
+        init_db(engine)
+    finally:
+        engine.dispose()
+    ssl_context()
+    if settings.METRICS_MULTIPROC_DIR:
+        clear_snapshots(settings.METRICS_MULTIPROC_DIR)
+    logger.info("Database schema and TLS context ready")
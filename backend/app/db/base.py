@@ -1,3 +1,4 @@
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.orm import declarative_base
 
-Base = declarative_base()
\ No newline at end of file
+# single declarative base for every ORM model (see app/models/meeting.py)
+Base = declarative_base()
@@ -0,0 +1,494 @@
+# app/db/repository.py
+"""
+Repositories over the meeting store (app/models/meeting.py) and the job
+queue (app/models/job.py).
+
+Routes get one instance per request (see app/api/v1/deps.py); every write
+method commits, so callers never deal with transactions. Listing uses
+keyset pagination on (created_at, id): the cursor is the last row seen,
+so a page costs one index range scan however deep the client pages.
+"""
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.models.job import Job
+from app.models.meeting import (ActionItem, LiveLease, Meeting, ModerationFlag, Participant, Segment, Transcript,
+                                Upload, utcnow)
+
+FLAG_CATEGORIES = {"toxic", "hate", "violence", "sexual", "self_harm", "pii"}
+
+
+def encode_cursor(created_at: datetime, meeting_id: str) -> str:
+    raw = f"{created_at.isoformat()}|{meeting_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    created_at, meeting_id = raw.split("|", 1)
+    return datetime.fromisoformat(created_at), meeting_id
+
+
+def _action_rows(meeting_id: str, actions: Iterable[Dict[str, str]], source: str) -> List[Dict[str, Any]]:
+    return [
+        {"meeting_id": meeting_id, "assignee": (a.get("assignee") or "")[:128], "text": a.get("text", ""),
+         "source": source, "completed": False, "created_at": utcnow()}
+        for a in actions if a.get("text")
+    ]
+
+
+def _flag_rows(meeting_id: str, notes: Iterable[str]) -> List[Dict[str, Any]]:
+    return [
+        {"meeting_id": meeting_id, "note": str(n), "category": _flag_category(str(n)), "created_at": utcnow()}
+        for n in notes if str(n).strip()
+    ]
+
+
+def _flag_category(note: str) -> Optional[str]:
+    head = note.split(":", 1)[0].strip().lower() if ":" in note else ""
+    return head if head in FLAG_CATEGORIES else None
+
+
+class MeetingRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ---------- meetings ----------
+    def create_meeting(self, title: str = "Untitled", meeting_type: str = "upload",
+                       meeting_id: Optional[str] = None) -> Meeting:
+        meeting = Meeting(title=title, meeting_type=meeting_type)
+        if meeting_id:
+            meeting.id = meeting_id
+        self.db.add(meeting)
+        self.db.commit()
+        return meeting
+
+    def get_meeting(self, meeting_id: str) -> Optional[Meeting]:
+        return self.db.get(Meeting, meeting_id)
+
+    def get_or_create_meeting(self, meeting_id: str, title: Optional[str] = None,
+                              meeting_type: str = "live") -> Meeting:
+        meeting = self.get_meeting(meeting_id)
+        if meeting is not None:
+            return meeting
+        try:
+            return self.create_meeting(title or meeting_id, meeting_type, meeting_id=meeting_id)
+        except IntegrityError:
+            # another worker created it first
+            self.db.rollback()
+            return self.get_meeting(meeting_id)
+
+    def list_meetings(self, limit: int = 50, cursor: Optional[str] = None,
+                      meeting_type: Optional[str] = None) -> Tuple[List[Meeting], Optional[str]]:
+        """
+        Newest first. Returns (page, next_cursor); next_cursor is None on the last page.
+        """
+        query = select(Meeting).order_by(Meeting.created_at.desc(), Meeting.id.desc())
+        if meeting_type:
+            query = query.where(Meeting.meeting_type == meeting_type)
+        if cursor:
+            created_at, last_id = decode_cursor(cursor)
+            query = query.where(or_(
+                Meeting.created_at < created_at,
+                and_(Meeting.created_at == created_at, Meeting.id < last_id),
+            ))
+        rows = list(self.db.scalars(query.limit(limit + 1)))
+        page = rows[:limit]
+        next_cursor = encode_cursor(page[-1].created_at, page[-1].id) if len(rows) > limit else None
+        return page, next_cursor
+
+    # ---------- transcripts ----------
+    def save_transcript(self, meeting_id: str, text_native: str, text_en: Optional[str] = None,
+                        language_code: Optional[str] = None) -> Transcript:
+        transcript = Transcript(meeting_id=meeting_id, text_native=text_native, text_en=text_en,
+                                language_code=language_code)
+        self.db.add(transcript)
+        self.db.commit()
+        return transcript
+
+    def latest_transcript(self, meeting_id: str) -> Optional[Transcript]:
+        return self.db.scalars(
+            select(Transcript).where(Transcript.meeting_id == meeting_id)
+            .order_by(Transcript.created_at.desc(), Transcript.id.desc()).limit(1)
+        ).first()
+
+    # ---------- segments ----------
+    def add_segments(self, meeting_id: str, segments: Sequence[Any]) -> int:
+        """
+        Bulk-inserts segments (strings or {"text", "start", "end"} dicts)
+        after the meeting's last one in a single executemany. Returns the
+        new segment count.
+        """
+        for attempt in range(3):
+            last = self.db.scalar(select(func.coalesce(func.max(Segment.seq), 0)).where(Segment.meeting_id == meeting_id))
+            rows: List[Dict[str, Any]] = []
+            for i, seg in enumerate(segments, start=last + 1):
+                if isinstance(seg, dict):
+                    rows.append({"meeting_id": meeting_id, "seq": i, "text": seg.get("text", ""),
+                                 "start_s": seg.get("start"), "end_s": seg.get("end"), "created_at": utcnow()})
+                else:
+                    rows.append({"meeting_id": meeting_id, "seq": i, "text": str(seg),
+                                 "start_s": None, "end_s": None, "created_at": utcnow()})
+            if not rows:
+                return last
+            try:
+                self.db.execute(insert(Segment), rows)
+                self.db.execute(update(Meeting).where(Meeting.id == meeting_id)
+                                .values(segment_count=last + len(rows)))
+                self.db.commit()
+                return last + len(rows)
+            except IntegrityError:
+                # a concurrent writer took the same seq numbers: renumber and retry
+                self.db.rollback()
+                if attempt == 2:
+                    raise
+        return last
+
+    def segment_texts(self, meeting_id: str, after_seq: int = 0, upto_seq: Optional[int] = None) -> List[str]:
+        query = select(Segment.text).where(Segment.meeting_id == meeting_id, Segment.seq > after_seq)
+        if upto_seq is not None:
+            query = query.where(Segment.seq <= upto_seq)
+        return list(self.db.scalars(query.order_by(Segment.seq)))
+
+    # ---------- actions / moderation ----------
+    def add_actions(self, meeting_id: str, actions: Iterable[Dict[str, str]], source: str = "llm") -> int:
+        rows = _action_rows(meeting_id, actions, source)
+        if rows:
+            self.db.execute(insert(ActionItem), rows)
+            self.db.commit()
+        return len(rows)
+
+    def add_new_actions(self, meeting_id: str, actions: Iterable[Dict[str, str]],
+                        source: str = "llm") -> List[Dict[str, str]]:
+        """
+        add_actions() for the ones not stored yet (same assignee and text,
+        ignoring case), e.g. found by another worker meanwhile. Returns them.
+        """
+        new = self._unknown_actions(meeting_id, actions)
+        self.add_actions(meeting_id, new, source)
+        return new
+
+    def _unknown_actions(self, meeting_id: str, actions: Iterable[Dict[str, str]]) -> List[Dict[str, str]]:
+        known = {(assignee.lower(), text.lower()) for assignee, text in self.db.execute(
+            select(ActionItem.assignee, ActionItem.text).where(ActionItem.meeting_id == meeting_id))}
+        new = []
+        for a in actions:
+            key = ((a.get("assignee") or "")[:128].lower(), (a.get("text") or "").lower())
+            if key[1] and key not in known:
+                known.add(key)
+                new.append(a)
+        return new
+
+    def list_actions(self, meeting_id: Optional[str] = None, assignee: Optional[str] = None,
+                     limit: int = 200) -> List[ActionItem]:
+        query = select(ActionItem).order_by(ActionItem.created_at, ActionItem.id).limit(limit)
+        if meeting_id:
+            query = query.where(ActionItem.meeting_id == meeting_id)
+        if assignee is not None:
+            query = query.where(ActionItem.assignee == assignee)
+        return list(self.db.scalars(query))
+
+    def add_flags(self, meeting_id: str, notes: Iterable[str]) -> int:
+        rows = _flag_rows(meeting_id, notes)
+        if rows:
+            self.db.execute(insert(ModerationFlag), rows)
+            self.db.commit()
+        return len(rows)
+
+    def list_flags(self, meeting_id: str, limit: int = 200) -> List[ModerationFlag]:
+        return list(self.db.scalars(
+            select(ModerationFlag).where(ModerationFlag.meeting_id == meeting_id)
+            .order_by(ModerationFlag.created_at, ModerationFlag.id).limit(limit)
+        ))
+
+    def save_analysis(self, meeting_id: str, analysis: Dict[str, Any]) -> None:
+        """
+        Stores the actions and moderation notes of a GroqClient analysis.
+        """
+        self.add_actions(meeting_id, analysis.get("actions") or [], source="llm")
+        self.add_flags(meeting_id, (analysis.get("moderation") or {}).get("notes") or [])
+
+    def save_analyze_result(self, meeting_id: str, data: Dict[str, Any]) -> None:
+        """
+        Stores an /analyze payload: transcript, detect_actions() items and
+        the moderation verdict (as one flag when flagged).
+        """
+        if data.get("transcript_native") or data.get("transcript_en"):
+            self.save_transcript(meeting_id, data.get("transcript_native") or "", data.get("transcript_en") or None,
+                                 data.get("language_code") or None)
+        actions = (data.get("actions") or {}).get("actions") or []
+        self.add_actions(meeting_id, [
+            {"assignee": a.get("owner") or "", "text": a.get("title") or ""} for a in actions if isinstance(a, dict)
+        ])
+        moderation = data.get("moderation") or {}
+        if moderation.get("is_flagged"):
+            self.add_flags(meeting_id, [moderation.get("notes") or "flagged"])
+        summary = data.get("summary_en") or ""
+        if summary:
+            self.db.execute(update(Meeting).where(Meeting.id == meeting_id).values(summary=summary, updated_at=utcnow()))
+            self.db.commit()
+
+    # ---------- live session state ----------
+    def add_participants(self, meeting_id: str, names: Iterable[str]) -> int:
+        """Adds the names not stored yet; returns how many were new."""
+        known = set(self.participant_names(meeting_id))
+        rows = [{"meeting_id": meeting_id, "name": n[:128]} for n in dict.fromkeys(str(n).strip() for n in names)
+                if n and n[:128] not in known]
+        if rows:
+            try:
+                self.db.execute(insert(Participant), rows)
+                self.db.commit()
+            except IntegrityError:
+                # a concurrent writer stored some of them first: add the rest one by one
+                self.db.rollback()
+                return sum(self.add_participants(meeting_id, [r["name"]]) for r in rows)
+        return len(rows)
+
+    def participant_names(self, meeting_id: str) -> List[str]:
+        return list(self.db.scalars(
+            select(Participant.name).where(Participant.meeting_id == meeting_id).order_by(Participant.id)
+        ))
+
+    def save_live_state(self, meeting_id: str, summary: str, analyzed_upto: int, interruptions: int,
+                        participants: Iterable[str] = ()) -> None:
+        self.add_participants(meeting_id, participants)
+        self.db.execute(
+            update(Meeting).where(Meeting.id == meeting_id)
+            .values(summary=summary, analyzed_upto=analyzed_upto, interruptions=interruptions, updated_at=utcnow())
+        )
+        self.db.commit()
+
+    def save_live_analysis(self, meeting_id: str, analyzed_from: int, result: Dict[str, Any],
+                           participants: Iterable[str] = ()) -> bool:
+        """
+        Stores one live analysis tick (an analyze_pending() result) in one
+        transaction, but only if the stored state is still the one it
+        started from (analyzed_upto == analyzed_from). Returns False, and
+        writes nothing, when another worker stored that tick first.
+        """
+        self.add_participants(meeting_id, participants)
+        stored = self.db.execute(
+            update(Meeting).where(Meeting.id == meeting_id, Meeting.analyzed_upto == analyzed_from)
+            .values(summary=result["summary"], analyzed_upto=result["analyzed_segments"],
+                    interruptions=result["moderation"]["interruptions"], updated_at=utcnow())
+        ).rowcount
+        if not stored:
+            self.db.rollback()
+            return False
+        actions = _action_rows(meeting_id, self._unknown_actions(meeting_id, result["new_actions"]), "llm")
+        if actions:
+            self.db.execute(insert(ActionItem), actions)
+        flags = _flag_rows(meeting_id, result["new_notes"])
+        if flags:
+            self.db.execute(insert(ModerationFlag), flags)
+        self.db.commit()
+        return True
+
+    def claim_live_lease(self, meeting_id: str, owner: str, lease_seconds: float) -> bool:
+        """
+        Takes or renews the right to run the meeting's analysis loop: it is
+        free, already `owner`'s, or its holder stopped renewing it. Safe
+        against concurrent workers.
+        """
+        now = utcnow()
+        expires = now + timedelta(seconds=lease_seconds)
+        held = self.db.execute(
+            update(LiveLease).where(LiveLease.meeting_id == meeting_id,
+                                    or_(LiveLease.owner == owner, LiveLease.expires < now))
+            .values(owner=owner, expires=expires)
+        ).rowcount
+        if not held:
+            try:
+                self.db.execute(insert(LiveLease).values(meeting_id=meeting_id, owner=owner, expires=expires))
+            except IntegrityError:
+                # held by another worker
+                self.db.rollback()
+                return False
+        self.db.commit()
+        return True
+
+    def release_live_lease(self, meeting_id: str, owner: str) -> None:
+        self.db.execute(delete(LiveLease).where(LiveLease.meeting_id == meeting_id, LiveLease.owner == owner))
+        self.db.commit()
+
+    def live_version(self, meeting_id: str) -> Optional[Tuple[int, int]]:
+        """(segment_count, analyzed_upto): changes whenever a segment or an analysis tick is stored."""
+        row = self.db.execute(
+            select(Meeting.segment_count, Meeting.analyzed_upto).where(Meeting.id == meeting_id)
+        ).first()
+        return (row[0], row[1]) if row else None
+
+    def load_live_state(self, meeting_id: str, segments_after: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        A live meeting as stored, with only the segments after `segments_after`
+        (the ones a worker holds already). Actions and flags are bounded lists.
+        """
+        row = self.db.execute(
+            select(Meeting.summary, Meeting.segment_count, Meeting.analyzed_upto, Meeting.interruptions)
+            .where(Meeting.id == meeting_id)
+        ).first()
+        if row is None:
+            return None
+        summary, segment_count, analyzed_upto, interruptions = row
+        return {
+            "segments": self.segment_texts(meeting_id, after_seq=segments_after, upto_seq=segment_count),
+            "summary": summary,
+            "analyzed_upto": analyzed_upto,
+            "interruptions": interruptions,
+            "actions": [{"assignee": a.assignee, "text": a.text} for a in self.list_actions(meeting_id)],
+            "notes": [f.note for f in self.list_flags(meeting_id)],
+            "participants": self.participant_names(meeting_id),
+            "version": (segment_count, analyzed_upto),
+        }
+
+    # ---------- uploads ----------
+    def create_upload(self, filename: str, path: str, size: int, meeting_id: Optional[str] = None) -> Upload:
+        upload = Upload(filename=filename, path=path, size=size, meeting_id=meeting_id)
+        self.db.add(upload)
+        self.db.commit()
+        return upload
+
+    def get_upload(self, upload_id: str) -> Optional[Upload]:
+        return self.db.get(Upload, upload_id)
+
+    def delete_upload(self, upload_id: str) -> None:
+        self.db.execute(delete(Upload).where(Upload.id == upload_id))
+        self.db.commit()
+
+
+class JobRepository:
+    """
+    Background analysis jobs (app/services/jobs.py). A worker owns a running
+    job through a lease: every write from the worker is conditional on still
+    holding it, so a job taken over after a crash, or cancelled meanwhile,
+    is never written by the old owner.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(self, audio_path: str, title: str = "Untitled", audio_digest: Optional[str] = None,
+                   delete_audio: bool = False) -> Job:
+        job = Job(audio_path=audio_path, title=title, audio_digest=audio_digest, delete_audio=delete_audio)
+        self.db.add(job)
+        self.db.commit()
+        return job
+
+    def create_jobs(self, items: Sequence[Dict[str, Any]]) -> List[Job]:
+        """Bulk create in one transaction; items are create_job() keyword dicts."""
+        jobs = [Job(**item) for item in items]
+        self.db.add_all(jobs)
+        self.db.commit()
+        return jobs
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        return self.db.get(Job, job_id)
+
+    def list_jobs(self, status: Optional[str] = None, limit: int = 50) -> List[Job]:
+        query = select(Job).order_by(Job.created_at.desc(), Job.id.desc()).limit(limit)
+        if status:
+            query = query.where(Job.status == status)
+        return list(self.db.scalars(query))
+
+    def queued_paths(self, paths: Sequence[str]) -> set:
+        """Those of `paths` that already have a job that is not failed or cancelled."""
+        if not paths:
+            return set()
+        return set(self.db.scalars(
+            select(Job.audio_path)
+            .where(Job.audio_path.in_(paths), Job.status.in_(("queued", "running", "done", "partial")))
+        ))
+
+    def claim_next(self, owner: str, lease_seconds: float) -> Optional[Job]:
+        """
+        Takes the oldest runnable job: queued and due, or running with an
+        expired lease (its worker died). Safe against concurrent workers.
+        """
+        now = utcnow()
+        runnable = or_(
+            and_(Job.status == "queued", Job.run_after <= now),
+            and_(Job.status == "running", Job.lease_expires < now),
+        )
+        for _ in range(5):
+            job_id = self.db.scalar(select(Job.id).where(runnable).order_by(Job.run_after, Job.created_at).limit(1))
+            if job_id is None:
+                return None
+            claimed = self.db.execute(
+                update(Job).where(Job.id == job_id, runnable).values(
+                    status="running", lease_owner=owner, lease_expires=now + timedelta(seconds=lease_seconds),
+                    attempts=Job.attempts + 1, started_at=func.coalesce(Job.started_at, now), updated_at=now,
+                )
+            ).rowcount
+            self.db.commit()
+            if claimed:
+                job = self.get_job(job_id)
+                self.db.refresh(job)
+                return job
+        return None  # lost every race; the caller polls again
+
+    def _owned(self, job_id: str, owner: str):
+        return update(Job).where(Job.id == job_id, Job.status == "running", Job.lease_owner == owner)
+
+    def renew_lease(self, job_id: str, owner: str, lease_seconds: float) -> bool:
+        now = utcnow()
+        ok = self.db.execute(
+            self._owned(job_id, owner).values(lease_expires=now + timedelta(seconds=lease_seconds), updated_at=now)
+        ).rowcount
+        self.db.commit()
+        return bool(ok)
+
+    def save_checkpoint(self, job_id: str, owner: str, checkpoint: Dict[str, Any], lease_seconds: float) -> bool:
+        now = utcnow()
+        ok = self.db.execute(self._owned(job_id, owner).values(
+            checkpoint=json.dumps(checkpoint, ensure_ascii=False),
+            lease_expires=now + timedelta(seconds=lease_seconds), updated_at=now,
+        )).rowcount
+        self.db.commit()
+        return bool(ok)
+
+    def finish_job(self, job_id: str, owner: str, meeting_id: str, timings: Dict[str, Any],
+                   failed_stages: Sequence[str] = ()) -> bool:
+        """Done, or `partial` with the stages that failed listed in `error`."""
+        now = utcnow()
+        ok = self.db.execute(self._owned(job_id, owner).values(
+            status="partial" if failed_stages else "done", meeting_id=meeting_id, timings=json.dumps(timings),
+            error=f"failed stages: {', '.join(failed_stages)}" if failed_stages else None,
+            lease_owner=None, lease_expires=None, finished_at=now, updated_at=now,
+        )).rowcount
+        self.db.commit()
+        return bool(ok)
+
+    def fail_job(self, job_id: str, owner: str, error: str, retry_in: Optional[float] = None) -> bool:
+        """Requeues the job after `retry_in` seconds, or marks it failed when None."""
+        now = utcnow()
+        values: Dict[str, Any] = {"error": error[:2000], "lease_owner": None, "lease_expires": None, "updated_at": now}
+        if retry_in is None:
+            values.update(status="failed", finished_at=now)
+        else:
+            values.update(status="queued", run_after=now + timedelta(seconds=retry_in))
+        ok = self.db.execute(self._owned(job_id, owner).values(**values)).rowcount
+        self.db.commit()
+        return bool(ok)
+
+    def release_job(self, job_id: str, owner: str) -> bool:
+        """Back to the queue without counting the attempt (worker shutting down)."""
+        ok = self.db.execute(self._owned(job_id, owner).values(
+            status="queued", lease_owner=None, lease_expires=None, attempts=Job.attempts - 1, updated_at=utcnow(),
+        )).rowcount
+        self.db.commit()
+        return bool(ok)
+
+    def cancel_job(self, job_id: str) -> bool:
+        now = utcnow()
+        ok = self.db.execute(
+            update(Job).where(Job.id == job_id, Job.status.in_(("queued", "running")))
+            .values(status="cancelled", lease_owner=None, lease_expires=None, finished_at=now, updated_at=now)
+        ).rowcount
+        self.db.commit()
+        return bool(ok)
@@ -1,10 +1,89 @@
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+import threading
+from typing import Iterator, Optional
 
-DATABASE_URL = "sqlite:///./test.db"  # Update this with your actual database URL
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+from app.config import get_settings
+from app.db.base import Base
 
-Base = declarative_base()
\ No newline at end of file
+
+def make_engine(url: str, pool_size: int = 5, max_overflow: int = 10, pool_recycle: int = 1800,
+                echo: bool = False) -> Engine:
+    """
+    Pooled engine. SQLite files get WAL so several workers can read while
+    one writes; in-memory SQLite shares a single connection.
+    """
+    if url.startswith("sqlite"):
+        kwargs = {"connect_args": {"check_same_thread": False}}
+        if ":memory:" in url or url in ("sqlite://", "sqlite:///"):
+            kwargs["poolclass"] = StaticPool
+        else:
+            kwargs.update(pool_size=pool_size, max_overflow=max_overflow)
+        engine = create_engine(url, echo=echo, **kwargs)
+
+        @event.listens_for(engine, "connect")
+        def _sqlite_pragmas(dbapi_conn, _):
+            cur = dbapi_conn.cursor()
+            cur.execute("PRAGMA journal_mode=WAL")
+            cur.execute("PRAGMA synchronous=NORMAL")
+            cur.execute("PRAGMA foreign_keys=ON")
+            cur.close()
+
+        return engine
+
+    return create_engine(
+        url, echo=echo, pool_size=pool_size, max_overflow=max_overflow,
+        pool_recycle=pool_recycle, pool_pre_ping=True,
+    )
+
+
+def init_db(engine: Engine) -> None:
+    import app.models.meeting  # noqa: F401  (registers the tables on Base)
+    import app.models.job  # noqa: F401
+    Base.metadata.create_all(engine)
+
+
+_ENGINE: Optional[Engine] = None
+_SESSION_FACTORY: Optional[sessionmaker] = None
+_LOCK = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    Process-wide engine built from settings; tables are created on first use.
+    """
+    global _ENGINE, _SESSION_FACTORY
+    if _ENGINE is None:
+        with _LOCK:
+            if _ENGINE is None:
+                settings = get_settings()
+                engine = make_engine(
+                    settings.DATABASE_URL,
+                    pool_size=settings.DB_POOL_SIZE,
+                    max_overflow=settings.DB_MAX_OVERFLOW,
+                    pool_recycle=settings.DB_POOL_RECYCLE_SECONDS,
+                    echo=settings.DB_ECHO,
+                )
+                init_db(engine)
+                _SESSION_FACTORY = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
+                _ENGINE = engine
+    return _ENGINE
+
+
+def SessionLocal() -> Session:
+    get_engine()
+    return _SESSION_FACTORY()
+
+
+def get_db() -> Iterator[Session]:
+    """
+    FastAPI dependency: one session per request, closed afterwards.
+    """
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
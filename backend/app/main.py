@@ -1,9 +1,42 @@
 # app/main.py
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+import math
+import os
+import time
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from app.api.v1.routes import router as api_router
+from fastapi.responses import JSONResponse, PlainTextResponse
+from app.api.v1.routes import router as api_router, run_live_analysis
+from app.config import get_settings
+from app.core import metrics
+from app.core.middleware import RequestContextMiddleware
+from app.services.groq_clients import close_client_manager, get_client_manager
+from app.services.jobs import start_job_runner, stop_job_runner
+from app.services.live_hub import start_live_hub, stop_live_hub
+from app.services.scheduler import SchedulerBusy
+from app.services.warmup import warm_up
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    started = time.perf_counter()
+    app.state.ready = False
+    # one pooled Groq client set for the whole process
+    get_client_manager()
+    app.state.warmup = await warm_up() if get_settings().WARMUP else None
+    await start_job_runner()
+    await start_live_hub(analyze=run_live_analysis)
+    await metrics.start_metrics_writer(get_settings().METRICS_MULTIPROC_DIR, get_settings().METRICS_FLUSH_SECONDS)
+    app.state.startup_ms = round((time.perf_counter() - started) * 1000, 1)
+    app.state.ready = True
+    yield
+    app.state.ready = False
+    await metrics.stop_metrics_writer(get_settings().METRICS_MULTIPROC_DIR)
+    await stop_live_hub()
+    await stop_job_runner()
+    await close_client_manager()
 
 app = FastAPI(
+    lifespan=lifespan,
     title="AI Meeting Monitor",
     version="0.1.0",
     docs_url="/docs",       # ensure docs are ON
@@ -16,11 +49,40 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+# request ids, latency histogram and per-request log line
+app.add_middleware(RequestContextMiddleware)
+
+@app.exception_handler(SchedulerBusy)
+async def scheduler_busy_handler(request: Request, exc: SchedulerBusy):
+    # model-call queue is full or over budget: tell the client when to come back
+    retry_after = max(1, math.ceil(exc.retry_after))
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc), "retry_after": retry_after},
+        headers={"Retry-After": str(retry_after)},
+    )
 
 @app.get("/health")
 def health():
     return {"status": "ok"}
 
+@app.get("/ready")
+def ready(request: Request):
+    # readiness (vs /health liveness): 503 until the lifespan startup has finished
+    state = request.app.state
+    if not getattr(state, "ready", False):
+        return JSONResponse(status_code=503, content={"status": "unavailable"})
+    return {"status": "ready", "pid": os.getpid(), "startup_ms": state.startup_ms, "warmup": state.warmup}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    # Prometheus text exposition format; summed over all workers with METRICS_MULTIPROC_DIR
+    settings = get_settings()
+    if not settings.METRICS_ENABLED:
+        return PlainTextResponse("metrics disabled\n", status_code=404)
+    return PlainTextResponse(metrics.render(settings.METRICS_MULTIPROC_DIR), media_type="text/plain; version=0.0.4")
+
 # mount v1 API
 app.include_router(api_router, prefix="/api/v1")
@@ -0,0 +1,39 @@
+from sqlalchemy import Boolean, Column, DateTime, Index, Integer, String, Text
+
+from app.db.base import Base
+from app.models.meeting import _uuid, utcnow
+
+# partial: finished, but some stages still failed on the last attempt (see error)
+JOB_STATUSES = ("queued", "running", "done", "partial", "failed", "cancelled")
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String(36), primary_key=True, default=_uuid)
+    kind = Column(String(16), nullable=False, default="analyze")
+    status = Column(String(16), nullable=False, default="queued")  # see JOB_STATUSES
+    title = Column(String(255), nullable=False, default="Untitled")
+    audio_path = Column(String(1024), nullable=False)
+    audio_digest = Column(String(64))
+    delete_audio = Column(Boolean, nullable=False, default=False)  # uploaded copy, not a backfilled original
+    # finished stages: {"stage name": result}, so a retried job resumes after them
+    checkpoint = Column(Text, nullable=False, default="{}")
+    timings = Column(Text)
+    meeting_id = Column(String(36))
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime, nullable=False, default=utcnow)
+    # a running job belongs to one worker until lease_expires; then any worker may take it over
+    lease_owner = Column(String(64))
+    lease_expires = Column(DateTime)
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow)
+    started_at = Column(DateTime)
+    finished_at = Column(DateTime)
+
+    __table_args__ = (
+        Index("ix_jobs_status_run_after", "status", "run_after"),
+        Index("ix_jobs_created", "created_at"),
+        Index("ix_jobs_audio_path", "audio_path"),
+    )
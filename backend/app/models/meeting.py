@@ -1,18 +1,129 @@
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
-
-class ActionItem(BaseModel):
-    id: int
-    description: str
-    assigned_to: Optional[str] = None
-    due_date: Optional[datetime] = None
-    completed: bool = False
-
-class Meeting(BaseModel):
-    id: int
-    title: str
-    description: Optional[str] = None
-    date: datetime
-    participants: List[str]
-    action_items: List[ActionItem] = []
\ No newline at end of file
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from sqlalchemy import Boolean, Column, DateTime, Float, ForeignKey, Index, Integer, String, Text
+from sqlalchemy.orm import relationship
+
+from app.db.base import Base
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _uuid() -> str:
+    return str(uuid4())
+
+
+class Meeting(Base):
+    __tablename__ = "meetings"
+
+    id = Column(String(36), primary_key=True, default=_uuid)
+    title = Column(String(255), nullable=False, default="Untitled")
+    meeting_type = Column(String(16), nullable=False, default="upload")  # upload | live
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+    updated_at = Column(DateTime, nullable=False, default=utcnow, onupdate=utcnow)
+    # live session state, so a restarted worker can pick the meeting up again;
+    # (segment_count, analyzed_upto) is its version, cheap for a worker to compare
+    summary = Column(Text, nullable=False, default="")
+    segment_count = Column(Integer, nullable=False, default=0)
+    analyzed_upto = Column(Integer, nullable=False, default=0)
+    interruptions = Column(Integer, nullable=False, default=0)
+
+    transcripts = relationship("Transcript", back_populates="meeting", cascade="all, delete-orphan")
+    actions = relationship("ActionItem", back_populates="meeting", cascade="all, delete-orphan")
+    flags = relationship("ModerationFlag", back_populates="meeting", cascade="all, delete-orphan")
+
+    # keyset pagination walks (created_at, id) newest first
+    __table_args__ = (Index("ix_meetings_created_id", "created_at", "id"),)
+
+
+class Transcript(Base):
+    __tablename__ = "transcripts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    meeting_id = Column(String(36), ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False, index=True)
+    language_code = Column(String(16))
+    text_native = Column(Text, nullable=False, default="")
+    text_en = Column(Text)
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+
+    meeting = relationship("Meeting", back_populates="transcripts")
+
+
+class Segment(Base):
+    __tablename__ = "segments"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    meeting_id = Column(String(36), ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False)
+    seq = Column(Integer, nullable=False)  # 1-based order within the meeting
+    start_s = Column(Float)
+    end_s = Column(Float)
+    text = Column(Text, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+
+    __table_args__ = (Index("ux_segments_meeting_seq", "meeting_id", "seq", unique=True),)
+
+
+class ActionItem(Base):
+    __tablename__ = "action_items"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    meeting_id = Column(String(36), ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False)
+    assignee = Column(String(128), nullable=False, default="")
+    text = Column(Text, nullable=False)
+    source = Column(String(16), nullable=False, default="llm")  # llm | rule
+    completed = Column(Boolean, nullable=False, default=False)
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+
+    meeting = relationship("Meeting", back_populates="actions")
+
+    __table_args__ = (
+        Index("ix_action_items_meeting_created", "meeting_id", "created_at"),
+        Index("ix_action_items_assignee", "assignee"),
+    )
+
+
+class ModerationFlag(Base):
+    __tablename__ = "moderation_flags"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    meeting_id = Column(String(36), ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False)
+    note = Column(Text, nullable=False)
+    category = Column(String(32))
+    created_at = Column(DateTime, nullable=False, default=utcnow)
+
+    meeting = relationship("Meeting", back_populates="flags")
+
+    __table_args__ = (Index("ix_moderation_flags_meeting_created", "meeting_id", "created_at"),)
+
+
+class Participant(Base):
+    """A live meeting's participant, as given to the rule-based action engine."""
+    __tablename__ = "participants"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    meeting_id = Column(String(36), ForeignKey("meetings.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(128), nullable=False)
+
+    __table_args__ = (Index("ux_participants_meeting_name", "meeting_id", "name", unique=True),)
+
+
+class LiveLease(Base):
+    """The process running a live meeting's analysis loop, until `expires` (see live_hub.py)."""
+    __tablename__ = "live_leases"
+
+    meeting_id = Column(String(36), primary_key=True)
+    owner = Column(String(64), nullable=False)
+    expires = Column(DateTime, nullable=False)
+
+
+class Upload(Base):
+    __tablename__ = "uploads"
+
+    id = Column(String(36), primary_key=True, default=_uuid)
+    meeting_id = Column(String(36), ForeignKey("meetings.id", ondelete="SET NULL"), index=True)
+    filename = Column(String(255), nullable=False)
+    path = Column(String(1024), nullable=False)
+    size = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=utcnow, index=True)
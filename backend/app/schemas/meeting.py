@@ -1,43 +1,46 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import List, Optional
 from datetime import datetime
 
 class MeetingBase(BaseModel):
-    title: str
-    description: Optional[str] = None
-    start_time: datetime
-    end_time: datetime
+    title: str = "Untitled"
+    meeting_type: str = "upload"
 
 class MeetingCreate(MeetingBase):
     pass
 
-class MeetingUpdate(MeetingBase):
-    pass
+class MeetingUpdate(BaseModel):
+    title: Optional[str] = None
 
 class Meeting(MeetingBase):
-    id: int
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
+    id: str
+    created_at: datetime
+    updated_at: datetime
 
 class ActionItemBase(BaseModel):
-    description: str
-    assigned_to: Optional[str] = None
-    due_date: Optional[datetime] = None
+    assignee: str = ""
+    text: str
 
 class ActionItemCreate(ActionItemBase):
-    pass
-
-class ActionItemUpdate(ActionItemBase):
-    pass
+    source: str = "llm"
 
 class ActionItem(ActionItemBase):
-    id: int
-    meeting_id: int
+    model_config = ConfigDict(from_attributes=True)
 
-    class Config:
-        orm_mode = True
-
-class MeetingResponse(BaseModel):
-    meeting: Meeting
-    action_items: List[ActionItem] = []
\ No newline at end of file
+    id: int
+    meeting_id: str
+    source: str
+    completed: bool
+    created_at: datetime
+
+class MeetingPage(BaseModel):
+    items: List[Meeting]
+    next_cursor: Optional[str] = None
+
+class MeetingResponse(Meeting):
+    summary: str = ""
+    transcript: Optional[str] = None
+    actions: List[ActionItem] = []
+    moderation: List[str] = []
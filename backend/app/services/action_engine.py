@@ -0,0 +1,162 @@
+# app/services/action_engine.py
+"""
+Rule-based action-item extraction, cheap enough to run on every live segment.
+
+All assignment patterns are compiled into one regex alternation (one named
+group per rule), so a transcript is scanned in a single left-to-right pass
+instead of splitting it into sentences and trying every pattern on each.
+A task never crosses a sentence boundary, so there is at most one action
+per sentence, taken from the earliest rule that matches.
+
+Candidate assignees are checked against a known-participants index when
+one is given; without one a name must be capitalised and not a pronoun or
+filler word ("We will...", "need to...").
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+NAME = r"(?P<{rule}_who>[A-Za-z][\w'-]*)"
+TASK = r"(?P<{rule}_task>[^.!?\n]{{3,}})"
+
+# (rule name, pattern) in priority order; {who} / {task} are filled in with
+# per-rule named groups. Keywords match case-insensitively.
+DEFAULT_RULES: List[Tuple[str, str]] = [
+    # "Assign Ram to handle backend with Flask."
+    ("assign", r"\bassign\s+{who}\s+to\s+{task}"),
+    # "Ravi: send the deck" / "Ravi - Action: send the deck"
+    ("colon", r"(?:^|(?<=[.!?\n]))\s*{who}\s*[:\-]\s*(?:action\s*:|todo\s*:)?\s*{task}"),
+    # "Sarah is responsible for the release notes."
+    ("responsible", r"\b{who}\s+is\s+responsible\s+for\s+{task}"),
+    # "Rahul will finish the frontend by EOD." / "Rahul should review the PR."
+    ("will", r"\b{who}\s+(?:will|shall|should|must|needs\s+to|has\s+to)\s+{task}"),
+    # "Sakshi to do integration."
+    ("to", r"\b{who}\s+to\s+{task}"),
+    # "Action: update the roadmap" (no assignee)
+    ("todo", r"\b(?:action(?:\s+item)?|todo|to-do)\s*:\s*{task}"),
+]
+
+NOT_NAMES = frozenset("""
+i we you he she they it this that these those there here someone somebody everyone everybody anyone
+anybody nobody team who what which also and but so then now just maybe perhaps please let lets let's
+need needs want wants going have has had plan plans try tries able me us them him her our your their
+action todo to-do note notes yes no ok okay well first next finally today tomorrow
+""".split())
+
+_LEADING_TO = re.compile(r"^to\s+", re.I)
+_SPACES = re.compile(r"\s+")
+
+
+class ActionEngine:
+    def __init__(
+        self,
+        rules: Optional[Sequence[Tuple[str, str]]] = None,
+        participants: Optional[Iterable[str]] = None,
+        max_task_chars: int = 140,
+    ):
+        self.rules = list(rules or DEFAULT_RULES)
+        self.max_task_chars = max_task_chars
+        alternatives = []
+        for name, pattern in self.rules:
+            body = pattern.format(who=NAME.format(rule=name), task=TASK.format(rule=name))
+            alternatives.append(f"(?P<{name}>{body})")
+        self.regex = re.compile("|".join(alternatives), re.I)
+        # rule name -> (who group index or None, task group index)
+        index = self.regex.groupindex
+        self._groups = {name: (index.get(f"{name}_who"), index[f"{name}_task"]) for name, _ in self.rules}
+        self.participants: Dict[str, str] = {}
+        self.add_participants(participants or [])
+        # incremental state for feed()
+        self.actions: List[Dict[str, str]] = []
+        self._seen: set[Tuple[str, str]] = set()
+
+    def add_participants(self, names: Iterable[str]) -> None:
+        """
+        Indexes participants by lower-cased first name -> display name.
+        """
+        for name in names:
+            name = str(name).strip()
+            if name:
+                self.participants.setdefault(name.split()[0].lower(), name.split()[0])
+
+    def _assignee(self, who: Optional[str]) -> Optional[str]:
+        if who is None:
+            return ""
+        if self.participants:
+            return self.participants.get(who.lower())
+        if not who[0].isupper() or who.lower() in NOT_NAMES:
+            return None
+        return who
+
+    def _task(self, task: str) -> str:
+        task = _LEADING_TO.sub("", task.strip())
+        return _SPACES.sub(" ", task).strip(" ,;:-")[: self.max_task_chars]
+
+    def scan(self, text: str) -> List[Dict[str, str]]:
+        """
+        Returns every action found in `text`, in order, without de-duplication.
+        """
+        items: List[Dict[str, str]] = []
+        pos, end = 0, len(text)
+        search = self.regex.search
+        while pos < end:
+            m = search(text, pos)
+            if m is None:
+                break
+            who_group, task_group = self._groups[m.lastgroup]
+            assignee = self._assignee(m.group(who_group) if who_group else None)
+            if assignee is None:
+                # rejected name: retry just past it so a later name in the same sentence can match
+                pos = m.start() + 1
+                continue
+            task = self._task(m.group(task_group))
+            if len(task) > 2:
+                items.append({"assignee": assignee, "text": task})
+            pos = m.end()
+        return items
+
+    def extract(self, text: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        One-shot extraction, de-duplicated by assignee+text.
+        """
+        items: List[Dict[str, str]] = []
+        seen: set[Tuple[str, str]] = set()
+        for it in self.scan(text):
+            key = (it["assignee"].lower(), it["text"].lower())
+            if key not in seen:
+                seen.add(key)
+                items.append(it)
+        return items[:limit] if limit is not None else items
+
+    def remember(self, actions: Iterable[Dict[str, str]]) -> None:
+        """
+        Marks actions as already seen, so feed() does not report them again
+        (e.g. for a live session rebuilt from the store).
+        """
+        for it in actions:
+            key = (it.get("assignee", "").lower(), it.get("text", "").lower())
+            if key not in self._seen:
+                self._seen.add(key)
+                self.actions.append({"assignee": it.get("assignee", ""), "text": it.get("text", "")})
+
+    def feed(self, segment: str) -> List[Dict[str, str]]:
+        """
+        Incremental extraction for live transcripts: scans only the new
+        segment and returns the actions not seen in earlier segments.
+        Each segment is treated as ending a sentence.
+        """
+        added: List[Dict[str, str]] = []
+        for it in self.scan(segment):
+            key = (it["assignee"].lower(), it["text"].lower())
+            if key not in self._seen:
+                self._seen.add(key)
+                self.actions.append(it)
+                added.append(it)
+        return added
+
+
+_DEFAULT_ENGINE = ActionEngine()
+
+
+def extract_actions(text: str, participants: Optional[Iterable[str]] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    engine = ActionEngine(participants=participants) if participants else _DEFAULT_ENGINE
+    return engine.extract(text, limit=limit)
@@ -0,0 +1,462 @@
+# app/services/async_groq_service.py
+"""
+Non-blocking equivalents of the functions in groq_service.py for use from
+`async def` routes. Model calls go through groq.AsyncGroq, so a slow Whisper
+or LLM request never stalls the event loop; the remaining CPU-bound bits
+(language ID) are offloaded to a worker thread.
+
+Prompts and response parsing are shared with groq_service.py, so both
+variants always return the same shapes.
+"""
+import asyncio
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Sequence, Tuple
+
+import anyio
+from dotenv import load_dotenv
+
+from app.config import get_settings
+from app.core.logger import logger
+from app.core.metrics import timed
+from app.services.audio import Audio, audio_duration, load_audio
+from app.services.cache import MISS, acache_get, acache_set, file_digest
+from app.services.map_reduce import merge_action_results, merge_moderation_results, reduce_summary_messages
+from app.services.chunked_transcriber import transcribe_chunked
+from app.services.groq_clients import get_client_manager
+from app.services.model_router import ACTIONS, FINAL, MODERATION, TRANSLATION, aroute, astream_route
+from app.services.preprocess import OffsetMap, Prepared, prepare_file
+from app.services.scheduler import SchedulerBusy, get_scheduler
+from app.services.groq_service import (
+    JSON_MODE,
+    SUMMARY_INSTRUCTION,
+    WHISPER_MODEL,
+    _actions_messages,
+    _analysis_fields,
+    _analysis_result,
+    _call_tokens,
+    _clean_translation,
+    _combined_messages,
+    _field,
+    _needs_translation,
+    _resolve_language,
+    _moderation_messages,
+    _chat_key,
+    _chunks,
+    _is_long,
+    _local_moderation,
+    _merge_chunk_analyses,
+    _parse_actions,
+    _parse_moderation,
+    _reduce_groups,
+    _request_options,
+    _summary_messages,
+    _transcribe_key,
+    _transcription_result,
+    _transcription_segments,
+    _translate_messages,
+    _translation_chunks,
+    _translation_max_tokens,
+    _validate_analysis,
+)
+
+load_dotenv()
+
+
+async def _achat(messages: List[Dict[str, str]], temperature: float, max_tokens: int, task: str = FINAL,
+                 response_format: Dict[str, str] | None = None) -> str:
+    async def on(model: str) -> str:
+        key = _chat_key(messages, temperature, max_tokens, model, response_format)
+        cached = await acache_get(key)
+        if cached is not MISS:
+            return cached
+
+        extra = {"response_format": response_format} if response_format else {}
+        response = await get_scheduler().acall(model, lambda: get_client_manager().agroq.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **extra,
+            **_request_options(),
+        ), tokens=_call_tokens(messages, max_tokens))
+        content = (response.choices[0].message.content or "").strip()
+        await acache_set(key, content)
+        return content
+
+    return await aroute(task, on)
+
+
+async def _achat_stream(
+    messages: List[Dict[str, str]], temperature: float, max_tokens: int, task: str = FINAL
+) -> AsyncIterator[str]:
+    """
+    Streaming _achat(): yields content deltas as the model produces them.
+    Shares cache entries with _achat(); a hit is yielded in one piece.
+    Falling back to another model is only possible until the stream opens;
+    the router accounts for the call (tokens from the final chunk's usage)
+    once the stream has ended.
+    """
+    async def open_stream(model: str) -> AsyncIterator[Any]:
+        key = _chat_key(messages, temperature, max_tokens, model)
+        cached = await acache_get(key)
+        if cached is not MISS:
+            return _replay(cached)
+        # admission and retries cover opening the stream; a failure mid-stream is not retried
+        stream = await get_scheduler().acall(model, lambda: get_client_manager().agroq.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+            **_request_options(),
+        ), tokens=_call_tokens(messages, max_tokens))
+        return _cache_stream(key, stream)
+
+    async for chunk in astream_route(task, open_stream, usage=_chunk_usage):
+        delta = _chunk_delta(chunk)
+        if delta:
+            yield delta
+
+
+async def _replay(content: str) -> AsyncIterator[str]:
+    # a cache hit, streamed as one chunk
+    yield content
+
+
+async def _cache_stream(key: str, stream: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    # passes the chunks through and caches the reply once the stream is complete
+    parts: List[str] = []
+    async for chunk in stream:
+        parts.append(_chunk_delta(chunk) or "")
+        yield chunk
+    await acache_set(key, "".join(parts).strip())
+
+
+def _chunk_delta(chunk: Any) -> str | None:
+    if isinstance(chunk, str):
+        return chunk
+    return chunk.choices[0].delta.content if chunk.choices else None
+
+
+def _chunk_usage(chunk: Any) -> Any:
+    # Groq reports a stream's usage in the last chunk's x_groq (OpenAI-style `usage` is also accepted)
+    if isinstance(chunk, str):
+        return None
+    return _field(chunk, "usage") or _field(_field(chunk, "x_groq"), "usage")
+
+
+async def _transcribe_window(wav: bytes, filename: str) -> Dict[str, Any]:
+    transcription = await get_scheduler().acall(WHISPER_MODEL, lambda: get_client_manager().agroq.audio.transcriptions.create(
+        model=WHISPER_MODEL,
+        file=(filename, wav),
+        response_format="verbose_json",
+        temperature=0.0,
+    ))
+    return {
+        "text": _field(transcription, "text", "") or "",
+        "language": _field(transcription, "language"),
+        "segments": _transcription_segments(transcription),
+    }
+
+
+async def _prepare(file_path: str) -> Prepared | None:
+    """
+    The audio to transcribe: preprocessed (see preprocess.py) or, with
+    AUDIO_PREPROCESS off, decoded as it is when it is long enough to be
+    chunked. None means the file is sent untouched.
+    """
+    settings = get_settings()
+    if settings.AUDIO_PREPROCESS:
+        return await anyio.to_thread.run_sync(prepare_file, file_path)
+    duration = await anyio.to_thread.run_sync(audio_duration, file_path)
+    if not duration or duration <= settings.TRANSCRIBE_CHUNK_SECONDS:
+        return None
+    audio = await anyio.to_thread.run_sync(load_audio, file_path)
+    return None if audio is None else Prepared(audio, OffsetMap.identity(audio.duration), audio.duration)
+
+
+async def _transcribe_long(audio: Audio) -> Dict[str, Any]:
+    """
+    Chunked path for recordings longer than TRANSCRIBE_CHUNK_SECONDS.
+    """
+    settings = get_settings()
+    return await transcribe_chunked(
+        audio,
+        _transcribe_window,
+        chunk_seconds=settings.TRANSCRIBE_CHUNK_SECONDS,
+        overlap_seconds=settings.TRANSCRIBE_CHUNK_OVERLAP_SECONDS,
+        max_parallel=settings.TRANSCRIBE_MAX_PARALLEL,
+        retries=settings.TRANSCRIBE_CHUNK_RETRIES,
+    )
+
+
+# ---------------- async map-reduce driver ----------------
+
+async def _amap_parallel(fn: Callable[[Any], Awaitable[Any]], items: List[Any]) -> List[Any]:
+    semaphore = asyncio.Semaphore(get_settings().MAP_REDUCE_MAX_PARALLEL)
+
+    async def run(item: Any) -> Any:
+        async with semaphore:
+            return await fn(item)
+
+    return list(await asyncio.gather(*(run(item) for item in items)))
+
+
+async def _afinal_group(partials: List[str], instruction: str) -> List[str]:
+    """
+    Reduces partial summaries level by level until they fit one prompt.
+    """
+    while True:
+        groups = _reduce_groups(partials)
+        if len(groups) == 1:
+            return groups[0]
+        partials = await _amap_parallel(
+            lambda g: _achat(reduce_summary_messages(g, instruction), temperature=0.3, max_tokens=600), groups
+        )
+
+
+async def _asummary_messages(text: str) -> List[Dict[str, str]]:
+    """
+    Messages for the final summary call; long transcripts are mapped first.
+    """
+    if not _is_long(text):
+        return _summary_messages(text)
+    partials = await _amap_parallel(
+        lambda chunk: _achat(_summary_messages(chunk), temperature=0.3, max_tokens=600), _chunks(text)
+    )
+    return reduce_summary_messages(await _afinal_group(partials, SUMMARY_INSTRUCTION), SUMMARY_INSTRUCTION)
+
+
+async def _amoderate_chunk(chunk: str) -> Dict[str, Any]:
+    return _parse_moderation(await _achat(_moderation_messages(chunk), temperature=0, max_tokens=300,
+                                          task=MODERATION))
+
+
+async def _aactions_chunk(chunk: str) -> Dict[str, Any]:
+    return _parse_actions(await _achat(_actions_messages(chunk), temperature=0, max_tokens=800, task=ACTIONS))
+
+
+async def _aanalyze_chunk(text: str, fields: Sequence[str]) -> Dict[str, Any]:
+    raw = await _achat(_combined_messages(text, fields), temperature=0, max_tokens=1200, response_format=JSON_MODE)
+    valid, invalid = _validate_analysis(raw, fields)
+    for _ in range(get_settings().ANALYZE_REASK_ATTEMPTS):
+        if not invalid:
+            break
+        raw = await _achat(_combined_messages(text, invalid, invalid), temperature=0, max_tokens=1200,
+                           response_format=JSON_MODE)
+        more, invalid = _validate_analysis(raw, invalid)
+        valid.update(more)
+    return valid
+
+
+async def _transcribe_file(file_path: str) -> Any:
+    # an open handle is streamed by the HTTP client; a Path would be read into memory first
+    with open(file_path, "rb") as audio_file:
+        return await get_client_manager().agroq.audio.transcriptions.create(
+            model=WHISPER_MODEL,
+            file=audio_file,
+            response_format="verbose_json",  # includes the detected language
+        )
+
+
+@timed("transcribe")
+async def transcribe_audio(file_path: str, digest: str | None = None) -> Dict[str, Any]:
+    """
+    Async transcribe_audio(): the recording is preprocessed first (see
+    preprocess.py); long ones are then transcribed in parallel windows
+    (see chunked_transcriber.py), short ones in a single request. Local
+    language detection, when Whisper reports no language, runs in a
+    worker thread.
+    """
+    try:
+        key = _transcribe_key(digest or await anyio.to_thread.run_sync(file_digest, file_path))
+        cached = await acache_get(key)
+        if cached is not MISS:
+            return cached
+
+        prepared = await _prepare(file_path)
+        if prepared is not None and prepared.audio.duration > get_settings().TRANSCRIBE_CHUNK_SECONDS:
+            transcribed = await _transcribe_long(prepared.audio)
+        else:
+            payload = None
+            if prepared is not None:
+                payload = await anyio.to_thread.run_sync(
+                    prepared.payload, os.path.getsize(file_path), os.path.basename(file_path)
+                )
+            if payload is not None:
+                transcribed = await _transcribe_window(*payload)
+            else:
+                transcription = await get_scheduler().acall(WHISPER_MODEL, lambda: _transcribe_file(file_path))
+                transcribed = {"text": getattr(transcription, "text", ""),
+                               "language": getattr(transcription, "language", None)}
+
+        text = (transcribed["text"] or "").strip()
+        language_code = await anyio.to_thread.run_sync(_resolve_language, transcribed.get("language"), text)
+        result = _transcription_result(text, language_code)
+        if "segments" in transcribed:
+            # timestamps in the original recording, whatever was cut out of it
+            result["segments"] = prepared.offsets.map_segments(transcribed["segments"])
+        await acache_set(key, result)
+        return result
+
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"Transcription failed: {e}")
+        return {"error": str(e)}
+
+
+async def _atranslate_chunk(chunk: str, source_lang: str, target_lang: str) -> str:
+    translated = await _achat(_translate_messages(chunk, source_lang, target_lang), temperature=0.2,
+                              max_tokens=_translation_max_tokens(chunk), task=TRANSLATION)
+    return _clean_translation(translated)
+
+
+@timed("translate")
+async def translate_text(native_text: str, source_lang: str = "auto", target_lang: str = "English") -> str:
+    try:
+        if not await anyio.to_thread.run_sync(_needs_translation, native_text, source_lang, target_lang):
+            return native_text
+
+        parts = await _amap_parallel(
+            lambda chunk: _atranslate_chunk(chunk, source_lang, target_lang), _translation_chunks(native_text)
+        )
+        return " ".join(filter(None, parts))
+
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"Translation failed: {e}")
+        return ""
+
+
+@timed("summarize_en")
+async def summarize_text_en(text: str) -> Dict[str, Any]:
+    try:
+        if not text.strip():
+            return {"error": "Empty text for summarization."}
+
+        messages = await _asummary_messages(text)
+        return {"summary_en": await _achat(messages, temperature=0.3, max_tokens=600)}
+
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"Summarization failed: {e}")
+        return {"error": str(e)}
+
+
+@timed("summarize_native")
+async def summarize_text_native(summary_en: str, target_lang: str) -> Dict[str, Any]:
+    try:
+        return {"summary_native": await translate_text(summary_en, "English", target_lang)}
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"Native summary translation failed: {e}")
+        return {"error": str(e)}
+
+
+@timed("moderate")
+async def moderate_text(text: str) -> Dict[str, Any]:
+    try:
+        if not text.strip():
+            return {"error": "Empty text for moderation."}
+
+        pre = _local_moderation(text)
+        if pre is not None:
+            if pre.verdict != "ambiguous":
+                return pre.as_moderation()
+            text = " ".join(pre.ambiguous_spans)
+
+        if _is_long(text):
+            result = merge_moderation_results(await _amap_parallel(_amoderate_chunk, _chunks(text)))
+        else:
+            result = await _amoderate_chunk(text)
+
+        return result if pre is None else merge_moderation_results([pre.as_moderation(), result])
+
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"Moderation failed: {e}")
+        return {"error": str(e)}
+
+
+@timed("detect_actions")
+async def detect_actions(text: str) -> Dict[str, Any]:
+    if not text.strip():
+        return {"error": "Empty text for action detection."}
+
+    try:
+        if _is_long(text):
+            return merge_action_results(await _amap_parallel(_aactions_chunk, _chunks(text)))
+
+        return await _aactions_chunk(text)
+
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"Action detection failed: {e}")
+        return {"error": str(e)}
+
+
+@timed("analyze")
+async def analyze_text(text: str) -> Dict[str, Any]:
+    """
+    Async analyze_text(): summary, actions/decisions and moderation from
+    one JSON-mode call per chunk.
+    """
+    if not text.strip():
+        return {"error": "Empty text for analysis."}
+
+    try:
+        pre = _local_moderation(text)
+        fields = _analysis_fields(pre)
+        if _is_long(text):
+            parts = await _amap_parallel(lambda chunk: _aanalyze_chunk(chunk, fields), _chunks(text))
+            valid = _merge_chunk_analyses(parts, fields)
+            summaries = [p["summary_en"] for p in parts if "summary_en" in p]
+            if summaries:
+                group = await _afinal_group(summaries, SUMMARY_INSTRUCTION)
+                valid["summary_en"] = await _achat(
+                    reduce_summary_messages(group, SUMMARY_INSTRUCTION), temperature=0.3, max_tokens=600
+                )
+        else:
+            valid = await _aanalyze_chunk(text, fields)
+        return _analysis_result(valid, pre)
+
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"Analysis failed: {e}")
+        return {"error": str(e)}
+
+
+# ---------------- streaming variants (token by token) ----------------
+
+async def stream_summary_en(text: str) -> AsyncIterator[str]:
+    """
+    Yields the English summary as it is generated. For long transcripts the
+    map step runs first and only the final reduce call is streamed.
+    """
+    messages = await _asummary_messages(text)
+    async for delta in _achat_stream(messages, temperature=0.3, max_tokens=600):
+        yield delta
+
+
+async def stream_translate_text(
+    native_text: str, source_lang: str = "auto", target_lang: str = "English"
+) -> AsyncIterator[str]:
+    """
+    Streaming translate_text() for short text such as a summary. Text that
+    needs no translation is yielded as-is in one piece.
+    """
+    if not await anyio.to_thread.run_sync(_needs_translation, native_text, source_lang, target_lang):
+        if native_text:
+            yield native_text
+        return
+    messages = _translate_messages(native_text, source_lang, target_lang)
+    async for delta in _achat_stream(messages, temperature=0.2, max_tokens=_translation_max_tokens(native_text),
+                                     task=TRANSLATION):
+        yield delta
@@ -0,0 +1,245 @@
+# app/services/audio.py
+"""
+Local audio helpers: decoding to 16 kHz mono PCM, frame energy and
+silence-aware splitting into overlapping windows, WAV / FLAC encoding.
+
+WAV files are decoded with the standard library; other formats (mp3, m4a,
+aac, ...) need an `ffmpeg` binary on PATH. When audio cannot be decoded the
+callers fall back to sending the original file untouched.
+"""
+import io
+import shutil
+import subprocess
+import wave
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Union
+
+import numpy as np
+
+from app.core.logger import logger
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+
+
+@dataclass
+class Audio:
+    samples: np.ndarray  # int16, mono
+    sample_rate: int = SAMPLE_RATE
+
+    @property
+    def duration(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+
+@dataclass
+class Window:
+    index: int
+    start: float       # window start incl. overlap (seconds)
+    end: float         # window end incl. overlap
+    core_start: float  # part of the timeline this window "owns"
+    core_end: float
+
+
+def _is_wav(path: str) -> bool:
+    with open(path, "rb") as f:
+        head = f.read(12)
+    return head[:4] == b"RIFF" and head[8:12] == b"WAVE"
+
+
+def audio_duration(path: str) -> Optional[float]:
+    """
+    Cheap duration probe (WAV header or ffprobe). None if unknown.
+    """
+    try:
+        if _is_wav(path):
+            with wave.open(path, "rb") as w:
+                return w.getnframes() / float(w.getframerate())
+        if shutil.which("ffprobe"):
+            out = subprocess.run(
+                ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "csv=p=0", path],
+                capture_output=True, text=True, timeout=30,
+            )
+            return float(out.stdout.strip())
+    except Exception:
+        pass
+    return None
+
+
+def _mean_groups(x: np.ndarray, k: int) -> np.ndarray:
+    """Mean of every k consecutive values (summing columns is far faster than mean(axis=1) for small k)."""
+    groups = x[: len(x) - len(x) % k].reshape(-1, k)
+    out = groups[:, 0].astype(np.float32)
+    for i in range(1, k):
+        out += groups[:, i]
+    return out / k if k > 1 else out
+
+
+def _resample(x: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    if src_rate == dst_rate or len(x) == 0:
+        return x
+    if src_rate % dst_rate == 0:
+        # 48 -> 16 kHz etc.: average each group of samples, which also filters out what would alias
+        return _mean_groups(x, src_rate // dst_rate)
+    n_out = int(round(len(x) * dst_rate / src_rate))
+    t_out = np.arange(n_out, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(t_out, np.arange(len(x), dtype=np.float64), x)
+
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int = SAMPLE_RATE) -> np.ndarray:
+    """int16 samples at `src_rate` -> int16 samples at `dst_rate` (linear interpolation)."""
+    if src_rate == dst_rate:
+        return samples
+    return np.clip(_resample(samples.astype(np.float32), src_rate, dst_rate), -32768, 32767).astype(np.int16)
+
+
+def _decode_wav(path: Union[str, BinaryIO]) -> Audio:
+    with wave.open(path, "rb") as w:
+        channels, width, rate = w.getnchannels(), w.getsampwidth(), w.getframerate()
+        raw = w.readframes(w.getnframes())
+
+    if width == 1:
+        x = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) * 256.0
+    elif width == 2:
+        x = np.frombuffer(raw, dtype="<i2")
+    elif width == 3:
+        b = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        x = ((b[:, 0].astype(np.int32) | (b[:, 1].astype(np.int32) << 8) | (b[:, 2].astype(np.int32) << 16))
+             << 8 >> 8).astype(np.float32) / 256.0
+    elif width == 4:
+        x = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 65536.0
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width}")
+
+    if channels > 1:
+        x = _mean_groups(x, channels)
+    x = _resample(x, rate, SAMPLE_RATE)
+    return Audio(np.clip(x, -32768, 32767).astype(np.int16))
+
+
+def _decode_ffmpeg(path: str) -> Audio:
+    out = subprocess.run(
+        ["ffmpeg", "-nostdin", "-v", "error", "-i", path, "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "-"],
+        capture_output=True, check=True,
+    )
+    return Audio(np.frombuffer(out.stdout, dtype="<i2").copy())
+
+
+def load_audio(path: str) -> Optional[Audio]:
+    """
+    Decodes any supported file to 16 kHz mono int16. None if not decodable here.
+    """
+    try:
+        if _is_wav(path):
+            return _decode_wav(path)
+        if shutil.which("ffmpeg"):
+            return _decode_ffmpeg(path)
+    except Exception as e:
+        logger.error(f"Audio decode failed: {e}")
+    return None
+
+
+def decode_bytes(data: bytes) -> Optional[Audio]:
+    """
+    load_audio() for audio held in memory.
+    """
+    try:
+        if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+            return _decode_wav(io.BytesIO(data))
+        if shutil.which("ffmpeg"):
+            out = subprocess.run(
+                ["ffmpeg", "-nostdin", "-v", "error", "-i", "pipe:0", "-f", "s16le", "-ac", "1",
+                 "-ar", str(SAMPLE_RATE), "-"],
+                input=data, capture_output=True, check=True,
+            )
+            return Audio(np.frombuffer(out.stdout, dtype="<i2").copy())
+    except Exception as e:
+        logger.error(f"Audio decode failed: {e}")
+    return None
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> bytes:
+    bio = io.BytesIO()
+    with wave.open(bio, "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(sample_rate)
+        w.writeframes(np.ascontiguousarray(samples, dtype="<i2").tobytes())
+    return bio.getvalue()
+
+
+def encode_flac(samples: np.ndarray, sample_rate: int = SAMPLE_RATE) -> Optional[bytes]:
+    """
+    Lossless and roughly half the size of encode_wav(); None without ffmpeg.
+    """
+    if not shutil.which("ffmpeg"):
+        return None
+    try:
+        out = subprocess.run(
+            ["ffmpeg", "-nostdin", "-v", "error", "-f", "s16le", "-ac", "1", "-ar", str(sample_rate),
+             "-i", "pipe:0", "-f", "flac", "-"],
+            input=np.ascontiguousarray(samples, dtype="<i2").tobytes(), capture_output=True, check=True,
+        )
+        return out.stdout
+    except Exception as e:
+        logger.error(f"FLAC encode failed: {e}")
+        return None
+
+
+def frame_energy(samples: np.ndarray, sample_rate: int = SAMPLE_RATE, frame_ms: int = FRAME_MS) -> np.ndarray:
+    """
+    RMS energy per non-overlapping frame (vectorized).
+    """
+    frame = max(1, sample_rate * frame_ms // 1000)
+    n = len(samples) // frame
+    if n == 0:
+        return np.zeros(0, dtype=np.float32)
+    x = samples[: n * frame].astype(np.float32).reshape(n, frame)
+    return np.sqrt(np.mean(x * x, axis=1))
+
+
+def split_windows(
+    audio: Audio,
+    chunk_seconds: float,
+    overlap_seconds: float,
+    search_seconds: float = 20.0,
+) -> List[Window]:
+    """
+    Splits the timeline into ~chunk_seconds pieces, moving every cut to the
+    quietest frame within ±search_seconds of its target, then pads each
+    window with `overlap_seconds` on both sides.
+    """
+    duration = audio.duration
+    if duration <= chunk_seconds:
+        return [Window(0, 0.0, duration, 0.0, duration)]
+
+    energy = frame_energy(audio.samples, audio.sample_rate)
+    frame_s = FRAME_MS / 1000.0
+    cuts = [0.0]
+    target = chunk_seconds
+    while target < duration - chunk_seconds / 4:
+        lo = max(int((target - search_seconds) / frame_s), int(cuts[-1] / frame_s) + 1)
+        hi = min(int((target + search_seconds) / frame_s), len(energy))
+        if hi > lo:
+            cut = (lo + int(np.argmin(energy[lo:hi]))) * frame_s + frame_s / 2
+        else:
+            cut = target
+        cuts.append(cut)
+        target = cut + chunk_seconds
+    cuts.append(duration)
+
+    windows = []
+    for i in range(len(cuts) - 1):
+        core_start, core_end = cuts[i], cuts[i + 1]
+        windows.append(Window(
+            index=i,
+            start=max(0.0, core_start - overlap_seconds),
+            end=min(duration, core_end + overlap_seconds),
+            core_start=core_start,
+            core_end=core_end,
+        ))
+    return windows
+
+
+def slice_seconds(audio: Audio, start: float, end: float) -> np.ndarray:
+    return audio.samples[int(start * audio.sample_rate): int(end * audio.sample_rate)]
@@ -0,0 +1,235 @@
+# app/services/cache.py
+"""
+Content-addressed cache for transcription and LLM results: an in-memory
+LRU tier plus an optional SQLite tier shared by the workers on a host.
+Values must be JSON-serializable. Async code uses acache_get / acache_set
+(the disk tier blocks).
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import anyio
+
+from app.config import get_settings
+from app.utils.singleton import Singleton
+
+MISS = object()
+
+
+def make_key(namespace: str, *parts: Any) -> str:
+    blob = json.dumps([namespace, parts], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def bytes_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 7 * 24 * 3600,
+        disk_path: Optional[str] = None,
+        disk_max_bytes: int = 512 * 1024 * 1024,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, Tuple[float, str, int]]" = OrderedDict()
+        self._mem_bytes = 0
+        self._counters: Dict[str, int] = {
+            "memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "evictions": 0, "expired": 0,
+        }
+        self._db: Optional[sqlite3.Connection] = None
+        self._disk_bytes = 0
+        if disk_path:
+            os.makedirs(os.path.dirname(os.path.abspath(disk_path)), exist_ok=True)
+            self._db = sqlite3.connect(disk_path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL,"
+                " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS ix_cache_accessed ON cache (accessed_at)")
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+
+    @property
+    def has_disk(self) -> bool:
+        return self._db is not None
+
+    # ---------- memory tier ----------
+    def _mem_put(self, key: str, expires_at: float, blob: str, size: int) -> None:
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= old[2]
+        self._mem[key] = (expires_at, blob, size)
+        self._mem_bytes += size
+        while self._mem and (len(self._mem) > self.max_entries or self._mem_bytes > self.max_bytes):
+            _, (_, _, evicted_size) = self._mem.popitem(last=False)
+            self._mem_bytes -= evicted_size
+            self._counters["evictions"] += 1
+
+    def _mem_drop(self, key: str) -> None:
+        old = self._mem.pop(key, None)
+        if old is not None:
+            self._mem_bytes -= old[2]
+
+    # ---------- disk tier ----------
+    def _disk_evict(self) -> None:
+        if self._disk_bytes <= self.disk_max_bytes:
+            return
+        # other workers may share the file: re-read the real total before evicting
+        self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM cache").fetchone()[0]
+        rows = self._db.execute("SELECT key, size FROM cache ORDER BY accessed_at")
+        victims = []
+        while self._disk_bytes > self.disk_max_bytes * 0.9:
+            row = rows.fetchone()
+            if row is None:
+                break
+            victims.append((row[0],))
+            self._disk_bytes -= row[1]
+        rows.close()
+        self._db.executemany("DELETE FROM cache WHERE key = ?", victims)
+        self._counters["evictions"] += len(victims)
+
+    # ---------- public API ----------
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            entry = self._mem.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._mem.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return json.loads(entry[1])
+                self._mem_drop(key)
+                self._counters["expired"] += 1
+
+            if self._db is not None:
+                row = self._db.execute("SELECT value, size, expires_at FROM cache WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    if row[2] > now:
+                        self._db.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._mem_put(key, row[2], row[0], row[1])
+                        self._counters["disk_hits"] += 1
+                        return json.loads(row[0])
+                    self._db.execute("DELETE FROM cache WHERE key = ?", (key,))
+                    self._disk_bytes -= row[1]
+                    self._counters["expired"] += 1
+
+            self._counters["misses"] += 1
+            return default
+
+    def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        now = time.time()
+        expires_at = now + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        blob = json.dumps(value, ensure_ascii=False)
+        size = len(blob)
+        with self._lock:
+            self._counters["sets"] += 1
+            self._mem_put(key, expires_at, blob, size)
+            if self._db is not None:
+                old = self._db.execute("SELECT size FROM cache WHERE key = ?", (key,)).fetchone()
+                self._disk_bytes += size - (old[0] if old else 0)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO cache (key, value, size, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, blob, size, expires_at, now),
+                )
+                self._disk_evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._mem.clear()
+            self._mem_bytes = 0
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+                self._disk_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            lookups = hits + self._counters["misses"]
+            data: Dict[str, Any] = {
+                **self._counters,
+                "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+                "memory_entries": len(self._mem),
+                "memory_bytes": self._mem_bytes,
+            }
+            if self._db is not None:
+                count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM cache").fetchone()
+                data.update({"disk_entries": count, "disk_bytes": size})
+            return data
+
+
+def _build_cache() -> ResultCache:
+    settings = get_settings()
+    return ResultCache(
+        max_entries=settings.CACHE_MAX_ENTRIES,
+        max_bytes=settings.CACHE_MAX_BYTES,
+        ttl_seconds=settings.CACHE_TTL_SECONDS,
+        disk_path=settings.CACHE_DISK_PATH,
+        disk_max_bytes=settings.CACHE_DISK_MAX_BYTES,
+    )
+
+
+_CACHE = Singleton(_build_cache)
+
+
+def get_cache() -> Optional[ResultCache]:
+    """
+    Process-wide cache built from settings; None when CACHE_ENABLED is off.
+    """
+    if not get_settings().CACHE_ENABLED:
+        return None
+    return _CACHE.get()
+
+
+def cache_get(key: str) -> Any:
+    cache = get_cache()
+    return MISS if cache is None else cache.get(key, MISS)
+
+
+def cache_set(key: str, value: Any) -> None:
+    cache = get_cache()
+    if cache is not None:
+        cache.set(key, value)
+
+
+async def acache_get(key: str) -> Any:
+    """cache_get() that keeps the disk tier off the event loop."""
+    cache = get_cache()
+    if cache is None:
+        return MISS
+    if not cache.has_disk:
+        return cache.get(key, MISS)
+    return await anyio.to_thread.run_sync(cache.get, key, MISS)
+
+
+async def acache_set(key: str, value: Any) -> None:
+    cache = get_cache()
+    if cache is None:
+        return
+    if not cache.has_disk:
+        cache.set(key, value)
+        return
+    await anyio.to_thread.run_sync(cache.set, key, value)
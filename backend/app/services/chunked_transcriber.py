@@ -0,0 +1,105 @@
+# app/services/chunked_transcriber.py
+"""
+Chunked, parallel transcription for long recordings.
+
+The decoded audio is cut on quiet frames into overlapping windows, every
+window is transcribed concurrently (bounded by a semaphore) and retried on
+its own if it fails, and the results are stitched back together. Each
+window "owns" the part of the timeline between its cut points; segments are
+kept by the window that owns their midpoint, which drops the duplicates
+produced by the overlaps.
+"""
+import asyncio
+import re
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from app.core.logger import logger
+from app.services.audio import Audio, Window, encode_wav, slice_seconds, split_windows
+from app.services.scheduler import SchedulerBusy
+
+# transcribe_window(wav_bytes, filename) -> {"text": str, "segments": [{"start","end","text"}], "language": str|None}
+TranscribeFn = Callable[[bytes, str], Awaitable[Dict[str, Any]]]
+
+
+async def _transcribe_window(
+    audio: Audio,
+    window: Window,
+    transcribe_window: TranscribeFn,
+    semaphore: asyncio.Semaphore,
+    retries: int,
+) -> Dict[str, Any]:
+    wav = encode_wav(slice_seconds(audio, window.start, window.end), audio.sample_rate)
+    filename = f"chunk_{window.index:03d}.wav"
+    attempt = 0
+    while True:
+        async with semaphore:
+            try:
+                return await transcribe_window(wav, filename)
+            except SchedulerBusy:
+                raise  # already retried / queued by the scheduler
+            except Exception as e:
+                if attempt >= retries:
+                    raise
+                logger.warning(f"Chunk {window.index} failed (attempt {attempt + 1}): {e}")
+        await asyncio.sleep(0.5 * (2 ** attempt))
+        attempt += 1
+
+
+def _merge_text_overlap(prev: str, nxt: str, max_words: int = 40) -> str:
+    """
+    Joins two texts, dropping the longest run of words that ends `prev`
+    and starts `nxt` (used when a window came back without segments).
+    """
+    a, b = prev.split(), nxt.split()
+    norm = lambda w: re.sub(r"\W+", "", w.lower())
+    a_norm = [norm(w) for w in a[-max_words:]]
+    b_norm = [norm(w) for w in b[:max_words]]
+    for k in range(min(len(a_norm), len(b_norm)), 0, -1):
+        if a_norm[-k:] == b_norm[:k]:
+            return " ".join(a + b[k:])
+    return " ".join(a + b)
+
+
+def stitch(windows: List[Window], results: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Returns (text, segments) with segment times relative to the whole recording.
+    """
+    segments: List[Dict[str, Any]] = []
+    text = ""
+    last = len(windows) - 1
+    for window, result in zip(windows, results):
+        win_segments = result.get("segments") or []
+        if not win_segments:
+            text = _merge_text_overlap(text, (result.get("text") or "").strip())
+            continue
+        kept = []
+        for seg in win_segments:
+            start = float(seg.get("start", 0.0)) + window.start
+            end = float(seg.get("end", 0.0)) + window.start
+            mid = (start + end) / 2
+            if window.core_start <= mid and (mid < window.core_end or window.index == last):
+                kept.append({"start": round(start, 2), "end": round(end, 2), "text": (seg.get("text") or "").strip()})
+        segments.extend(kept)
+        text = " ".join(filter(None, [text, *(s["text"] for s in kept)]))
+    return re.sub(r"\s+", " ", text).strip(), segments
+
+
+async def transcribe_chunked(
+    audio: Audio,
+    transcribe_window: TranscribeFn,
+    chunk_seconds: float,
+    overlap_seconds: float,
+    max_parallel: int,
+    retries: int,
+) -> Dict[str, Any]:
+    windows = split_windows(audio, chunk_seconds, overlap_seconds)
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+    results = await asyncio.gather(*(
+        _transcribe_window(audio, w, transcribe_window, semaphore, retries) for w in windows
+    ))
+    text, segments = stitch(windows, list(results))
+    # the language most windows were detected in, if Whisper reported any
+    languages = Counter(r.get("language") for r in results if r.get("language"))
+    language = languages.most_common(1)[0][0] if languages else None
+    return {"text": text, "segments": segments, "chunks": len(windows), "language": language}
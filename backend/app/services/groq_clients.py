@@ -0,0 +1,240 @@
+# app/services/groq_clients.py
+"""
+One set of pooled Groq clients per process, created in the app lifespan and
+closed on shutdown (scripts and tests get one lazily). The transports'
+counters feed /api/v1/clients/stats.
+"""
+import ssl
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+import certifi
+import httpx
+from groq import AsyncGroq, Groq
+
+from app.config import Settings, get_settings
+from app.core.logger import logger
+from app.utils.singleton import Singleton
+
+
+@lru_cache
+def _h2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning("GROQ_HTTP2 is on but the h2 package is missing; using HTTP/1.1 keep-alive")
+        return False
+    return True
+
+
+@lru_cache
+def ssl_context() -> ssl.SSLContext:
+    """
+    The verifying TLS context both transports share. Loading the CA bundle
+    is most of a manager's construction time, so it is built once per
+    process, or once in the gunicorn master and inherited by every worker.
+    """
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+class _Counters:
+    def __init__(self, max_connections: Optional[int] = None):
+        self._lock = threading.Lock()
+        self.max_connections = max_connections
+        self.requests = 0
+        self.errors = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.connections_opened = 0
+        self.total_ms = 0.0
+
+    def start(self) -> float:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        return time.perf_counter()
+
+    def connected(self) -> None:
+        with self._lock:
+            self.connections_opened += 1
+
+    def finish(self, started: float, failed: bool) -> None:
+        with self._lock:
+            self.in_flight -= 1
+            self.errors += failed
+            self.total_ms += (time.perf_counter() - started) * 1000
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "errors": self.errors,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                # new TCP connections; every other request reused a pooled one
+                "connections_opened": self.connections_opened,
+                "max_connections": self.max_connections,
+                "utilization": round(self.in_flight / self.max_connections, 3) if self.max_connections else None,
+                # time to response headers; bodies are read after the connection is handed back
+                "avg_headers_ms": round(self.total_ms / self.requests, 2) if self.requests else 0.0,
+            }
+
+
+# httpcore reports each new connection through the request's "trace" extension
+_CONNECTED = "connection.connect_tcp.complete"
+
+
+class InstrumentedTransport(httpx.HTTPTransport):
+    def __init__(self, max_connections: Optional[int] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.counters = _Counters(max_connections)
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        outer = request.extensions.get("trace")
+
+        def trace(event: str, info: Dict[str, Any]) -> None:
+            if event == _CONNECTED:
+                self.counters.connected()
+            if outer is not None:
+                outer(event, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        started = self.counters.start()
+        failed = True
+        try:
+            response = super().handle_request(request)
+            failed = False
+            return response
+        finally:
+            self.counters.finish(started, failed)
+
+
+class InstrumentedAsyncTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, max_connections: Optional[int] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.counters = _Counters(max_connections)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        outer = request.extensions.get("trace")
+
+        async def trace(event: str, info: Dict[str, Any]) -> None:
+            if event == _CONNECTED:
+                self.counters.connected()
+            if outer is not None:
+                await outer(event, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        started = self.counters.start()
+        failed = True
+        try:
+            response = await super().handle_async_request(request)
+            failed = False
+            return response
+        finally:
+            self.counters.finish(started, failed)
+
+
+class ClientManager:
+    """
+    Owns the pooled httpx clients and the Groq / AsyncGroq clients built on
+    them. The SDK clients are created on first use, so the app starts
+    without GROQ_API_KEY (routes check it before calling out).
+    """
+
+    def __init__(self, settings: Optional[Settings] = None, groq: Any = None, agroq: Any = None):
+        settings = settings or get_settings()
+        self.api_key = settings.GROQ_API_KEY
+        self.max_retries = settings.GROQ_MAX_RETRIES
+        self.http2 = settings.GROQ_HTTP2 and _h2_available()
+
+        limits = httpx.Limits(
+            max_connections=settings.GROQ_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.GROQ_KEEPALIVE_SECONDS,
+        )
+        self.timeout = httpx.Timeout(
+            settings.GROQ_TIMEOUT_SECONDS,
+            connect=settings.GROQ_CONNECT_TIMEOUT_SECONDS,
+            pool=settings.GROQ_POOL_TIMEOUT_SECONDS,
+        )
+        self.transport = InstrumentedTransport(settings.GROQ_MAX_CONNECTIONS, http2=self.http2, limits=limits,
+                                               verify=ssl_context())
+        self.atransport = InstrumentedAsyncTransport(settings.GROQ_MAX_CONNECTIONS, http2=self.http2, limits=limits,
+                                                     verify=ssl_context())
+        self.http = httpx.Client(transport=self.transport, timeout=self.timeout)
+        self.ahttp = httpx.AsyncClient(transport=self.atransport, timeout=self.timeout)
+
+        self._groq = groq
+        self._agroq = agroq
+        self._others: Dict[str, Groq] = {}  # clients for keys other than GROQ_API_KEY
+        self._lock = threading.Lock()
+
+    def _build(self, api_key: Optional[str]) -> Groq:
+        return Groq(api_key=api_key, http_client=self.http, timeout=self.timeout, max_retries=self.max_retries)
+
+    @property
+    def groq(self) -> Groq:
+        if self._groq is None:
+            with self._lock:
+                if self._groq is None:
+                    self._groq = self._build(self.api_key)
+        return self._groq
+
+    @property
+    def agroq(self) -> AsyncGroq:
+        if self._agroq is None:
+            with self._lock:
+                if self._agroq is None:
+                    self._agroq = AsyncGroq(api_key=self.api_key, http_client=self.ahttp,
+                                            timeout=self.timeout, max_retries=self.max_retries)
+        return self._agroq
+
+    def groq_for(self, api_key: Optional[str]) -> Groq:
+        """
+        Sync client for a given key, built once per key; it shares this
+        manager's connection pool.
+        """
+        if api_key == self.api_key:
+            return self.groq
+        if api_key not in self._others:
+            with self._lock:
+                if api_key not in self._others:
+                    self._others[api_key] = self._build(api_key)
+        return self._others[api_key]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "http2": self.http2,
+            "sync": self.transport.counters.snapshot(),
+            "async": self.atransport.counters.snapshot(),
+        }
+
+    def close(self) -> None:
+        self.http.close()
+
+    async def aclose(self) -> None:
+        self.http.close()
+        await self.ahttp.aclose()
+
+
+_MANAGER = Singleton(ClientManager)
+
+
+def get_client_manager() -> ClientManager:
+    return _MANAGER.get()
+
+
+def set_client_manager(manager: Optional[ClientManager]) -> Optional[ClientManager]:
+    """
+    Replaces the process-wide manager (None resets it); returns the previous one.
+    """
+    return _MANAGER.set(manager)
+
+
+async def close_client_manager() -> None:
+    manager = set_client_manager(None)
+    if manager is not None:
+        await manager.aclose()
@@ -1,105 +1,526 @@
 # app/services/groq_service.py (only the analyze_* parts changed)
 from groq import Groq
-from io import BytesIO
 import json, re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Sequence, Tuple
 import os
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 import tempfile
-from langdetect import detect, DetectorFactory
+from app.config import get_settings
+from app.core.logger import logger
+from app.core.metrics import timed
+from app.services.cache import MISS, bytes_digest, cache_get, cache_set, file_digest, make_key
+from app.services.map_reduce import (
+    chunk_by_tokens,
+    estimate_tokens,
+    group_partials,
+    merge_action_results,
+    merge_analysis_results,
+    merge_moderation_results,
+    reduce_summary_messages,
+)
+from app.services.action_engine import extract_actions
+from app.services.langid import detect_language, language_name, normalize_language, resolve_language, same_language
+from app.services.moderation_filter import PrefilterResult, prefilter
+from app.services.groq_clients import get_client_manager
+from app.services.model_router import ACTIONS, FINAL, LIVE, MODERATION, TRANSLATION, get_model_router, route
+from app.services.preprocess import Prepared, prepare_bytes, prepare_file
+from app.services.scheduler import SchedulerBusy, current_fail_fast, get_scheduler
+from app.services.singleflight import coalesce
 
 load_dotenv()
 
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-
 NAME_WORD = r"[A-Z][a-zA-Z]+"
-ASSIGN_PATTERNS = [
-    # "Rahul will finish the frontend by EOD."
-    re.compile(rf"\b({NAME_WORD})\s+will\s+([^\.]+)", re.I),
-    # "Assign Ram to handle backend with Flask."
-    re.compile(rf"\bassign\s+({NAME_WORD})\s+to\s+([^\.]+)", re.I),
-    # "Sakshin to do integration."
-    re.compile(rf"\b({NAME_WORD})\s+to\s+([^\.]+)", re.I),
-    # "({name}) is responsible for ..."
-    re.compile(rf"\b({NAME_WORD})\s+is\s+responsible\s+for\s+([^\.]+)", re.I),
-]
-
-DetectorFactory.seed = 0
-
-def transcribe_audio(file_path: str) -> Dict[str, Any]:
+
+WHISPER_MODEL = "whisper-large-v3"
+
+# ---------------- shared prompt builders / parsers ----------------
+# Used by both the blocking functions below and app/services/async_groq_service.py
+
+def _chat_key(messages: List[Dict[str, str]], temperature: float, max_tokens: int, model: str,
+              response_format: Dict[str, str] | None = None) -> str:
+    extra = [response_format] if response_format else []
+    return make_key("chat", model, messages, temperature, max_tokens, *extra)
+
+def _transcribe_key(digest: str) -> str:
+    return make_key("transcribe", WHISPER_MODEL, digest)
+
+def _call_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    # what a chat call is charged against the model's tokens-per-minute budget
+    return estimate_tokens(" ".join(m.get("content", "") for m in messages)) + max_tokens
+
+def _request_options() -> Dict[str, Any]:
+    # a call that can still fall back to another model gives up after its tier's timeout
+    budget = current_fail_fast()
+    return {"timeout": budget} if budget is not None else {}
+
+def _chat(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    task: str = FINAL,
+    groq: Groq | None = None,
+    response_format: Dict[str, str] | None = None,
+) -> str:
     """
-    Automatically detects the spoken language and transcribes
-    the given audio file into its native script.
-    Uses Groq Whisper + langdetect fallback for language detection.
+    One chat completion on the model the router picks for `task` (see
+    model_router.py). Answers are cached per model.
     """
+    def on(model: str) -> str:
+        key = _chat_key(messages, temperature, max_tokens, model, response_format)
+        cached = cache_get(key)
+        if cached is not MISS:
+            return cached
+
+        extra = {"response_format": response_format} if response_format else {}
+        response = get_scheduler().call(model, lambda: (groq or get_client_manager().groq).chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **extra,
+            **_request_options(),
+        ), tokens=_call_tokens(messages, max_tokens))
+        content = (response.choices[0].message.content or "").strip()
+        cache_set(key, content)
+        return content
+
+    return route(task, on)
+
+def _detect_language(transcript_text: str) -> str:
+    return detect_language(transcript_text, get_settings().LANGID_SAMPLE_CHARS)
+
+def _resolve_language(reported: str | None, transcript_text: str) -> str:
+    # Whisper's language when it reported one, else local detection on a sample
+    return resolve_language(reported, transcript_text, get_settings().LANGID_SAMPLE_CHARS)
+
+def _transcription_result(transcript_text: str, language_code: str) -> Dict[str, Any]:
+    return {
+        "language_code": language_code,
+        "language_name": language_name(language_code),
+        "transcript_native": transcript_text
+    }
+
+def _field(obj: Any, name: str, default: Any = None) -> Any:
+    return obj.get(name, default) if isinstance(obj, dict) else getattr(obj, name, default)
+
+def _transcription_segments(transcription: Any) -> List[Dict[str, Any]]:
+    return [
+        {"start": _field(seg, "start", 0.0), "end": _field(seg, "end", 0.0), "text": _field(seg, "text", "")}
+        for seg in _field(transcription, "segments") or []
+    ]
+
+def _payload(prepared: Prepared | None, original_bytes: int, filename: str) -> Tuple[bytes, str] | None:
+    # the preprocessed audio when it beats the original (see preprocess.py)
+    return prepared.payload(original_bytes, filename) if prepared is not None else None
+
+def _needs_translation(text: str, source_lang: str, target_lang: str) -> bool:
+    """
+    False when there is nothing to translate: empty text, an unknown
+    target language, or text already in the target language ("auto" or
+    unknown sources are detected locally).
+    """
+    if not text.strip() or not normalize_language(target_lang):
+        return False
+    source = normalize_language(source_lang) or _detect_language(text)
+    return not same_language(source, target_lang)
+
+def _translation_chunks(text: str) -> List[str]:
+    # sentence-aligned pieces small enough that no translation hits max_tokens
+    return chunk_by_tokens(text, get_settings().TRANSLATE_CHUNK_TOKENS)
+
+def _translation_max_tokens(text: str) -> int:
+    # room for the translation to come out longer than the source
+    return max(600, min(4096, 2 * estimate_tokens(text) + 100))
+
+def _translate_messages(native_text: str, source_lang: str, target_lang: str = "English") -> List[Dict[str, str]]:
+    # Explicit instruction for translation
+    prompt = (
+        f"You are a professional translator. The user will give you text in {source_lang}. "
+        f"Translate it into natural, fluent {target_lang}. "
+        f"If the text is already in {target_lang}, just return it as-is. "
+        "Do not explain, comment, or repeat the source. "
+        f"Output only the {target_lang} translation text.\n\n"
+        f"Text:\n{native_text}"
+    )
+    return [
+        {"role": "system", "content": "You are a multilingual translation assistant."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _clean_translation(translated_text: str) -> str:
+    # Optional: clean up potential "Translation:" prefixes
+    if translated_text.lower().startswith("translation:"):
+        translated_text = translated_text.split(":", 1)[1].strip()
+    return translated_text
+
+def _summary_messages(text: str) -> List[Dict[str, str]]:
+    prompt = (
+        "You are a precise meeting summarizer. "
+        "Summarize the following transcript into concise, clear English points. "
+        "Focus on key discussion topics, decisions, and outcomes.\n\n"
+        f"Transcript:\n{text}\n\n"
+        "Summary:"
+    )
+    return [
+        {"role": "system", "content": "You write clear, structured summaries."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _moderation_messages(text: str) -> List[Dict[str, str]]:
+    prompt = (
+        "You are a strict content moderation system. "
+        "Analyze the following text and respond ONLY in valid JSON format with these keys:\n"
+        "{"
+        "\"is_flagged\": bool, "
+        "\"categories\": {"
+        "\"hate\": bool, "
+        "\"violence\": bool, "
+        "\"sexual\": bool, "
+        "\"self_harm\": bool"
+        "}, "
+        "\"notes\": string"
+        "}\n\n"
+        f"Text:\n{text}\n\n"
+        "Return JSON only, no extra words."
+    )
+    return [
+        {"role": "system", "content": "You are a JSON-only moderation classifier."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _parse_moderation(raw: str) -> Dict[str, Any]:
+    # Attempt to parse JSON safely
     try:
-        with open(file_path, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                model="whisper-large-v3",
-                file=audio_file
-            )
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return {"is_flagged": False, "categories": {}, "notes": "Invalid JSON response"}
 
-        # Extract transcription text
-        transcript_text = getattr(transcription, "text", "").strip()
+def _local_moderation(text: str) -> PrefilterResult | None:
+    """
+    Runs the lexicon/PII prefilter when MODERATION_PREFILTER is on.
+    A non-"ambiguous" verdict is final and needs no model call.
+    """
+    if not get_settings().MODERATION_PREFILTER:
+        return None
+    return prefilter(text)
 
-        # Try to get language from Groq (if available)
-        language_code = getattr(transcription, "language", None)
+def _merge_notes(notes: List[str], local_notes: List[str]) -> List[str]:
+    seen = {str(n).strip().lower() for n in notes}
+    return list(notes) + [n for n in local_notes if n.lower() not in seen]
 
-        # Fallback: detect language manually if not provided
-        if not language_code or language_code == "unknown":
+def _actions_messages(text: str) -> List[Dict[str, str]]:
+    example_json = {
+        "actions": [
+            {
+                "title": "Prepare project plan",
+                "owner": "John",
+                "due_date": "Friday",
+                "priority": "High",
+                "notes": "Include timeline and budget"
+            }
+        ],
+        "decisions": [
+            {
+                "title": "Budget approval",
+                "details": "Approved $10,000 for marketing."
+            }
+        ]
+    }
+
+    prompt = (
+        "You are an AI meeting assistant. "
+        "Extract actionable items and decisions from the following meeting transcript.\n\n"
+        "Return ONLY valid JSON strictly following this format:\n"
+        f"{json.dumps(example_json, indent=2)}\n\n"
+        "Transcript:\n"
+        f"{text}\n\n"
+        "Return JSON ONLY — no explanations, markdown, or extra text."
+    )
+    return [
+        {"role": "system", "content": "You are a strict JSON-only meeting action extractor."},
+        {"role": "user", "content": prompt}
+    ]
+
+def _parse_actions(raw: str) -> Dict[str, Any]:
+    # Try parsing JSON directly
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        # Try to extract JSON substring if model wrapped it in text
+        match = re.search(r"\{[\s\S]*\}", raw)
+        if match:
             try:
-                language_code = detect(transcript_text)
+                return json.loads(match.group(0))
             except Exception:
-                language_code = "unknown"
+                pass
 
+        # Fallback
         return {
-            "language_code": language_code,
-            "language_name": language_code.capitalize(),
-            "transcript_native": transcript_text
+            "actions": [],
+            "decisions": [],
+            "notes": "Invalid JSON returned — raw output: " + raw[:200]
         }
 
-    except Exception as e:
-        print(f"Transcription failed: {e}")
-        return {"error": str(e)}
+# ---------------- combined analysis (one JSON-mode call) ----------------
+# summary_en, actions/decisions and moderation of one transcript from a
+# single call instead of one call each, so the transcript is sent once.
+
+JSON_MODE = {"type": "json_object"}
+ANALYSIS_FIELDS = ("summary_en", "actions", "decisions", "moderation")
+
+_ANALYSIS_SCHEMA = {
+    "summary_en": '"string"',
+    "actions": '[{"title":"string","owner":"string","due_date":"string","priority":"High|Medium|Low","notes":"string"}]',
+    "decisions": '[{"title":"string","details":"string"}]',
+    "moderation": '{"is_flagged":bool,"categories":{"hate":bool,"violence":bool,"sexual":bool,"self_harm":bool},'
+                  '"notes":"string"}',
+}
+_ANALYSIS_RULES = {
+    "summary_en": "summary_en = concise, clear English bullet points on key discussion topics, decisions and outcomes.",
+    "actions": "actions = concrete action items; owner is the person's first name if obvious, otherwise \"\"; "
+               "use \"\" for unknown due_date and notes.",
+    "decisions": "decisions = what was agreed or approved.",
+    "moderation": "moderation flags hate, violence, sexual or self-harm content; notes briefly says why (or \"\").",
+}
+
+def _combined_messages(text: str, fields: Sequence[str] = ANALYSIS_FIELDS,
+                       invalid: Sequence[str] = ()) -> List[Dict[str, str]]:
+    schema = "{" + ",".join(f'"{f}":{_ANALYSIS_SCHEMA[f]}' for f in fields) + "}"
+    system = (
+        "You are a JSON-only meeting analyst. Analyze the meeting transcript and return ONLY a JSON object "
+        f"with exactly these keys:\n{schema}\n"
+        "Rules: " + " ".join(_ANALYSIS_RULES[f] for f in fields) + " Use empty arrays when there is nothing to report."
+    )
+    user = f'Transcript:\n"""\n{text}\n"""\n'
+    if invalid:
+        # targeted re-ask: a different prompt, so it is never answered from the cache
+        user += f"Your previous answer had missing or malformed {', '.join(invalid)}. "
+    return [{"role": "system", "content": system},
+            {"role": "user", "content": user + "Return JSON only."}]
+
+def _text_field(value: Any) -> str | None:
+    return value.strip() if isinstance(value, str) else None
+
+def _items(value: Any, keys: Sequence[str]) -> List[Dict[str, str]] | None:
+    # a list of objects that all have a title; other keys are coerced to strings
+    if not isinstance(value, list):
+        return None
+    items = []
+    for item in value:
+        if not isinstance(item, dict) or not _text_field(item.get("title")):
+            return None
+        items.append({k: str(item.get(k) or "").strip() for k in keys})
+    return items
+
+def _moderation_field(value: Any) -> Dict[str, Any] | None:
+    if not isinstance(value, dict) or not isinstance(value.get("is_flagged"), bool):
+        return None
+    categories = value.get("categories") if isinstance(value.get("categories"), dict) else {}
+    notes = value.get("notes")
+    return {
+        "is_flagged": value["is_flagged"],
+        "categories": {c: bool(categories.get(c)) for c in ("hate", "violence", "sexual", "self_harm")},
+        "notes": "; ".join(map(str, notes)) if isinstance(notes, list) else str(notes or ""),
+    }
 
-def translate_text(native_text: str, source_lang: str = "auto") -> str:
+_ANALYSIS_VALIDATORS: Dict[str, Callable[[Any], Any]] = {
+    "summary_en": lambda v: _text_field(v) or None,
+    "actions": lambda v: _items(v, ("title", "owner", "due_date", "priority", "notes")),
+    "decisions": lambda v: _items(v, ("title", "details")),
+    "moderation": _moderation_field,
+}
+
+def _validate_analysis(raw: str, fields: Sequence[str]) -> Tuple[Dict[str, Any], List[str]]:
     """
-    Translates text from its detected language into English using Groq's LLM.
-    Returns the translated English text as a string.
+    Parses a combined-analysis reply. Returns (valid fields, names of the
+    requested fields that are missing or do not match the schema).
     """
-    try:
-        # Explicit instruction for translation
-        prompt = (
-            f"You are a professional translator. The user will give you text in {source_lang}. "
-            "Translate it into natural, fluent English. "
-            "If the text is already in English, just return it as-is. "
-            "Do not explain, comment, or repeat the source. "
-            "Output only the English translation text.\n\n"
-            f"Text:\n{native_text}"
-        )
+    data = _safe_json_loads(_strip_code_fences(raw))
+    valid: Dict[str, Any] = {}
+    for name in fields:
+        value = _ANALYSIS_VALIDATORS[name](data.get(name)) if isinstance(data, dict) else None
+        if value is None:
+            continue
+        valid[name] = value
+    return valid, [name for name in fields if name not in valid]
+
+def _analysis_fields(pre: PrefilterResult | None) -> Tuple[str, ...]:
+    # moderation decided by the local prefilter is not asked for again
+    if pre is not None and pre.verdict != "ambiguous":
+        return tuple(f for f in ANALYSIS_FIELDS if f != "moderation")
+    return ANALYSIS_FIELDS
 
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a multilingual translation assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.2,
-            max_tokens=600,
+def _merge_chunk_analyses(parts: List[Dict[str, Any]], fields: Sequence[str]) -> Dict[str, Any]:
+    """
+    Reduces per-chunk combined analyses, except the summaries (which need a
+    model call): actions/decisions and moderation merged as in map-reduce mode.
+    """
+    merged = merge_action_results([{"actions": p.get("actions"), "decisions": p.get("decisions")} for p in parts])
+    if not any("actions" in p for p in parts):
+        merged.pop("actions")
+    if not any("decisions" in p for p in parts):
+        merged.pop("decisions")
+    moderations = [p["moderation"] for p in parts if "moderation" in p]
+    if "moderation" in fields and moderations:
+        merged["moderation"] = merge_moderation_results(moderations)
+    return merged
+
+def _analysis_result(valid: Dict[str, Any], pre: PrefilterResult | None) -> Dict[str, Any]:
+    """
+    Splits a combined analysis into the results the separate calls return
+    (summarize_text_en, detect_actions, moderate_text), so callers can't
+    tell the modes apart. Fields still invalid after re-asking get the same
+    fallbacks as those functions.
+    """
+    summary = {"summary_en": valid["summary_en"]} if "summary_en" in valid else {"error": "Invalid summary returned."}
+    if "actions" in valid or "decisions" in valid:
+        actions = {"actions": valid.get("actions", []), "decisions": valid.get("decisions", [])}
+    else:
+        actions = {"actions": [], "decisions": [], "notes": "Invalid JSON returned."}
+
+    if pre is not None and pre.verdict != "ambiguous":
+        moderation = pre.as_moderation()
+    else:
+        moderation = valid.get("moderation") or {"is_flagged": False, "categories": {}, "notes": "Invalid JSON response"}
+        if pre is not None:
+            moderation = merge_moderation_results([pre.as_moderation(), moderation])
+    return {"summary_en": summary, "actions": actions, "moderation": moderation}
+
+SUMMARY_INSTRUCTION = "Use concise, clear English points focusing on key discussion topics, decisions, and outcomes."
+LIVE_SUMMARY_INSTRUCTION = "Use 1–3 short sentences."
+
+def _is_long(text: str) -> bool:
+    return estimate_tokens(text) > get_settings().MAP_REDUCE_THRESHOLD_TOKENS
+
+def _chunks(text: str) -> List[str]:
+    return chunk_by_tokens(text, get_settings().MAP_REDUCE_CHUNK_TOKENS)
+
+def _reduce_groups(partials: List[str]) -> List[List[str]]:
+    groups = group_partials(partials, get_settings().MAP_REDUCE_CHUNK_TOKENS)
+    if len(groups) >= len(partials) > 1:
+        # every partial is over budget on its own: merge pairwise so we still converge
+        groups = [partials[i:i + 2] for i in range(0, len(partials), 2)]
+    return groups
+
+# ---------------- blocking map-reduce driver ----------------
+
+def _map_parallel(fn: Callable[[Any], Any], items: List[Any]) -> List[Any]:
+    if len(items) <= 1:
+        return [fn(item) for item in items]
+    workers = min(get_settings().MAP_REDUCE_MAX_PARALLEL, len(items))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="map-reduce") as ex:
+        futures = [ex.submit(contextvars.copy_context().run, fn, item) for item in items]
+        return [f.result() for f in futures]
+
+def _reduce_summaries(partials: List[str], instruction: str, groq: Groq | None = None) -> str:
+    while True:
+        groups = _reduce_groups(partials)
+        reduced = _map_parallel(
+            lambda g: _chat(reduce_summary_messages(g, instruction), temperature=0.3, max_tokens=600, groq=groq),
+            groups,
         )
+        if len(reduced) == 1:
+            return reduced[0]
+        partials = reduced
+
+def _analyze_chunk_combined(text: str, fields: Sequence[str]) -> Dict[str, Any]:
+    raw = _chat(_combined_messages(text, fields), temperature=0, max_tokens=1200, response_format=JSON_MODE)
+    valid, invalid = _validate_analysis(raw, fields)
+    for _ in range(get_settings().ANALYZE_REASK_ATTEMPTS):
+        if not invalid:
+            break
+        raw = _chat(_combined_messages(text, invalid, invalid), temperature=0, max_tokens=1200,
+                    response_format=JSON_MODE)
+        more, invalid = _validate_analysis(raw, invalid)
+        valid.update(more)
+    return valid
+
+def _summarize_long(text: str) -> str:
+    partials = _map_parallel(
+        lambda chunk: _chat(_summary_messages(chunk), temperature=0.3, max_tokens=600), _chunks(text)
+    )
+    return _reduce_summaries(partials, SUMMARY_INSTRUCTION)
 
-        translated_text = response.choices[0].message.content.strip()
+# ---------------- blocking service functions ----------------
 
-        # Optional: clean up potential "Translation:" prefixes
-        if translated_text.lower().startswith("translation:"):
-            translated_text = translated_text.split(":", 1)[1].strip()
+@timed("transcribe")
+def transcribe_audio(file_path: str, digest: str | None = None) -> Dict[str, Any]:
+    """
+    Automatically detects the spoken language and transcribes
+    the given audio file into its native script.
+    Uses the language Whisper reports, or local detection (langid.py) when it reports none.
+    The recording is preprocessed (preprocess.py) when that makes it smaller or shorter.
+    `digest` (sha256 of the file, e.g. from spool_upload) saves re-hashing it.
+    """
+    try:
+        key = _transcribe_key(digest or file_digest(file_path))
+        cached = cache_get(key)
+        if cached is not MISS:
+            return cached
+
+        prepared = prepare_file(file_path) if get_settings().AUDIO_PREPROCESS else None
+        payload = _payload(prepared, os.path.getsize(file_path), os.path.basename(file_path))
+
+        def call():
+            if payload is not None:
+                return get_client_manager().groq.audio.transcriptions.create(
+                    model=WHISPER_MODEL, file=payload, response_format="verbose_json",
+                )
+            with open(file_path, "rb") as audio_file:
+                return get_client_manager().groq.audio.transcriptions.create(
+                    model=WHISPER_MODEL,
+                    file=audio_file,
+                    response_format="verbose_json",  # includes the detected language
+                )
+
+        transcription = get_scheduler().call(WHISPER_MODEL, call)
 
-        return translated_text
+        # Extract transcription text
+        transcript_text = getattr(transcription, "text", "").strip()
 
+        # Whisper's language if it gave one, else a local guess from a sample of the text
+        language_code = _resolve_language(getattr(transcription, "language", None), transcript_text)
+
+        result = _transcription_result(transcript_text, language_code)
+        if payload is not None:
+            # timestamps in the original recording, whatever was cut out of it
+            result["segments"] = prepared.offsets.map_segments(_transcription_segments(transcription))
+        cache_set(key, result)
+        return result
+
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"Transcription failed: {e}")
+        return {"error": str(e)}
+
+@timed("translate")
+def translate_text(native_text: str, source_lang: str = "auto", target_lang: str = "English") -> str:
+    """
+    Translates text from its detected language into English (or
+    `target_lang`) using Groq's LLM. Text already in the target language is
+    returned without a call; long text is translated in parallel
+    sentence-aligned chunks. Returns the translated text as a string.
+    """
+    try:
+        if not _needs_translation(native_text, source_lang, target_lang):
+            return native_text
+
+        def translate(chunk: str) -> str:
+            return _clean_translation(_chat(_translate_messages(chunk, source_lang, target_lang), temperature=0.2,
+                                            max_tokens=_translation_max_tokens(chunk), task=TRANSLATION))
+
+        return " ".join(filter(None, _map_parallel(translate, _translation_chunks(native_text))))
+
+    except SchedulerBusy:
+        raise
     except Exception as e:
-        print(f"Translation failed: {e}")
+        logger.error(f"Translation failed: {e}")
         return ""
 
+@timed("summarize_en")
 def summarize_text_en(text: str) -> dict:
     """
     Summarizes the given English text clearly and concisely.
@@ -109,43 +530,35 @@ def summarize_text_en(text: str) -> dict:
         if not text.strip():
             return {"error": "Empty text for summarization."}
 
-        prompt = (
-            "You are a precise meeting summarizer. "
-            "Summarize the following transcript into concise, clear English points. "
-            "Focus on key discussion topics, decisions, and outcomes.\n\n"
-            f"Transcript:\n{text}\n\n"
-            "Summary:"
-        )
-
-        summary = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",  # ✅ updated model
-            messages=[
-                {"role": "system", "content": "You write clear, structured summaries."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=600
-        )
+        if _is_long(text):
+            return {"summary_en": _summarize_long(text)}
 
-        return {"summary_en": summary.choices[0].message.content.strip()}
+        return {"summary_en": _chat(_summary_messages(text), temperature=0.3, max_tokens=600)}
 
+    except SchedulerBusy:
+        raise
     except Exception as e:
-        print(f"Summarization failed: {e}")
+        logger.error(f"Summarization failed: {e}")
         return {"error": str(e)}
 
+@timed("summarize_native")
 def summarize_text_native(summary_en: str, target_lang: str) -> Dict[str, Any]:
     """
     Translates the English summary into the detected native language.
-    Returns the summary in the original spoken language.
+    Returns the summary in the original spoken language (the English one,
+    without a call, when that language is English or unknown).
     """
     try:
-        translated_text = translate_text(summary_en, target_lang)
+        translated_text = translate_text(summary_en, "English", target_lang)
         # translate_text() already returns a string, not a dict
         return {"summary_native": translated_text}
+    except SchedulerBusy:
+        raise
     except Exception as e:
-        print(f"Native summary translation failed: {e}")
+        logger.error(f"Native summary translation failed: {e}")
         return {"error": str(e)}
     
+@timed("moderate")
 def moderate_text(text: str) -> Dict[str, Any]:
     """
     Detects offensive, hateful, sexual, violent, or self-harm related content.
@@ -155,120 +568,84 @@ def moderate_text(text: str) -> Dict[str, Any]:
         if not text.strip():
             return {"error": "Empty text for moderation."}
 
-        prompt = (
-            "You are a strict content moderation system. "
-            "Analyze the following text and respond ONLY in valid JSON format with these keys:\n"
-            "{"
-            "\"is_flagged\": bool, "
-            "\"categories\": {"
-            "\"hate\": bool, "
-            "\"violence\": bool, "
-            "\"sexual\": bool, "
-            "\"self_harm\": bool"
-            "}, "
-            "\"notes\": string"
-            "}\n\n"
-            f"Text:\n{text}\n\n"
-            "Return JSON only, no extra words."
-        )
-
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a JSON-only moderation classifier."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-            max_tokens=300
-        )
-
-        raw = response.choices[0].message.content.strip()
-
-        # Attempt to parse JSON safely
-        import json
-        try:
-            parsed = json.loads(raw)
-        except json.JSONDecodeError:
-            parsed = {"is_flagged": False, "categories": {}, "notes": "Invalid JSON response"}
+        # clear cases are decided locally; only ambiguous sentences reach the model
+        pre = _local_moderation(text)
+        if pre is not None:
+            if pre.verdict != "ambiguous":
+                return pre.as_moderation()
+            text = " ".join(pre.ambiguous_spans)
+
+        if _is_long(text):
+            result = merge_moderation_results(_map_parallel(
+                lambda chunk: _parse_moderation(_chat(_moderation_messages(chunk), temperature=0, max_tokens=300,
+                                                      task=MODERATION)),
+                _chunks(text),
+            ))
+        else:
+            result = _parse_moderation(_chat(_moderation_messages(text), temperature=0, max_tokens=300,
+                                             task=MODERATION))
 
-        return parsed
+        return result if pre is None else merge_moderation_results([pre.as_moderation(), result])
 
+    except SchedulerBusy:
+        raise
     except Exception as e:
-        print(f"Moderation failed: {e}")
+        logger.error(f"Moderation failed: {e}")
         return {"error": str(e)}
     
+@timed("detect_actions")
 def detect_actions(text: str) -> Dict[str, Any]:
     """
     Detects action items and decisions from meeting transcripts.
     Returns structured JSON with two arrays: 'actions' and 'decisions'.
     """
-    import json, re
-
     if not text.strip():
         return {"error": "Empty text for action detection."}
 
-    example_json = {
-        "actions": [
-            {
-                "title": "Prepare project plan",
-                "owner": "John",
-                "due_date": "Friday",
-                "priority": "High",
-                "notes": "Include timeline and budget"
-            }
-        ],
-        "decisions": [
-            {
-                "title": "Budget approval",
-                "details": "Approved $10,000 for marketing."
-            }
-        ]
-    }
+    try:
+        if _is_long(text):
+            return merge_action_results(_map_parallel(
+                lambda chunk: _parse_actions(_chat(_actions_messages(chunk), temperature=0, max_tokens=800,
+                                                   task=ACTIONS)),
+                _chunks(text),
+            ))
 
-    prompt = (
-        "You are an AI meeting assistant. "
-        "Extract actionable items and decisions from the following meeting transcript.\n\n"
-        "Return ONLY valid JSON strictly following this format:\n"
-        f"{json.dumps(example_json, indent=2)}\n\n"
-        "Transcript:\n"
-        f"{text}\n\n"
-        "Return JSON ONLY — no explanations, markdown, or extra text."
-    )
+        return _parse_actions(_chat(_actions_messages(text), temperature=0, max_tokens=800, task=ACTIONS))
 
-    try:
-        response = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[
-                {"role": "system", "content": "You are a strict JSON-only meeting action extractor."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0,
-            max_tokens=800
-        )
+    except SchedulerBusy:
+        raise
+    except Exception as e:
+        logger.error(f"Action detection failed: {e}")
+        return {"error": str(e)}
 
-        raw = response.choices[0].message.content.strip()
+@timed("analyze")
+def analyze_text(text: str) -> Dict[str, Any]:
+    """
+    summarize_text_en(), detect_actions() and moderate_text() in one
+    JSON-mode call. Returns {"summary_en": ..., "actions": ..., "moderation": ...}
+    holding what each of those would have returned. Fields that fail
+    schema validation are asked for again on their own (ANALYZE_REASK_ATTEMPTS).
+    """
+    if not text.strip():
+        return {"error": "Empty text for analysis."}
 
-        # Try parsing JSON directly
-        try:
-            return json.loads(raw)
-        except json.JSONDecodeError:
-            # Try to extract JSON substring if model wrapped it in text
-            match = re.search(r"\{[\s\S]*\}", raw)
-            if match:
-                try:
-                    return json.loads(match.group(0))
-                except Exception:
-                    pass
-
-            # Fallback
-            return {
-                "actions": [],
-                "decisions": [],
-                "notes": "Invalid JSON returned — raw output: " + raw[:200]
-            }
+    try:
+        pre = _local_moderation(text)
+        fields = _analysis_fields(pre)
+        if _is_long(text):
+            parts = _map_parallel(lambda chunk: _analyze_chunk_combined(chunk, fields), _chunks(text))
+            valid = _merge_chunk_analyses(parts, fields)
+            summaries = [p["summary_en"] for p in parts if "summary_en" in p]
+            if summaries:
+                valid["summary_en"] = _reduce_summaries(summaries, SUMMARY_INSTRUCTION)
+        else:
+            valid = _analyze_chunk_combined(text, fields)
+        return _analysis_result(valid, pre)
 
+    except SchedulerBusy:
+        raise
     except Exception as e:
-        print(f"Action detection failed: {e}")
+        logger.error(f"Analysis failed: {e}")
         return {"error": str(e)}
 
 
@@ -286,113 +663,236 @@ def _safe_json_loads(text: str) -> Dict[str, Any]:
         except Exception:
             return {}
 
-def _fallback_actions_with_assignees(transcript: str) -> List[Dict[str, str]]:
-    items: List[Dict[str, str]] = []
-    # scan sentence by sentence
-    sentences = re.split(r'(?<=[.!?])\s+', transcript)
-    for s in sentences:
-        s_clean = s.strip()
-        if not s_clean:
-            continue
-        for pat in ASSIGN_PATTERNS:
-            m = pat.search(s_clean)
-            if m:
-                assignee = m.group(1).strip().rstrip(",.")
-                task = m.group(2).strip().rstrip(".")
-                # tidy verbs like "to complete"/"complete"
-                task = re.sub(r"^(to\s+)", "", task, flags=re.I)
-                # cap length
-                task = re.sub(r"\s+", " ", task)[:140]
-                items.append({"assignee": assignee, "text": task})
-                break
-
-    # de-duplicate by assignee+text
-    dedup: List[Dict[str, str]] = []
-    seen: set[Tuple[str, str]] = set()
-    for it in items:
-        key = (it["assignee"].lower(), it["text"].lower())
-        if key not in seen:
-            seen.add(key)
-            dedup.append(it)
-    return dedup[:10]
-
-class GroqClient:
-    def __init__(self, api_key: str):
-        self.client = Groq(api_key=api_key)
+def _normalize_analysis(data: Dict[str, Any], transcript: str) -> Dict[str, Any]:
+    """
+    Normalizes a parsed {summary, actions, moderation} model response
+    into the shape returned by the /meetings endpoints.
+    """
+    summary = (data.get("summary") or "").strip()
+    actions = data.get("actions") or []
+    moderation = data.get("moderation") or {}
+    interruptions = int(moderation.get("interruptions") or 0)
+    notes = moderation.get("notes") or []
+
+    # Normalize actions to list of {assignee, text}
+    norm_actions: List[Dict[str, str]] = []
+    if isinstance(actions, list):
+        for a in actions:
+            if isinstance(a, dict):
+                norm_actions.append({
+                    "assignee": (a.get("assignee") or "").strip(),
+                    "text": (a.get("text") or "").strip(),
+                })
+            elif isinstance(a, str):
+                # try to pull "Name: task" pattern
+                m = re.match(rf"^\s*({NAME_WORD})\s*[:\-]\s*(.+)$", a)
+                if m:
+                    norm_actions.append({"assignee": m.group(1).strip(), "text": m.group(2).strip()})
+                else:
+                    norm_actions.append({"assignee": "", "text": a.strip()})
+    else:
+        norm_actions = []
+
+    # Fallback if model missed names/tasks
+    if not norm_actions:
+        norm_actions = extract_actions(transcript, limit=10)
+
+    # final trims
+    for it in norm_actions:
+        it["text"] = re.sub(r"\s+", " ", it["text"]).strip()[:120]
+        it["assignee"] = it["assignee"].strip()
+
+    return {
+        "summary": summary,
+        "actions": norm_actions,
+        "moderation": {"interruptions": interruptions, "notes": notes if isinstance(notes, list) else [str(notes)]},
+    }
 
-    def transcribe_bytes(self, audio_bytes: bytes, filename: str = "audio.wav") -> str:
-        bio = BytesIO(audio_bytes); bio.name = filename
-        tx = self.client.audio.transcriptions.create(
-            file=bio, model="whisper-large-v3", response_format="json", temperature=0.0
-        )
-        return getattr(tx, "text", "") or (tx.get("text") if isinstance(tx, dict) else "")
+MODERATION_NOTES_RULE = (
+    "moderation.notes MUST include brief bullets for any toxic or harassing language (e.g., 'toxic: \"idiot\"'), "
+    "hate, threats, sexual content, or PII (phone/email). If none, return an empty array."
+)
+# used when the local prefilter already decided moderation for the text
+SKIP_MODERATION_NOTES_RULE = "moderation.notes: always return an empty array."
+
+def _analysis_messages(transcript: str, moderate: bool = True) -> List[Dict[str, str]]:
+    system = (
+        "You are an expert Meeting Analysis AI. "
+        "Return ONLY valid JSON (no markdown). Schema:\n"
+        "{"
+        '"summary":"string",'
+        '"actions":[{"assignee":"string","text":"string"}],'
+        '"moderation":{"interruptions":0,"notes":["string",...]}'
+        "}\n"
+        "Rules: summary = 1–3 short sentences. "
+        "actions = concrete, imperative, ≤120 chars each. "
+        "If the assignee is obvious from the transcript, include their first name; otherwise use an empty string. "
+        + (MODERATION_NOTES_RULE if moderate else SKIP_MODERATION_NOTES_RULE)
+    )
+    user = f'Transcript:\n"""\n{transcript}\n"""\nReturn JSON only.'
+    return [{"role": "system", "content": system},
+            {"role": "user", "content": user}]
 
+class GroqClient:
+    def __init__(self, api_key: str | None = None):
+        # shares the process-wide connection pool; a different key gets its own SDK client on it
+        manager = get_client_manager()
+        self.client = manager.groq if api_key in (None, manager.api_key) else manager.groq_for(api_key)
+
+    @timed("transcribe")
+    def transcribe_bytes(self, audio_bytes: bytes, filename: str = "audio.wav", language: str | None = None) -> str:
+        """
+        `language` (ISO 639-1) skips Whisper's own detection, which is
+        unreliable on the few seconds of a live utterance.
+        """
+        extra = {"language": language} if language else {}
+        key = make_key("transcribe_bytes", WHISPER_MODEL, bytes_digest(audio_bytes), *extra.values())
+        cached = cache_get(key)
+        if cached is not MISS:
+            return cached
+
+        prepared = prepare_bytes(audio_bytes) if get_settings().AUDIO_PREPROCESS else None
+        file = _payload(prepared, len(audio_bytes), filename) or (filename, audio_bytes)
+        tx = get_scheduler().call(WHISPER_MODEL, lambda: self.client.audio.transcriptions.create(
+            file=file, model=WHISPER_MODEL, response_format="json", temperature=0.0, **extra
+        ))
+        text = getattr(tx, "text", "") or (tx.get("text") if isinstance(tx, dict) else "")
+        cache_set(key, text)
+        return text
+
+    @timed("transcribe")
+    def transcribe_file(self, path: str, filename: str | None = None, digest: str | None = None) -> str:
+        """
+        transcribe_bytes() for audio on disk: the open file is streamed to
+        the API, never read into memory. Shares cache entries with it.
+        """
+        key = make_key("transcribe_bytes", WHISPER_MODEL, digest or file_digest(path))
+        cached = cache_get(key)
+        if cached is not MISS:
+            return cached
+
+        name = filename or os.path.basename(path)
+        prepared = prepare_file(path) if get_settings().AUDIO_PREPROCESS else None
+        payload = _payload(prepared, os.path.getsize(path), name)
+
+        def call():
+            if payload is not None:
+                return self.client.audio.transcriptions.create(
+                    file=payload, model=WHISPER_MODEL, response_format="json", temperature=0.0,
+                )
+            with open(path, "rb") as audio_file:
+                return self.client.audio.transcriptions.create(
+                    file=(name, audio_file), model=WHISPER_MODEL,
+                    response_format="json", temperature=0.0,
+                )
+
+        tx = get_scheduler().call(WHISPER_MODEL, call)
+        text = getattr(tx, "text", "") or (tx.get("text") if isinstance(tx, dict) else "")
+        cache_set(key, text)
+        return text
+
+    def _analyze_chunk(self, transcript: str, moderate: bool = True) -> Dict[str, Any]:
+        raw = _chat(_analysis_messages(transcript, moderate), temperature=0.1, max_tokens=700, groq=self.client)
+        return _normalize_analysis(_safe_json_loads(_strip_code_fences(raw)), transcript)
+
+    @timed("analyze_transcript")
     def analyze_transcript(self, transcript: str) -> Dict[str, Any]:
+        """
+        Concurrent calls for the same transcript (e.g. several tabs open on
+        one live meeting) share a single analysis.
+        """
+        key = make_key("analyze_transcript", get_model_router().models(FINAL), transcript)
+        return coalesce("analyze_transcript", key, lambda: self._analyze_transcript(transcript))
+
+    def _analyze_transcript(self, transcript: str) -> Dict[str, Any]:
+        pre = _local_moderation(transcript)
+        moderate = pre is None or pre.verdict == "ambiguous"
+
+        if _is_long(transcript):
+            # map: analyze chunks in parallel; reduce: merge summaries with one more call
+            parts = _map_parallel(lambda chunk: self._analyze_chunk(chunk, moderate), _chunks(transcript))
+            summaries = [p["summary"] for p in parts if p["summary"]]
+            result = merge_analysis_results(parts)
+            result["summary"] = (
+                _reduce_summaries(summaries, LIVE_SUMMARY_INSTRUCTION, groq=self.client) if summaries else ""
+            )
+        else:
+            result = self._analyze_chunk(transcript, moderate)
+
+        if pre is not None:
+            result["moderation"]["notes"] = _merge_notes(result["moderation"]["notes"], pre.notes)
+
+        if not result["summary"]:
+            result["summary"] = "Key tasks were assigned with a target of EOD completion."
+
+        return {"summary": result["summary"], "actions": result["actions"], "moderation": result["moderation"]}
+
+    @timed("analyze_delta")
+    def analyze_delta(
+        self,
+        delta: str,
+        summary: str = "",
+        actions: List[Dict[str, str]] | None = None,
+        notes: List[str] | None = None,
+    ) -> Dict[str, Any]:
+        """
+        Incremental variant of analyze_transcript for live sessions.
+        Only the new transcript text is sent, together with the running
+        summary and the already-known actions/notes so the model can update
+        the summary and return just the *new* items.
+        """
+        known_actions = "\n".join(
+            f"- {a['assignee']}: {a['text']}" if a.get("assignee") else f"- {a['text']}"
+            for a in (actions or [])
+        ) or "(none)"
+        known_notes = "\n".join(f"- {n}" for n in (notes or [])) or "(none)"
+        pre = _local_moderation(delta)
+        if pre is None or pre.verdict == "ambiguous":
+            notes_rule = (
+                "moderation.notes = brief bullets for NEW toxic or harassing language, hate, threats, sexual content, "
+                "or PII (phone/email) in the new transcript; do not repeat known notes. If none, return an empty array."
+            )
+        else:
+            notes_rule = SKIP_MODERATION_NOTES_RULE
+
         system = (
-            "You are an expert Meeting Analysis AI. "
+            "You are an expert Meeting Analysis AI following a live meeting. "
+            "You receive the running summary so far, the action items and moderation notes already "
+            "recorded, and ONLY the newest part of the transcript. "
             "Return ONLY valid JSON (no markdown). Schema:\n"
             "{"
             '"summary":"string",'
             '"actions":[{"assignee":"string","text":"string"}],'
             '"moderation":{"interruptions":0,"notes":["string",...]}'
             "}\n"
-            "Rules: summary = 1–3 short sentences. "
-            "actions = concrete, imperative, ≤120 chars each. "
-            "If the assignee is obvious from the transcript, include their first name; otherwise use an empty string."
-            "moderation.notes MUST include brief bullets for any toxic or harassing language (e.g., 'toxic: \"idiot\"'), hate, threats, sexual content, or PII (phone/email). If none, return an empty array."
-
+            "Rules: summary = the UPDATED running summary of the whole meeting, at most 5 short sentences. "
+            "actions = only NEW concrete, imperative action items found in the new transcript, ≤120 chars each; "
+            "do not repeat known actions. "
+            "If the assignee is obvious, include their first name; otherwise use an empty string. "
+            "moderation.interruptions = interruptions in the new transcript only. "
+            + notes_rule
+        )
+        user = (
+            f"Running summary:\n{summary or '(meeting just started)'}\n\n"
+            f"Known actions:\n{known_actions}\n\n"
+            f"Known moderation notes:\n{known_notes}\n\n"
+            f'New transcript:\n"""\n{delta}\n"""\nReturn JSON only.'
         )
-        user = f'Transcript:\n"""\n{transcript}\n"""\nReturn JSON only.'
 
-        resp = self.client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "system", "content": system},
-                      {"role": "user", "content": user}],
+        raw = _chat(
+            [{"role": "system", "content": system},
+             {"role": "user", "content": user}],
             temperature=0.1,
             max_tokens=700,
+            task=LIVE,
+            groq=self.client,
         )
-        content = _strip_code_fences(resp.choices[0].message.content or "")
-        data = _safe_json_loads(content)
-
-        summary = (data.get("summary") or "").strip()
-        actions = data.get("actions") or []
-        moderation = data.get("moderation") or {}
-        interruptions = int(moderation.get("interruptions") or 0)
-        notes = moderation.get("notes") or []
-
-        # Normalize actions to list of {assignee, text}
-        norm_actions: List[Dict[str, str]] = []
-        if isinstance(actions, list):
-            for a in actions:
-                if isinstance(a, dict):
-                    norm_actions.append({
-                        "assignee": (a.get("assignee") or "").strip(),
-                        "text": (a.get("text") or "").strip(),
-                    })
-                elif isinstance(a, str):
-                    # try to pull "Name: task" pattern
-                    m = re.match(rf"^\s*({NAME_WORD})\s*[:\-]\s*(.+)$", a)
-                    if m:
-                        norm_actions.append({"assignee": m.group(1).strip(), "text": m.group(2).strip()})
-                    else:
-                        norm_actions.append({"assignee": "", "text": a.strip()})
-        else:
-            norm_actions = []
-
-        # Fallback if model missed names/tasks
-        if not norm_actions:
-            norm_actions = _fallback_actions_with_assignees(transcript)
-
-        # final trims
-        for it in norm_actions:
-            it["text"] = re.sub(r"\s+", " ", it["text"]).strip()[:120]
-            it["assignee"] = it["assignee"].strip()
+        content = _strip_code_fences(raw)
+        result = _normalize_analysis(_safe_json_loads(content), delta)
+        if pre is not None:
+            result["moderation"]["notes"] = _merge_notes(result["moderation"]["notes"], pre.notes)
 
-        if not summary:
-            summary = "Key tasks were assigned with a target of EOD completion."
+        if not result["summary"]:
+            result["summary"] = summary
 
-        return {
-            "summary": summary,
-            "actions": norm_actions,
-            "moderation": {"interruptions": interruptions, "notes": notes if isinstance(notes, list) else [str(notes)]},
-        }
+        return result
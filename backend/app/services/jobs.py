@@ -0,0 +1,269 @@
+# app/services/jobs.py
+"""
+Background analysis jobs.
+
+POST /jobs/analyze stores the audio and a `jobs` row and returns at once;
+JobRunner workers claim queued rows from the database and run the
+/analyze pipeline on them. The store is the queue, so workers can live in
+the API process (JOB_WORKERS > 0, started in the app lifespan) or in a
+separate one (`python -m app.worker`), or both.
+
+Every finished stage is checkpointed on the job row. A job whose worker
+crashed is taken over once its lease expires and resumes after the last
+checkpoint, so e.g. transcription is never paid for twice. Failures,
+including a single failed stage, are retried with backoff up to
+JOB_MAX_ATTEMPTS; a job whose stages still fail on its last attempt is
+stored with what did succeed and marked `partial`.
+"""
+import asyncio
+import json
+import os
+import socket
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TypeVar
+from uuid import uuid4
+
+import anyio
+
+from app.config import get_settings
+from app.core import metrics
+from app.core.logger import logger, request_id_var
+from app.db.repository import JobRepository
+from app.db.session import SessionLocal
+from app.models.job import Job
+from app.services.persistence import persist_analysis
+from app.services.pipeline import analyze_pipeline, analyze_response
+from app.services.scheduler import BATCH, SchedulerBusy, priority
+from app.utils.uploads import remove_quietly
+
+T = TypeVar("T")
+
+AUDIO_EXTENSIONS = {".mp3", ".wav", ".m4a", ".mp4", ".aac", ".ogg", ".flac", ".webm"}
+
+
+class JobLost(Exception):
+    """The job was cancelled or taken over by another worker while running."""
+
+
+class StagesFailed(RuntimeError):
+    """Some stages failed; the retry reruns them after the checkpointed ones."""
+
+
+def _with_repo(fn: Callable[[JobRepository], T]) -> T:
+    db = SessionLocal()
+    try:
+        return fn(JobRepository(db))
+    finally:
+        db.close()
+
+
+async def in_repo(fn: Callable[[JobRepository], T]) -> T:
+    """Runs `fn(repo)` with a fresh session in a worker thread."""
+    return await anyio.to_thread.run_sync(_with_repo, fn)
+
+
+def _failed(result: Any) -> bool:
+    return isinstance(result, dict) and "error" in result
+
+
+def discard_audio(job: Job) -> None:
+    """Deletes an uploaded job's audio once the job is done, failed for good or cancelled."""
+    if job.delete_audio:
+        remove_quietly(job.audio_path)
+
+
+def job_view(job: Job) -> Dict[str, Any]:
+    """API shape of a job: status, finished stages and the partial /analyze payload."""
+    checkpoint = json.loads(job.checkpoint or "{}")
+    return {
+        "id": job.id,
+        "status": job.status,
+        "title": job.title,
+        "stages_done": sorted(checkpoint),
+        "result": analyze_response(checkpoint),
+        "meeting_id": job.meeting_id,
+        "error": job.error,
+        "attempts": job.attempts,
+        "timings": json.loads(job.timings) if job.timings else None,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+class JobRunner:
+    def __init__(self, workers: int = 2, poll_seconds: float = 1.0, lease_seconds: float = 120.0,
+                 max_attempts: int = 3, owner: Optional[str] = None):
+        self.workers = workers
+        self.poll_seconds = poll_seconds
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        self._tasks: List[asyncio.Task] = []
+        self._wake: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # ---------- lifecycle ----------
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker(), name=f"job-worker-{i}") for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def notify(self) -> None:
+        """Wakes an idle worker now instead of at the next poll (thread-safe)."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def _worker(self) -> None:
+        while True:
+            try:
+                ran = await self.run_once()
+            except Exception as e:  # database hiccup: keep the worker alive
+                logger.error(f"Job worker error: {e}")
+                ran = False
+            if not ran:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+
+    # ---------- one job ----------
+    async def run_once(self) -> bool:
+        """Claims and runs one job; False when there was nothing to do."""
+        job = await in_repo(lambda repo: repo.claim_next(self.owner, self.lease_seconds))
+        if job is None:
+            return False
+        await self.run_job(job)
+        return True
+
+    async def _heartbeat(self, job_id: str, run: asyncio.Task) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not await in_repo(lambda repo: repo.renew_lease(job_id, self.owner, self.lease_seconds)):
+                run.cancel()  # cancelled or taken over: stop spending on it
+                return
+
+    async def run_job(self, job: Job) -> None:
+        # log lines of the job carry its id in place of a request id
+        token = request_id_var.set(f"job-{job.id}")
+        try:
+            with metrics.trace() as trace:
+                await self._run_job(job, trace)
+        finally:
+            request_id_var.reset(token)
+
+    async def _run_job(self, job: Job, trace: Dict[str, Any]) -> None:
+        started = time.perf_counter()
+        run = asyncio.ensure_future(self._analyze(job))
+        heartbeat = asyncio.ensure_future(self._heartbeat(job.id, run))
+        try:
+            await asyncio.wait({run})
+        except asyncio.CancelledError:
+            # shutting down: hand the job back so the next worker resumes it without waiting out the lease
+            run.cancel()
+            await asyncio.shield(in_repo(lambda repo: repo.release_job(job.id, self.owner)))
+            raise
+        finally:
+            heartbeat.cancel()
+
+        error = None if run.cancelled() else run.exception()
+        if not run.cancelled() and error is None:
+            seconds = time.perf_counter() - started
+            logger.info(f"Job {job.id} done in {seconds:.1f}s",
+                        extra={"fields": {"job_id": job.id, "duration_ms": round(seconds * 1000, 1), **trace}})
+        elif run.cancelled() or isinstance(error, JobLost):
+            logger.info(f"Job {job.id} was cancelled or taken over")
+        elif error is not None:
+            retry_in = None if job.attempts >= self.max_attempts else _retry_delay(error, job.attempts)
+            logger.warning(f"Job {job.id} failed (attempt {job.attempts}): {error}")
+            failed = await in_repo(lambda repo: repo.fail_job(job.id, self.owner, str(error), retry_in))
+            if failed and retry_in is None:
+                discard_audio(job)  # no attempt left that could read it
+
+    async def _analyze(self, job: Job) -> None:
+        checkpoint: Dict[str, Any] = json.loads(job.checkpoint or "{}")
+        ctx: Dict[str, Any] = {"audio_path": job.audio_path, "audio_digest": job.audio_digest, **checkpoint}
+        failed: Dict[str, str] = {}
+
+        async def on_stage(name: str, result: Any) -> None:
+            if _failed(result):
+                if name == "transcription":
+                    raise RuntimeError(f"{name}: {result['error']}")  # nothing to analyze: retry the job
+                failed[name] = str(result["error"])
+                return
+            checkpoint[name] = result
+            saved = await in_repo(lambda repo: repo.save_checkpoint(job.id, self.owner, dict(checkpoint),
+                                                                    self.lease_seconds))
+            if not saved:
+                raise JobLost(job.id)
+
+        with priority(BATCH):
+            results, timings = await analyze_pipeline().run(ctx, on_stage=on_stage, skip=list(checkpoint))
+        if failed and job.attempts < self.max_attempts:
+            raise StagesFailed("; ".join(f"{name}: {error}" for name, error in sorted(failed.items())))
+        meeting_id = await anyio.to_thread.run_sync(persist_analysis, job.title, analyze_response(results))
+        if not await in_repo(lambda repo: repo.finish_job(job.id, self.owner, meeting_id, timings, sorted(failed))):
+            raise JobLost(job.id)
+        discard_audio(job)
+
+
+def _retry_delay(error: Exception, attempts: int) -> float:
+    if isinstance(error, SchedulerBusy):
+        return max(error.retry_after, 1.0)
+    return min(300.0, 5.0 * (2 ** (attempts - 1)))
+
+
+_RUNNER: Optional[JobRunner] = None
+
+
+def get_job_runner() -> Optional[JobRunner]:
+    """The runner started by the app lifespan, if any."""
+    return _RUNNER
+
+
+def build_job_runner(workers: Optional[int] = None) -> JobRunner:
+    settings = get_settings()
+    return JobRunner(
+        workers=settings.JOB_WORKERS if workers is None else workers,
+        poll_seconds=settings.JOB_POLL_SECONDS,
+        lease_seconds=settings.JOB_LEASE_SECONDS,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+async def start_job_runner() -> Optional[JobRunner]:
+    global _RUNNER
+    if get_settings().JOB_WORKERS <= 0:
+        return None
+    _RUNNER = build_job_runner()
+    _RUNNER.start()
+    return _RUNNER
+
+
+async def stop_job_runner() -> None:
+    global _RUNNER
+    runner, _RUNNER = _RUNNER, None
+    if runner is not None:
+        await runner.stop()
+
+
+def notify_workers() -> None:
+    if _RUNNER is not None:
+        _RUNNER.notify()
+
+
+def backfill_candidates(directory: str, pattern: str = "*", recursive: bool = False) -> List[str]:
+    """Audio files under `directory` matching `pattern`, sorted, as real paths."""
+    root = Path(directory)
+    files = root.rglob(pattern) if recursive else root.glob(pattern)
+    return sorted(
+        os.path.realpath(p) for p in files if p.is_file() and p.suffix.lower() in AUDIO_EXTENSIONS
+    )
@@ -0,0 +1,178 @@
+# app/services/langid.py
+"""
+Fast, deterministic language identification for transcripts.
+
+Whisper's own language is trusted when it reports one. Otherwise a
+bounded sample of the text is classified locally: the Unicode script
+settles most non-Latin languages outright, and within a script the
+language is picked by how many of its most frequent words the sample
+contains. Only text no profile recognises falls back to langdetect, and
+then on the sample, never the whole transcript. langdetect is imported on
+that first fallback: its profiles take ~0.5s and ~60 MB per process.
+"""
+import re
+from collections import Counter
+from typing import Dict, Optional
+
+# ISO 639-1 code -> English name (the names Whisper reports, capitalized)
+LANGUAGES: Dict[str, str] = {
+    "en": "English", "hi": "Hindi", "bn": "Bengali", "ta": "Tamil", "te": "Telugu", "kn": "Kannada",
+    "ml": "Malayalam", "mr": "Marathi", "gu": "Gujarati", "pa": "Punjabi", "ur": "Urdu", "or": "Odia",
+    "ne": "Nepali", "si": "Sinhala", "es": "Spanish", "fr": "French", "de": "German", "it": "Italian",
+    "pt": "Portuguese", "nl": "Dutch", "id": "Indonesian", "ms": "Malay", "tr": "Turkish", "pl": "Polish",
+    "sv": "Swedish", "ru": "Russian", "uk": "Ukrainian", "ar": "Arabic", "fa": "Persian", "he": "Hebrew",
+    "el": "Greek", "th": "Thai", "vi": "Vietnamese", "zh": "Chinese", "ja": "Japanese", "ko": "Korean",
+}
+_BY_NAME = {name.lower(): code for code, name in LANGUAGES.items()}
+_BY_NAME.update({"oriya": "or", "punjabi": "pa", "mandarin": "zh", "farsi": "fa"})
+
+# first code point of each range -> script; a letter's script is that of the range it falls in
+_SCRIPTS = [
+    (0x0041, "Latin"), (0x0250, None), (0x0370, "Greek"), (0x0400, "Cyrillic"), (0x0530, None),
+    (0x0590, "Hebrew"), (0x0600, "Arabic"), (0x0700, None), (0x0900, "Devanagari"), (0x0980, "Bengali"),
+    (0x0A00, "Gurmukhi"), (0x0A80, "Gujarati"), (0x0B00, "Odia"), (0x0B80, "Tamil"), (0x0C00, "Telugu"),
+    (0x0C80, "Kannada"), (0x0D00, "Malayalam"), (0x0D80, "Sinhala"), (0x0E00, "Thai"), (0x0E80, None),
+    (0x1E00, "Latin"), (0x1F00, None), (0x3040, "Kana"), (0x3100, None), (0x4E00, "Han"), (0xA000, None),
+    (0xAC00, "Hangul"), (0xD7B0, None),
+]
+_SCRIPT_STARTS = [start for start, _ in _SCRIPTS]
+# the language a script means when no word profile below narrows it down
+_SCRIPT_DEFAULT = {
+    "Latin": "en", "Greek": "el", "Cyrillic": "ru", "Hebrew": "he", "Arabic": "ar", "Devanagari": "hi",
+    "Bengali": "bn", "Gurmukhi": "pa", "Gujarati": "gu", "Odia": "or", "Tamil": "ta", "Telugu": "te",
+    "Kannada": "kn", "Malayalam": "ml", "Sinhala": "si", "Thai": "th", "Kana": "ja", "Han": "zh", "Hangul": "ko",
+}
+
+# most frequent words per language, for scripts several languages share
+_PROFILES: Dict[str, Dict[str, frozenset]] = {
+    "Latin": {
+        "en": "the and is are was to of in that it you we for on with this have be not what they at will".split(),
+        "es": "el la los las de que y en es un una por con no para se lo como pero más está vamos".split(),
+        "fr": "le la les de des et est un une que pour pas dans ce il nous vous sur avec qui sont".split(),
+        "de": "der die das und ist nicht ein eine zu den mit sich auf für ich wir sie es auch werden".split(),
+        "it": "il lo la che di è un una per non con sono gli le della questo anche abbiamo".split(),
+        "pt": "o os as de que é um uma para não com do da em por mas você vamos isso".split(),
+        "nl": "de het een en is van dat niet op te ik je we zijn met voor maar ook".split(),
+        "id": "yang dan di ini itu dengan untuk tidak ada saya kita akan dari ke juga".split(),
+        # romanized Hindi ("Hinglish") still needs translating
+        "hi": "hai hain ka ki ke nahi nahin aur kya toh bhi hum yeh woh mein ko kar raha".split(),
+    },
+    "Devanagari": {
+        "hi": "है हैं और में का की के नहीं यह वह को से हम भी".split(),
+        "mr": "आहे आहेत आणि मी तो ती नाही हे ते आम्ही पण".split(),
+        "ne": "छ छन् र म हो गर्न यो त्यो हामी पनि".split(),
+    },
+    "Arabic": {
+        "ur": "ہے ہیں اور کے کی کا میں نہیں یہ وہ کو سے".split(),
+        "fa": "است و در به از که این را با می".split(),
+        "ar": "في من على أن هذا إلى ما هو التي الذي".split(),
+    },
+    "Cyrillic": {
+        "ru": "и в не на что я он это как мы вы".split(),
+        "uk": "і в не на що я він це як ми ви".split(),
+    },
+}
+_PROFILES = {script: {lang: frozenset(words) for lang, words in langs.items()} for script, langs in _PROFILES.items()}
+
+# whitespace/punctuation-delimited tokens; \w would split Indic words at their vowel signs
+_WORD = re.compile(r"[^\s\d.,!?;:\"'()\[\]{}।॥،؟…\-–—]+")
+
+
+def normalize_language(value: Optional[str]) -> Optional[str]:
+    """ISO 639-1 code for a code or English name ("en", "en-US", "English"); None if unknown."""
+    if not value:
+        return None
+    value = value.strip().lower()
+    code = value.split("-")[0].split("_")[0]
+    if code in LANGUAGES:
+        return code
+    return _BY_NAME.get(value)
+
+
+def language_name(code: Optional[str]) -> str:
+    if not code or code == "unknown":
+        return "Unknown"
+    return LANGUAGES.get(code, code.capitalize())
+
+
+def is_english(language: Optional[str]) -> bool:
+    return normalize_language(language) == "en"
+
+
+def same_language(a: Optional[str], b: Optional[str]) -> bool:
+    code = normalize_language(a)
+    return code is not None and code == normalize_language(b)
+
+
+def sample_text(text: str, limit: int = 2000) -> str:
+    """
+    Up to `limit` characters from the start, middle and end of `text`, so
+    a long transcript is classified by its whole span at a fixed cost.
+    """
+    if len(text) <= limit:
+        return text
+    part = limit // 3
+    middle = (len(text) - part) // 2
+    return " ".join(text[i:i + part] for i in (0, middle, len(text) - part))
+
+
+def _script(char: str) -> Optional[str]:
+    lo, hi = 0, len(_SCRIPT_STARTS)
+    point = ord(char)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _SCRIPT_STARTS[mid] <= point:
+            lo = mid + 1
+        else:
+            hi = mid
+    return _SCRIPTS[lo - 1][1] if lo else None
+
+
+def detect_language(text: str, sample_chars: int = 2000) -> str:
+    """
+    ISO 639-1 code of `text`, or "unknown". Deterministic; looks at no
+    more than `sample_chars` characters.
+    """
+    sample = sample_text(text, sample_chars)
+    words = [w.lower() for w in _WORD.findall(sample)]
+    if not words:
+        return "unknown"
+
+    scripts = Counter(_script(c) for c in sample if not c.isspace())
+    scripts.pop(None, None)
+    if not scripts:
+        return "unknown"
+    script = scripts.most_common(1)[0][0]
+    if script == "Han" and scripts.get("Kana"):
+        return "ja"  # Japanese mixes kanji and kana
+
+    profiles = _PROFILES.get(script)
+    if not profiles:
+        return _SCRIPT_DEFAULT[script]
+
+    in_script = [w for w in words if _script(w[0]) == script]
+    hits = sorted(((sum(w in vocab for w in in_script), lang) for lang, vocab in profiles.items()), reverse=True)
+    (best, lang), (second, _) = hits[0], hits[1]
+    if best >= 2 and best > second and best >= 0.05 * len(in_script):
+        return lang
+    if script != "Latin":
+        return _SCRIPT_DEFAULT[script]
+
+    try:
+        from langdetect import DetectorFactory, detect
+
+        DetectorFactory.seed = 0
+        return normalize_language(detect(sample)) or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def resolve_language(reported: Optional[str], text: str, sample_chars: int = 2000) -> str:
+    """
+    The transcript's language code: Whisper's `reported` language when it
+    gave one, else detect_language() on a sample of the text.
+    """
+    code = normalize_language(reported)
+    if code:
+        return code
+    return detect_language(text, sample_chars)
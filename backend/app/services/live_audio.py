@@ -0,0 +1,270 @@
+# app/services/live_audio.py
+"""
+Live audio ingest for the /ws/meetings/{id}/audio socket.
+
+The browser streams 16-bit mono PCM (at its own sample rate) or an Opus
+stream (WebM/Ogg, as MediaRecorder produces; decoded by an `ffmpeg`
+subprocess) in small frames. Samples go into a fixed-size ring buffer,
+and an energy-based voice-activity detector with an adaptive noise floor
+cuts the stream into utterances at pauses, so Whisper gets whole phrases
+and silence is never sent. An utterance that runs past max_seconds is cut
+at its quietest recent frame, which bounds the delay from speech to text.
+
+Utterances are transcribed concurrently (bounded per socket, and by the
+scheduler's Whisper limits across sockets); results come back in order.
+"""
+import asyncio
+import shutil
+from collections import deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Awaitable, Callable, Deque, List, Optional, Tuple
+
+import numpy as np
+
+from app.services.audio import FRAME_MS, SAMPLE_RATE, frame_energy, resample
+
+ENCODINGS = ("pcm_s16le", "opus")
+
+# RMS (int16 scale) below which a frame is never speech, and how far above
+# the noise floor a frame has to be to count as voiced
+MIN_SPEECH_RMS = 300.0
+SPEECH_RATIO = 2.5
+START_FRAMES = 3  # consecutive voiced frames that open an utterance
+
+
+class RingBuffer:
+    """The last `capacity` samples of an int16 stream, addressed by absolute sample index."""
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.end = 0  # samples written so far
+        self._data = np.zeros(capacity, dtype=np.int16)
+
+    @property
+    def start(self) -> int:
+        return max(0, self.end - self.capacity)
+
+    def write(self, samples: np.ndarray) -> None:
+        n = len(samples)
+        if n > self.capacity:
+            self.end += n - self.capacity
+            samples, n = samples[-self.capacity:], self.capacity
+        pos = self.end % self.capacity
+        first = min(n, self.capacity - pos)
+        self._data[pos:pos + first] = samples[:first]
+        self._data[:n - first] = samples[first:]
+        self.end += n
+
+    def read(self, start: int, end: int) -> np.ndarray:
+        """Samples [start, end), clipped to what is still held."""
+        start, end = max(start, self.start), min(end, self.end)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+        n = end - start
+        pos = start % self.capacity
+        first = min(n, self.capacity - pos)
+        return np.concatenate((self._data[pos:pos + first], self._data[:n - first]))
+
+
+@dataclass
+class Utterance:
+    seq: int
+    start: float  # seconds since the stream started
+    end: float
+    samples: np.ndarray  # int16 at 16 kHz
+
+
+class UtteranceSegmenter:
+    """
+    feed() PCM as it arrives, get back the utterances it completed. The
+    noise floor follows quiet frames quickly and loud ones slowly, so a
+    noisy room raises the bar without speech ever being mistaken for it.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, buffer_seconds: float = 30.0, silence_ms: int = 500,
+                 min_speech_ms: int = 250, max_seconds: float = 6.0, pre_roll_ms: int = 200):
+        self.sample_rate = sample_rate
+        self.frame = max(1, sample_rate * FRAME_MS // 1000)
+        self.ring = RingBuffer(int(max(buffer_seconds, max_seconds * 2) * sample_rate))
+        self.silence_frames = max(1, silence_ms // FRAME_MS)
+        self.min_speech_frames = max(1, min_speech_ms // FRAME_MS)
+        self.max_frames = max(self.silence_frames + 1, int(max_seconds * 1000) // FRAME_MS)
+        self.pre_roll_frames = pre_roll_ms // FRAME_MS
+        self.noise: Optional[float] = None
+        self.seq = 0
+        self._pending = np.zeros(0, dtype=np.int16)  # samples short of a whole frame
+        self._frames = 0          # whole frames seen
+        self._run = 0             # consecutive voiced frames while idle
+        self._speech_start: Optional[int] = None  # first frame of the open utterance
+        self._last_voiced = 0
+        self._voiced = 0          # voiced frames in the open utterance
+        self._energies: Deque[float] = deque()  # energies of the open utterance's frames
+
+    def _threshold(self) -> float:
+        return max(MIN_SPEECH_RMS, (self.noise or 0.0) * SPEECH_RATIO)
+
+    def _track_noise(self, energy: float) -> None:
+        if self.noise is None:
+            self.noise = energy
+        else:
+            rate = 0.3 if energy < self.noise else 0.02
+            self.noise += rate * (energy - self.noise)
+
+    def feed(self, samples: np.ndarray) -> List[Utterance]:
+        self.ring.write(samples)
+        buf = np.concatenate((self._pending, samples)) if len(self._pending) else samples
+        whole = len(buf) // self.frame * self.frame
+        self._pending = buf[whole:].copy()
+        done: List[Utterance] = []
+        for energy in frame_energy(buf[:whole], self.sample_rate):
+            utterance = self._step(float(energy))
+            if utterance is not None:
+                done.append(utterance)
+        return done
+
+    def _step(self, energy: float) -> Optional[Utterance]:
+        i = self._frames
+        self._frames += 1
+        voiced = energy > self._threshold()
+        if not voiced:
+            self._track_noise(energy)
+
+        if self._speech_start is None:
+            self._run = self._run + 1 if voiced else 0
+            if self._run >= START_FRAMES:
+                first = i - self._run + 1
+                self._speech_start = max(0, first - self.pre_roll_frames, self.ring.start // self.frame)
+                self._energies = deque([0.0] * (first - self._speech_start) + [energy] * self._run)
+                self._last_voiced, self._voiced, self._run = i, self._run, 0
+            return None
+
+        self._energies.append(energy)
+        if voiced:
+            self._last_voiced = i
+            self._voiced += 1
+        if i - self._last_voiced >= self.silence_frames:
+            # keep a little of the trailing silence so the last word isn't clipped
+            return self._close(self._last_voiced + 1 + self.silence_frames // 2, reopen=False)
+        if i + 1 - self._speech_start >= self.max_frames:
+            # still talking: cut at the quietest frame of the utterance's second half
+            half = len(self._energies) // 2
+            quietest = half + int(np.argmin(list(self._energies)[half:]))
+            return self._close(self._speech_start + quietest + 1, reopen=True)
+        return None
+
+    def _close(self, end_frame: int, reopen: bool) -> Optional[Utterance]:
+        start_frame = self._speech_start
+        voiced = self._voiced
+        if reopen:
+            kept = end_frame - start_frame
+            for _ in range(kept):
+                self._energies.popleft()
+            self._speech_start = end_frame
+            self._voiced = sum(e > self._threshold() for e in self._energies)
+        else:
+            self._speech_start = None
+            self._energies.clear()
+        if voiced < self.min_speech_frames:
+            return None  # a click or a cough
+        return self._utterance(start_frame, end_frame)
+
+    def _utterance(self, start_frame: int, end_frame: int) -> Utterance:
+        samples = self.ring.read(start_frame * self.frame, end_frame * self.frame)
+        self.seq += 1
+        frame_s = FRAME_MS / 1000.0
+        return Utterance(self.seq, round(start_frame * frame_s, 3), round(end_frame * frame_s, 3),
+                         resample(samples, self.sample_rate))
+
+    def flush(self) -> List[Utterance]:
+        """Closes the open utterance (end of stream)."""
+        if self._speech_start is None:
+            return []
+        utterance = self._close(self._frames, reopen=False)
+        return [utterance] if utterance is not None else []
+
+
+def pcm_from_bytes(data: bytes, carry: bytes = b"") -> Tuple[np.ndarray, bytes]:
+    """int16 little-endian samples in `carry + data`, and the odd byte left over."""
+    data = carry + data
+    whole = len(data) - len(data) % 2
+    return np.frombuffer(data[:whole], dtype="<i2").copy(), data[whole:]
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+class OpusDecoder:
+    """Streams WebM/Ogg Opus through ffmpeg into 16 kHz mono PCM."""
+
+    def __init__(self):
+        self.proc: Optional[asyncio.subprocess.Process] = None
+
+    async def start(self) -> None:
+        self.proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-nostdin", "-v", "error", "-i", "pipe:0",
+            "-f", "s16le", "-ac", "1", "-ar", str(SAMPLE_RATE), "pipe:1",
+            stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE,
+        )
+
+    async def write(self, data: bytes) -> None:
+        self.proc.stdin.write(data)
+        await self.proc.stdin.drain()
+
+    async def end(self) -> None:
+        if self.proc.stdin and not self.proc.stdin.is_closing():
+            self.proc.stdin.close()
+
+    async def chunks(self) -> AsyncIterator[bytes]:
+        while True:
+            data = await self.proc.stdout.read(8192)
+            if not data:
+                return
+            yield data
+
+    async def close(self) -> None:
+        if self.proc is not None and self.proc.returncode is None:
+            self.proc.kill()
+            await self.proc.wait()
+
+
+class OrderedTranscriber:
+    """
+    Transcribes submitted utterances at most `max_parallel` at a time and
+    hands them out, with their text or exception, in submission order.
+    """
+
+    def __init__(self, transcribe: Callable[[Utterance], Awaitable[str]], max_parallel: int = 2):
+        self._transcribe = transcribe
+        self._slots = asyncio.Semaphore(max(1, max_parallel))
+        self._queue: "asyncio.Queue[Optional[Tuple[Utterance, asyncio.Task]]]" = asyncio.Queue()
+
+    async def _run(self, utterance: Utterance) -> str:
+        async with self._slots:
+            return await self._transcribe(utterance)
+
+    def submit(self, utterance: Utterance) -> None:
+        self._queue.put_nowait((utterance, asyncio.ensure_future(self._run(utterance))))
+
+    def close(self) -> None:
+        """No more utterances: results() ends after the pending ones."""
+        self._queue.put_nowait(None)
+
+    async def results(self) -> AsyncIterator[Tuple[Utterance, Optional[str], Optional[BaseException]]]:
+        while True:
+            item = await self._queue.get()
+            if item is None:
+                return
+            utterance, task = item
+            try:
+                yield utterance, await task, None
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                yield utterance, None, e
+
+    def cancel(self) -> None:
+        while not self._queue.empty():
+            item = self._queue.get_nowait()
+            if item is not None:
+                item[1].cancel()
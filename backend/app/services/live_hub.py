@@ -0,0 +1,327 @@
+# app/services/live_hub.py
+"""
+Fan-out of live meeting insights to any number of viewers: one analysis
+loop per meeting (held by whichever worker has its lease) publishes each
+change once as a compact diff, and a broker ("memory", or "sqlite" across
+the workers on a host) copies it to every subscriber.
+"""
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from uuid import uuid4
+
+import anyio
+
+from app.config import get_settings
+from app.core.logger import logger
+from app.db.repository import MeetingRepository
+from app.db.session import SessionLocal
+from app.services.live_session import LiveSession, forget_session
+from app.utils.singleton import Singleton
+
+SUBSCRIBER_QUEUE = 256  # undelivered events a subscriber may have before it must resync
+RETENTION_SECONDS = 600.0  # how long the sqlite broker keeps events
+
+Deliver = Callable[[str, Dict[str, Any]], None]
+
+
+class MemoryBroker:
+    name = "memory"
+
+    def __init__(self, deliver: Deliver):
+        self._deliver = deliver  # thread-safe
+
+    def publish(self, meeting_id: str, event: Dict[str, Any]) -> None:
+        self._deliver(meeting_id, event)
+
+    async def run(self, watched: Callable[[], Set[str]]) -> None:
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteBroker:
+    name = "sqlite"
+
+    def __init__(self, path: str, deliver: Deliver, poll_seconds: float = 0.25):
+        self.path = path
+        self.poll_seconds = poll_seconds
+        self._deliver = deliver
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=10)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS live_events (id INTEGER PRIMARY KEY AUTOINCREMENT,"
+            " meeting_id TEXT NOT NULL, payload TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS live_events_created ON live_events (created)")
+
+    def publish(self, meeting_id: str, event: Dict[str, Any]) -> None:
+        payload = json.dumps(event, ensure_ascii=False)
+        with self._lock:
+            self._db.execute("INSERT INTO live_events (meeting_id, payload, created) VALUES (?, ?, ?)",
+                             (meeting_id, payload, time.time()))
+
+    def _last_id(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COALESCE(MAX(id), 0) FROM live_events").fetchone()[0]
+
+    def _fetch(self, after: int) -> List[Tuple[int, str, str]]:
+        with self._lock:
+            return self._db.execute(
+                "SELECT id, meeting_id, payload FROM live_events WHERE id > ? ORDER BY id", (after,)
+            ).fetchall()
+
+    def _prune(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM live_events WHERE created < ?", (time.time() - RETENTION_SECONDS,))
+
+    async def run(self, watched: Callable[[], Set[str]]) -> None:
+        last = await anyio.to_thread.run_sync(self._last_id)
+        pruned = time.monotonic()
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                rows = await anyio.to_thread.run_sync(self._fetch, last)
+                meetings = watched()
+                for row_id, meeting_id, payload in rows:
+                    last = row_id
+                    if meeting_id in meetings:
+                        self._deliver(meeting_id, json.loads(payload))
+                if time.monotonic() - pruned > 60:
+                    pruned = time.monotonic()
+                    await anyio.to_thread.run_sync(self._prune)
+            except Exception as e:
+                logger.warning(f"Live hub poll failed: {e}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class LiveHub:
+    """
+    Per-meeting subscribers and the server-side analysis loops.
+
+    `analyze(meeting_id)` runs one analysis round in a worker thread and
+    returns whether it analyzed anything; a meeting's loop calls it every
+    `interval` seconds and ends after `idle_seconds` without new transcript.
+    With `lease_seconds` set, a round only runs while this hub holds the
+    meeting's lease; None (one process) skips the lease.
+    """
+
+    def __init__(self, broker: str = "memory", sqlite_path: str = "./live_events.db", poll_seconds: float = 0.25,
+                 interval: float = 10.0, idle_seconds: float = 120.0, lease_seconds: Optional[float] = None,
+                 owner: Optional[str] = None):
+        self.interval = interval
+        self.idle_seconds = idle_seconds
+        self.lease_seconds = lease_seconds
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:6]}"
+        self.analyze: Optional[Callable[[str], bool]] = None
+        if broker == "sqlite":
+            self.broker = SqliteBroker(sqlite_path, self._deliver_threadsafe, poll_seconds)
+        elif broker == "memory":
+            self.broker = MemoryBroker(self._deliver_threadsafe)
+        else:
+            raise ValueError(f"Unknown LIVE_HUB_BROKER: {broker}")
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._analyzers: Dict[str, asyncio.Task] = {}
+        self._leases: Set[str] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._broker_task: Optional[asyncio.Task] = None
+        self._counts = {"published": 0, "delivered": 0, "analyses": 0, "resyncs": 0}
+
+    # ---------- lifecycle (event loop thread) ----------
+
+    def start(self, analyze: Optional[Callable[[str], bool]] = None) -> None:
+        if analyze is not None:
+            self.analyze = analyze
+        if self._loop is None:
+            self._loop = asyncio.get_running_loop()
+            self._broker_task = asyncio.create_task(self.broker.run(self._watched), name="live-hub-broker")
+
+    async def stop(self) -> None:
+        tasks = [t for t in [self._broker_task, *self._analyzers.values()] if t is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._loop, self._broker_task = None, None
+        self.broker.close()
+
+    # ---------- publishing (any thread) ----------
+
+    def publish(self, session: LiveSession, since: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Sends what changed in `session` since the mark `since` to every
+        subscriber: a LiveSession.changes() mark taken while the session was
+        in step with the store, whose state the viewers have already been
+        sent by whichever worker stored it (None for everything). Returns
+        the event, or None when nothing changed.
+        """
+        with self._lock:
+            diff, _ = session.changes(since)
+            if not diff:
+                return None
+            self._counts["published"] += 1
+            event = {"type": "update", **diff}
+            # under the lock, so diffs of one meeting go out in the order they were taken
+            self.broker.publish(session.meeting_id, event)
+        return event
+
+    def touch(self, meeting_id: str) -> None:
+        """New transcript for the meeting: make sure its analysis loop runs."""
+        self._touched[meeting_id] = time.monotonic()
+        if self._loop is not None and self.analyze is not None:
+            self._loop.call_soon_threadsafe(self._ensure_analysis, meeting_id)
+
+    def _deliver_threadsafe(self, meeting_id: str, event: Dict[str, Any]) -> None:
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            if asyncio.get_running_loop() is loop:
+                self._deliver(meeting_id, event)
+                return
+        except RuntimeError:
+            pass
+        loop.call_soon_threadsafe(self._deliver, meeting_id, event)
+
+    # ---------- event loop thread ----------
+
+    def _watched(self) -> Set[str]:
+        return set(self._subscribers)
+
+    def _deliver(self, meeting_id: str, event: Dict[str, Any]) -> None:
+        for queue in list(self._subscribers.get(meeting_id, ())):
+            try:
+                queue.put_nowait(event)
+                self._counts["delivered"] += 1
+            except asyncio.QueueFull:
+                # too slow to keep up: it starts again from a snapshot
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+                self._counts["resyncs"] += 1
+                self._unsubscribe(meeting_id, queue)
+
+    def _unsubscribe(self, meeting_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(meeting_id)
+        if queues is not None:
+            queues.discard(queue)
+            if not queues:
+                del self._subscribers[meeting_id]
+
+    @asynccontextmanager
+    async def subscribe(self, meeting_id: str) -> AsyncIterator[asyncio.Queue]:
+        """A queue receiving the meeting's events until the block exits."""
+        self.start()
+        queue: asyncio.Queue = asyncio.Queue(SUBSCRIBER_QUEUE)
+        self._subscribers.setdefault(meeting_id, set()).add(queue)
+        try:
+            yield queue
+        finally:
+            self._unsubscribe(meeting_id, queue)
+
+    def _ensure_analysis(self, meeting_id: str) -> None:
+        if meeting_id not in self._analyzers:
+            self._analyzers[meeting_id] = asyncio.create_task(
+                self._analysis_loop(meeting_id), name=f"live-analysis-{meeting_id}"
+            )
+
+    def _with_repo(self, fn: Callable[[MeetingRepository], Any]) -> Any:
+        db = SessionLocal()
+        try:
+            return fn(MeetingRepository(db))
+        finally:
+            db.close()
+
+    async def _hold_lease(self, meeting_id: str) -> bool:
+        """Takes or renews the meeting's lease; False while another worker holds it."""
+        if self.lease_seconds is None:
+            return True
+        held = await anyio.to_thread.run_sync(
+            self._with_repo, lambda repo: repo.claim_live_lease(meeting_id, self.owner, self.lease_seconds))
+        if held:
+            self._leases.add(meeting_id)
+        else:
+            self._leases.discard(meeting_id)
+        return held
+
+    async def _release_lease(self, meeting_id: str) -> None:
+        if meeting_id not in self._leases:
+            return
+        self._leases.discard(meeting_id)
+        try:
+            await anyio.to_thread.run_sync(
+                self._with_repo, lambda repo: repo.release_live_lease(meeting_id, self.owner))
+        except Exception as e:  # it expires on its own
+            logger.warning(f"Could not release the live analysis lease of {meeting_id}: {e}")
+
+    async def _analysis_loop(self, meeting_id: str) -> None:
+        try:
+            while True:
+                await asyncio.sleep(self.interval)
+                try:
+                    if await self._hold_lease(meeting_id) and await anyio.to_thread.run_sync(self.analyze, meeting_id):
+                        self._counts["analyses"] += 1
+                        continue
+                except Exception as e:  # busy or failing model: try again next round
+                    logger.warning(f"Live analysis of {meeting_id} failed: {e}")
+                if time.monotonic() - self._touched.get(meeting_id, 0.0) >= self.idle_seconds:
+                    return
+        finally:
+            self._analyzers.pop(meeting_id, None)
+            # the meeting went quiet here: keep nothing of it (the store has it all)
+            self._touched.pop(meeting_id, None)
+            forget_session(meeting_id)
+            # hand the meeting over right away, should transcript keep arriving at another worker
+            await asyncio.shield(self._release_lease(meeting_id))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "broker": self.broker.name,
+            "subscribers": {m: len(q) for m, q in self._subscribers.items()},
+            "analysis_loops": sorted(self._analyzers),
+            "analysis_leases": sorted(self._leases),
+            **self._counts,
+        }
+
+
+def _build_hub() -> LiveHub:
+    settings = get_settings()
+    return LiveHub(
+        broker=settings.LIVE_HUB_BROKER,
+        sqlite_path=settings.LIVE_HUB_SQLITE_PATH,
+        poll_seconds=settings.LIVE_HUB_POLL_SECONDS,
+        interval=settings.LIVE_ANALYZE_INTERVAL_SECONDS,
+        idle_seconds=settings.LIVE_ANALYZE_IDLE_SECONDS,
+        lease_seconds=settings.LIVE_ANALYZE_LEASE_SECONDS,
+    )
+
+
+_HUB = Singleton(_build_hub)
+
+
+def get_live_hub() -> LiveHub:
+    return _HUB.get()
+
+
+async def start_live_hub(analyze: Callable[[str], bool]) -> LiveHub:
+    hub = get_live_hub()
+    hub.start(analyze)
+    return hub
+
+
+async def stop_live_hub() -> None:
+    hub = _HUB.set(None)
+    if hub is not None:
+        await hub.stop()
@@ -0,0 +1,271 @@
+# app/services/live_session.py
+"""
+Server-side state for live meetings.
+
+The browser posts transcript segments as they are recognised. Every segment
+goes through the rule-based action engine straight away (no model call);
+each analysis tick only sends the segments added since the previous tick (the "delta") to
+the model, together with a bounded rolling summary and the most recent
+actions / moderation notes, so prompt size stays flat for the whole meeting.
+
+With several workers, segments of one meeting can arrive at any of them,
+so the meeting store is the source of truth: before every use a session
+compares its version with the stored one and fetches only what was stored
+since, and a tick's result is only stored if no other worker stored that
+tick first.
+"""
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.services.action_engine import ActionEngine
+
+# How much carried-over state goes back into each prompt
+MAX_CARRY_ACTIONS = 15
+MAX_CARRY_NOTES = 10
+MAX_SUMMARY_CHARS = 1200
+
+
+@dataclass
+class LiveSession:
+    meeting_id: str
+    segments: List[str] = field(default_factory=list)
+    analyzed_upto: int = 0
+    summary: str = ""
+    actions: List[Dict[str, str]] = field(default_factory=list)
+    notes: List[str] = field(default_factory=list)
+    interruptions: int = 0
+    engine: ActionEngine = field(default_factory=ActionEngine, repr=False)
+    # the stored (segment_count, analyzed_upto) the fields above reflect; None: reload in full
+    version: Optional[Tuple[int, int]] = None
+    # guards the fields above; analyze_lock serializes model calls per session,
+    # store_lock a sync with the store and the writes that follow it
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    analyze_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+    store_lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    def add_participants(self, names: Iterable[str]) -> None:
+        with self.lock:
+            self.engine.add_participants(names)
+
+    def participants(self) -> List[str]:
+        with self.lock:
+            return list(self.engine.participants.values())
+
+    def add_segment(self, text: str) -> List[Dict[str, str]]:
+        """
+        Appends a segment and returns the action items the rule engine
+        found in it that were not known yet.
+        """
+        text = re.sub(r"\s+", " ", text).strip()
+        with self.lock:
+            if not text:
+                return []
+            self.segments.append(text)
+            return merge_actions(self.actions, self.engine.feed(text))
+
+    def load(self, other: "LiveSession") -> None:
+        """Takes over `other`'s transcript, analysis and action engine (e.g. fresher state from the store)."""
+        with self.lock:
+            self.segments, self.analyzed_upto, self.summary = list(other.segments), other.analyzed_upto, other.summary
+            self.actions, self.notes, self.interruptions = list(other.actions), list(other.notes), other.interruptions
+            self.engine, self.version = other.engine, other.version
+
+    def catch_up(self, state: Dict[str, Any]) -> None:
+        """
+        Applies stored state loaded with segments_after=version[0]: appends
+        the new segments and takes the analysis fields.
+        """
+        with self.lock:
+            self.segments.extend(state.get("segments") or [])
+            self.analyzed_upto = int(state.get("analyzed_upto") or 0)
+            self.summary = state.get("summary") or ""
+            self.actions = list(state.get("actions") or [])
+            self.notes = list(state.get("notes") or [])
+            self.interruptions = int(state.get("interruptions") or 0)
+            self.engine.add_participants(state.get("participants") or [])
+            self.engine.remember(self.actions)
+            self.version = tuple(state["version"]) if state.get("version") else None
+
+    def note_stored(self, segment_count: Optional[int] = None, analyzed_upto: Optional[int] = None) -> None:
+        """
+        Moves the version past this session's own write. A segment stored
+        behind one from another worker leaves the order unknown: reload.
+        """
+        with self.lock:
+            if self.version is None:
+                return
+            segments, analyzed = self.version
+            if segment_count is not None:
+                if not segment_count == segments + 1 == len(self.segments):
+                    self.version = None
+                    return
+                segments = segment_count
+            self.version = (segments, analyzed if analyzed_upto is None else analyzed_upto)
+
+    def invalidate(self) -> None:
+        with self.lock:
+            self.version = None
+
+    def transcript(self) -> str:
+        with self.lock:
+            return " ".join(self.segments)
+
+    def pending_chars(self) -> int:
+        """Length of the transcript not analyzed yet."""
+        with self.lock:
+            return sum(len(t) for t in self.segments[self.analyzed_upto:])
+
+    def changes(self, mark: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        What changed since `mark` (the second item of an earlier call; None
+        for everything) as a compact diff, and the new mark. Segments,
+        actions and notes only ever grow, so they are sent as the new items
+        plus the index they start at (`segments_from`, ...); summary and
+        interruptions only when they differ. An empty diff means no change.
+        """
+        with self.lock:
+            current = {"segments": len(self.segments), "actions": len(self.actions), "notes": len(self.notes),
+                       "summary": self.summary, "interruptions": self.interruptions,
+                       "analyzed_segments": self.analyzed_upto}
+            mark = mark or {"segments": 0, "actions": 0, "notes": 0, "summary": "", "interruptions": 0,
+                            "analyzed_segments": 0}
+            diff: Dict[str, Any] = {}
+            for name, items in (("segments", self.segments), ("actions", self.actions), ("notes", self.notes)):
+                if len(items) > mark[name]:
+                    diff[f"{name}_from"] = mark[name]
+                    diff[name] = list(items[mark[name]:])
+            for name in ("summary", "interruptions", "analyzed_segments"):
+                if current[name] != mark[name]:
+                    diff[name] = current[name]
+        return diff, current
+
+    def snapshot(self, include_transcript: bool = False) -> Dict[str, Any]:
+        with self.lock:
+            data = {
+                "meeting_id": self.meeting_id,
+                "segments": len(self.segments),
+                "analyzed_segments": self.analyzed_upto,
+                "summary": self.summary,
+                "actions": list(self.actions),
+                "moderation": {"interruptions": self.interruptions, "notes": list(self.notes)},
+            }
+            if include_transcript:
+                data["transcript"] = " ".join(self.segments)
+            return data
+
+
+_SESSIONS: Dict[str, LiveSession] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def get_session(meeting_id: str, create: bool = True) -> Optional[LiveSession]:
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.get(meeting_id)
+        if session is None and create:
+            session = _SESSIONS[meeting_id] = LiveSession(meeting_id=meeting_id)
+        return session
+
+
+def forget_session(meeting_id: str) -> None:
+    """Drops the meeting's session (it goes quiet); the store still has it."""
+    with _SESSIONS_LOCK:
+        _SESSIONS.pop(meeting_id, None)
+
+
+def restore_session(meeting_id: str, state: Dict[str, Any]) -> LiveSession:
+    """
+    The meeting's registered session, holding stored state (see
+    MeetingRepository.load_live_state). The store is the source of truth:
+    other workers add transcript and analysis too, so a session this worker
+    already has is brought up to date rather than trusted.
+    """
+    fresh = session_from_state(meeting_id, state)
+    with _SESSIONS_LOCK:
+        session = _SESSIONS.setdefault(meeting_id, fresh)
+    if session is not fresh:
+        session.load(fresh)
+    return session
+
+
+def session_from_state(meeting_id: str, state: Dict[str, Any]) -> LiveSession:
+    """
+    An unregistered session holding stored state: the same transcript,
+    analysis, participants and known actions as the session that saved it.
+    """
+    session = LiveSession(
+        meeting_id=meeting_id,
+        segments=list(state.get("segments") or []),
+        analyzed_upto=int(state.get("analyzed_upto") or 0),
+        summary=state.get("summary") or "",
+        actions=list(state.get("actions") or []),
+        notes=list(state.get("notes") or []),
+        interruptions=int(state.get("interruptions") or 0),
+        version=tuple(state["version"]) if state.get("version") else None,
+    )
+    session.engine.add_participants(state.get("participants") or [])
+    session.engine.remember(session.actions)
+    return session
+
+
+def merge_actions(existing: List[Dict[str, str]], incoming: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Appends incoming actions that are not already known (by assignee+text)
+    to `existing` in place and returns the ones that were added.
+    """
+    seen = {(a["assignee"].lower(), a["text"].lower()) for a in existing}
+    added: List[Dict[str, str]] = []
+    for a in incoming:
+        key = (a.get("assignee", "").lower(), a.get("text", "").lower())
+        if not key[1] or key in seen:
+            continue
+        seen.add(key)
+        item = {"assignee": a.get("assignee", ""), "text": a.get("text", "")}
+        existing.append(item)
+        added.append(item)
+    return added
+
+
+def merge_notes(existing: List[str], incoming: List[str]) -> List[str]:
+    seen = {n.strip().lower() for n in existing}
+    added: List[str] = []
+    for n in incoming:
+        n = str(n).strip()
+        if not n or n.lower() in seen:
+            continue
+        seen.add(n.lower())
+        existing.append(n)
+        added.append(n)
+    return added
+
+
+def analyze_pending(session: LiveSession, groq) -> Dict[str, Any]:
+    """
+    Analyzes the segments added since the last tick and merges the result
+    into the session. `groq` is a GroqClient (anything with analyze_delta).
+    Returns the merged session state plus `new_actions` / `new_notes` and
+    `analyzed_from`, where the analyzed delta started.
+    """
+    with session.analyze_lock:
+        with session.lock:
+            start, end = session.analyzed_upto, len(session.segments)
+            delta = " ".join(session.segments[start:end])
+            summary = session.summary
+            carry_actions = session.actions[-MAX_CARRY_ACTIONS:]
+            carry_notes = session.notes[-MAX_CARRY_NOTES:]
+
+        if not delta:
+            return {**session.snapshot(), "new_actions": [], "new_notes": [], "analyzed_from": start}
+
+        result = groq.analyze_delta(delta, summary=summary, actions=carry_actions, notes=carry_notes)
+
+        with session.lock:
+            session.summary = (result.get("summary") or session.summary)[:MAX_SUMMARY_CHARS]
+            new_actions = merge_actions(session.actions, result.get("actions") or [])
+            moderation = result.get("moderation") or {}
+            new_notes = merge_notes(session.notes, moderation.get("notes") or [])
+            session.interruptions += int(moderation.get("interruptions") or 0)
+            session.analyzed_upto = end
+
+    return {**session.snapshot(), "new_actions": new_actions, "new_notes": new_notes, "analyzed_from": start}
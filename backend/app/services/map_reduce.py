@@ -0,0 +1,171 @@
+# app/services/map_reduce.py
+"""
+Helpers for hierarchical map-reduce over long transcripts.
+
+Transcripts above MAP_REDUCE_THRESHOLD_TOKENS are split on sentence
+boundaries into chunks of at most MAP_REDUCE_CHUNK_TOKENS (estimated
+locally, no tokenizer round trip), the per-chunk prompts run in parallel,
+and the partial results are reduced: summaries through one more model call,
+actions and moderation verdicts locally.
+
+This module holds the model-independent parts; the sync and async map/reduce
+drivers live next to the clients in groq_service.py / async_groq_service.py.
+"""
+import re
+from typing import Any, Dict, List
+
+_SENTENCE_END = re.compile(r"(?<=[.!?।。？！])\s+")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count: ~4 chars/token for ASCII, ~1.5 for other scripts.
+    Pure C-level string ops, fast enough to call on every request.
+    """
+    if not text:
+        return 0
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return int(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5) + 1
+
+
+def split_sentences(text: str) -> List[str]:
+    return [s for s in _SENTENCE_END.split(text.strip()) if s]
+
+
+def chunk_by_tokens(text: str, budget: int) -> List[str]:
+    """
+    Greedily packs whole sentences into chunks of <= budget estimated tokens.
+    A single sentence longer than the budget is split on word boundaries.
+    """
+    chunks: List[str] = []
+    current: List[str] = []
+    used = 0
+
+    def flush() -> None:
+        nonlocal current, used
+        if current:
+            chunks.append(" ".join(current))
+        current, used = [], 0
+
+    for sentence in split_sentences(text):
+        cost = estimate_tokens(sentence)
+        if cost > budget:
+            flush()
+            words, piece, piece_cost = sentence.split(), [], 0
+            for word in words:
+                word_cost = estimate_tokens(word + " ")
+                if piece and piece_cost + word_cost > budget:
+                    chunks.append(" ".join(piece))
+                    piece, piece_cost = [], 0
+                piece.append(word)
+                piece_cost += word_cost
+            if piece:
+                current, used = piece, piece_cost
+            continue
+        if current and used + cost > budget:
+            flush()
+        current.append(sentence)
+        used += cost
+    flush()
+    return chunks
+
+
+def reduce_summary_messages(partials: List[str], instruction: str) -> List[Dict[str, str]]:
+    parts = "\n\n".join(f"[Part {i + 1}]\n{p}" for i, p in enumerate(partials))
+    prompt = (
+        "You are a precise meeting summarizer. "
+        "The following are summaries of consecutive parts of ONE meeting transcript. "
+        f"Merge them into a single summary of the whole meeting. {instruction} "
+        "Remove repetition and keep the chronological order of topics.\n\n"
+        f"Part summaries:\n{parts}\n\n"
+        "Summary:"
+    )
+    return [
+        {"role": "system", "content": "You write clear, structured summaries."},
+        {"role": "user", "content": prompt}
+    ]
+
+
+def group_partials(partials: List[str], budget: int) -> List[List[str]]:
+    """
+    Groups partial summaries so each reduce prompt fits the budget.
+    One group means the next reduce call is the final one.
+    """
+    groups: List[List[str]] = [[]]
+    used = 0
+    for p in partials:
+        cost = estimate_tokens(p)
+        if groups[-1] and used + cost > budget:
+            groups.append([])
+            used = 0
+        groups[-1].append(p)
+        used += cost
+    return groups
+
+
+def merge_action_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduces per-chunk detect_actions() results: concatenates actions and
+    decisions, dropping duplicates by title (+ owner).
+    """
+    actions: List[Dict[str, Any]] = []
+    decisions: List[Dict[str, Any]] = []
+    seen_actions, seen_decisions = set(), set()
+    for r in results:
+        for a in r.get("actions") or []:
+            if not isinstance(a, dict):
+                continue
+            key = (str(a.get("title", "")).strip().lower(), str(a.get("owner", "")).strip().lower())
+            if key not in seen_actions:
+                seen_actions.add(key)
+                actions.append(a)
+        for d in r.get("decisions") or []:
+            if not isinstance(d, dict):
+                continue
+            key = str(d.get("title", "")).strip().lower()
+            if key not in seen_decisions:
+                seen_decisions.add(key)
+                decisions.append(d)
+    return {"actions": actions, "decisions": decisions}
+
+
+def merge_moderation_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduces per-chunk moderate_text() results: flagged if any chunk is,
+    each category true if any chunk says so, notes concatenated.
+    """
+    categories: Dict[str, bool] = {"hate": False, "violence": False, "sexual": False, "self_harm": False}
+    notes: List[str] = []
+    flagged = False
+    for r in results:
+        flagged = flagged or bool(r.get("is_flagged"))
+        for name, value in (r.get("categories") or {}).items():
+            categories[name] = categories.get(name, False) or bool(value)
+        note = str(r.get("notes") or "").strip()
+        if note and note not in notes:
+            notes.append(note)
+    return {"is_flagged": flagged, "categories": categories, "notes": "; ".join(notes)}
+
+
+def merge_analysis_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reduces per-chunk GroqClient analyses (without the summary, which
+    needs a model call): actions and notes de-duplicated, interruptions summed.
+    """
+    actions: List[Dict[str, str]] = []
+    notes: List[str] = []
+    seen_actions, seen_notes = set(), set()
+    interruptions = 0
+    for r in results:
+        for a in r.get("actions") or []:
+            key = (a.get("assignee", "").lower(), a.get("text", "").lower())
+            if key[1] and key not in seen_actions:
+                seen_actions.add(key)
+                actions.append(a)
+        moderation = r.get("moderation") or {}
+        interruptions += int(moderation.get("interruptions") or 0)
+        for n in moderation.get("notes") or []:
+            if str(n).strip().lower() not in seen_notes:
+                seen_notes.add(str(n).strip().lower())
+                notes.append(n)
+    return {"actions": actions, "moderation": {"interruptions": interruptions, "notes": notes}}
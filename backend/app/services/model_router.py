@@ -0,0 +1,272 @@
+# app/services/model_router.py
+"""
+Which chat model serves which task.
+
+Every chat call names its task: LIVE (the periodic live-meeting refresh),
+FINAL (reports and summaries), MODERATION, TRANSLATION or ACTIONS.
+MODEL_ROUTES maps the task to a tier and MODEL_TIERS the tier to an
+ordered list of models, e.g. a small instant model for live ticks, which
+have to come back well within the refresh interval, and the 70B model for
+final reports.
+
+A tier's first model is used while it keeps up. If it is rate limited
+(locally or by a 429), failing, or slower than the tier's
+MODEL_TIER_TIMEOUT_SECONDS, the call moves on to the next model instead
+of retrying. The last model of a tier is called like any other model
+call, with the full scheduler wait and retries, since a late answer beats
+none.
+
+For every tier and model the router counts calls by outcome, latency
+(queueing included) and estimated cost (reported tokens × MODEL_PRICES);
+see stats() and /metrics. A streamed call (astream()) is only counted once
+its stream has ended: latency to the last chunk, tokens from the usage the
+last chunk reports, and "failed" if the stream breaks off.
+"""
+import contextlib
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, List, Optional, Tuple, TypeVar
+
+from app.config import get_settings
+from app.core.logger import logger
+from app.core.metrics import MODEL_COST, ROUTED_CALLS, ROUTED_SECONDS, model_usage, observe_stream_usage
+from app.services.scheduler import SchedulerBusy, fail_fast, is_retryable
+from app.utils.singleton import Singleton
+
+T = TypeVar("T")
+
+LIVE, FINAL, MODERATION, TRANSLATION, ACTIONS = "live", "final", "moderation", "translation", "actions"
+TASKS = (LIVE, FINAL, MODERATION, TRANSLATION, ACTIONS)
+LATENCY_WINDOW = 512  # recent calls per tier and model kept for the percentiles in stats()
+
+
+def _can_fall_back(error: BaseException) -> bool:
+    # capacity or transport trouble another model may not have; a bad request fails everywhere
+    return isinstance(error, (SchedulerBusy, TimeoutError)) or is_retryable(error)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class _ModelStats:
+    __slots__ = ("ok", "fallback", "failed", "prompt_tokens", "completion_tokens", "cost_usd", "latencies")
+
+    def __init__(self):
+        self.ok = self.fallback = self.failed = 0
+        self.prompt_tokens = self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    def as_dict(self) -> Dict[str, Any]:
+        latencies = list(self.latencies)
+        return {
+            "ok": self.ok,
+            "fallback": self.fallback,
+            "failed": self.failed,
+            "p50_ms": round(_percentile(latencies, 0.5) * 1000, 1) if latencies else 0.0,
+            "p95_ms": round(_percentile(latencies, 0.95) * 1000, 1) if latencies else 0.0,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        routes: Dict[str, str],
+        tiers: Dict[str, List[str]],
+        timeouts: Optional[Dict[str, float]] = None,
+        prices: Optional[Dict[str, Dict[str, float]]] = None,
+    ):
+        if FINAL not in routes:
+            raise ValueError("MODEL_ROUTES needs a tier for the 'final' task")
+        for task, tier in routes.items():
+            if not tiers.get(tier):
+                raise ValueError(f"MODEL_ROUTES: task {task} uses tier {tier}, which has no models")
+        self.routes = routes
+        self.tiers = tiers
+        self.timeouts = timeouts or {}
+        self.prices = prices or {}
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str], _ModelStats] = {}
+
+    def tier(self, task: str) -> str:
+        # tasks without a route of their own are treated as final reports
+        return self.routes.get(task) or self.routes[FINAL]
+
+    def models(self, task: str) -> List[str]:
+        return list(self.tiers[self.tier(task)])
+
+    def _budget(self, tier: str, last: bool) -> contextlib.AbstractContextManager:
+        if last:
+            return contextlib.nullcontext()
+        return fail_fast(self.timeouts.get(tier, 30.0))
+
+    def _cost(self, model: str, used: Dict[str, int]) -> float:
+        price = self.prices.get(model, {})
+        return (used["prompt_tokens"] * price.get("input", 0.0)
+                + used["completion_tokens"] * price.get("output", 0.0)) / 1_000_000
+
+    def _record(self, task: str, tier: str, model: str, outcome: str, seconds: float, used: Dict[str, int]) -> None:
+        cost = self._cost(model, used)
+        ROUTED_CALLS.inc(task=task, tier=tier, model=model, outcome=outcome)
+        ROUTED_SECONDS.observe(seconds, tier=tier, model=model)
+        if cost:
+            MODEL_COST.inc(cost, tier=tier, model=model)
+        with self._lock:
+            stats = self._stats.get((tier, model))
+            if stats is None:
+                stats = self._stats[(tier, model)] = _ModelStats()
+            setattr(stats, outcome, getattr(stats, outcome) + 1)
+            stats.prompt_tokens += used["prompt_tokens"]
+            stats.completion_tokens += used["completion_tokens"]
+            stats.cost_usd += cost
+            if outcome == "ok":
+                stats.latencies.append(seconds)
+
+    def _attempts(self, task: str) -> Iterator[Tuple[str, str, Optional[str]]]:
+        """(tier, model, next model or None) in the order they are tried."""
+        tier = self.tier(task)
+        models = self.tiers[tier]
+        for i, model in enumerate(models):
+            yield tier, model, models[i + 1] if i + 1 < len(models) else None
+
+    def _failed(self, task: str, tier: str, model: str, successor: Optional[str], error: Exception,
+                seconds: float, used: Dict[str, int]) -> None:
+        """Records a failed attempt; re-raises unless `successor` should get the call."""
+        if successor is None or not _can_fall_back(error):
+            self._record(task, tier, model, "failed", seconds, used)
+            raise error
+        self._record(task, tier, model, "fallback", seconds, used)
+        logger.warning(f"{model} unavailable for {task} ({error}); falling back to {successor}")
+
+    def call(self, task: str, fn: Callable[[str], T]) -> T:
+        """fn(model) with the task's models, in order, until one succeeds."""
+        for tier, model, successor in self._attempts(task):
+            started = time.perf_counter()
+            with model_usage() as used:
+                try:
+                    with self._budget(tier, successor is None):
+                        result = fn(model)
+                except Exception as e:
+                    self._failed(task, tier, model, successor, e, time.perf_counter() - started, used)
+                    continue
+            self._record(task, tier, model, "ok", time.perf_counter() - started, used)
+            return result
+        raise AssertionError("unreachable")
+
+    async def acall(self, task: str, fn: Callable[[str], Awaitable[T]]) -> T:
+        for tier, model, successor in self._attempts(task):
+            started = time.perf_counter()
+            with model_usage() as used:
+                try:
+                    with self._budget(tier, successor is None):
+                        result = await fn(model)
+                except Exception as e:
+                    self._failed(task, tier, model, successor, e, time.perf_counter() - started, used)
+                    continue
+            self._record(task, tier, model, "ok", time.perf_counter() - started, used)
+            return result
+        raise AssertionError("unreachable")
+
+    async def astream(self, task: str, open_stream: Callable[[str], Awaitable[AsyncIterator[T]]],
+                      usage: Callable[[T], Any] = lambda item: None) -> AsyncIterator[T]:
+        """
+        Yields the items of open_stream(model). Falls back like acall() while
+        the stream opens; after that the model is committed, and the call is
+        recorded when the stream ends, with the tokens of any item for which
+        `usage` returns a usage object. A consumer that stops early records
+        nothing.
+        """
+        for tier, model, successor in self._attempts(task):
+            started = time.perf_counter()
+            with model_usage() as used:
+                try:
+                    with self._budget(tier, successor is None):
+                        stream = await open_stream(model)
+                except Exception as e:
+                    self._failed(task, tier, model, successor, e, time.perf_counter() - started, used)
+                    continue
+            break
+        else:
+            raise AssertionError("unreachable")
+
+        try:
+            async for item in stream:
+                reported = usage(item)
+                if reported is not None:
+                    with model_usage() as tokens:
+                        observe_stream_usage(model, reported)
+                    for name, value in tokens.items():
+                        used[name] += value
+                yield item
+        except Exception:
+            # the stream broke off: there is no other model to hand it to, but it counts against this one
+            self._record(task, tier, model, "failed", time.perf_counter() - started, used)
+            raise
+        self._record(task, tier, model, "ok", time.perf_counter() - started, used)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = {(tier, model): stats.as_dict() for (tier, model), stats in self._stats.items()}
+        return {
+            "routes": {task: self.tier(task) for task in TASKS},
+            "tiers": {
+                tier: {
+                    "models": list(models),
+                    "timeout_s": self.timeouts.get(tier),
+                    "calls": {model: c for (t, model), c in sorted(calls.items()) if t == tier},
+                }
+                for tier, models in self.tiers.items()
+            },
+        }
+
+
+def _build_router() -> ModelRouter:
+    settings = get_settings()
+    return ModelRouter(
+        routes=settings.MODEL_ROUTES,
+        tiers=settings.MODEL_TIERS,
+        timeouts=settings.MODEL_TIER_TIMEOUT_SECONDS,
+        prices=settings.MODEL_PRICES,
+    )
+
+
+_ROUTER = Singleton(_build_router)
+
+
+def get_model_router() -> ModelRouter:
+    return _ROUTER.get()
+
+
+def set_model_router(router: Optional[ModelRouter]) -> Optional[ModelRouter]:
+    """
+    Replaces the process-wide router (None resets it); returns the previous one.
+    """
+    return _ROUTER.set(router)
+
+
+def route(task: str, fn: Callable[[str], T]) -> T:
+    """
+    fn(model) on the models of the task's tier, falling back down the list.
+    """
+    return get_model_router().call(task, fn)
+
+
+async def aroute(task: str, fn: Callable[[str], Awaitable[T]]) -> T:
+    """
+    Async route().
+    """
+    return await get_model_router().acall(task, fn)
+
+
+def astream_route(task: str, open_stream: Callable[[str], Awaitable[AsyncIterator[T]]],
+                  usage: Callable[[T], Any] = lambda item: None) -> AsyncIterator[T]:
+    """
+    Streaming aroute(): see ModelRouter.astream().
+    """
+    return get_model_router().astream(task, open_stream, usage)
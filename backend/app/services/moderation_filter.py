@@ -0,0 +1,159 @@
+# app/services/moderation_filter.py
+"""
+Local moderation prefilter that runs before (and usually instead of) the LLM.
+
+All lexicon terms are compiled into a single prefix-factored regex (a trie
+flattened into one alternation), so a transcript is scanned once regardless
+of lexicon size; PII (emails, phone numbers) is matched with two more
+regexes. Every term is either *strong* (decides on its own) or *ambiguous*
+("shoot", "kill", "hot", ...). Text with no ambiguous hits is decided locally;
+otherwise only the sentences containing ambiguous hits are escalated.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Tuple
+
+CATEGORIES = ("hate", "violence", "sexual", "self_harm")
+
+# (category, strength) -> terms. "toxic" is reported in notes/is_flagged but
+# has no category flag of its own, matching the LLM moderation schema.
+LEXICON: Dict[Tuple[str, str], List[str]] = {
+    ("toxic", "strong"): [
+        "idiot", "idiots", "stupid", "moron", "morons", "dumbass", "useless", "worthless", "pathetic",
+        "loser", "asshole", "bastard", "son of a bitch", "dickhead", "prick", "retard", "retarded",
+        "scumbag", "shut up", "get lost", "go to hell", "you are nothing", "no one cares",
+        "who asked you", "do you have a brain",
+    ],
+    ("hate", "strong"): [
+        "i hate you", "subhuman", "inferior race", "ethnic cleansing", "white power",
+        "go back to your country", "your kind", "those people are animals",
+    ],
+    ("hate", "ambiguous"): ["hate", "nazi", "terrorist", "vermin"],
+    ("violence", "strong"): [
+        "i will kill you", "i'll kill you", "kill you", "beat you up", "shoot you", "stab you",
+        "break your legs", "bomb threat", "going to hurt you",
+    ],
+    ("violence", "ambiguous"): ["kill", "shoot", "attack", "bomb", "blow up", "gun", "knife", "weapon", "punch"],
+    ("sexual", "strong"): ["porn", "nudes", "sexual favors", "sleep with me", "send nudes"],
+    ("sexual", "ambiguous"): ["sex", "sexy", "naked", "hot body"],
+    ("self_harm", "strong"): [
+        "kill myself", "suicide", "end my life", "self harm", "self-harm", "cut myself", "hurt myself",
+        "want to die",
+    ],
+    ("self_harm", "ambiguous"): ["die", "overdose"],
+}
+
+EMAIL_RE = re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)+\b")
+# candidate runs of digits/separators; a run is a phone number if it has 9-15 digits
+PHONE_RE = re.compile(r"(?<![\w+])\+?\(?\d[\d\s().-]{7,18}\d(?!\w)")
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _trie_regex(terms: Iterable[str]) -> str:
+    """
+    Builds a prefix-factored alternation ("kill(?: you|myself)?" style) so
+    the regex engine never re-tries common prefixes across terms.
+    """
+    trie: Dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        ends = "" in node
+        branches = []
+        for ch in sorted(k for k in node if k):
+            piece = r"\s+" if ch == " " else re.escape(ch)
+            branches.append(piece + build(node[ch]))
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends:
+            return "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+def _normalize(term: str) -> str:
+    return re.sub(r"\s+", " ", term.lower().strip())
+
+
+_TERM_INFO: Dict[str, Tuple[str, str]] = {}
+for (_category, _strength), _terms in LEXICON.items():
+    for _t in _terms:
+        _TERM_INFO[_normalize(_t)] = (_category, _strength)
+
+# longest-match-first is guaranteed by the greedy optional groups of the trie;
+# matched against lower-cased text (about twice as fast as re.I)
+LEXICON_RE = re.compile(r"(?<![\w'])(" + _trie_regex(_TERM_INFO) + r")(?![\w'])")
+
+
+def _has_phone(text: str) -> bool:
+    return any(9 <= sum(c.isdigit() for c in m.group()) <= 15 for m in PHONE_RE.finditer(text))
+
+
+@dataclass
+class PrefilterResult:
+    verdict: str  # "clean" | "flagged" | "ambiguous"
+    categories: Dict[str, bool] = field(default_factory=lambda: {c: False for c in CATEGORIES})
+    notes: List[str] = field(default_factory=list)
+    flagged: bool = False
+    ambiguous_spans: List[str] = field(default_factory=list)
+
+    def as_moderation(self) -> Dict:
+        """
+        Same shape as moderate_text() returns.
+        """
+        return {"is_flagged": self.flagged, "categories": dict(self.categories), "notes": "; ".join(self.notes)}
+
+
+def prefilter(text: str) -> PrefilterResult:
+    """
+    Decides clean/flagged locally; "ambiguous" means ambiguous_spans (the
+    sentences with ambiguous terms) still need the LLM.
+    """
+    result = PrefilterResult(verdict="clean")
+    if not text:
+        return result
+
+    lowered = text.lower()
+    seen_notes = set()
+    ambiguous_at: List[int] = []
+    for m in LEXICON_RE.finditer(lowered):
+        term = _normalize(m.group(1))
+        category, strength = _TERM_INFO.get(term, ("toxic", "ambiguous"))
+        if strength == "ambiguous":
+            ambiguous_at.append(m.start())
+            continue
+        result.flagged = True
+        if category in result.categories:
+            result.categories[category] = True
+        note = f'{category}: "{term}"'
+        if note not in seen_notes:
+            seen_notes.add(note)
+            result.notes.append(note)
+
+    if EMAIL_RE.search(text):
+        result.notes.append("PII: email")
+    if _has_phone(text):
+        result.notes.append("PII: phone")
+
+    if ambiguous_at:
+        # escalate only the sentences that contain ambiguous terms; lower()
+        # keeps whitespace and punctuation, so both splits line up
+        offset = 0
+        originals = _SENTENCE_END.split(text)
+        for i, sentence in enumerate(_SENTENCE_END.split(lowered)):
+            start = lowered.find(sentence, offset)
+            end = start + len(sentence)
+            offset = end
+            if any(start <= pos < end for pos in ambiguous_at):
+                result.ambiguous_spans.append(originals[i].strip())
+        result.verdict = "ambiguous"
+    elif result.flagged:
+        result.verdict = "flagged"
+    return result
@@ -0,0 +1,26 @@
+# app/services/persistence.py
+from app.db.repository import MeetingRepository
+from app.db.session import SessionLocal
+from app.services.search import index_analysis
+
+
+def persist_analysis(title: str, data: dict) -> str:
+    """
+    Stores an /analyze result (analyze_response() payload) as a new meeting
+    and indexes it for search. Blocking; returns the meeting id.
+    """
+    db = SessionLocal()
+    try:
+        repo = MeetingRepository(db)
+        meeting = repo.create_meeting(title or "Untitled", "upload")
+        repo.save_analyze_result(meeting.id, data)
+    finally:
+        db.close()
+    index_analysis(
+        meeting.id,
+        title=meeting.title,
+        transcript=data.get("transcript_en") or data.get("transcript_native") or "",
+        summary=data.get("summary_en") or "",
+        actions=(data.get("actions") or {}).get("actions") or [],
+    )
+    return meeting.id
@@ -0,0 +1,297 @@
+# app/services/pipeline.py
+"""
+Small dependency-graph runner for multi-stage analyses.
+
+Each stage names the stages it depends on and starts as soon as those have
+finished, so independent stages run concurrently. Plain functions are run on
+a bounded, shared thread pool; coroutine functions are awaited directly.
+Stage results are written back into the context dict under the stage name.
+"""
+import asyncio
+import contextvars
+import inspect
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.config import get_settings
+from app.core.metrics import PIPELINE_STAGES
+from app.core.logger import logger
+from app.services.async_groq_service import (
+    analyze_text,
+    transcribe_audio,
+    translate_text,
+    summarize_text_en,
+    summarize_text_native,
+    moderate_text,
+    detect_actions,
+    stream_summary_en,
+    stream_translate_text,
+)
+from app.services.groq_service import _clean_translation
+from app.services.scheduler import SchedulerBusy
+
+Emit = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+_EXECUTOR: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(
+            max_workers=get_settings().PIPELINE_MAX_WORKERS, thread_name_prefix="pipeline"
+        )
+    return _EXECUTOR
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    deps: Tuple[str, ...] = ()
+
+
+class Pipeline:
+    def __init__(self, stages: Iterable[Stage], executor: Optional[ThreadPoolExecutor] = None):
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage: {stage.name}")
+            self.stages[stage.name] = stage
+        self.order = self._toposort()
+        self._executor = executor
+
+    def _toposort(self) -> List[str]:
+        order: List[str] = []
+        state: Dict[str, int] = {}  # 1 = visiting, 2 = done
+
+        def visit(name: str, path: Tuple[str, ...]) -> None:
+            if state.get(name) == 2:
+                return
+            if state.get(name) == 1:
+                raise ValueError(f"Cycle in pipeline: {' -> '.join(path + (name,))}")
+            if name not in self.stages:
+                raise ValueError(f"Unknown dependency: {name}")
+            state[name] = 1
+            for dep in self.stages[name].deps:
+                visit(dep, path + (name,))
+            state[name] = 2
+            order.append(name)
+
+        for name in self.stages:
+            visit(name, ())
+        return order
+
+    async def _call(self, stage: Stage, ctx: Dict[str, Any]) -> Any:
+        if inspect.iscoroutinefunction(stage.fn):
+            return await stage.fn(ctx)
+        loop = asyncio.get_running_loop()
+        executor = self._executor or get_executor()
+        # copy the context so contextvars (priority, request id, ...) reach the worker thread
+        return await loop.run_in_executor(executor, contextvars.copy_context().run, stage.fn, ctx)
+
+    async def run(
+        self,
+        ctx: Dict[str, Any],
+        on_stage: Optional[Callable[[str, Any], Awaitable[None]]] = None,
+        skip: Iterable[str] = (),
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Runs every stage, each as soon as its dependencies are done.
+        `on_stage(name, result)` is awaited as each stage finishes.
+        Stages named in `skip` already have their result in ctx (e.g.
+        restored from a checkpoint) and are not run again.
+        Returns (ctx, timings); timings holds per-stage start offsets and
+        durations in milliseconds plus the total wall time.
+        """
+        skip = {name for name in skip if name in ctx}
+        t0 = time.perf_counter()
+        stage_timings: Dict[str, Dict[str, float]] = {}
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def run_stage(stage: Stage) -> None:
+            if stage.deps:
+                await asyncio.gather(*(tasks[d] for d in stage.deps))
+            if stage.name in skip:
+                stage_timings[stage.name] = {"start_ms": 0.0, "duration_ms": 0.0, "resumed": True}
+                return
+            started = time.perf_counter()
+            ctx[stage.name] = await self._call(stage, ctx)
+            duration = time.perf_counter() - started
+            PIPELINE_STAGES.observe(duration, stage=stage.name)
+            stage_timings[stage.name] = {
+                "start_ms": round((started - t0) * 1000, 1),
+                "duration_ms": round(duration * 1000, 1),
+            }
+            if on_stage is not None:
+                await on_stage(stage.name, ctx[stage.name])
+
+        for name in self.order:
+            tasks[name] = asyncio.ensure_future(run_stage(self.stages[name]))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+
+        timings = {
+            "total_ms": round((time.perf_counter() - t0) * 1000, 1),
+            "stages": {name: stage_timings[name] for name in self.order},
+        }
+        return ctx, timings
+
+
+# ---------------- /analyze stage graph ----------------
+# transcription → translation → {summary_en, moderation, actions} → summary_native
+# English meetings skip both translations: translate_text() hands back text
+# already in the target language without a model call.
+# In combined mode one "analysis" stage produces summary_en, moderation and
+# actions, and those three stages just hand out its parts.
+
+async def _transcribe(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return await transcribe_audio(ctx["audio_path"], digest=ctx.get("audio_digest"))
+
+
+async def _translate(ctx: Dict[str, Any]) -> str:
+    transcription = ctx["transcription"]
+    return await translate_text(
+        transcription.get("transcript_native", ""), transcription.get("language_name", "Unknown")
+    )
+
+
+async def _summary_en(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return await summarize_text_en(ctx["transcript_en"])
+
+
+async def _summary_native(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return await summarize_text_native(
+        ctx["summary_en"].get("summary_en", ""), ctx["transcription"].get("language_name", "Unknown")
+    )
+
+
+async def _moderation(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return await moderate_text(ctx["transcript_en"])
+
+
+async def _actions(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return await detect_actions(ctx["transcript_en"])
+
+
+async def _analysis(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    return await analyze_text(ctx["transcript_en"])
+
+
+def _part_of_analysis(name: str):
+    async def stage(ctx: Dict[str, Any]) -> Dict[str, Any]:
+        analysis = ctx["analysis"]
+        return analysis[name] if name in analysis else {"error": analysis.get("error", "Analysis failed.")}
+    return stage
+
+
+def _streamed_summary_en(emit: Emit):
+    async def stage(ctx: Dict[str, Any]) -> Dict[str, Any]:
+        text = ctx["transcript_en"]
+        if not text.strip():
+            return await summarize_text_en(text)
+        try:
+            parts = []
+            async for delta in stream_summary_en(text):
+                parts.append(delta)
+                await emit("summary_en.delta", {"text": delta})
+            return {"summary_en": "".join(parts).strip()}
+        except SchedulerBusy:
+            raise
+        except Exception as e:
+            logger.error(f"Summarization failed: {e}")
+            return {"error": str(e)}
+    return stage
+
+
+def _streamed_summary_native(emit: Emit):
+    async def stage(ctx: Dict[str, Any]) -> Dict[str, Any]:
+        summary_en = ctx["summary_en"].get("summary_en", "")
+        language_name = ctx["transcription"].get("language_name", "Unknown")
+        try:
+            parts = []
+            async for delta in stream_translate_text(summary_en, "English", language_name):
+                parts.append(delta)
+                await emit("summary_native.delta", {"text": delta})
+            return {"summary_native": _clean_translation("".join(parts).strip())}
+        except SchedulerBusy:
+            raise
+        except Exception as e:
+            logger.error(f"Native summary translation failed: {e}")
+            return {"summary_native": ""}
+    return stage
+
+
+def analyze_pipeline(emit: Optional[Emit] = None, mode: Optional[str] = None) -> Pipeline:
+    """
+    The /analyze stage graph; `mode` defaults to ANALYZE_MODE. With `emit`,
+    the summaries stream their tokens as `summary_en.delta` /
+    `summary_native.delta` events (summary_en only in separate mode: in
+    combined mode it arrives whole with the rest of the analysis).
+    """
+    summary_native = _streamed_summary_native(emit) if emit else _summary_native
+    if (mode or get_settings().ANALYZE_MODE) == "combined":
+        return Pipeline([
+            Stage("transcription", _transcribe),
+            Stage("transcript_en", _translate, ("transcription",)),
+            Stage("analysis", _analysis, ("transcript_en",)),
+            Stage("summary_en", _part_of_analysis("summary_en"), ("analysis",)),
+            Stage("moderation", _part_of_analysis("moderation"), ("analysis",)),
+            Stage("actions", _part_of_analysis("actions"), ("analysis",)),
+            Stage("summary_native", summary_native, ("summary_en", "transcription")),
+        ])
+
+    summary_en = _streamed_summary_en(emit) if emit else _summary_en
+    return Pipeline([
+        Stage("transcription", _transcribe),
+        Stage("transcript_en", _translate, ("transcription",)),
+        Stage("summary_en", summary_en, ("transcript_en",)),
+        Stage("moderation", _moderation, ("transcript_en",)),
+        Stage("actions", _actions, ("transcript_en",)),
+        Stage("summary_native", summary_native, ("summary_en", "transcription")),
+    ])
+
+
+def stage_events(name: str, result: Any) -> List[Tuple[str, Dict[str, Any]]]:
+    """
+    Maps a finished /analyze stage to the events pushed by /analyze/stream.
+    """
+    if name == "transcription":
+        result = result or {}
+        if "error" in result:
+            return [("error", {"stage": name, "message": result["error"]})]
+        return [
+            ("language", {"language_code": result.get("language_code", ""),
+                          "language_name": result.get("language_name", "Unknown")}),
+            ("transcript_native", {"text": result.get("transcript_native", "")}),
+        ]
+    if name == "transcript_en":
+        return [("transcript_en", {"text": result or ""})]
+    if name == "analysis":
+        return []  # reported through the summary_en / moderation / actions stages
+    if name in ("summary_en", "summary_native"):
+        return [(name, {"text": (result or {}).get(name, "")})]
+    return [(name, {"data": result})]
+
+
+def analyze_response(ctx: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shapes the results of analyze_pipeline() into the /analyze `data` payload.
+    """
+    transcription = ctx.get("transcription") or {}
+    return {
+        "language_code": transcription.get("language_code", ""),
+        "language_name": transcription.get("language_name", "Unknown"),
+        "transcript_native": transcription.get("transcript_native", ""),
+        "transcript_en": ctx.get("transcript_en", ""),
+        "summary_native": (ctx.get("summary_native") or {}).get("summary_native", ""),
+        "summary_en": (ctx.get("summary_en") or {}).get("summary_en", ""),
+        "moderation": ctx.get("moderation"),
+        "actions": ctx.get("actions"),
+    }
@@ -0,0 +1,163 @@
+# app/services/preprocess.py
+"""
+Audio preprocessing before Whisper.
+
+Recordings are decoded to 16 kHz mono (what Whisper resamples everything
+to anyway), and long silences found by a vectorized energy VAD are cut
+down to a short pause, so neither the upload nor Whisper's audio-seconds
+pay for dead air. The result is re-encoded as FLAC (WAV without ffmpeg)
+and only sent when it beats the original file; otherwise the upload goes
+out untouched.
+
+An OffsetMap records which stretches of the original were kept, so
+segment timestamps from the shortened audio still refer to the recording.
+"""
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import get_settings
+from app.services.audio import FRAME_MS, Audio, decode_bytes, encode_flac, encode_wav, frame_energy, load_audio
+
+# noise floor = this percentile of frame energies; a frame is speech when it
+# is SPEECH_RATIO above the floor (capped at half the level of the loudest
+# frames, so a noisy recording is never trimmed as a whole) and above MIN_SPEECH_RMS
+NOISE_PERCENTILE = 10
+SPEECH_RATIO = 2.5
+MIN_SPEECH_RMS = 200.0
+HANGOVER_MS = 240  # speech padding on both sides, keeps soft word onsets/endings
+
+# a preprocessed file is sent when it is smaller than the original or at
+# least this much shorter
+MIN_SAVING = 0.1
+
+
+class OffsetMap:
+    """
+    Kept spans as (start in the processed audio, start in the original,
+    length), in seconds and in order.
+    """
+
+    def __init__(self, spans: List[Tuple[float, float, float]]):
+        self.spans = spans
+        self._starts = np.array([s[0] for s in spans], dtype=np.float64)
+
+    @classmethod
+    def identity(cls, duration: float) -> "OffsetMap":
+        return cls([(0.0, 0.0, duration)])
+
+    def to_original(self, t: float) -> float:
+        if not self.spans:
+            return t
+        i = max(0, int(np.searchsorted(self._starts, t, side="right")) - 1)
+        start, original, length = self.spans[i]
+        return original + min(max(0.0, t - start), length)
+
+    def map_segments(self, segments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [
+            {**seg, "start": round(self.to_original(float(seg.get("start", 0.0))), 2),
+             "end": round(self.to_original(float(seg.get("end", 0.0))), 2)}
+            for seg in segments
+        ]
+
+
+@dataclass
+class Prepared:
+    audio: Audio  # 16 kHz mono, long silences collapsed
+    offsets: OffsetMap
+    original_seconds: float
+
+    @property
+    def removed_seconds(self) -> float:
+        return self.original_seconds - self.audio.duration
+
+    def payload(self, original_bytes: int, name: str = "audio") -> Optional[Tuple[bytes, str]]:
+        """
+        (data, filename) to send instead of the original, or None when the
+        original is already as small and no longer.
+        """
+        data, ext = encode_flac(self.audio.samples), "flac"
+        if data is None:
+            data, ext = encode_wav(self.audio.samples), "wav"
+        if len(data) < original_bytes or self.removed_seconds >= MIN_SAVING * self.original_seconds:
+            return data, f"{os.path.splitext(name)[0] or 'audio'}.{ext}"
+        return None
+
+
+def speech_mask(energy: np.ndarray, hangover_frames: int) -> np.ndarray:
+    """
+    Voiced frames, each widened by `hangover_frames` on both sides.
+    """
+    if len(energy) == 0:
+        return np.zeros(0, dtype=bool)
+    floor = float(np.percentile(energy, NOISE_PERCENTILE))
+    loud = float(np.percentile(energy, 99))
+    threshold = max(MIN_SPEECH_RMS, min(floor * SPEECH_RATIO, loud / 2))
+    voiced = energy > threshold
+    if hangover_frames:
+        voiced = np.convolve(voiced, np.ones(2 * hangover_frames + 1), mode="same") > 0
+    return voiced
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """(starts, ends) of the runs of True in `mask`."""
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    return edges[0::2], edges[1::2]
+
+
+def collapse_silence(audio: Audio, max_silence_ms: int = 1000, keep_silence_ms: int = 400) -> Prepared:
+    """
+    Shortens every silence longer than `max_silence_ms` to `keep_silence_ms`
+    (half kept after the speech before it, half before the speech after
+    it); leading and trailing silence keep half of that. Audio with no
+    speech at all is returned as it is.
+    """
+    frame = max(1, audio.sample_rate * FRAME_MS // 1000)
+    speech = speech_mask(frame_energy(audio.samples, audio.sample_rate), HANGOVER_MS // FRAME_MS)
+    duration = audio.duration
+    if not speech.any():
+        return Prepared(audio, OffsetMap.identity(duration), duration)
+
+    keep = speech.copy()
+    half = max(0, keep_silence_ms // FRAME_MS // 2)
+    longest = max(1, max_silence_ms // FRAME_MS)
+    starts, ends = _runs(~speech)
+    for start, end in zip(starts, ends):
+        if start > 0 and end < len(speech) and end - start <= longest:
+            keep[start:end] = True  # a pause inside speech
+            continue
+        if start > 0:
+            keep[start:start + half] = True  # after the speech before it
+        if end < len(speech):
+            keep[max(start, end - half):end] = True  # before the speech after it
+
+    spans: List[Tuple[float, float, float]] = []
+    pieces = []
+    position = 0
+    rate = audio.sample_rate
+    for start, end in zip(*_runs(keep)):
+        lo = start * frame
+        hi = len(audio.samples) if end == len(keep) else end * frame  # the tail shorter than a frame
+        pieces.append(audio.samples[lo:hi])
+        spans.append((position / rate, lo / rate, (hi - lo) / rate))
+        position += hi - lo
+    samples = np.concatenate(pieces) if pieces else audio.samples[:0]
+    return Prepared(Audio(samples, rate), OffsetMap(spans), duration)
+
+
+def preprocess(audio: Audio) -> Prepared:
+    settings = get_settings()
+    return collapse_silence(audio, settings.AUDIO_MAX_SILENCE_MS, settings.AUDIO_KEEP_SILENCE_MS)
+
+
+def prepare_file(path: str) -> Optional[Prepared]:
+    """None when the file cannot be decoded here."""
+    audio = load_audio(path)
+    return None if audio is None else preprocess(audio)
+
+
+def prepare_bytes(data: bytes) -> Optional[Prepared]:
+    audio = decode_bytes(data)
+    return None if audio is None else preprocess(audio)
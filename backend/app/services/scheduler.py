@@ -0,0 +1,395 @@
+# app/services/scheduler.py
+"""
+Admission control for outbound model calls: per-model token buckets,
+priority queues (LIVE > INTERACTIVE > BATCH) bounded by SchedulerBusy,
+and retries with jittered backoff that honour Retry-After.
+"""
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import math
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, TypeVar
+
+from app.config import get_settings
+from app.core.logger import logger
+from app.core.metrics import observe_model_call
+from app.utils.singleton import Singleton
+
+T = TypeVar("T")
+
+LIVE, INTERACTIVE, BATCH = 0, 1, 2
+PRIORITY_NAMES = {LIVE: "live", INTERACTIVE: "interactive", BATCH: "batch"}
+
+_PRIORITY: contextvars.ContextVar[int] = contextvars.ContextVar("model_call_priority", default=INTERACTIVE)
+_FAIL_FAST: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("model_call_fail_fast", default=None)
+_POLL_SECONDS = 0.02
+_RETRY_STATUS = {408, 409, 429}
+
+
+class SchedulerBusy(Exception):
+    def __init__(self, model: str, retry_after: float, reason: str):
+        super().__init__(f"{model}: {reason}; retry in {retry_after:.0f}s")
+        self.model = model
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+@contextlib.contextmanager
+def priority(level: int) -> Iterator[None]:
+    """
+    Model calls made inside the block (including from threads started with
+    a copied context) are queued at `level`.
+    """
+    token = _PRIORITY.set(level)
+    try:
+        yield
+    finally:
+        _PRIORITY.reset(token)
+
+
+def current_priority() -> int:
+    return _PRIORITY.get()
+
+
+@contextlib.contextmanager
+def fail_fast(seconds: float) -> Iterator[None]:
+    """
+    Model calls made inside the block are tried once and raise SchedulerBusy
+    rather than queue for longer than `seconds`; callers use current_fail_fast()
+    to give the request itself the same timeout.
+    """
+    token = _FAIL_FAST.set(seconds)
+    try:
+        yield
+    finally:
+        _FAIL_FAST.reset(token)
+
+
+def current_fail_fast() -> Optional[float]:
+    return _FAIL_FAST.get()
+
+
+class TokenBucket:
+    """
+    `rate` units per second, holding at most `capacity`. A rate of 0 means unlimited.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        if self.rate:
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_for(self, amount: float, now: float, capped: bool = True) -> float:
+        """Seconds until `amount` is available (0 when it is now)."""
+        if not self.rate:
+            return 0.0
+        self._refill(now)
+        if capped:
+            amount = min(amount, self.capacity)  # oversized calls wait for a full bucket, never forever
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        if self.rate:
+            self.level -= min(amount, self.capacity)
+
+
+class _Ticket:
+    __slots__ = ("priority", "seq", "tokens", "created", "cancelled")
+
+    def __init__(self, priority: int, seq: int, tokens: int, created: float):
+        self.priority = priority
+        self.seq = seq
+        self.tokens = tokens
+        self.created = created
+        self.cancelled = False
+
+    def __lt__(self, other: "_Ticket") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class ModelLimiter:
+    def __init__(self, model: str, rpm: float = 0, tpm: float = 0, max_queue: int = 64):
+        self.model = model
+        self.requests = TokenBucket(rpm / 60.0, max(1.0, rpm / 6.0))   # bursts of up to 10s worth
+        self.tokens = TokenBucket(tpm / 60.0, max(1.0, tpm / 6.0))
+        self.max_queue = max_queue
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+        self._heap: List[_Ticket] = []
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.rejected = 0
+        self.wait_seconds = 0.0
+
+    def _estimate_wait(self, ticket: _Ticket, now: float) -> float:
+        ahead = [t for t in self._heap if not t.cancelled and t < ticket]
+        # each call is charged as try_admit/take charge it: at most one full bucket
+        tokens = sum(min(t.tokens, self.tokens.capacity) for t in [*ahead, ticket])
+        wait = max(
+            self.requests.wait_for(len(ahead) + 1, now, capped=False),
+            self.tokens.wait_for(tokens, now, capped=False),
+        )
+        return max(wait, self.paused_until - now)
+
+    def enqueue(self, tokens: int, max_wait: float) -> _Ticket:
+        with self._lock:
+            now = time.monotonic()
+            ticket = _Ticket(current_priority(), next(self._seq), tokens, now)
+            queued = sum(1 for t in self._heap if not t.cancelled)
+            estimate = self._estimate_wait(ticket, now)
+            if queued >= self.max_queue or estimate > max_wait:
+                self.rejected += 1
+                reason = "queue full" if queued >= self.max_queue else "rate limit budget exhausted"
+                raise SchedulerBusy(self.model, max(1.0, math.ceil(estimate)), reason)
+            heapq.heappush(self._heap, ticket)
+            return ticket
+
+    def try_admit(self, ticket: _Ticket) -> float:
+        """0 when `ticket` may go now, else seconds to wait before asking again."""
+        with self._lock:
+            now = time.monotonic()
+            while self._heap and self._heap[0].cancelled:
+                heapq.heappop(self._heap)
+            if now < self.paused_until:
+                return self.paused_until - now
+            if self._heap[0] is not ticket:
+                return _POLL_SECONDS
+            wait = max(self.requests.wait_for(1, now), self.tokens.wait_for(ticket.tokens, now))
+            if wait > 0:
+                return wait
+            self.requests.take(1)
+            self.tokens.take(ticket.tokens)
+            heapq.heappop(self._heap)
+            self.admitted += 1
+            self.wait_seconds += now - ticket.created
+            return 0.0
+
+    def cancel(self, ticket: _Ticket) -> None:
+        with self._lock:
+            ticket.cancelled = True
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            waiting: Dict[str, int] = {}
+            for t in self._heap:
+                if not t.cancelled:
+                    name = PRIORITY_NAMES.get(t.priority, str(t.priority))
+                    waiting[name] = waiting.get(name, 0) + 1
+            return {
+                "waiting": waiting,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(self.wait_seconds / self.admitted * 1000, 2) if self.admitted else 0.0,
+                "paused_for_s": round(max(0.0, self.paused_until - time.monotonic()), 2),
+            }
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    return getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass  # HTTP-date form: fall back to our own backoff
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    try:
+        from groq import APIConnectionError
+        if isinstance(error, APIConnectionError):
+            return True
+    except ImportError:
+        pass
+    status = _status_code(error)
+    return status is not None and (status in _RETRY_STATUS or status >= 500)
+
+
+class Scheduler:
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Dict[str, float]]] = None,
+        max_queue: int = 64,
+        max_wait: Optional[Dict[str, float]] = None,
+        retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+    ):
+        self.limits = limits or {}
+        self.max_queue = max_queue
+        self.max_wait = max_wait or {}
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._limiters: Dict[str, ModelLimiter] = {}
+        self._lock = threading.Lock()
+        self.retried = 0
+
+    def limiter(self, model: str) -> ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            with self._lock:
+                limiter = self._limiters.get(model)
+                if limiter is None:
+                    cfg = self.limits.get(model, {})
+                    limiter = self._limiters[model] = ModelLimiter(
+                        model, rpm=cfg.get("rpm", 0), tpm=cfg.get("tpm", 0), max_queue=self.max_queue
+                    )
+        return limiter
+
+    def _max_wait(self) -> float:
+        wait = self.max_wait.get(PRIORITY_NAMES[current_priority()], 60.0)
+        budget = current_fail_fast()
+        return wait if budget is None else min(wait, budget)
+
+    def _retries(self) -> int:
+        return self.retries if current_fail_fast() is None else 0
+
+    def _backoff(self, attempt: int, error: BaseException, limiter: ModelLimiter) -> float:
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        hinted = _retry_after(error)
+        if hinted is not None:
+            delay = max(delay, hinted)
+            if _status_code(error) == 429:
+                limiter.pause(hinted)  # everyone waiting on this model backs off, not just us
+        return delay
+
+    def _rate_limited(self, model: str, error: BaseException, limiter: ModelLimiter) -> SchedulerBusy:
+        hinted = _retry_after(error)
+        if hinted is not None:
+            limiter.pause(hinted)  # later calls skip the upstream round trip until it has passed
+        return SchedulerBusy(model, hinted or self.backoff_max, "rate limited upstream")
+
+    # ---------- blocking ----------
+    def _acquire(self, limiter: ModelLimiter, tokens: int) -> None:
+        ticket = limiter.enqueue(tokens, self._max_wait())
+        try:
+            while True:
+                wait = limiter.try_admit(ticket)
+                if wait == 0:
+                    break
+                time.sleep(min(wait, 1.0))
+        except BaseException:
+            limiter.cancel(ticket)
+            raise
+
+    def call(self, model: str, fn: Callable[[], T], tokens: int = 0) -> T:
+        limiter = self.limiter(model)
+        for attempt in itertools.count():
+            queued = time.perf_counter()
+            self._acquire(limiter, tokens)
+            started = time.perf_counter()
+            try:
+                result = fn()
+                observe_model_call(model, started - queued, time.perf_counter() - started, result)
+                return result
+            except Exception as e:
+                observe_model_call(model, started - queued, time.perf_counter() - started, failed=True)
+                if attempt >= self._retries() or not is_retryable(e):
+                    if _status_code(e) == 429:
+                        raise self._rate_limited(model, e, limiter) from e
+                    raise
+                self.retried += 1
+                delay = self._backoff(attempt, e, limiter)
+                logger.warning(f"{model} call failed ({e}); retry {attempt + 1} in {delay:.1f}s")
+                time.sleep(delay)
+        raise AssertionError("unreachable")
+
+    # ---------- async ----------
+    async def _aacquire(self, limiter: ModelLimiter, tokens: int) -> None:
+        ticket = limiter.enqueue(tokens, self._max_wait())
+        try:
+            while True:
+                wait = limiter.try_admit(ticket)
+                if wait == 0:
+                    break
+                await asyncio.sleep(min(wait, 1.0))
+        except BaseException:
+            limiter.cancel(ticket)
+            raise
+
+    async def acall(self, model: str, fn: Callable[[], Awaitable[T]], tokens: int = 0) -> T:
+        limiter = self.limiter(model)
+        for attempt in itertools.count():
+            queued = time.perf_counter()
+            await self._aacquire(limiter, tokens)
+            started = time.perf_counter()
+            try:
+                result = await fn()
+                observe_model_call(model, started - queued, time.perf_counter() - started, result)
+                return result
+            except Exception as e:
+                observe_model_call(model, started - queued, time.perf_counter() - started, failed=True)
+                if attempt >= self._retries() or not is_retryable(e):
+                    if _status_code(e) == 429:
+                        raise self._rate_limited(model, e, limiter) from e
+                    raise
+                self.retried += 1
+                delay = self._backoff(attempt, e, limiter)
+                logger.warning(f"{model} call failed ({e}); retry {attempt + 1} in {delay:.1f}s")
+                await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "retried": self.retried,
+            "models": {name: limiter.stats() for name, limiter in list(self._limiters.items())},
+        }
+
+
+def _process_limits(limits: Dict[str, Dict[str, float]], share: float) -> Dict[str, Dict[str, float]]:
+    # buckets live in this process: it may only spend its share of the account's budget
+    return {model: {name: value * share for name, value in cfg.items()} for model, cfg in limits.items()}
+
+
+def _build_scheduler() -> Scheduler:
+    settings = get_settings()
+    return Scheduler(
+        limits=(_process_limits(settings.SCHEDULER_LIMITS, settings.SCHEDULER_LIMIT_SHARE)
+                if settings.SCHEDULER_ENABLED else {}),
+        max_queue=settings.SCHEDULER_MAX_QUEUE if settings.SCHEDULER_ENABLED else 1 << 30,
+        max_wait=settings.SCHEDULER_MAX_WAIT_SECONDS,
+        retries=settings.SCHEDULER_RETRIES,
+        backoff_base=settings.SCHEDULER_BACKOFF_BASE_SECONDS,
+        backoff_max=settings.SCHEDULER_BACKOFF_MAX_SECONDS,
+    )
+
+
+_SCHEDULER = Singleton(_build_scheduler)
+
+
+def get_scheduler() -> Scheduler:
+    """
+    Process-wide scheduler built from settings. With SCHEDULER_ENABLED off
+    calls still retry but are not rate limited or queued. Limits are per
+    process: this one gets SCHEDULER_LIMIT_SHARE of SCHEDULER_LIMITS.
+    """
+    return _SCHEDULER.get()
+
+
+def set_scheduler(scheduler: Optional[Scheduler]) -> Optional[Scheduler]:
+    """
+    Replaces the process-wide scheduler (None resets it); returns the previous one.
+    """
+    return _SCHEDULER.set(scheduler)
@@ -0,0 +1,181 @@
+# app/services/search.py
+"""
+Full-text search over meeting transcripts, summaries and action items.
+
+Backed by an SQLite FTS5 table (an inverted index with BM25 ranking and
+snippet extraction built in) in its own file, so it works whatever database
+holds the meetings. Documents are added as results are produced: a
+summary replaces the previous one for its meeting, transcripts and actions
+are appended. Reads use one connection per thread (WAL lets them run
+while a write is in progress); writes are serialized.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from app.config import get_settings
+from app.core.logger import logger
+from app.utils.singleton import Singleton
+
+KINDS = ("transcript", "summary", "action")
+# bm25() weights per column: meeting_id, kind, created_at (unindexed), title, body
+_BM25 = "bm25(docs, 0, 0, 0, 4.0, 1.0)"
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def to_match_query(text: str, any_term: bool = False) -> str:
+    """
+    Turns free text into a safe FTS5 query: every word quoted (so
+    punctuation and FTS operators in user input are literal), all words
+    required unless any_term.
+    """
+    terms = [f'"{t}"' for t in _TOKEN.findall(text.lower())]
+    return (" OR " if any_term else " ").join(terms)
+
+
+class SearchIndex:
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._writer = self._connect()
+        self._writer.executescript(
+            """
+            CREATE VIRTUAL TABLE IF NOT EXISTS docs USING fts5(
+                meeting_id UNINDEXED, kind UNINDEXED, created_at UNINDEXED, title, body,
+                tokenize = 'porter unicode61 remove_diacritics 2'
+            );
+            """
+        )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        if self.path != ":memory:":
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        if self.path == ":memory:":
+            return self._writer  # an in-memory index exists on one connection only
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+        return conn
+
+    # ---------- writes ----------
+    def add(self, meeting_id: str, kind: str, body: str, title: str = "", replace: bool = False) -> None:
+        self.add_many(meeting_id, kind, [body], title=title, replace=replace)
+
+    def add_many(self, meeting_id: str, kind: str, bodies: Iterable[str], title: str = "",
+                 replace: bool = False) -> None:
+        """
+        Indexes several documents of one kind in one transaction.
+        `replace` first drops the meeting's existing documents of that kind.
+        """
+        rows = [(meeting_id, kind, time.time(), title, b) for b in bodies if b and b.strip()]
+        if not rows and not replace:
+            return
+        with self._write_lock:
+            self._writer.execute("BEGIN")
+            try:
+                if replace:
+                    self._writer.execute("DELETE FROM docs WHERE meeting_id = ? AND kind = ?", (meeting_id, kind))
+                self._writer.executemany(
+                    "INSERT INTO docs (meeting_id, kind, created_at, title, body) VALUES (?, ?, ?, ?, ?)", rows
+                )
+                self._writer.execute("COMMIT")
+            except BaseException:
+                self._writer.execute("ROLLBACK")
+                raise
+
+    def index_analysis(self, meeting_id: str, title: str = "", transcript: str = "", summary: str = "",
+                       actions: Iterable[Dict[str, Any]] = ()) -> None:
+        """
+        Indexes what one analysis produced for a meeting.
+        Actions may be {"assignee","text"} (GroqClient) or {"title","owner"} (detect_actions).
+        """
+        if transcript:
+            self.add(meeting_id, "transcript", transcript, title=title)
+        if summary:
+            self.add(meeting_id, "summary", summary, title=title, replace=True)
+        lines = []
+        for a in actions or []:
+            if not isinstance(a, dict):
+                continue
+            owner = a.get("assignee") or a.get("owner") or ""
+            text = a.get("text") or a.get("title") or ""
+            if text:
+                lines.append(f"{owner}: {text}" if owner else text)
+        self.add_many(meeting_id, "action", lines, title=title)
+
+    def delete_meeting(self, meeting_id: str) -> None:
+        with self._write_lock:
+            self._writer.execute("DELETE FROM docs WHERE meeting_id = ?", (meeting_id,))
+
+    # ---------- reads ----------
+    def search(self, query: str, meeting_ids: Optional[List[str]] = None, kinds: Optional[List[str]] = None,
+               limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        BM25-ranked hits (best first) with a highlighted snippet. When no
+        document has every word, falls back to matching any of them.
+        """
+        for any_term in (False, True):
+            match = to_match_query(query, any_term=any_term)
+            if not match:
+                return []
+            sql = (
+                f"SELECT meeting_id, kind, title, snippet(docs, 4, '[', ']', '…', 16), {_BM25} AS score, created_at "
+                "FROM docs WHERE docs MATCH ?"
+            )
+            params: List[Any] = [match]
+            if meeting_ids:
+                sql += f" AND meeting_id IN ({','.join('?' * len(meeting_ids))})"
+                params.extend(meeting_ids)
+            if kinds:
+                sql += f" AND kind IN ({','.join('?' * len(kinds))})"
+                params.extend(kinds)
+            sql += " ORDER BY score LIMIT ?"
+            params.append(limit)
+            rows = self._reader().execute(sql, params).fetchall()
+            if rows or len(match.split()) < 2:
+                break
+        return [
+            {"meeting_id": r[0], "kind": r[1], "title": r[2], "snippet": r[3], "score": round(-r[4], 4),
+             "indexed_at": r[5]}
+            for r in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        rows = self._reader().execute("SELECT kind, COUNT(*) FROM docs GROUP BY kind").fetchall()
+        return {"documents": dict(rows), "path": self.path}
+
+
+_INDEX = Singleton(lambda: SearchIndex(get_settings().SEARCH_INDEX_PATH))
+
+
+def get_search_index() -> Optional[SearchIndex]:
+    """
+    Process-wide index built from settings; None when SEARCH_ENABLED is off.
+    """
+    if not get_settings().SEARCH_ENABLED:
+        return None
+    return _INDEX.get()
+
+
+def index_analysis(meeting_id: str, **kwargs: Any) -> None:
+    """
+    Best-effort indexing: a search failure never fails the request that produced the data.
+    """
+    index = get_search_index()
+    if index is None:
+        return
+    try:
+        index.index_analysis(meeting_id, **kwargs)
+    except Exception as e:
+        logger.error(f"Search indexing failed: {e}")
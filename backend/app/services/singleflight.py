@@ -0,0 +1,145 @@
+# app/services/singleflight.py
+"""
+Request coalescing ("single flight"): concurrent calls with the same key
+share one execution and its result; nothing is kept once it finishes.
+Threads (do) and coroutines (ado) coalesce with each other.
+"""
+import asyncio
+import concurrent.futures
+import copy
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+from app.config import get_settings
+from app.utils.singleton import Singleton
+
+T = TypeVar("T")
+
+
+class _LeaderGone(Exception):
+    """The caller running the work was cancelled; a waiter takes over."""
+
+
+class _Call:
+    __slots__ = ("future", "waiters")
+
+    def __init__(self):
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[str, str], _Call] = {}
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, name: str, outcome: str) -> None:
+        counts = self._counts.setdefault(name, {"executed": 0, "coalesced": 0, "takeovers": 0})
+        counts[outcome] += 1
+
+    def _join(self, name: str, key: str) -> Tuple[_Call, bool]:
+        """(call, True) if the caller has to run the work, (call, False) if it waits."""
+        with self._lock:
+            call = self._calls.get((name, key))
+            if call is not None:
+                call.waiters += 1
+                self._count(name, "coalesced")
+                return call, False
+            call = self._calls[(name, key)] = _Call()
+            self._count(name, "executed")
+            return call, True
+
+    def _leave(self, call: _Call) -> None:
+        with self._lock:
+            call.waiters -= 1
+
+    def _settle(self, name: str, key: str, call: _Call, result: Any = None,
+                error: Optional[BaseException] = None) -> None:
+        with self._lock:
+            if self._calls.get((name, key)) is call:
+                del self._calls[(name, key)]
+            if isinstance(error, _LeaderGone) and call.waiters:
+                self._count(name, "takeovers")
+        if error is not None:
+            call.future.set_exception(error)
+        else:
+            call.future.set_result(result)
+
+    def do(self, name: str, key: str, fn: Callable[[], T]) -> T:
+        while True:
+            call, leader = self._join(name, key)
+            if not leader:
+                try:
+                    return _copy(call.future.result())
+                except _LeaderGone:
+                    continue
+                finally:
+                    self._leave(call)
+            try:
+                result = fn()
+            except BaseException as e:
+                self._settle(name, key, call, error=e)
+                raise
+            self._settle(name, key, call, result)
+            return result
+
+    async def ado(self, name: str, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+        while True:
+            call, leader = self._join(name, key)
+            if not leader:
+                try:
+                    # shield: a waiter going away must not cancel the shared future
+                    return _copy(await asyncio.shield(asyncio.wrap_future(call.future)))
+                except _LeaderGone:
+                    continue
+                finally:
+                    self._leave(call)
+            try:
+                result = await fn()
+            except asyncio.CancelledError:
+                self._settle(name, key, call, error=_LeaderGone())
+                raise
+            except BaseException as e:
+                self._settle(name, key, call, error=e)
+                raise
+            self._settle(name, key, call, result)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": len(self._calls),
+                "waiting": sum(call.waiters for call in self._calls.values()),
+                "calls": copy.deepcopy(self._counts),
+            }
+
+
+def _copy(result: T) -> T:
+    # waiters get their own copy, so a caller editing its result can't change another's
+    return copy.deepcopy(result)
+
+
+_SINGLEFLIGHT = Singleton(SingleFlight)
+
+
+def get_singleflight() -> SingleFlight:
+    return _SINGLEFLIGHT.get()
+
+
+def coalesce(name: str, key: str, fn: Callable[[], T]) -> T:
+    """
+    fn(), shared with every concurrent coalesce() of the same name and key.
+    """
+    if not get_settings().COALESCE_REQUESTS:
+        return fn()
+    return get_singleflight().do(name, key, fn)
+
+
+async def acoalesce(name: str, key: str, fn: Callable[[], Awaitable[T]]) -> T:
+    """
+    Async coalesce().
+    """
+    if not get_settings().COALESCE_REQUESTS:
+        return await fn()
+    return await get_singleflight().ado(name, key, fn)
@@ -0,0 +1,101 @@
+# app/services/warmup.py
+"""
+One-time per-process initialisation, run by the app lifespan when WARMUP
+is on so a worker's first request doesn't pay for it: the database engine
+(schema check, ORM mappers), the search index, the result cache, the scheduler
+and pipeline pool, and the language-ID tables. With WARMUP_GROQ the async
+client also opens its first API connection (TLS included).
+
+langdetect's profiles are deliberately not loaded: they cost ~60 MB per
+worker and are only needed for Latin text no word profile recognises.
+
+Every step is best-effort; a failing one is logged and reported with its
+error, and the worker starts anyway.
+"""
+import time
+from typing import Any, Callable, Dict
+
+import anyio
+
+from app.config import get_settings
+from app.core.logger import logger
+
+_LANGID_SAMPLE = "We agreed to ship the release on Friday. Hum kal meeting mein baat karenge."
+
+
+def _database() -> None:
+    from app.db.repository import MeetingRepository
+    from app.db.session import SessionLocal
+
+    # a real ORM query: it also configures the mappers and fills the SQL compile cache
+    db = SessionLocal()
+    try:
+        MeetingRepository(db).list_meetings(limit=1)
+    finally:
+        db.close()
+
+
+def _search() -> None:
+    from app.services.search import get_search_index
+
+    get_search_index()
+
+
+def _cache() -> None:
+    from app.services.cache import get_cache
+
+    get_cache()
+
+
+def _scheduler() -> None:
+    from app.services.pipeline import get_executor
+    from app.services.scheduler import get_scheduler
+
+    get_scheduler()
+    get_executor()
+
+
+def _language_id() -> None:
+    from app.services.langid import detect_language
+
+    detect_language(_LANGID_SAMPLE)
+
+
+STEPS: Dict[str, Callable[[], None]] = {
+    "database": _database,
+    "search": _search,
+    "cache": _cache,
+    "scheduler": _scheduler,
+    "language_id": _language_id,
+}
+
+
+async def _groq_connection() -> None:
+    from app.services.groq_clients import get_client_manager
+
+    manager = get_client_manager()
+    # any response will do: the point is the pooled keep-alive connection
+    await manager.ahttp.head(str(manager.agroq.base_url))
+
+
+async def warm_up() -> Dict[str, Any]:
+    """Runs the steps in order; returns {step: ms} (or {step: {"error": ...}})."""
+    report: Dict[str, Any] = {}
+
+    async def run(name: str, step: Callable[[], Any], is_async: bool = False) -> None:
+        started = time.perf_counter()
+        try:
+            if is_async:
+                await step()
+            else:
+                await anyio.to_thread.run_sync(step)
+            report[name] = round((time.perf_counter() - started) * 1000, 1)
+        except Exception as e:
+            logger.warning(f"Warm-up step {name} failed: {e}")
+            report[name] = {"error": str(e)}
+
+    for name, step in STEPS.items():
+        await run(name, step)
+    if get_settings().WARMUP_GROQ:
+        await run("groq", _groq_connection, is_async=True)
+    return report
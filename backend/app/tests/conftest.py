@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# route tests hit the meeting store: keep it (and uploads) out of the working tree
+_SCRATCH = tempfile.mkdtemp(prefix="meeting_monitor_tests_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_SCRATCH, 'meetings.db')}")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_SCRATCH, "uploads"))
+os.environ.setdefault("SEARCH_INDEX_PATH", os.path.join(_SCRATCH, "search.db"))
+os.environ.setdefault("LIVE_HUB_SQLITE_PATH", os.path.join(_SCRATCH, "live_events.db"))
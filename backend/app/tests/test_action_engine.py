@@ -0,0 +1,35 @@
+from app.services.action_engine import ActionEngine, extract_actions
+
+TRANSCRIPT = (
+    "Rahul will finish the frontend by EOD. Assign Ram to handle backend with Flask. "
+    "We need to finish the slides. I think we will ship it, and Ravi will test the build. "
+    "Action: update the roadmap."
+)
+
+
+def test_single_pass_covers_every_rule():
+    assert extract_actions(TRANSCRIPT) == [
+        {"assignee": "Rahul", "text": "finish the frontend by EOD"},
+        {"assignee": "Ram", "text": "handle backend with Flask"},
+        {"assignee": "Ravi", "text": "test the build"},
+        {"assignee": "", "text": "update the roadmap"},
+    ]
+
+
+def test_participants_index_filters_unknown_names():
+    actions = extract_actions(TRANSCRIPT, participants=["ram", "Ravi Kumar"])
+    assert [a["assignee"] for a in actions] == ["ram", "Ravi", ""]
+
+
+def test_feed_returns_only_new_actions():
+    engine = ActionEngine()
+    assert engine.feed("Sakshi to do integration.") == [{"assignee": "Sakshi", "text": "do integration"}]
+    assert engine.feed("sakshi to do integration. John should call the client") == [
+        {"assignee": "John", "text": "call the client"}
+    ]
+    assert len(engine.actions) == 2
+
+
+def test_custom_rule_set():
+    engine = ActionEngine(rules=[("owns", r"\b{who}\s+owns\s+{task}")])
+    assert engine.extract("Priya owns the release. Rahul will test.") == [{"assignee": "Priya", "text": "the release"}]
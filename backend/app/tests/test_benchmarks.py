@@ -0,0 +1,27 @@
+import argparse
+import asyncio
+
+from benchmarks.fake_groq import FakeConfig
+from benchmarks.run import compare, run_scenario
+
+
+def test_process_scenario_runs_against_fake_groq():
+    args = argparse.Namespace(
+        cache=False, seed=1, requests=3, concurrency=2, words=200,
+        meetings=1, tick_every=5, audio_seconds=1.0,
+    )
+    config = FakeConfig(latency_ms=0, jitter_ms=0, token_ms=0, transcribe_ms=0, transcript_words=200)
+    report = asyncio.run(run_scenario("process", args, config))
+
+    ops = report["operations"]["process"]
+    assert ops["requests"] == 3 and ops["errors"] == 0
+    assert ops["chat_calls_per_request"] == 1.0
+    assert ops["prompt_tokens_per_request"] > 0
+
+
+def test_compare_flags_regressions_only_past_tolerance():
+    def results(p95):
+        return {"scenarios": {"process": {"operations": {"process": {"p95_ms": p95, "errors": 0}}}}}
+
+    assert compare(results(110), results(100), tolerance=0.25) == []
+    assert compare(results(200), results(100), tolerance=0.25) == ["process/process p95_ms: 100 -> 200 (+100%)"]
@@ -0,0 +1,77 @@
+import time
+
+from app.services.cache import ResultCache, make_key
+
+
+def test_memory_lru_eviction_and_counters():
+    cache = ResultCache(max_entries=2)
+    cache.set("a", {"text": "one"})
+    cache.set("b", "two")
+    assert cache.get("a") == {"text": "one"}  # "a" is now most recent
+    cache.set("c", "three")                   # evicts "b"
+
+    assert cache.get("b") is None
+    assert cache.get("c") == "three"
+    stats = cache.stats()
+    assert stats["memory_hits"] == 2 and stats["misses"] == 1 and stats["evictions"] == 1
+
+
+def test_hits_return_independent_copies():
+    cache = ResultCache()
+    cache.set("k", {"actions": []})
+    cache.get("k")["actions"].append("mutated")
+    assert cache.get("k") == {"actions": []}
+
+
+def test_ttl_expiry():
+    cache = ResultCache(ttl_seconds=0.05)
+    cache.set("k", "v")
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.stats()["expired"] == 1
+
+
+def test_disk_tier_survives_restart_and_respects_size(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResultCache(disk_path=path, disk_max_bytes=50)
+    for i in range(10):
+        cache.set(f"k{i}", "x" * 10)
+    assert cache.stats()["disk_bytes"] <= 50
+
+    reopened = ResultCache(disk_path=path)
+    assert reopened.get("k9") == "x" * 10
+    assert reopened.stats()["disk_hits"] == 1
+
+
+def test_keys_depend_on_every_part():
+    base = make_key("chat", "model", [{"role": "user", "content": "hi"}], 0.1, 700)
+    assert base == make_key("chat", "model", [{"role": "user", "content": "hi"}], 0.1, 700)
+    assert base != make_key("chat", "model", [{"role": "user", "content": "hi"}], 0.2, 700)
+    assert base != make_key("chat", "other", [{"role": "user", "content": "hi"}], 0.1, 700)
+
+
+def test_async_lookups_keep_the_disk_tier_off_the_event_loop(tmp_path, monkeypatch):
+    import threading
+
+    import anyio
+
+    from app.services import cache as cache_module
+
+    disk = ResultCache(disk_path=str(tmp_path / "cache.db"))
+    threads = []
+    real_get = disk.get
+
+    def get(key, default=None):
+        threads.append(threading.get_ident())
+        return real_get(key, default)
+
+    monkeypatch.setattr(disk, "get", get)
+    monkeypatch.setattr(cache_module, "get_cache", lambda: disk)
+
+    async def main():
+        await cache_module.acache_set("k", {"summary": "s"})
+        return threading.get_ident(), await cache_module.acache_get("k")
+
+    loop_thread, value = anyio.run(main)
+    assert value == {"summary": "s"}
+    assert threads and loop_thread not in threads
@@ -0,0 +1,73 @@
+import json
+
+import anyio
+import pytest
+
+from app.services import async_groq_service
+from app.services.async_groq_service import analyze_text
+
+TRANSCRIPT = "Ram will send the budget sheet by Friday. We agreed to keep the current scope."
+MODERATION = {"is_flagged": False, "categories": {"hate": False, "violence": False, "sexual": False,
+                                                  "self_harm": False}, "notes": ""}
+
+
+@pytest.fixture
+def replies(monkeypatch):
+    """Scripted model replies; records the prompt of every call."""
+    script, prompts = [], []
+
+    async def fake_achat(messages, temperature, max_tokens, task=None, response_format=None):
+        assert response_format == {"type": "json_object"}
+        prompts.append(messages[0]["content"] + messages[1]["content"])
+        return json.dumps(script.pop(0))
+
+    monkeypatch.setattr(async_groq_service, "_achat", fake_achat)
+    return script, prompts
+
+
+def test_one_call_returns_what_the_separate_calls_would(replies):
+    script, prompts = replies
+    script.append({"summary_en": "- Budget sheet due Friday",
+                   "actions": [{"title": "Send budget sheet", "owner": "Ram", "due_date": "Friday"}],
+                   "decisions": [{"title": "Keep scope", "details": "No new features"}],
+                   "moderation": MODERATION})
+
+    result = anyio.run(analyze_text, TRANSCRIPT)
+    assert len(prompts) == 1
+    assert result["summary_en"] == {"summary_en": "- Budget sheet due Friday"}
+    assert result["actions"]["actions"][0] == {"title": "Send budget sheet", "owner": "Ram", "due_date": "Friday",
+                                               "priority": "", "notes": ""}
+    assert result["actions"]["decisions"] == [{"title": "Keep scope", "details": "No new features"}]
+    assert result["moderation"]["is_flagged"] is False
+
+
+def test_only_invalid_fields_are_asked_again(replies):
+    script, prompts = replies
+    script.append({"summary_en": "- ok", "actions": "Ram sends the sheet", "decisions": [], "moderation": MODERATION})
+    script.append({"actions": [{"title": "Send budget sheet", "owner": "Ram"}]})
+
+    result = anyio.run(analyze_text, TRANSCRIPT)
+    assert len(prompts) == 2
+    assert '"actions"' in prompts[1] and '"summary_en"' not in prompts[1]
+    assert "malformed actions" in prompts[1]
+    assert result["summary_en"] == {"summary_en": "- ok"}
+    assert result["actions"]["actions"][0]["owner"] == "Ram"
+
+
+def test_fields_still_invalid_after_reask_fall_back(replies):
+    script, _ = replies
+    script.append({"actions": [], "decisions": [], "moderation": MODERATION})
+    script.append({"summary_en": ""})
+
+    result = anyio.run(analyze_text, TRANSCRIPT)
+    assert "error" in result["summary_en"]
+    assert result["actions"] == {"actions": [], "decisions": []}
+
+
+def test_locally_decided_moderation_is_not_requested(replies):
+    script, prompts = replies
+    script.append({"summary_en": "- ok", "actions": [], "decisions": []})
+
+    result = anyio.run(analyze_text, "Call me at 555-123-4567 about the launch.")
+    assert '"moderation"' not in prompts[0]
+    assert "notes" in result["moderation"] and len(prompts) == 1
@@ -0,0 +1,69 @@
+import http.server
+import json
+import threading
+
+import anyio
+import pytest
+
+from app.config import Settings
+from app.services import groq_clients
+from app.services.groq_clients import ClientManager
+from app.services.groq_service import GroqClient
+
+COMPLETION = json.dumps({
+    "id": "x", "object": "chat.completion", "created": 0, "model": "m",
+    "choices": [{"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": "ok"}}],
+}).encode()
+
+
+class _Handler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["content-length"]))
+        self.send_response(200)
+        self.send_header("content-type", "application/json")
+        self.send_header("content-length", str(len(COMPLETION)))
+        self.end_headers()
+        self.wfile.write(COMPLETION)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def manager(monkeypatch):
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setenv("GROQ_BASE_URL", f"http://127.0.0.1:{server.server_port}")
+    manager = ClientManager(Settings(GROQ_API_KEY="k", GROQ_HTTP2=False))
+    previous = groq_clients.set_client_manager(manager)
+    yield manager
+    groq_clients.set_client_manager(previous)
+    manager.close()
+    server.shutdown()
+
+
+def test_requests_share_one_pooled_connection(manager):
+    for _ in range(5):
+        GroqClient().client.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+    stats = manager.stats()["sync"]
+    assert (stats["requests"], stats["errors"], stats["connections_opened"], stats["in_flight"]) == (5, 0, 1, 0)
+
+
+def test_groq_client_reuses_the_shared_sdk_client(manager):
+    assert GroqClient().client is manager.groq is GroqClient(api_key="k").client
+    other = GroqClient(api_key="other").client
+    assert other is not manager.groq and other._client is manager.http
+    assert GroqClient(api_key="other").client is other
+
+
+def test_async_requests_count_their_connections(manager):
+    async def main():
+        for _ in range(3):
+            await manager.agroq.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+        await manager.ahttp.aclose()
+
+    anyio.run(main)
+    stats = manager.stats()["async"]
+    assert (stats["requests"], stats["connections_opened"], stats["in_flight"]) == (3, 1, 0)
@@ -0,0 +1,127 @@
+import json
+import os
+
+import anyio
+import pytest
+
+from app.services.jobs import JobRunner, in_repo, job_view
+from benchmarks import corpus
+from benchmarks.fake_groq import FakeConfig, install
+
+CONFIG = FakeConfig(latency_ms=0, jitter_ms=0, token_ms=0, transcribe_ms=0, transcript_words=120)
+
+
+@pytest.fixture
+def audio(tmp_path):
+    path = tmp_path / "talk.wav"
+    path.write_bytes(corpus.wav(1.0, seed=3))
+    return str(path)
+
+
+def _job(job_id):
+    return anyio.run(in_repo, lambda repo: repo.get_job(job_id))
+
+
+def _run(runner, **job):
+    async def main():
+        created = await in_repo(lambda repo: repo.create_job(**job))
+        assert await runner.run_once()
+        return created.id
+    return anyio.run(main)
+
+
+def test_job_runs_every_stage_and_stores_the_meeting(audio):
+    with install(CONFIG) as usage:
+        job_id = _run(JobRunner(owner="w1"), audio_path=audio, title="Weekly", delete_audio=True)
+
+    view = job_view(_job(job_id))
+    assert view["status"] == "done" and view["meeting_id"] and view["attempts"] == 1
+    assert {"transcription", "summary_en", "actions"} <= set(view["stages_done"])
+    assert view["result"]["transcript_native"] and view["result"]["summary_en"]
+    assert usage.counters["transcribe_calls"] == 1
+    assert not os.path.exists(audio)  # uploaded copy is cleaned up
+
+
+def test_resumed_job_skips_checkpointed_stages(audio):
+    transcript = {"language_code": "en", "language_name": "English",
+                  "transcript_native": corpus.transcript(80, seed=1)}
+
+    async def main():
+        job = await in_repo(lambda repo: repo.create_job(audio_path=audio))
+        claimed = await in_repo(lambda repo: repo.claim_next("crashed", 60))
+        assert claimed.id == job.id
+        await in_repo(lambda repo: repo.save_checkpoint(job.id, "crashed", {"transcription": transcript}, 0))
+        return job.id
+
+    job_id = anyio.run(main)  # "crashed" holds an already expired lease
+    with install(CONFIG) as usage:
+        assert anyio.run(JobRunner(owner="w2").run_once)
+
+    job = _job(job_id)
+    assert job.status == "done" and job.attempts == 2
+    assert json.loads(job.checkpoint)["transcription"] == transcript
+    assert usage.counters.get("transcribe_calls", 0) == 0
+    assert json.loads(job.timings)["stages"]["transcription"]["resumed"] is True
+
+
+def test_old_owner_cannot_write_after_takeover(audio):
+    async def main():
+        job = await in_repo(lambda repo: repo.create_job(audio_path=audio))
+        await in_repo(lambda repo: repo.claim_next("a", 0))
+        taken = await in_repo(lambda repo: repo.claim_next("b", 60))
+        assert taken.id == job.id and taken.lease_owner == "b"
+        assert not await in_repo(lambda repo: repo.save_checkpoint(job.id, "a", {"x": 1}, 60))
+        assert not await in_repo(lambda repo: repo.finish_job(job.id, "a", "m", {}))
+        assert await in_repo(lambda repo: repo.fail_job(job.id, "b", "boom"))
+        return job.id
+
+    job = _job(anyio.run(main))
+    assert job.status == "failed" and job.error == "boom" and job.checkpoint == "{}"
+
+
+def test_cancelled_jobs_are_never_claimed(audio):
+    async def main():
+        job = await in_repo(lambda repo: repo.create_job(audio_path=audio))
+        assert await in_repo(lambda repo: repo.cancel_job(job.id))
+        assert not await in_repo(lambda repo: repo.cancel_job(job.id))
+        return job.id, await in_repo(lambda repo: repo.claim_next("w", 60))
+
+    job_id, claimed = anyio.run(main)
+    assert claimed is None and _job(job_id).status == "cancelled"
+
+
+def test_uploaded_audio_is_removed_when_a_job_fails_for_good_or_is_cancelled(audio, tmp_path):
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    with install(FakeConfig(transcribe_ms=0, error_rate=1.0)):
+        job_id = _run(JobRunner(owner="w1", max_attempts=1), audio_path=audio, delete_audio=True)
+    assert _job(job_id).status == "failed"
+    assert not os.path.exists(audio)
+
+    queued = tmp_path / "queued.wav"
+    queued.write_bytes(b"RIFF")
+    job = anyio.run(in_repo, lambda repo: repo.create_job(audio_path=str(queued), delete_audio=True))
+    response = TestClient(app).post(f"/api/v1/jobs/{job.id}/cancel")
+    assert response.status_code == 200 and response.json()["status"] == "cancelled"
+    assert not queued.exists()
+
+
+def test_a_failed_stage_is_retried_and_then_reported_as_partial(audio, monkeypatch):
+    import app.services.pipeline as pipeline
+
+    async def translation_down(summary, language):
+        return {"error": "translation down"}
+
+    monkeypatch.setattr(pipeline, "summarize_text_native", translation_down)
+    with install(CONFIG):
+        job_id = _run(JobRunner(owner="w1", max_attempts=2), audio_path=audio)
+        job = _job(job_id)
+        assert job.status == "queued" and "translation down" in job.error
+        assert "summary_en" in job_view(job)["stages_done"] and "summary_native" not in job_view(job)["stages_done"]
+
+        job_id = _run(JobRunner(owner="w1", max_attempts=1), audio_path=audio)
+    view = job_view(_job(job_id))
+    assert view["status"] == "partial" and view["meeting_id"]
+    assert view["error"] == "failed stages: summary_native"
@@ -0,0 +1,59 @@
+import anyio
+import pytest
+
+from app.services import async_groq_service
+from app.services.async_groq_service import summarize_text_native, translate_text
+from app.services.langid import detect_language, resolve_language, sample_text
+
+
+@pytest.mark.parametrize("code, text", [
+    ("en", "We agreed that the budget is approved and Ram will send the sheet by Friday."),
+    ("hi", "हम सब ने तय किया कि बजट मंजूर है और राम शुक्रवार तक शीट भेजेगा।"),
+    ("mr", "आम्ही ठरवले की बजेट मंजूर आहे आणि राम शुक्रवारपर्यंत शीट पाठवेल."),
+    ("ta", "நாங்கள் பட்ஜெட் அங்கீகரிக்கப்பட்டது என்று முடிவு செய்தோம்."),
+    ("es", "Hemos decidido que el presupuesto está aprobado y que Ram enviará la hoja el viernes."),
+    ("hi", "Humne decide kiya ki budget approve hai aur Ram Friday tak sheet bhej raha hai"),
+    ("ja", "予算は承認されました。ラムは金曜日までにシートを送ります。"),
+    ("unknown", "12:30 -- 45%"),
+])
+def test_detects_common_meeting_languages(code, text):
+    assert detect_language(text) == code
+
+
+def test_whisper_language_wins_and_long_text_is_sampled():
+    assert resolve_language("english", "हम सब ने तय किया") == "en"
+    assert resolve_language(None, "हम सब ने तय किया कि बजट मंजूर है") == "hi"
+    text = "The budget is approved. " * 10000
+    assert len(sample_text(text, 2000)) <= 2002 and detect_language(text) == "en"
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    prompts = []
+
+    async def fake_achat(messages, temperature, max_tokens, task=None, response_format=None):
+        prompts.append((messages[1]["content"], max_tokens))
+        return "translated"
+
+    monkeypatch.setattr(async_groq_service, "_achat", fake_achat)
+    return prompts
+
+
+def test_english_is_never_sent_for_translation(calls):
+    assert anyio.run(translate_text, "We ship on Friday.", "English") == "We ship on Friday."
+    assert anyio.run(translate_text, "We ship on Friday.", "auto") == "We ship on Friday."
+    assert anyio.run(summarize_text_native, "- Ship Friday", "English") == {"summary_native": "- Ship Friday"}
+    assert anyio.run(summarize_text_native, "- Ship Friday", "Unknown") == {"summary_native": "- Ship Friday"}
+    assert calls == []
+
+
+def test_long_text_is_translated_in_sentence_aligned_chunks(calls, monkeypatch):
+    from app.config import get_settings
+    monkeypatch.setattr(get_settings(), "TRANSLATE_CHUNK_TOKENS", 50)
+    text = " ".join(f"यह वाक्य संख्या {i} है।" for i in range(40))
+
+    assert anyio.run(translate_text, text, "Hindi").startswith("translated translated")
+    assert len(calls) > 1
+    assert all(prompt.rstrip().endswith("।") for prompt, _ in calls)  # no sentence is cut
+    assert anyio.run(summarize_text_native, "- Ship Friday", "Hindi") == {"summary_native": "translated"}
+    assert "fluent Hindi" in calls[-1][0]
@@ -0,0 +1,96 @@
+import numpy as np
+from fastapi.testclient import TestClient
+
+from app.services.audio import SAMPLE_RATE
+from app.services.live_audio import RingBuffer, UtteranceSegmenter
+from benchmarks.fake_groq import FakeConfig, install
+
+RATE = 48000
+
+
+def _tone(seconds, rate=RATE, amplitude=6000):
+    t = np.arange(int(seconds * rate)) / rate
+    return (amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.int16)
+
+
+def _noise(seconds, rate=RATE, amplitude=80, seed=0):
+    return np.random.default_rng(seed).normal(0, amplitude, int(seconds * rate)).astype(np.int16)
+
+
+def _stream(*parts, rate=RATE):
+    return np.concatenate([_tone(s, rate) if kind == "speech" else _noise(s, rate) for kind, s in parts])
+
+
+def _feed(segmenter, samples, frame_ms=20, rate=RATE):
+    step = rate * frame_ms // 1000
+    out = []
+    for i in range(0, len(samples), step):
+        out += segmenter.feed(samples[i:i + step])
+    return out + segmenter.flush()
+
+
+def test_ring_buffer_keeps_the_latest_samples_across_wraparound():
+    ring = RingBuffer(10)
+    ring.write(np.arange(7, dtype=np.int16))
+    ring.write(np.arange(7, 15, dtype=np.int16))
+    assert ring.start == 5 and ring.end == 15
+    assert ring.read(0, 15).tolist() == list(range(5, 15))
+    assert ring.read(8, 12).tolist() == [8, 9, 10, 11]
+
+
+def test_utterances_are_cut_at_pauses_and_resampled():
+    samples = _stream(("noise", 0.6), ("speech", 1.2), ("noise", 0.9), ("speech", 1.0), ("noise", 0.9))
+    utterances = _feed(UtteranceSegmenter(sample_rate=RATE, silence_ms=400), samples)
+
+    assert [u.seq for u in utterances] == [1, 2]
+    first, second = utterances
+    assert 0.3 <= first.start <= 0.6 and 1.8 <= first.end <= 2.3
+    assert 2.5 <= second.start <= 2.7 and 3.7 <= second.end <= 4.3
+    # 16 kHz for Whisper, whatever the client sent
+    assert abs(len(first.samples) - (first.end - first.start) * SAMPLE_RATE) < SAMPLE_RATE * 0.05
+
+
+def test_long_speech_is_cut_at_max_length_and_clicks_are_dropped():
+    samples = _stream(("noise", 0.5), ("speech", 0.06), ("noise", 1.0), ("speech", 9.0), ("noise", 1.0))
+    utterances = _feed(UtteranceSegmenter(sample_rate=RATE, max_seconds=4.0), samples)
+
+    assert utterances[0].start >= 1.3  # nothing for the 60 ms click
+    assert all(2.0 <= u.end - u.start <= 4.0 for u in utterances[:-1])
+    # back to back: a cut inside speech loses nothing
+    assert all(b.start == a.end for a, b in zip(utterances, utterances[1:]))
+    assert utterances[-1].end >= 10.5
+
+
+def test_socket_streams_segments_back_and_stores_them():
+    from app.main import app
+
+    pcm = _stream(("noise", 0.5), ("speech", 1.0), ("noise", 0.8), ("speech", 1.0), ("noise", 0.3), rate=16000)
+    with install(FakeConfig(latency_ms=0, jitter_ms=0, token_ms=0, transcribe_ms=0, transcript_words=6)) as usage:
+        client = TestClient(app)
+        with client.websocket_connect("/api/v1/ws/meetings/ws-m1/audio?sample_rate=16000") as ws:
+            assert ws.receive_json()["type"] == "ready"
+            ws.send_json({"participants": ["Ram"]})
+            for i in range(0, len(pcm), 1600):
+                ws.send_bytes(pcm[i:i + 1600].tobytes())
+            ws.send_json({"type": "stop"})
+            messages = []
+            while not messages or messages[-1]["type"] != "end":
+                messages.append(ws.receive_json())
+
+        segments = [m for m in messages if m["type"] == "segment"]
+        assert [s["seq"] for s in segments] == [1, 2]
+        assert all(s["text"] and s["latency_ms"] >= 0 for s in segments)
+        assert usage.counters["transcribe_calls"] == 2
+
+        live = client.get("/api/v1/meetings/ws-m1/live").json()
+        assert live["segments"] == 2
+        assert live["transcript"] == " ".join(s["text"] for s in segments)
+
+
+def test_socket_rejects_unknown_encodings():
+    from app.main import app
+
+    with install(FakeConfig()):
+        with TestClient(app).websocket_connect("/api/v1/ws/meetings/ws-m2/audio?encoding=mp3") as ws:
+            message = ws.receive_json()
+    assert message["type"] == "error" and "encoding" in message["message"]
@@ -0,0 +1,224 @@
+import asyncio
+from uuid import uuid4
+
+import anyio
+
+from app.config import get_settings
+from app.db.repository import MeetingRepository
+from app.db.session import SessionLocal
+from app.services.live_hub import SUBSCRIBER_QUEUE, LiveHub
+from app.services.live_session import LiveSession, analyze_pending, get_session, restore_session
+from app.tests.test_live_session import StubGroq
+from benchmarks.fake_groq import FakeConfig, install
+
+
+def test_changes_are_diffs_against_the_previous_mark():
+    session = LiveSession(meeting_id="d1")
+    session.add_segment("Assign Ram to handle backend.")
+    first, mark = session.changes()
+    assert first["segments_from"] == 0 and first["segments"] == ["Assign Ram to handle backend."]
+    assert first["actions"] == [{"assignee": "Ram", "text": "handle backend"}]  # rule-based
+
+    assert session.changes(mark)[0] == {}
+    session.add_segment("Second line.")
+    analyze_pending(session, StubGroq())
+    diff, _ = session.changes(mark)
+    assert diff["segments_from"] == 1 and diff["segments"] == ["Second line."]
+    assert diff["actions_from"] == 1 and diff["actions"] == [{"assignee": "Ram", "text": "Deploy backend"}]
+    assert diff["notes_from"] == 0 and diff["notes"] == ['toxic: "idiot"']
+    assert diff["summary"] == "summary 1" and diff["analyzed_segments"] == 2
+    assert "segments" not in session.changes(session.changes(mark)[1])[0]
+
+
+def _drain(queue):
+    events = []
+    while not queue.empty():
+        events.append(queue.get_nowait())
+    return events
+
+
+def test_fifty_viewers_cost_one_analysis_per_tick():
+    groq = StubGroq()
+    session = LiveSession(meeting_id="m50")
+
+    async def main():
+        hub = LiveHub(interval=0.05, idle_seconds=0.2)
+
+        def analyze(meeting_id):
+            if session.pending_chars() == 0:
+                return False
+            mark = session.changes()[1]
+            analyze_pending(session, groq)
+            hub.publish(session, mark)
+            return True
+
+        hub.start(analyze)
+        async with _Subscriptions([hub.subscribe("m50") for _ in range(50)]) as queues:
+            def speak():  # like a segment arriving on a threadpool thread
+                mark = session.changes()[1]
+                session.add_segment("Ram will send the deck by Friday.")
+                hub.publish(session, mark)
+                hub.touch("m50")
+            await anyio.to_thread.run_sync(speak)
+            await asyncio.sleep(0.3)
+            received = [_drain(q) for q in queues]
+        loops_left = hub.stats()["analysis_loops"]
+        await hub.stop()
+        return received, loops_left
+
+    received, loops_left = anyio.run(main)
+    assert len(groq.deltas) == 1
+    assert all(events == received[0] for events in received)
+    segment_event, analysis_event = received[0]
+    assert segment_event["segments"] == ["Ram will send the deck by Friday."]
+    assert "segments" not in analysis_event and analysis_event["summary"] == "summary 1"
+    assert loops_left == []  # the loop ends once the meeting goes quiet
+
+
+def test_two_workers_on_one_database_analyze_each_tick_once(monkeypatch):
+    from app.api.v1.routes import _store_live_segment, run_live_analysis
+
+    monkeypatch.setattr(get_settings(), "GROQ_API_KEY", "test-key")
+    meeting_id = f"shared-{uuid4().hex[:8]}"
+    lines = [f"Ram will send the revised deck number {i} to the whole steering group by Friday afternoon."
+             for i in range(6)]
+
+    async def main():
+        workers = [LiveHub(interval=0.05, idle_seconds=0.4, lease_seconds=30, owner=name) for name in ("a", "b")]
+        for worker in workers:
+            worker.start(run_live_analysis)
+        leases = []
+        for i, line in enumerate(lines):  # the load balancer alternates between the workers
+            await anyio.to_thread.run_sync(_store_live_segment, meeting_id, line, None, ["Ram"])
+            workers[i % 2].touch(meeting_id)
+            await asyncio.sleep(0.08)
+            leases.append([w.stats()["analysis_leases"] for w in workers])
+        await asyncio.sleep(0.3)
+        for worker in workers:
+            await worker.stop()
+        return [w.stats()["analyses"] for w in workers], leases
+
+    with install(FakeConfig(latency_ms=0, jitter_ms=0, token_ms=0)) as usage:
+        analyses, leases = anyio.run(main)
+
+    assert all(sum(bool(held) for held in tick) <= 1 for tick in leases)
+    assert 0 in analyses and sum(analyses) == usage.counters["chat_calls"]
+    db = SessionLocal()
+    try:
+        state = MeetingRepository(db).load_live_state(meeting_id)
+    finally:
+        db.close()
+    assert state["analyzed_upto"] == len(lines)
+    keys = [(a["assignee"].lower(), a["text"].lower()) for a in state["actions"]]
+    assert len(keys) == len(set(keys))
+
+
+class _RecordingHub:
+    def __init__(self):
+        self.events = []
+
+    def publish(self, session, since=None):
+        self.events.append(session.changes(since)[0])
+
+    def touch(self, meeting_id):
+        pass
+
+
+def test_a_worker_fetches_and_publishes_only_what_is_new(monkeypatch):
+    from app.api.v1 import routes
+
+    hub = _RecordingHub()
+    monkeypatch.setattr(routes, "get_live_hub", lambda: hub)
+    fetched = []
+    segment_texts = MeetingRepository.segment_texts
+    monkeypatch.setattr(MeetingRepository, "segment_texts", lambda self, meeting_id, after_seq=0, upto_seq=None:
+                        fetched.append(after_seq) or segment_texts(self, meeting_id, after_seq, upto_seq))
+    meeting_id = f"inc-{uuid4().hex[:8]}"
+    db = SessionLocal()
+    try:
+        repo = MeetingRepository(db)
+        routes._append_live_segment(repo, meeting_id, "First line.")
+        repo.add_segments(meeting_id, ["Second line.", "Third line."])  # stored by another worker
+        fetched.clear()
+        session = routes._live_session(meeting_id, repo)
+        assert session.segments == ["First line.", "Second line.", "Third line."] and fetched == [1]
+        fetched.clear()
+        routes._live_session(meeting_id, repo)
+        assert fetched == []  # nothing new: only the version was read
+
+        routes._append_live_segment(repo, meeting_id, "Fourth line.")
+    finally:
+        db.close()
+    assert hub.events[-1]["segments_from"] == 3 and hub.events[-1]["segments"] == ["Fourth line."]
+
+
+def test_a_quiet_meeting_is_dropped_from_the_worker():
+    session = restore_session("quiet", {"segments": ["Hello."]})
+
+    async def main():
+        hub = LiveHub(interval=0.02, idle_seconds=0.1)
+        hub.start(lambda meeting_id: False)
+        hub.touch("quiet")
+        await asyncio.sleep(0.05)
+        running = hub.stats()["analysis_loops"]
+        await asyncio.sleep(0.3)
+        left = hub.stats()["analysis_loops"], "quiet" in hub._touched
+        await hub.stop()
+        return running, left
+
+    running, left = anyio.run(main)
+    assert running == ["quiet"] and left == ([], False)
+    assert session.segments == ["Hello."] and get_session("quiet", create=False) is None
+
+
+def test_sqlite_broker_carries_updates_between_processes(tmp_path):
+    path = str(tmp_path / "events.db")
+    session = LiveSession(meeting_id="x1")
+
+    async def main():
+        speaker, viewer = LiveHub("sqlite", path, poll_seconds=0.02), LiveHub("sqlite", path, poll_seconds=0.02)
+        speaker.start()
+        async with viewer.subscribe("x1") as queue:
+            await asyncio.sleep(0.05)
+            session.add_segment("Priya owns the budget review.")
+            await anyio.to_thread.run_sync(speaker.publish, session)
+            event = await asyncio.wait_for(queue.get(), 2)
+        await speaker.stop()
+        await viewer.stop()
+        return event
+
+    event = anyio.run(main)
+    assert event["type"] == "update" and event["segments"] == ["Priya owns the budget review."]
+
+
+def test_a_viewer_that_falls_behind_is_told_to_resync():
+    session = LiveSession(meeting_id="slow")
+
+    async def main():
+        hub = LiveHub()
+        async with hub.subscribe("slow") as queue:
+            for i in range(SUBSCRIBER_QUEUE + 1):
+                session.add_segment(f"line {i}")
+                hub.publish(session)
+            events = _drain(queue)
+            subscribers = hub.stats()["subscribers"]
+        await hub.stop()
+        return events, subscribers
+
+    events, subscribers = anyio.run(main)
+    assert events == [{"type": "resync"}]
+    assert subscribers == {}
+
+
+class _Subscriptions:
+    """Enters many async context managers; yields their values."""
+
+    def __init__(self, managers):
+        self.managers = managers
+
+    async def __aenter__(self):
+        return [await m.__aenter__() for m in self.managers]
+
+    async def __aexit__(self, *exc):
+        for m in reversed(self.managers):
+            await m.__aexit__(*exc)
@@ -0,0 +1,68 @@
+from app.services.live_session import LiveSession, analyze_pending
+
+
+class StubGroq:
+    def __init__(self):
+        self.deltas = []
+
+    def analyze_delta(self, delta, summary="", actions=None, notes=None):
+        self.deltas.append(delta)
+        return {
+            "summary": f"summary {len(self.deltas)}",
+            "actions": [{"assignee": "Ram", "text": "Deploy backend"}],
+            "moderation": {"interruptions": 1, "notes": ["toxic: \"idiot\""]},
+        }
+
+
+def test_only_new_segments_are_analyzed():
+    session = LiveSession(meeting_id="m1")
+    groq = StubGroq()
+
+    session.add_segment("Assign Ram to handle backend.")
+    first = analyze_pending(session, groq)
+    session.add_segment("Sakshi will do integration.")
+    second = analyze_pending(session, groq)
+
+    assert groq.deltas == ["Assign Ram to handle backend.", "Sakshi will do integration."]
+    assert first["new_actions"] == [{"assignee": "Ram", "text": "Deploy backend"}]
+    # duplicates from later ticks are merged away
+    assert second["new_actions"] == [] and second["new_notes"] == []
+    assert second["summary"] == "summary 2"
+    assert second["moderation"]["interruptions"] == 2
+
+
+def test_no_pending_text_skips_model_call():
+    session = LiveSession(meeting_id="m2")
+    groq = StubGroq()
+    result = analyze_pending(session, groq)
+    assert groq.deltas == []
+    assert result["segments"] == 0
+
+
+def test_segments_get_rule_based_actions_without_model_call():
+    session = LiveSession(meeting_id="m3")
+    session.add_participants(["Ram", "Sakshi"])
+    assert session.add_segment("Assign Ram to handle backend.") == [{"assignee": "Ram", "text": "handle backend"}]
+    assert session.add_segment("We need to ship. Sakshi will do integration.") == [
+        {"assignee": "Sakshi", "text": "do integration"}
+    ]
+    assert session.add_segment("assign ram to handle backend.") == []
+    assert len(session.snapshot()["actions"]) == 2
+
+
+def test_session_rebuilt_from_stored_state_behaves_like_the_original():
+    from app.services.live_session import session_from_state
+
+    original = LiveSession(meeting_id="m4")
+    original.add_participants(["Ram", "Sakshi"])
+    original.add_segment("Assign Ram to handle backend.")
+    stored = {**original.snapshot(include_transcript=False), "segments": list(original.segments),
+              "analyzed_upto": 0, "notes": [], "participants": original.participants()}
+    rebuilt = session_from_state("m4", stored)
+
+    assert rebuilt.participants() == ["Ram", "Sakshi"]
+    for session in (original, rebuilt):
+        # known action is not reported again; a non-participant is still ignored
+        assert session.add_segment("assign ram to handle backend. Assign Bob to write docs.") == []
+        assert session.add_segment("Sakshi will do integration.") == [{"assignee": "Sakshi", "text": "do integration"}]
+    assert rebuilt.snapshot() == {**original.snapshot(), "meeting_id": "m4"}
@@ -0,0 +1,28 @@
+from app.services.map_reduce import chunk_by_tokens, estimate_tokens, merge_moderation_results
+
+
+def test_chunks_respect_budget_and_sentence_boundaries():
+    text = " ".join(f"Item {i} was discussed by the team." for i in range(500))
+    chunks = chunk_by_tokens(text, 200)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(c) <= 200 for c in chunks)
+    assert all(c.endswith(".") for c in chunks)
+    assert " ".join(chunks) == text
+
+
+def test_overlong_sentence_is_split_on_words():
+    text = "word " * 2000
+    chunks = chunk_by_tokens(text, 100)
+    assert all(estimate_tokens(c) <= 100 for c in chunks)
+    assert sum(len(c.split()) for c in chunks) == 2000
+
+
+def test_moderation_reduce_is_any_flagged():
+    merged = merge_moderation_results([
+        {"is_flagged": False, "categories": {"hate": False}, "notes": ""},
+        {"is_flagged": True, "categories": {"violence": True}, "notes": "threat in part 2"},
+    ])
+    assert merged["is_flagged"] is True
+    assert merged["categories"]["violence"] is True and merged["categories"]["hate"] is False
+    assert merged["notes"] == "threat in part 2"
@@ -0,0 +1,82 @@
+import asyncio
+import json
+import os
+from types import SimpleNamespace
+
+import anyio
+import httpx
+
+from app.core import metrics
+from app.core.metrics import Histogram, observe_model_call, timed, trace
+
+
+def test_histogram_renders_cumulative_prometheus_buckets():
+    h = Histogram("t_seconds", "test", buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        h.observe(value, stage='say "hi"')
+    lines = h.render()
+    assert 't_seconds_bucket{stage="say \\"hi\\"",le="0.1"} 1' in lines
+    assert 't_seconds_bucket{stage="say \\"hi\\"",le="1.0"} 2' in lines
+    assert 't_seconds_bucket{stage="say \\"hi\\"",le="+Inf"} 3' in lines
+    assert 't_seconds_count{stage="say \\"hi\\""} 3' in lines
+
+
+def test_spans_and_model_usage_collect_into_the_trace():
+    @timed("unit_sync")
+    def work():
+        observe_model_call("m", wait=0.01, seconds=0.02, response=SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=4)))
+        return 1
+
+    @timed("unit_async")
+    async def awork():
+        await asyncio.sleep(0)
+        return work()
+
+    before = metrics.STAGES.count(stage="unit_sync")
+    with trace() as data:
+        assert anyio.run(awork) == 1
+    assert set(data["spans"]) == {"unit_sync", "unit_async"}
+    assert data["model"]["calls"] == 1 and data["model"]["prompt_tokens"] == 10
+    assert metrics.STAGES.count(stage="unit_sync") == before + 1
+    assert metrics.MODEL_TOKENS.value(model="m", type="completion") >= 4
+
+
+def test_requests_get_ids_and_route_templates():
+    from app.main import app
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            echoed = await client.get("/api/v1/jobs/missing", headers={"X-Request-ID": "req-42"})
+            generated = await client.get("/health", headers={"X-Request-ID": "not ok!"})
+            scrape = await client.get("/metrics")
+        return echoed, generated, scrape
+
+    echoed, generated, scrape = anyio.run(main)
+    assert echoed.headers["x-request-id"] == "req-42"
+    assert len(generated.headers["x-request-id"]) == 32
+    assert scrape.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/v1/jobs/{job_id}",status="404"' in scrape.text
+
+
+def test_scrapes_sum_the_snapshots_of_every_worker(tmp_path):
+    directory = str(tmp_path)
+    metrics.MODEL_ERRORS.inc(model="mp-test")
+    metrics.MODEL_CALLS.observe(0.2, model="mp-test")
+    metrics.write_snapshot(directory)
+    # a recycled worker's last snapshot: its counters still count, its gauges don't
+    mine = json.loads((tmp_path / f"{os.getpid()}.json").read_text())
+    mine["pid"] = 2**31 - 1
+    mine["runtime"].append(["scheduler_waiting_calls", "gauge", "Model calls queued in the scheduler.",
+                            [[{"model": "mp-test", "priority": "0"}, 3]]])
+    (tmp_path / "dead.json").write_text(json.dumps(mine))
+
+    text = metrics.render(directory)
+    expected = 2 * metrics.MODEL_ERRORS.value(model="mp-test")
+    assert f'model_call_errors_total{{model="mp-test"}} {int(expected)}' in text
+    assert f'model_call_seconds_count{{model="mp-test"}} {2 * metrics.MODEL_CALLS.count(model="mp-test")}' in text
+    assert 'scheduler_waiting_calls{model="mp-test"' not in text
+    assert text.count("# TYPE model_call_errors_total counter") == 1
+
+    metrics.clear_snapshots(directory)
+    assert os.listdir(directory) == []
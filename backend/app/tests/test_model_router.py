@@ -0,0 +1,122 @@
+import anyio
+import pytest
+
+from app.services.groq_service import GroqClient
+from app.services.model_router import FINAL, LIVE, ModelRouter, get_model_router, set_model_router
+from app.services.scheduler import Scheduler
+from app.tests.test_scheduler import RateLimited
+from benchmarks.fake_groq import FakeConfig, install
+
+SMALL, LARGE = "llama-3.1-8b-instant", "llama-3.3-70b-versatile"
+
+
+@pytest.fixture
+def router():
+    previous = set_model_router(None)
+    yield get_model_router
+    set_model_router(previous)
+
+
+def test_live_ticks_use_the_fast_tier_and_reports_the_large_one(router):
+    config = FakeConfig(jitter_ms=0, token_ms=0, model_latency_ms={SMALL: 20, LARGE: 400})
+    with install(config) as usage:
+        client = GroqClient()
+        for i in range(10):
+            client.analyze_delta(f"Ram will send deck number {i} by Friday.")
+        client.analyze_transcript("Ram will send the deck by Friday. Priya owns the budget review.")
+
+    assert usage.counters[f"chat_calls:{SMALL}"] == 10
+    assert usage.counters[f"chat_calls:{LARGE}"] == 1
+    tiers = router().stats()["tiers"]
+    fast, large = tiers["fast"]["calls"][SMALL], tiers["large"]["calls"][LARGE]
+    assert fast["ok"] == 10 and fast["p95_ms"] < 200
+    assert large["ok"] == 1 and large["p95_ms"] >= 400
+    assert 0 < fast["cost_usd"] / fast["ok"] < large["cost_usd"]
+
+
+def test_slow_model_hands_over_to_the_next_one_in_its_tier(router):
+    set_model_router(ModelRouter(routes={LIVE: "fast", FINAL: "large"},
+                                 tiers={"fast": [SMALL, LARGE], "large": [LARGE]}, timeouts={"fast": 0.1}))
+    config = FakeConfig(jitter_ms=0, token_ms=0, model_latency_ms={SMALL: 2000, LARGE: 10})
+    with install(config) as usage:
+        result = GroqClient().analyze_delta("Ram will send the deck by Friday.")
+
+    assert result["summary"]
+    assert usage.counters[f"chat_calls:{SMALL}"] == 1 and usage.counters[f"chat_calls:{LARGE}"] == 1
+    calls = router().stats()["tiers"]["fast"]["calls"]
+    assert calls[SMALL]["fallback"] == 1 and calls[LARGE]["ok"] == 1
+
+
+def test_rate_limited_model_is_skipped_until_its_retry_after():
+    scheduler = Scheduler(retries=3, backoff_base=0.001)
+    router = ModelRouter(routes={FINAL: "fast"}, tiers={"fast": ["a", "b"]}, timeouts={"fast": 1.0})
+    attempts = []
+
+    def call(model):
+        def send():
+            attempts.append(model)
+            if model == "a":
+                raise RateLimited("30")
+            return model
+        return scheduler.call(model, send)
+
+    assert [router.call(FINAL, call) for _ in range(3)] == ["b", "b", "b"]
+    # one 429 (no retries while "b" is left), then "a" is paused and not even tried
+    assert attempts == ["a", "b", "b", "b"]
+    assert router.stats()["tiers"]["fast"]["calls"]["a"]["fallback"] == 3
+
+
+def test_errors_another_model_cannot_fix_are_raised():
+    router = ModelRouter(routes={FINAL: "large"}, tiers={"large": ["a", "b"]})
+    attempts = []
+
+    async def bad_request(model):
+        attempts.append(model)
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        anyio.run(router.acall, FINAL, bad_request)
+    assert attempts == ["a"]
+    assert router.stats()["tiers"]["large"]["calls"]["a"]["failed"] == 1
+
+    with pytest.raises(ValueError):
+        ModelRouter(routes={FINAL: "huge"}, tiers={"large": ["a"]})
+
+
+def test_streamed_calls_are_counted_when_the_stream_ends(router):
+    from app.services.async_groq_service import _achat_stream
+
+    config = FakeConfig(jitter_ms=0, token_ms=20, model_latency_ms={LARGE: 10})
+    messages = [{"role": "user", "content": "Summarise: Ram will send the deck by Friday."}]
+
+    async def main():
+        return [delta async for delta in _achat_stream(messages, temperature=0.3, max_tokens=100)]
+
+    with install(config) as usage:
+        deltas = anyio.run(main)
+
+    calls = router().stats()["tiers"]["large"]["calls"][LARGE]
+    assert len(deltas) > 1 and calls["ok"] == 1
+    assert calls["completion_tokens"] == usage.counters["completion_tokens"] and calls["cost_usd"] > 0
+    assert calls["p50_ms"] >= 20 * (len(deltas) - 1)  # to the last chunk, not to the first
+
+
+def test_a_stream_that_breaks_off_counts_as_failed():
+    router = ModelRouter(routes={FINAL: "large"}, tiers={"large": ["a", "b"]})
+
+    async def open_stream(model):
+        async def chunks():
+            yield "first"
+            raise ConnectionError("stream reset")
+        return chunks()
+
+    async def main():
+        received = []
+        with pytest.raises(ConnectionError):
+            async for chunk in router.astream(FINAL, open_stream):
+                received.append(chunk)
+        return received
+
+    assert anyio.run(main) == ["first"]
+    calls = router.stats()["tiers"]["large"]["calls"]
+    assert calls["a"]["failed"] == 1 and calls["a"]["ok"] == 0 and "b" not in calls
@@ -0,0 +1,29 @@
+from app.services.moderation_filter import prefilter
+
+
+def test_clean_text_is_decided_locally():
+    result = prefilter("Ram will fix the backend by Friday. Sakshi will do the integration.")
+    assert result.verdict == "clean"
+    assert result.as_moderation() == {
+        "is_flagged": False,
+        "categories": {"hate": False, "violence": False, "sexual": False, "self_harm": False},
+        "notes": "",
+    }
+
+
+def test_strong_terms_and_pii_are_flagged():
+    result = prefilter("You are an IDIOT. Mail me at ram@example.com or call +91 98765 43210. I will kill you.")
+    assert result.verdict == "flagged"
+    assert result.categories["violence"] is True
+    assert result.notes == ['toxic: "idiot"', 'violence: "i will kill you"', "PII: email", "PII: phone"]
+
+
+def test_only_ambiguous_sentences_are_escalated():
+    text = "Let's review the roadmap. We should kill the old process today. Shoot me an email after."
+    result = prefilter(text)
+    assert result.verdict == "ambiguous"
+    assert result.ambiguous_spans == ["We should kill the old process today.", "Shoot me an email after."]
+
+
+def test_numbers_that_are_not_phones():
+    assert prefilter("In 2023 we had 40 people; budget 1,200,000 on 12 05 2024.").verdict == "clean"
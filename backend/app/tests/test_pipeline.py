@@ -0,0 +1,44 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.pipeline import Pipeline, Stage
+
+
+def _sleepy(value, delay=0.1):
+    def fn(ctx):
+        time.sleep(delay)
+        return value
+    return fn
+
+
+def test_independent_stages_run_in_parallel():
+    pipeline = Pipeline([
+        Stage("a", _sleepy(1)),
+        Stage("b", _sleepy(2), ("a",)),
+        Stage("c", _sleepy(3), ("a",)),
+        Stage("d", _sleepy(4), ("a",)),
+    ])
+    ctx, timings = asyncio.run(pipeline.run({}))
+
+    assert [ctx[k] for k in "abcd"] == [1, 2, 3, 4]
+    # a, then b/c/d side by side: ~0.2s rather than ~0.4s
+    assert timings["total_ms"] < 350
+    assert timings["stages"]["b"]["start_ms"] >= timings["stages"]["a"]["duration_ms"]
+
+
+def test_async_stage_sees_dependency_results():
+    async def double(ctx):
+        return ctx["base"] * 2
+
+    pipeline = Pipeline([Stage("base", lambda ctx: ctx["x"] + 1), Stage("double", double, ("base",))])
+    ctx, _ = asyncio.run(pipeline.run({"x": 1}))
+    assert ctx["double"] == 4
+
+
+def test_cycles_and_unknown_deps_are_rejected():
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", _sleepy(1), ("b",)), Stage("b", _sleepy(1), ("a",))])
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", _sleepy(1), ("missing",))])
@@ -0,0 +1,77 @@
+import io
+import wave
+
+import anyio
+import numpy as np
+
+from app.services.async_groq_service import transcribe_audio
+from app.services.audio import Audio, SAMPLE_RATE, decode_bytes
+from app.services.preprocess import collapse_silence
+from benchmarks.fake_groq import FakeConfig, install
+
+CONFIG = FakeConfig(latency_ms=0, jitter_ms=0, token_ms=0, transcribe_ms=0, transcript_words=40)
+
+
+def _meeting(parts, rate=SAMPLE_RATE, seed=0):
+    rng = np.random.default_rng(seed)
+    pieces = []
+    for kind, seconds in parts:
+        n = int(seconds * rate)
+        if kind == "speech":
+            t = np.arange(n) / rate
+            pieces.append(6000 * np.sin(2 * np.pi * 220 * t) + rng.normal(0, 80, n))
+        else:
+            pieces.append(rng.normal(0, 80, n))
+    return np.concatenate(pieces).astype(np.int16)
+
+
+def _stereo_wav(samples, rate):
+    bio = io.BytesIO()
+    with wave.open(bio, "wb") as w:
+        w.setnchannels(2)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(np.repeat(samples, 2).astype("<i2").tobytes())
+    return bio.getvalue()
+
+
+PARTS = [("silence", 3.0), ("speech", 2.0), ("silence", 6.0), ("speech", 2.0), ("silence", 0.5),
+         ("speech", 1.0), ("silence", 4.0)]
+
+
+def test_long_silences_are_collapsed_and_times_map_back():
+    original = _meeting(PARTS)
+    prepared = collapse_silence(Audio(original), max_silence_ms=1000, keep_silence_ms=400)
+
+    assert prepared.original_seconds == 18.5
+    # 5 s of speech, the 0.5 s pause, a 0.4 s gap and a little padding
+    assert 5.9 <= prepared.audio.duration <= 7.5
+    assert abs(prepared.offsets.to_original(0.5) - 3.0) < 0.3  # first word, after 3 s of silence
+    for t in np.arange(0.0, prepared.audio.duration - 0.01, 0.37):
+        i = int(round(t * SAMPLE_RATE))
+        j = int(round(prepared.offsets.to_original(t) * SAMPLE_RATE))
+        assert prepared.audio.samples[i] == original[j]
+
+
+def test_silent_or_continuous_audio_is_left_alone():
+    silent = Audio(np.zeros(SAMPLE_RATE * 5, dtype=np.int16))
+    assert collapse_silence(silent).audio.duration == 5.0
+
+    talk = collapse_silence(Audio(_meeting([("speech", 8.0)])))
+    assert talk.removed_seconds == 0.0
+    assert talk.payload(original_bytes=8 * SAMPLE_RATE * 2 + 44) is None  # nothing to gain
+
+
+def test_stereo_48k_upload_is_sent_as_short_16k_mono(tmp_path):
+    path = tmp_path / "meeting.wav"
+    original = _stereo_wav(_meeting(PARTS, rate=48000, seed=1), 48000)
+    path.write_bytes(original)
+
+    with install(CONFIG) as usage:
+        result = anyio.run(transcribe_audio, str(path))
+
+    assert result["transcript_native"]
+    assert usage.counters["transcribe_calls"] == 1
+    assert usage.counters["audio_bytes"] < len(original) / 15
+    assert result["segments"] and all(0 <= s["start"] <= s["end"] <= 18.5 for s in result["segments"])
+    assert decode_bytes(original).duration == 18.5
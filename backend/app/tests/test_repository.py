@@ -0,0 +1,101 @@
+from datetime import timedelta
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.db.repository import MeetingRepository
+from app.db.session import init_db, make_engine
+
+
+@pytest.fixture
+def repo(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'meetings.db'}")
+    init_db(engine)
+    db = sessionmaker(bind=engine, expire_on_commit=False)()
+    yield MeetingRepository(db)
+    db.close()
+    engine.dispose()
+
+
+def test_keyset_pagination_walks_every_meeting_once(repo):
+    created = [repo.create_meeting(f"m{i}") for i in range(7)]
+    # two meetings with the same timestamp must still page deterministically
+    created[3].created_at = created[4].created_at
+    for i, m in enumerate(created):
+        m.created_at += timedelta(seconds=i if i != 3 else 4)
+    repo.db.commit()
+
+    seen, cursor = [], None
+    while True:
+        page, cursor = repo.list_meetings(limit=3, cursor=cursor)
+        seen.extend(m.title for m in page)
+        if cursor is None:
+            break
+    assert sorted(seen) == sorted(m.title for m in created)
+    assert len(seen) == len(set(seen)) == 7
+
+
+def test_bulk_segments_and_live_state_round_trip(repo):
+    meeting = repo.get_or_create_meeting("room-1", meeting_type="live")
+    assert repo.add_segments("room-1", ["one.", "two."]) == 2
+    assert repo.add_segments("room-1", [{"text": "three.", "start": 1.0, "end": 2.5}]) == 3
+    repo.add_actions("room-1", [{"assignee": "Ram", "text": "handle backend"}], source="rule")
+    repo.add_flags("room-1", ['toxic: "idiot"'])
+    repo.save_live_state("room-1", "so far", 2, 1, participants=["Ram", "Sakshi"])
+    repo.save_live_state("room-1", "so far", 2, 1, participants=["Sakshi", "Priya"])
+
+    state = repo.load_live_state(meeting.id)
+    assert state["participants"] == ["Ram", "Sakshi", "Priya"]
+    assert state["segments"] == ["one.", "two.", "three."]
+    assert (state["summary"], state["analyzed_upto"], state["interruptions"]) == ("so far", 2, 1)
+    assert state["actions"] == [{"assignee": "Ram", "text": "handle backend"}]
+    assert repo.list_flags("room-1")[0].category == "toxic"
+    assert [a.text for a in repo.list_actions(assignee="Ram")] == ["handle backend"]
+    assert repo.segment_texts("room-1", after_seq=2) == ["three."]
+
+
+def test_a_live_tick_is_stored_once_and_leases_exclude_each_other(repo):
+    repo.get_or_create_meeting("room-2", meeting_type="live")
+    repo.add_segments("room-2", ["one.", "two."])
+    repo.add_actions("room-2", [{"assignee": "Ram", "text": "handle backend"}], source="rule")
+    tick = {"summary": "s", "analyzed_segments": 2, "moderation": {"interruptions": 1}, "new_notes": ["late"],
+            "new_actions": [{"assignee": "ram", "text": "Handle backend"}, {"assignee": "Priya", "text": "budget"}]}
+
+    assert repo.save_live_analysis("room-2", 0, tick) is True
+    assert repo.save_live_analysis("room-2", 0, {**tick, "summary": "other worker"}) is False
+    state = repo.load_live_state("room-2")
+    assert (state["summary"], state["analyzed_upto"], state["notes"]) == ("s", 2, ["late"])
+    assert [a["text"] for a in state["actions"]] == ["handle backend", "budget"]
+
+    assert repo.claim_live_lease("room-2", "a", 60) and repo.claim_live_lease("room-2", "a", 60)
+    assert not repo.claim_live_lease("room-2", "b", 60)
+    repo.release_live_lease("room-2", "a")
+    assert repo.claim_live_lease("room-2", "b", -1)  # already expired
+    assert repo.claim_live_lease("room-2", "a", 60)
+
+
+def test_uploads_are_addressed_by_id(repo):
+    first = repo.create_upload("a.wav", "/tmp/a.wav", 10)
+    second = repo.create_upload("b.wav", "/tmp/b.wav", 20)
+    assert repo.get_upload(first.id).filename == "a.wav"
+    assert repo.get_upload(second.id).filename == "b.wav"
+
+
+def test_meeting_routes_answer_in_the_schema_shapes():
+    from fastapi.testclient import TestClient
+
+    from app.db.session import SessionLocal
+    from app.main import app
+
+    client = TestClient(app)
+    meeting = client.post("/api/v1/meetings", params={"title": "Standup"}).json()
+    assert {"id", "title", "meeting_type", "created_at", "updated_at"} <= set(meeting)
+    with SessionLocal() as db:
+        MeetingRepository(db).add_actions(meeting["id"], [{"assignee": "Ram", "text": "ship it"}], source="rule")
+
+    page = client.get("/api/v1/meetings", params={"limit": 1}).json()
+    assert set(page) == {"items", "next_cursor"} and len(page["items"]) == 1
+
+    detail = client.get(f"/api/v1/meetings/{meeting['id']}").json()
+    assert detail["title"] == "Standup" and detail["transcript"] is None
+    assert [(a["assignee"], a["text"], a["source"]) for a in detail["actions"]] == [("Ram", "ship it", "rule")]
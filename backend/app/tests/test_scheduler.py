@@ -0,0 +1,130 @@
+import threading
+import time
+
+import anyio
+import pytest
+
+from app.services.scheduler import BATCH, LIVE, Scheduler, SchedulerBusy, priority
+
+
+class _Response:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+    def __init__(self, retry_after="0.05"):
+        super().__init__("429 Too Many Requests")
+        self.response = _Response({"retry-after": retry_after})
+
+
+def test_retries_429_honoring_retry_after_then_succeeds():
+    s = Scheduler(retries=3, backoff_base=0.001)
+    calls = []
+
+    def flaky():
+        calls.append(time.monotonic())
+        if len(calls) < 3:
+            raise RateLimited()
+        return "ok"
+
+    assert s.call("m", flaky) == "ok"
+    assert len(calls) == 3 and calls[1] - calls[0] >= 0.05
+    assert s.stats()["retried"] == 2
+
+
+def test_non_retryable_errors_fail_fast_and_exhausted_429_becomes_busy():
+    s = Scheduler(retries=1, backoff_base=0.001)
+    with pytest.raises(ValueError):
+        s.call("m", lambda: (_ for _ in ()).throw(ValueError("bad request")))
+
+    def always_limited():
+        raise RateLimited("0.01")
+
+    with pytest.raises(SchedulerBusy) as info:
+        s.call("m", always_limited)
+    assert info.value.retry_after == pytest.approx(0.01)
+
+
+def test_over_budget_calls_are_rejected_with_a_retry_hint():
+    # 60 rpm = 1/s with a burst of 10; the 11th call would wait ~1s
+    s = Scheduler(limits={"m": {"rpm": 60}}, max_wait={"interactive": 0.5})
+    for _ in range(10):
+        s.call("m", lambda: None)
+    with pytest.raises(SchedulerBusy) as info:
+        s.call("m", lambda: None)
+    assert info.value.retry_after >= 1
+    assert s.stats()["models"]["m"]["rejected"] == 1
+
+
+def test_oversized_calls_are_admitted_once_the_bucket_is_full():
+    # 12000 tpm: a bucket of 2000 tokens refilling at 200/s
+    s = Scheduler(limits={"m": {"rpm": 600, "tpm": 12000}}, max_wait={"live": 1.0})
+    with priority(LIVE):
+        assert s.call("m", lambda: "ok", tokens=4000) == "ok"  # full bucket: admitted at once
+        s.limiter("m").tokens.level = 1900  # 0.5s short of full
+        started = time.monotonic()
+        assert s.call("m", lambda: "ok", tokens=4000) == "ok"
+    assert time.monotonic() - started < 1.0
+    assert s.stats()["models"]["m"]["rejected"] == 0
+
+
+def test_live_calls_are_admitted_before_queued_batch_calls():
+    s = Scheduler(limits={"m": {"rpm": 600}})  # 10/s, burst of 100
+    limiter = s.limiter("m")
+    limiter.requests.level = 0  # empty bucket: everyone queues
+    order = []
+
+    def worker(level, name):
+        with priority(level):
+            s.call("m", lambda: order.append(name))
+
+    batch = [threading.Thread(target=worker, args=(BATCH, f"batch{i}")) for i in range(3)]
+    for t in batch:
+        t.start()
+    time.sleep(0.03)
+    live = threading.Thread(target=worker, args=(LIVE, "live"))
+    live.start()
+    for t in batch + [live]:
+        t.join()
+    assert order.index("live") <= 1  # at most the batch call already at the head goes first
+
+
+def test_async_calls_share_the_limiter():
+    s = Scheduler(limits={"m": {"rpm": 60}}, max_wait={"interactive": 0.1})
+
+    async def main():
+        async def ok():
+            return 1
+        return [await s.acall("m", ok) for _ in range(10)]
+
+    assert anyio.run(main) == [1] * 10
+    with pytest.raises(SchedulerBusy):
+        s.call("m", lambda: None)
+
+
+def test_busy_maps_to_503_with_retry_after():
+    from app.main import app
+
+    handler = app.exception_handlers[SchedulerBusy]
+    response = anyio.run(handler, None, SchedulerBusy("m", 2.2, "queue full"))
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "3"
+
+
+def test_each_process_enforces_its_share_of_the_account_limits(monkeypatch):
+    from app.config import get_settings
+    from app.services.scheduler import get_scheduler, set_scheduler
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "SCHEDULER_LIMITS", {"m": {"rpm": 60, "tpm": 12000}})
+    monkeypatch.setattr(settings, "SCHEDULER_LIMIT_SHARE", 0.25)
+    previous = set_scheduler(None)
+    try:
+        limiter = get_scheduler().limiter("m")
+    finally:
+        set_scheduler(previous)
+    assert limiter.requests.rate == pytest.approx(15 / 60)
+    assert limiter.tokens.rate == pytest.approx(3000 / 60)
@@ -0,0 +1,40 @@
+import pytest
+
+from app.services.search import SearchIndex, to_match_query
+
+
+@pytest.fixture
+def index(tmp_path):
+    return SearchIndex(str(tmp_path / "search.db"))
+
+
+def test_ranking_filters_and_snippets(index):
+    index.index_analysis("m1", title="Budget review", transcript="We discussed the budget and hiring plans.",
+                         summary="Budget approved for Q3.", actions=[{"assignee": "Ram", "text": "send budget sheet"}])
+    index.index_analysis("m2", title="Standup", transcript="Deploying the backend today, budget not discussed.",
+                         actions=[{"owner": "Asha", "title": "fix login bug"}])
+
+    hits = index.search("budget")
+    assert {h["meeting_id"] for h in hits} == {"m1", "m2"}
+    assert hits[0]["meeting_id"] == "m1"  # title match weighs more
+    assert "[budget]" in hits[0]["snippet"].lower()
+
+    assert [h["kind"] for h in index.search("budget", kinds=["action"])] == ["action"]
+    assert {h["meeting_id"] for h in index.search("budget", meeting_ids=["m2"])} == {"m2"}
+    assert index.search("Asha login")[0]["snippet"].startswith("[Asha]")
+
+
+def test_summary_is_replaced_and_queries_fall_back_to_any_term(index):
+    index.add("m1", "summary", "first draft")
+    index.add("m1", "summary", "final version", replace=True)
+    assert index.stats()["documents"] == {"summary": 1}
+    assert index.search("draft") == []
+    # no document has both words: any-term fallback still finds one
+    assert index.search("final nonexistentword")[0]["meeting_id"] == "m1"
+
+
+def test_user_input_is_never_parsed_as_fts_syntax(index):
+    index.add("m1", "transcript", "Ship it by 5pm (UTC) - NOT later")
+    assert to_match_query('budget" OR *') == '"budget" "or"'
+    assert index.search('NOT "later') and index.search("(utc) AND")
+    assert index.search("!!!") == []
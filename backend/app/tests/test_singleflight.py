@@ -0,0 +1,96 @@
+import asyncio
+import threading
+import time
+
+import anyio
+import httpx
+
+from app.services.singleflight import SingleFlight, get_singleflight
+from benchmarks.fake_groq import FakeConfig, install
+
+
+def test_concurrent_threads_share_one_execution():
+    flight, runs = SingleFlight(), []
+    release = threading.Event()
+
+    def work():
+        runs.append(1)
+        release.wait(5)
+        return {"summary": "done"}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do("analyze", "k", work))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while flight.stats()["waiting"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(runs) == 1
+    assert results == [{"summary": "done"}] * 5
+    assert results[0] is not results[1]  # every caller gets its own copy
+    assert flight.stats() == {"in_flight": 0, "waiting": 0,
+                              "calls": {"analyze": {"executed": 1, "coalesced": 4, "takeovers": 0}}}
+
+
+def test_errors_reach_every_waiter_and_nothing_is_remembered():
+    flight = SingleFlight()
+
+    async def main():
+        async def boom():
+            await asyncio.sleep(0.05)
+            raise ValueError("model down")
+
+        outcomes = await asyncio.gather(*(flight.ado("a", "k", boom) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(o, ValueError) for o in outcomes)
+
+        async def ok():
+            return 42
+        assert await flight.ado("a", "k", ok) == 42  # a finished call is not cached
+
+    anyio.run(main)
+
+
+def test_waiter_takes_over_when_the_running_caller_is_cancelled():
+    flight, runs = SingleFlight(), []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.1)
+        return len(runs)
+
+    async def main():
+        first = asyncio.create_task(flight.ado("a", "k", work))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(flight.ado("a", "k", work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert anyio.run(main) == 2
+    assert flight.stats()["calls"]["a"]["takeovers"] == 1
+
+
+def test_tabs_posting_the_same_transcript_cause_one_model_call():
+    from app.main import app
+
+    before = get_singleflight().stats()["calls"].get("analyze_transcript", {}).get("coalesced", 0)
+    transcript = "Ram will send the deck by Friday. Priya owns the budget review."
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            return await asyncio.gather(*(
+                client.post("/api/v1/meetings/process", json={"transcript": transcript}) for _ in range(4)
+            ))
+
+    # the result cache is off under install(): only coalescing can save calls here
+    with install(FakeConfig(latency_ms=300, jitter_ms=0, token_ms=0)) as usage:
+        responses = anyio.run(main)
+
+    assert all(r.status_code == 200 for r in responses)
+    assert len({r.json()["summary"] for r in responses}) == 1
+    assert usage.counters["chat_calls"] == 1
+    assert get_singleflight().stats()["calls"]["analyze_transcript"]["coalesced"] - before == 3
+
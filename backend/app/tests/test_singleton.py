@@ -0,0 +1,24 @@
+import threading
+
+from app.utils.singleton import Singleton
+
+
+def test_concurrent_callers_share_one_instance():
+    built = []
+    ready = threading.Barrier(8)
+    instance = Singleton(lambda: built.append(object()) or built[-1])
+    seen = []
+
+    def get():
+        ready.wait()
+        seen.append(instance.get())
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(built) == 1 and all(s is built[0] for s in seen)
+
+    assert instance.set(None) is built[0]
+    assert instance.get() is not built[0] and len(built) == 2
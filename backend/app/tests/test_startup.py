@@ -0,0 +1,46 @@
+import subprocess
+import sys
+
+import anyio
+import httpx
+
+from app.config import get_settings
+from app.services.groq_clients import set_client_manager
+
+
+def test_ready_is_503_until_startup_then_reports_warmup(monkeypatch):
+    from app.main import app
+
+    settings = get_settings()
+    monkeypatch.setattr(settings, "WARMUP", True)
+    monkeypatch.setattr(settings, "JOB_WORKERS", 0)
+    previous = set_client_manager(None)  # the lifespan closes the manager it creates
+
+    async def main():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://t") as client:
+            before = await client.get("/ready")
+            async with app.router.lifespan_context(app):
+                during = await client.get("/ready")
+            after = await client.get("/ready")
+        return before, during, after
+
+    try:
+        before, during, after = anyio.run(main)
+    finally:
+        set_client_manager(previous)
+    assert before.status_code == 503 and after.status_code == 503
+    assert during.status_code == 200
+    body = during.json()
+    assert body["status"] == "ready" and body["startup_ms"] >= 0
+    assert set(body["warmup"]) == {"database", "search", "cache", "scheduler", "language_id"}
+    assert all(isinstance(ms, float) for ms in body["warmup"].values())
+
+
+def test_language_id_loads_langdetect_only_on_fallback():
+    script = (
+        "import sys; from app.services.langid import detect_language; "
+        "assert detect_language('we will ship the release and it is on track') == 'en'; "
+        "print('langdetect' in sys.modules)"
+    )
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "False"
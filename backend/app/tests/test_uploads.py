@@ -0,0 +1,74 @@
+import hashlib
+import io
+import os
+import tempfile
+
+import anyio
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from app.utils.uploads import spool_upload, spooled_upload
+
+DATA = os.urandom(3 * 1024 * 1024 + 17)
+
+
+def _upload(data: bytes = DATA, filename: str = "talk.wav") -> UploadFile:
+    return UploadFile(io.BytesIO(data), filename=filename)
+
+
+def test_spool_hashes_while_copying(tmp_path):
+    spooled = anyio.run(lambda: spool_upload(_upload(), directory=str(tmp_path)))
+    assert spooled.path.endswith(".wav") and spooled.size == len(DATA)
+    assert spooled.sha256 == hashlib.sha256(DATA).hexdigest()
+    with open(spooled.path, "rb") as f:
+        assert f.read() == DATA
+
+
+def test_oversized_upload_is_rejected_without_leftovers(tmp_path):
+    with pytest.raises(HTTPException) as info:
+        anyio.run(lambda: spool_upload(_upload(), directory=str(tmp_path), max_bytes=1024 * 1024))
+    assert info.value.status_code == 413
+    assert os.listdir(tmp_path) == []
+
+
+def test_spooled_upload_removes_the_temp_file_on_error(tmp_path, monkeypatch):
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    seen = []
+
+    async def main():
+        async with spooled_upload(_upload()) as audio:
+            seen.append(audio.path)
+            assert os.path.exists(audio.path)
+            raise RuntimeError("transcription failed")
+
+    with pytest.raises(RuntimeError):
+        anyio.run(main)
+    assert seen and os.listdir(tmp_path) == []
+
+
+def test_an_upload_is_deleted_once_transcribed(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.config import get_settings
+    from app.db.repository import MeetingRepository
+    from app.db.session import SessionLocal
+    from app.main import app
+    from benchmarks.fake_groq import FakeConfig, install
+
+    monkeypatch.setattr(get_settings(), "GROQ_API_KEY", "x")
+    monkeypatch.setattr(get_settings(), "AUDIO_PREPROCESS", False)
+    client = TestClient(app)
+    with install(FakeConfig(latency_ms=0, jitter_ms=0, token_ms=0, transcribe_ms=0, transcript_words=5)):
+        files = {"file": ("talk.wav", DATA[:4096], "audio/wav")}
+        upload_id = client.post("/api/v1/meetings/upload", files=files).json()["upload_id"]
+        with SessionLocal() as db:
+            path = MeetingRepository(db).get_upload(upload_id).path
+        assert os.path.exists(path)
+
+        response = client.post("/api/v1/meetings/transcribe", params={"upload_id": upload_id})
+        assert response.status_code == 200 and response.json()["text"]
+
+    assert not os.path.exists(path)
+    with SessionLocal() as db:
+        assert MeetingRepository(db).get_upload(upload_id) is None
+    assert client.post("/api/v1/meetings/transcribe", params={"upload_id": upload_id}).status_code == 404
@@ -11,4 +11,9 @@ def format_meeting_notes(notes: str) -> str:
 
 def validate_meeting_data(meeting_data: dict) -> bool:
     required_fields = ['title', 'start_time', 'end_time', 'participants']
-    return all(field in meeting_data for field in required_fields)
\ No newline at end of file
+    return all(field in meeting_data for field in required_fields)
+
+def format_sse(event: str, data) -> str:
+    import json
+
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
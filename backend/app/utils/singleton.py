@@ -0,0 +1,30 @@
+# app/utils/singleton.py
+import threading
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Singleton(Generic[T]):
+    """
+    A process-wide instance, built by `factory` on first use (once, however
+    many threads ask at the same time).
+    """
+
+    def __init__(self, factory: Callable[[], T]):
+        self._factory = factory
+        self._value: Optional[T] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> T:
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+        return self._value
+
+    def set(self, value: Optional[T]) -> Optional[T]:
+        """Replaces the instance (None resets it); returns the previous one."""
+        with self._lock:
+            previous, self._value = self._value, value
+        return previous
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+import anyio
+from fastapi import HTTPException, UploadFile
+
+from app.config import get_settings
+
+CHUNK_SIZE = 1024 * 1024  # 1 MiB
+
+
+@dataclass
+class SpooledUpload:
+    path: str
+    size: int
+    sha256: str  # hex digest of the content, usable as the transcription cache key
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(status_code=413, detail=f"Upload exceeds the {max_bytes} byte limit")
+
+
+def upload_suffix(file: UploadFile, default: str = ".mp3") -> str:
+    # Whisper picks the decoder from the file extension
+    return os.path.splitext(file.filename or "")[1].lower() or default
+
+
+def remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def spool_upload(file: UploadFile, suffix: str | None = None, directory: str | None = None,
+                       max_bytes: int | None = None) -> SpooledUpload:
+    """
+    Copies an uploaded file to a named temp file (in `directory` if given)
+    in fixed-size chunks without blocking the event loop, hashing it on the
+    way, so memory stays at one chunk whatever the file size. Uploads over
+    `max_bytes` (default MAX_UPLOAD_BYTES) are rejected with 413 and
+    nothing is left on disk. The caller is responsible for removing the
+    file (or use spooled_upload()).
+    """
+    max_bytes = get_settings().MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+    if file.size is not None and file.size > max_bytes:
+        raise _too_large(max_bytes)  # known up front: don't copy anything
+
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=suffix or upload_suffix(file), dir=directory)
+    os.close(fd)
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        async with await anyio.open_file(path, "wb") as out:
+            while chunk := await file.read(CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise _too_large(max_bytes)
+                digest.update(chunk)
+                await out.write(chunk)
+    except BaseException:
+        remove_quietly(path)
+        raise
+    return SpooledUpload(path=path, size=size, sha256=digest.hexdigest())
+
+
+@asynccontextmanager
+async def spooled_upload(file: UploadFile, suffix: str | None = None,
+                         max_bytes: int | None = None) -> AsyncIterator[SpooledUpload]:
+    """
+    spool_upload() whose temp file is removed when the block exits, however it exits.
+    """
+    upload = await spool_upload(file, suffix=suffix, max_bytes=max_bytes)
+    try:
+        yield upload
+    finally:
+        remove_quietly(upload.path)
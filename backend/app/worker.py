@@ -0,0 +1,41 @@
+# app/worker.py
+"""
+Standalone job worker: `python -m app.worker [--workers N]`.
+
+Runs the background analysis jobs (app/services/jobs.py) from the shared
+database until interrupted or sent SIGTERM. Run the API with JOB_WORKERS=0
+to keep all analysis out of the web process, or run both to add capacity.
+"""
+import argparse
+import asyncio
+import signal
+
+from app.config import get_settings
+from app.core.logger import logger
+from app.services.groq_clients import close_client_manager, get_client_manager
+from app.services.jobs import build_job_runner
+
+
+async def main(workers: int) -> None:
+    get_client_manager()
+    runner = build_job_runner(workers)
+    runner.start()
+    logger.info(f"Job worker {runner.owner} running {workers} worker(s)")
+    # SIGTERM (docker stop) hands running jobs back to the queue like Ctrl-C does
+    stopping = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stopping.set)
+    try:
+        await stopping.wait()
+    finally:
+        await runner.stop()
+        await close_client_manager()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run background analysis jobs.")
+    parser.add_argument("--workers", type=int, default=max(1, get_settings().JOB_WORKERS))
+    args = parser.parse_args()
+    try:
+        asyncio.run(main(args.workers))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,5 @@
+# benchmarks/__init__.py
+"""
+Offline benchmark harness: drives the API in-process against a fake Groq
+client (see fake_groq.py). Run with `python -m benchmarks.run --help`.
+"""
@@ -0,0 +1,280 @@
+# benchmarks/fake_groq.py
+"""
+Stand-ins for groq.Groq / groq.AsyncGroq with configurable latency, jitter
+and error rate, so the pipeline can be benchmarked without a network.
+
+Only the surface the services use is implemented:
+chat.completions.create (incl. stream=True on the async client) and
+audio.transcriptions.create. Responses are synthesized from the prompt
+(moderation / actions / analysis JSON, summaries, translations) and token
+usage is estimated locally. Usage is added to the global counters and to
+the per-request `usage` dict in the REQUEST_USAGE context variable, which
+the benchmark driver sets for every request it sends.
+"""
+import asyncio
+import contextlib
+import contextvars
+import hashlib
+import io
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+from app.services.map_reduce import estimate_tokens
+from benchmarks import corpus
+
+REQUEST_USAGE: contextvars.ContextVar[Optional[Dict[str, int]]] = contextvars.ContextVar("request_usage", default=None)
+
+
+class FakeGroqError(RuntimeError):
+    """Injected failure (stands in for a 5xx / rate-limit from the API)."""
+
+
+class FakeGroqTimeout(FakeGroqError, TimeoutError):
+    """A call slower than the `timeout` it was given."""
+
+
+@dataclass
+class FakeConfig:
+    latency_ms: float = 250.0        # base latency of every call
+    jitter_ms: float = 100.0         # uniform +/- jitter
+    token_ms: float = 1.0            # extra latency per completion token
+    transcribe_ms: float = 800.0     # base latency of a transcription
+    model_latency_ms: Dict[str, float] = field(default_factory=dict)  # base latency per chat model
+    error_rate: float = 0.0          # share of calls that raise FakeGroqError
+    transcript_words: int = 1500     # length of every fake transcription
+    seed: int = 0
+
+
+class Usage:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+
+    def add(self, **values: int) -> None:
+        per_request = REQUEST_USAGE.get()
+        with self._lock:
+            for name, value in values.items():
+                self.counters[name] = self.counters.get(name, 0) + value
+                if per_request is not None:
+                    per_request[name] = per_request.get(name, 0) + value
+
+
+def _prompt_text(messages: List[Dict[str, str]]) -> str:
+    return "\n".join(str(m.get("content", "")) for m in messages)
+
+
+def _reply(messages: List[Dict[str, str]], max_tokens: int, rng: random.Random) -> str:
+    """
+    A plausible answer for each prompt family the services send.
+    """
+    system = str(messages[0].get("content", "")) if messages else ""
+    prompt = _prompt_text(messages)
+    if "moderation classifier" in system:
+        return json.dumps({"is_flagged": False, "categories": {"hate": False, "violence": False, "sexual": False,
+                                                               "self_harm": False}, "notes": "No issues found."})
+    if "action extractor" in system:
+        names = rng.sample(corpus.NAMES, 3)
+        return json.dumps({
+            "actions": [{"title": f"Follow up on {rng.choice(corpus.TOPICS)}", "owner": n, "due_date": "Friday",
+                         "priority": "Medium", "notes": ""} for n in names],
+            "decisions": [{"title": "Keep the current scope", "details": "Agreed by the team."}],
+        })
+    if "meeting analyst" in system:
+        names = rng.sample(corpus.NAMES, 3)
+        return json.dumps({
+            "summary_en": "\n".join("- " + corpus.sentence(rng) for _ in range(4)),
+            "actions": [{"title": f"Follow up on {rng.choice(corpus.TOPICS)}", "owner": n, "due_date": "Friday",
+                         "priority": "Medium", "notes": ""} for n in names],
+            "decisions": [{"title": "Keep the current scope", "details": "Agreed by the team."}],
+            "moderation": {"is_flagged": False, "categories": {"hate": False, "violence": False, "sexual": False,
+                                                               "self_harm": False}, "notes": ""},
+        })
+    if "Meeting Analysis AI" in system:
+        names = rng.sample(corpus.NAMES, 2)
+        return json.dumps({
+            "summary": " ".join(corpus.sentence(rng) for _ in range(3)),
+            "actions": [{"assignee": n, "text": f"Review {rng.choice(corpus.TOPICS)}"} for n in names],
+            "moderation": {"interruptions": rng.randint(0, 2), "notes": []},
+        })
+    if "translation assistant" in system:
+        return prompt.partition("Text:\n")[2].strip() or prompt[-2000:]
+    # summaries (map, reduce, native-language translation of a summary)
+    words = min(max_tokens // 2, 180)
+    out: List[str] = []
+    while sum(len(s.split()) for s in out) < words:
+        out.append("- " + corpus.sentence(rng))
+    return "\n".join(out)
+
+
+class _Base:
+    def __init__(self, config: FakeConfig, usage: Usage):
+        self.config = config
+        self.usage = usage
+        self._rng = random.Random(config.seed)
+        self._rng_lock = threading.Lock()
+
+    def _delay(self, base_ms: float, tokens: int = 0) -> float:
+        with self._rng_lock:
+            jitter = self._rng.uniform(-self.config.jitter_ms, self.config.jitter_ms)
+            fail = self._rng.random() < self.config.error_rate
+        if fail:
+            self.usage.add(injected_errors=1)
+            raise FakeGroqError("injected fake Groq failure")
+        return max(0.0, base_ms + jitter + tokens * self.config.token_ms) / 1000
+
+    def _chat(self, model: str, messages: List[Dict[str, str]], max_tokens: int) -> Dict[str, Any]:
+        digest = hashlib.sha256(_prompt_text(messages).encode("utf-8")).digest()
+        content = _reply(messages, max_tokens, random.Random(digest))
+        prompt_tokens = sum(estimate_tokens(str(m.get("content", ""))) for m in messages)
+        completion_tokens = estimate_tokens(content)
+        self.usage.add(chat_calls=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                       **{f"chat_calls:{model}": 1})
+        return {
+            "content": content,
+            "delay": self._delay(self.config.model_latency_ms.get(model, self.config.latency_ms), completion_tokens),
+            "usage": SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+        }
+
+    def _transcription(self, file: Any, response_format: str) -> Dict[str, Any]:
+        data = _read_file(file)
+        seed = int.from_bytes(hashlib.sha256(data).digest()[:4], "big")
+        text = corpus.transcript(self.config.transcript_words, seed)
+        self.usage.add(transcribe_calls=1, audio_bytes=len(data))
+        words = text.split()
+        segments = []
+        if response_format == "verbose_json":
+            # ~2.5 words/second, 12-word segments
+            for i in range(0, len(words), 12):
+                segments.append(SimpleNamespace(start=i / 2.5, end=min(len(words), i + 12) / 2.5,
+                                                text=" ".join(words[i:i + 12])))
+        return {
+            "response": SimpleNamespace(text=text, language="en", duration=len(words) / 2.5, segments=segments),
+            "delay": self._delay(self.config.transcribe_ms),
+        }
+
+
+def _read_file(file: Any) -> bytes:
+    if isinstance(file, tuple):
+        file = file[1]
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if isinstance(file, (str, Path)):
+        return Path(file).read_bytes()
+    if isinstance(file, io.IOBase) or hasattr(file, "read"):
+        return file.read()
+    raise TypeError(f"unsupported file argument: {type(file)!r}")
+
+
+def _completion(content: str, usage: Any) -> Any:
+    message = SimpleNamespace(content=content, role="assistant")
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason="stop")], usage=usage)
+
+
+def _stream_chunks(content: str, usage: Any) -> Iterator[Any]:
+    words = content.split(" ")
+    for i, word in enumerate(words):
+        piece = word if i == 0 else " " + word
+        yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece))])
+    # like Groq: the usage comes in a last, empty chunk
+    yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=None))],
+                          x_groq=SimpleNamespace(usage=usage))
+
+
+class FakeGroq(_Base):
+    """Blocking client: sleeps in the calling thread like the real SDK."""
+
+    def __init__(self, config: FakeConfig, usage: Usage):
+        super().__init__(config, usage)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat))
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(create=self._create_transcription))
+
+    def _create_chat(self, model: str, messages: List[Dict[str, str]], max_tokens: int = 1024, **kwargs: Any) -> Any:
+        reply = self._chat(model, messages, max_tokens)
+        timeout = kwargs.get("timeout")
+        if timeout is not None and reply["delay"] > timeout:
+            time.sleep(timeout)
+            raise FakeGroqTimeout(f"{model} timed out after {timeout}s")
+        time.sleep(reply["delay"])
+        return _completion(reply["content"], reply["usage"])
+
+    def _create_transcription(self, model: str, file: Any, response_format: str = "json", **kwargs: Any) -> Any:
+        result = self._transcription(file, response_format)
+        time.sleep(result["delay"])
+        return result["response"]
+
+
+class FakeAsyncGroq(_Base):
+    """Async client: awaits the latency instead of blocking the loop."""
+
+    def __init__(self, config: FakeConfig, usage: Usage):
+        super().__init__(config, usage)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create_chat))
+        self.audio = SimpleNamespace(transcriptions=SimpleNamespace(create=self._create_transcription))
+
+    async def _create_chat(
+        self, model: str, messages: List[Dict[str, str]], max_tokens: int = 1024, stream: bool = False, **kwargs: Any
+    ) -> Any:
+        reply = self._chat(model, messages, max_tokens)
+        timeout = kwargs.get("timeout")
+        if timeout is not None and reply["delay"] > timeout:
+            await asyncio.sleep(timeout)
+            raise FakeGroqTimeout(f"{model} timed out after {timeout}s")
+        if not stream:
+            await asyncio.sleep(reply["delay"])
+            return _completion(reply["content"], reply["usage"])
+
+        # first token after the base latency, the rest spread over the token time
+        chunks = list(_stream_chunks(reply["content"], reply["usage"]))
+        first = max(0.0, reply["delay"] - len(chunks) * self.config.token_ms / 1000)
+
+        async def gen():
+            await asyncio.sleep(first)
+            for chunk in chunks:
+                yield chunk
+                await asyncio.sleep(self.config.token_ms / 1000)
+
+        return gen()
+
+    async def _create_transcription(self, model: str, file: Any, response_format: str = "json", **kwargs: Any) -> Any:
+        result = self._transcription(file, response_format)
+        await asyncio.sleep(result["delay"])
+        return result["response"]
+
+
+@contextlib.contextmanager
+def install(config: FakeConfig, cache: bool = False) -> Iterator[Usage]:
+    """
+    Points every service at the fakes for the duration of the block by
+    swapping in a client manager that hands them out. The result cache is
+    off unless `cache` is set, so every request reaches the fake; the
+    scheduler has no rate limits, so the numbers measure the app, not
+    Groq's quotas.
+    """
+    from app.config import get_settings
+    from app.services.groq_clients import ClientManager, set_client_manager
+    from app.services.scheduler import Scheduler, set_scheduler
+
+    usage = Usage()
+    sync_client = FakeGroq(config, usage)
+    async_client = FakeAsyncGroq(config, usage)
+    settings = get_settings()
+    saved = (settings.GROQ_API_KEY, settings.CACHE_ENABLED)
+    settings.GROQ_API_KEY = settings.GROQ_API_KEY or "benchmark"
+    settings.CACHE_ENABLED = cache
+    manager = ClientManager(settings, groq=sync_client, agroq=async_client)
+    manager.groq_for = lambda api_key: sync_client
+    previous = set_client_manager(manager)
+    previous_scheduler = set_scheduler(Scheduler(max_queue=1 << 30))
+    try:
+        yield usage
+    finally:
+        set_scheduler(previous_scheduler)
+        set_client_manager(previous)
+        manager.close()
+        settings.GROQ_API_KEY, settings.CACHE_ENABLED = saved
@@ -0,0 +1,263 @@
+# benchmarks/run.py
+"""
+Benchmark driver.
+
+Sends requests to the FastAPI app in-process (httpx ASGITransport, no
+sockets) with every Groq call served by the fakes in fake_groq.py, and
+reports p50/p95/p99 latency, throughput and LLM tokens per request.
+
+    python -m benchmarks.run --scenario all --concurrency 8 --requests 40
+    python -m benchmarks.run --save benchmarks/baselines/default.json
+    python -m benchmarks.run --compare benchmarks/baselines/default.json
+
+Scenarios:
+  analyze  POST /api/v1/analyze with a WAV upload (full stage pipeline)
+  process  POST /api/v1/meetings/process with a transcript
+  live     virtual live meetings: one POST /meetings/{id}/segments per
+           caption line (analyze=false) plus an analysis tick every
+           --tick-every lines
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+
+os.environ.setdefault("GROQ_API_KEY", "benchmark")  # the services build their clients at import
+# keep benchmark meetings/uploads out of the real store
+_SCRATCH = tempfile.mkdtemp(prefix="bench_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_SCRATCH, 'meetings.db')}")
+os.environ.setdefault("UPLOAD_DIR", os.path.join(_SCRATCH, "uploads"))
+os.environ.setdefault("SEARCH_INDEX_PATH", os.path.join(_SCRATCH, "search.db"))
+
+from app.main import app  # noqa: E402
+from benchmarks import corpus  # noqa: E402
+from benchmarks.fake_groq import REQUEST_USAGE, FakeConfig, install  # noqa: E402
+
+SCENARIOS = ("analyze", "process", "live")
+# metrics compared against a baseline; higher is worse for all of them
+COMPARED = ("p50_ms", "p95_ms", "p99_ms", "prompt_tokens_per_request", "completion_tokens_per_request",
+            "chat_calls_per_request")
+
+
+class Recorder:
+    def __init__(self):
+        self.samples: Dict[str, List[Tuple[float, bool, Dict[str, int]]]] = {}
+        self.started = time.perf_counter()
+
+    async def timed(self, op: str, send: Callable[[], Awaitable[httpx.Response]]) -> Optional[httpx.Response]:
+        usage: Dict[str, int] = {}
+        token = REQUEST_USAGE.set(usage)
+        start = time.perf_counter()
+        ok, response = True, None
+        try:
+            response = await send()
+            ok = response.status_code < 400 and not _has_error(response)
+        except Exception as e:
+            print(f"{op} request failed: {e}", file=sys.stderr)
+            ok = False
+        finally:
+            REQUEST_USAGE.reset(token)
+        self.samples.setdefault(op, []).append(((time.perf_counter() - start) * 1000, ok, usage))
+        return response
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = time.perf_counter() - self.started
+        ops: Dict[str, Any] = {}
+        for op, samples in self.samples.items():
+            latencies = np.array([s[0] for s in samples])
+            n = len(samples)
+
+            def per_request(name: str) -> float:
+                return round(sum(s[2].get(name, 0) for s in samples) / n, 1)
+
+            p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+            ops[op] = {
+                "requests": n,
+                "errors": sum(1 for s in samples if not s[1]),
+                "p50_ms": round(float(p50), 1),
+                "p95_ms": round(float(p95), 1),
+                "p99_ms": round(float(p99), 1),
+                "mean_ms": round(float(latencies.mean()), 1),
+                "throughput_rps": round(n / elapsed, 2),
+                "prompt_tokens_per_request": per_request("prompt_tokens"),
+                "completion_tokens_per_request": per_request("completion_tokens"),
+                "chat_calls_per_request": per_request("chat_calls"),
+                "transcribe_calls_per_request": per_request("transcribe_calls"),
+            }
+        return {"elapsed_s": round(elapsed, 2), "operations": ops}
+
+
+def _has_error(response: httpx.Response) -> bool:
+    """
+    Services report failures as {"error": ...} inside a 200 response.
+    """
+    try:
+        body = response.json()
+    except ValueError:
+        return False
+    if not isinstance(body, dict):
+        return False
+    data = body.get("data") if isinstance(body.get("data"), dict) else {}
+    return "error" in body or body.get("status") == "error" or any(
+        isinstance(v, dict) and "error" in v for v in data.values()
+    )
+
+
+async def _run_workers(jobs: List[Callable[[], Awaitable[None]]], concurrency: int) -> None:
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+
+    async def worker():
+        while not queue.empty():
+            job = queue.get_nowait()
+            await job()
+
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+
+
+def _jobs(scenario: str, client: httpx.AsyncClient, rec: Recorder, args: argparse.Namespace) -> List[Callable]:
+    base = args.seed * 100_000
+    if scenario == "analyze":
+        def analyze(i: int):
+            async def job():
+                audio = corpus.wav(args.audio_seconds, base + i)
+                await rec.timed("analyze", lambda: client.post(
+                    "/api/v1/analyze", files={"file": (f"bench_{i}.wav", audio, "audio/wav")}))
+            return job
+        return [analyze(i) for i in range(args.requests)]
+
+    if scenario == "process":
+        def process(i: int):
+            async def job():
+                transcript = corpus.transcript(args.words, base + i)
+                await rec.timed("process", lambda: client.post(
+                    "/api/v1/meetings/process", json={"transcript": transcript}))
+            return job
+        return [process(i) for i in range(args.requests)]
+
+    if scenario == "live":
+        def meeting(i: int):
+            async def job():
+                url = f"/api/v1/meetings/bench-{base + i}/segments"
+                lines = corpus.segments(args.words, base + i)
+                for n, line in enumerate(lines, start=1):
+                    await rec.timed("live.segment", lambda: client.post(
+                        url, json={"text": line, "analyze": False, "participants": corpus.NAMES}))
+                    if n % args.tick_every == 0 or n == len(lines):
+                        await rec.timed("live.tick", lambda: client.post(url, json={"text": "", "analyze": True}))
+            return job
+        return [meeting(i) for i in range(args.meetings)]
+
+    raise ValueError(f"unknown scenario: {scenario}")
+
+
+async def run_scenario(scenario: str, args: argparse.Namespace, config: FakeConfig) -> Dict[str, Any]:
+    with install(config, cache=args.cache) as usage:
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+            rec = Recorder()
+            await _run_workers(_jobs(scenario, client, rec, args), args.concurrency)
+    report = rec.report()
+    report["fake_groq"] = dict(usage.counters)
+    return report
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Returns one line per metric that got worse than baseline * (1 + tolerance).
+    """
+    regressions = []
+    for scenario, report in results["scenarios"].items():
+        base_ops = baseline.get("scenarios", {}).get(scenario, {}).get("operations", {})
+        for op, metrics in report["operations"].items():
+            for name in COMPARED:
+                old, new = base_ops.get(op, {}).get(name), metrics.get(name)
+                if old and new is not None and new > old * (1 + tolerance):
+                    regressions.append(f"{scenario}/{op} {name}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+            if metrics["errors"] > base_ops.get(op, {}).get("errors", 0):
+                regressions.append(f"{scenario}/{op} errors: {base_ops.get(op, {}).get('errors', 0)} -> {metrics['errors']}")
+    return regressions
+
+
+def _print_table(results: Dict[str, Any]) -> None:
+    header = f"{'operation':<16}{'n':>6}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'req/s':>9}" \
+             f"{'tok in':>9}{'tok out':>9}{'calls':>7}"
+    print(header)
+    print("-" * len(header))
+    for scenario, report in results["scenarios"].items():
+        for op, m in report["operations"].items():
+            print(f"{op:<16}{m['requests']:>6}{m['errors']:>5}{m['p50_ms']:>10}{m['p95_ms']:>10}{m['p99_ms']:>10}"
+                  f"{m['throughput_rps']:>9}{m['prompt_tokens_per_request']:>9}"
+                  f"{m['completion_tokens_per_request']:>9}{m['chat_calls_per_request']:>7}")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Offline API benchmarks against a fake Groq client.")
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=40, help="requests per analyze/process run")
+    parser.add_argument("--meetings", type=int, default=8, help="concurrent live meetings")
+    parser.add_argument("--words", type=int, default=1500, help="transcript length for process/live")
+    parser.add_argument("--tick-every", type=int, default=5, help="live: analysis tick every N lines")
+    parser.add_argument("--audio-seconds", type=float, default=5.0)
+    parser.add_argument("--latency-ms", type=float, default=250.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--token-ms", type=float, default=1.0)
+    parser.add_argument("--transcribe-ms", type=float, default=800.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cache", action="store_true", help="keep the result cache on")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON to compare against; exits 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    config = FakeConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, token_ms=args.token_ms,
+        transcribe_ms=args.transcribe_ms, error_rate=args.error_rate, transcript_words=args.words, seed=args.seed,
+    )
+    scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+    results: Dict[str, Any] = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "args": {k: v for k, v in vars(args).items() if k not in ("save", "compare")},
+        "fake_groq": asdict(config),
+        "scenarios": {},
+    }
+    for scenario in scenarios:
+        results["scenarios"][scenario] = asyncio.run(run_scenario(scenario, args, config))
+    _print_table(results)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.save)), exist_ok=True)
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print("\nRegressions against", args.compare)
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print(f"\nNo regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,177 @@
+# benchmarks/startup.py
+"""
+Cold start and memory of the production server profile.
+
+Starts `gunicorn -c gunicorn.conf.py app.main:app` (or plain uvicorn with
+--server uvicorn) on a scratch database, polls GET /ready until every
+worker has answered, then reports:
+
+  ready_ms          spawn -> first worker ready
+  all_ready_ms      spawn -> every worker ready
+  first_request_ms  the first GET /api/v1/meetings (cold with --workers 1)
+  memory            RSS, PSS and private (USS) memory of the master and each
+                    worker, from /proc (Linux only); PSS/USS show how much of
+                    the preloaded master the workers really share
+  shutdown_ms       SIGTERM -> all processes exited
+
+    python -m benchmarks.startup --workers 4
+    python -m benchmarks.startup --workers 4 --warmup
+    python -m benchmarks.startup --workers 4 --no-preload
+"""
+import argparse
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _children(pid: int) -> List[int]:
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # the ppid is the 2nd field after the parenthesised command name
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == pid:
+            found.append(int(entry))
+    return sorted(found)
+
+
+def _memory_kb(pid: int) -> Dict[str, int]:
+    fields: Dict[str, int] = {}
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    fields["rss_kb"] = int(line.split()[1])
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            rollup = {line.split(":")[0]: int(line.split()[1]) for line in f if line.split()[-1] == "kB"}
+        fields["pss_kb"] = rollup.get("Pss", 0)
+        fields["uss_kb"] = rollup.get("Private_Clean", 0) + rollup.get("Private_Dirty", 0)
+    except OSError:
+        pass
+    return fields
+
+
+def _command(args: argparse.Namespace, port: int) -> List[str]:
+    if args.server == "uvicorn":
+        return [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+                "--workers", str(args.workers), "--no-access-log"]
+    return [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "app.main:app"]
+
+
+def measure(args: argparse.Namespace) -> Dict[str, Any]:
+    port = _free_port()
+    scratch = tempfile.mkdtemp(prefix="bench_startup_")
+    env = {
+        **os.environ,
+        "GROQ_API_KEY": os.environ.get("GROQ_API_KEY", "benchmark"),
+        "DATABASE_URL": f"sqlite:///{os.path.join(scratch, 'meetings.db')}",
+        "UPLOAD_DIR": os.path.join(scratch, "uploads"),
+        "SEARCH_INDEX_PATH": os.path.join(scratch, "search.db"),
+        "BIND": f"127.0.0.1:{port}",
+        "WEB_CONCURRENCY": str(args.workers),
+        "GUNICORN_PRELOAD": "false" if args.no_preload else "true",
+        "WARMUP": "true" if args.warmup else "false",
+        "LOG_REQUESTS": "false",
+        "LOG_LEVEL": "warning",
+    }
+    # built up front: a client's TLS setup would otherwise be counted as server time
+    client = httpx.Client(timeout=10.0)
+    started = time.perf_counter()
+    proc = subprocess.Popen(_command(args, port), cwd=BACKEND, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    report: Dict[str, Any] = {"server": args.server, "workers": args.workers, "warmup": args.warmup,
+                              "preload": args.server == "gunicorn" and not args.no_preload}
+    try:
+        ready: Dict[int, Dict[str, Any]] = {}
+        ready_ms: Optional[float] = None
+        deadline = started + args.timeout
+        while len(ready) < args.workers and time.perf_counter() < deadline:
+            if proc.poll() is not None:
+                raise RuntimeError(f"server exited with {proc.returncode}")
+            try:
+                # a new connection per poll, so the kernel hands it to any worker
+                response = client.get(f"{url}/ready", headers={"Connection": "close"}, timeout=1.0)
+            except httpx.HTTPError:
+                time.sleep(0.02)
+                continue
+            if response.status_code == 200:
+                body = response.json()
+                ready_ms = ready_ms or (time.perf_counter() - started) * 1000
+                ready.setdefault(body["pid"], body)
+        if len(ready) < args.workers:
+            raise RuntimeError(f"only {len(ready)}/{args.workers} workers ready after {args.timeout}s")
+        report["ready_ms"] = round(ready_ms, 1)
+        report["all_ready_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        report["startup_ms"] = {pid: body["startup_ms"] for pid, body in sorted(ready.items())}
+        report["warmup_steps"] = next(iter(ready.values()))["warmup"]
+
+        t = time.perf_counter()
+        client.get(f"{url}/api/v1/meetings", params={"limit": 1}).raise_for_status()
+        report["first_request_ms"] = round((time.perf_counter() - t) * 1000, 1)
+
+        workers = _children(proc.pid)
+        report["memory"] = {"master": _memory_kb(proc.pid),
+                            "workers": [_memory_kb(pid) for pid in workers]}
+        for key in ("rss_kb", "pss_kb", "uss_kb"):
+            values = [m.get(key, 0) for m in report["memory"]["workers"]]
+            report[f"worker_{key}_avg"] = round(sum(values) / len(values)) if values else 0
+    finally:
+        t = time.perf_counter()
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        report["shutdown_ms"] = round((time.perf_counter() - t) * 1000, 1)
+        client.close()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure server cold start and per-worker memory.")
+    parser.add_argument("--server", choices=("gunicorn", "uvicorn"), default="gunicorn")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--warmup", action="store_true", help="set WARMUP=true")
+    parser.add_argument("--no-preload", action="store_true", help="gunicorn: import the app in every worker")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    report = measure(args)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"{report['server']} x{report['workers']} preload={report['preload']} warmup={report['warmup']}")
+    print(f"  ready {report['ready_ms']:.0f} ms, all workers ready {report['all_ready_ms']:.0f} ms, "
+          f"first request {report['first_request_ms']:.0f} ms, shutdown {report['shutdown_ms']:.0f} ms")
+    master = report["memory"]["master"]
+    print(f"  master  RSS {master.get('rss_kb', 0) / 1024:.1f} MB")
+    print(f"  workers RSS {report['worker_rss_kb_avg'] / 1024:.1f} MB, PSS {report['worker_pss_kb_avg'] / 1024:.1f} MB, "
+          f"private {report['worker_uss_kb_avg'] / 1024:.1f} MB (average)")
+
+
+if __name__ == "__main__":
+    main()
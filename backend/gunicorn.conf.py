@@ -0,0 +1,47 @@
+# gunicorn.conf.py
+"""
+Production server profile:
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Uvicorn workers under a gunicorn master that imports the app once and
+forks (preload), restarts crashed workers, and on SIGTERM drains them for
+up to GRACEFUL_TIMEOUT seconds. Set WARMUP=true to have every worker
+initialise its clients before it takes traffic; GET /ready reports it.
+
+Environment: PORT, WEB_CONCURRENCY (workers, default one per CPU up to 4),
+GRACEFUL_TIMEOUT, KEEPALIVE, MAX_REQUESTS (recycle a worker after that many
+requests, 0 = never), GUNICORN_PRELOAD.
+"""
+import multiprocessing
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value else default
+
+
+bind = os.getenv("BIND", f"0.0.0.0:{_env_int('PORT', 8000)}")
+workers = _env_int("WEB_CONCURRENCY", min(4, multiprocessing.cpu_count()))
+worker_class = "app.core.server.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+# a worker whose event loop stops heartbeating this long is restarted
+timeout = _env_int("WORKER_TIMEOUT", 60)
+graceful_timeout = _env_int("GRACEFUL_TIMEOUT", 30)
+keepalive = _env_int("KEEPALIVE", 5)
+max_requests = _env_int("MAX_REQUESTS", 0)
+max_requests_jitter = max_requests // 10
+
+# the app logs every request itself (LOG_REQUESTS), with its request id
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+
+def on_starting(server):
+    from app.core.server import prepare_master
+
+    prepare_master()
@@ -1,4 +1,6 @@
 #!/bin/bash
 
-# Start the FastAPI application using Uvicorn
-uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload --workers 4
\ No newline at end of file
+# Start the FastAPI application: preloaded Uvicorn workers under Gunicorn
+# (settings in gunicorn.conf.py; WEB_CONCURRENCY sets the worker count).
+# For development use: uvicorn app.main:app --reload
+exec gunicorn -c gunicorn.conf.py app.main:app